@@ -1,12 +1,11 @@
 # analytics_models.py
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.sqlite import JSON as SQLITE_JSON
-try:
-    from sqlalchemy.dialects.postgresql import JSONB
-    JSONType = JSONB
-except Exception:
-    JSONType = SQLITE_JSON  # cai no JSON do SQLite
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB no Postgres, JSON genérico nos demais (o SQLite não compila JSONB)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 db = SQLAlchemy()
 
@@ -28,3 +27,31 @@ class Event(db.Model):
     country     = db.Column(db.String(2))
     device      = db.Column(db.String(32))
     props       = db.Column(JSONType)                    # <-- OPCIONAL: extras em JSON (SQLite/Postgres)
+
+
+# ---------------------------------------------------------------------------
+# Rollups do painel (services/analytics_rollups.py): contagens por minuto e por
+# dia no formato (período, métrica, chave) -> valor, e sketches HyperLogLog de
+# visitantes/sessões por hora e por dia para as contagens distintas.
+# ---------------------------------------------------------------------------
+
+class RollupMinuto(db.Model):
+    __tablename__ = "li_rollup_minuto"
+    minuto      = db.Column(db.DateTime, primary_key=True)
+    metrica     = db.Column(db.String(16), primary_key=True)   # 'pageview','click','hb_ms','eventos'
+    chave       = db.Column(db.String(255), primary_key=True)  # path, label ou tipo de evento
+    valor       = db.Column(db.BigInteger, nullable=False, default=0)
+
+class RollupDia(db.Model):
+    __tablename__ = "li_rollup_dia"
+    dia         = db.Column(db.Date, primary_key=True)
+    metrica     = db.Column(db.String(16), primary_key=True)
+    chave       = db.Column(db.String(255), primary_key=True)
+    valor       = db.Column(db.BigInteger, nullable=False, default=0)
+
+class SketchDistintos(db.Model):
+    __tablename__ = "li_rollup_hll"
+    periodo     = db.Column(db.DateTime, primary_key=True)     # início da hora ou do dia
+    granularidade = db.Column(db.String(1), primary_key=True)  # 'h' ou 'd'
+    tipo        = db.Column(db.String(1), primary_key=True)    # 'v' visitante, 's' sessão
+    registros   = db.Column(db.LargeBinary, nullable=False)    # HyperLogLog serializado (services/analytics_hll.py)
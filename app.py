@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, jsonify, request, send_file, redirect, url_for, session, Response
+from flask import Flask, render_template, jsonify, request, send_file, redirect, url_for, session, Response, stream_with_context
 from functools import wraps
 import os
 import sys
@@ -31,7 +31,10 @@ import logging
 FREE_ACCESS_MODE = True
 
 # Analytics imports
-from analytics_models import db, Event
+from analytics_models import db, RollupDia, RollupMinuto, SketchDistintos
+from services import analytics_particoes, analytics_rollups
+from services.analytics_ingestao import evento_da_requisicao, ingestor as ingestor_analytics
+from services.analytics_tempo_real import janela as janela_tempo_real
 
 # ============================================================================
 # 🔐 SISTEMA SIMPLES DE AUTENTICAÇÃO
@@ -594,6 +597,8 @@ if os.path.exists('config.env'):
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///li.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 db.init_app(app)
+ingestor_analytics.init_app(app)
+janela_tempo_real.init_app(app)
 
 # Criar tabelas automaticamente
 with app.app_context():
@@ -615,9 +620,17 @@ with app.app_context():
         has_table = inspector.has_table("li_events")
         logger.info(f"📊 Tabela li_events existe após criação: {has_table}")
         
-        # Contar eventos
-        count = db.session.query(db.func.count(Event.id)).scalar()
+        # Partições mensais dos eventos (migra a li_events original na primeira vez)
+        analytics_particoes.migrar()
+        count = analytics_particoes.contar()["total"]
         logger.info(f"📈 Total de eventos: {count}")
+
+        # Rollups do painel: na primeira vez, carregados a partir dos eventos existentes
+        tabelas_rollup = [RollupMinuto.__table__, RollupDia.__table__, SketchDistintos.__table__]
+        if not all(inspector.has_table(t.name) for t in tabelas_rollup):
+            db.metadata.create_all(db.engine, tables=tabelas_rollup)
+            recompostos = analytics_rollups.recompor_historico()
+            logger.info(f"✅ Rollups do analytics criados ({recompostos} eventos agregados)")
         
     except Exception as e:
         logger.error(f"❌ Erro ao criar tabelas: {e}")
@@ -1512,6 +1525,9 @@ def create_test_user(level):
 
 # Funções utilitárias movidas para utils/data_helpers.py
 from utils.data_helpers import _to_native, limpar_valores_problematicos
+from services.cache_analises import cache_analise
+from services import agregados_incrementais, backtest as backtest_service, contexto_geracao
+from services.draw_store import carregar_historico
 
 # --- Importações das suas funções de análise, conforme a nova estrutura ---
 # Certifique-se de que esses arquivos Python (.py) estejam no mesmo diretório
@@ -1524,7 +1540,7 @@ from utils.data_helpers import _to_native, limpar_valores_problematicos
 # Imports pesados movidos para lazy loading - serão importados quando necessário
 
 # Funções de carregamento movidas para services/data_loader.py
-from services.data_loader import carregar_dados_milionaria, carregar_dados_megasena_app, carregar_dados_quina_app
+from services.data_loader import carregar_dados_milionaria, carregar_dados_megasena_app, carregar_dados_quina_app, carregar_dados_lotomania
 from funcoes.lotofacil.LotofacilFuncaCarregaDadosExcel import carregar_dados_lotofacil
 
 # Importações das funções da Milionária (como estava no backup)
@@ -1638,20 +1654,20 @@ def carregar_dados_da_loteria(loteria):
             from funcoes.lotofacil.LotofacilFuncaCarregaDadosExcel import carregar_dados_lotofacil
             _data_cache[loteria] = carregar_dados_lotofacil()
         elif loteria == "lotomania":
-            # Lazy import para lotomania
-            pd = _lazy_import_pandas()
-            excel_path = _get_loteria_data_path("lotomania")
-            logger.info(f"Tentando carregar Lotomania de: {excel_path}")
-            if os.path.exists(excel_path):
-                _data_cache[loteria] = pd.read_excel(excel_path)
+            _data_cache[loteria] = carregar_dados_lotomania()
+            if _data_cache[loteria] is not None:
                 logger.info(f"Lotomania carregada com sucesso. Linhas: {len(_data_cache[loteria])}")
             else:
-                logger.error(f"Arquivo Lotomania não encontrado: {excel_path}")
-                _data_cache[loteria] = None
+                logger.error(f"Arquivo Lotomania não encontrado: {data_path}")
         else:
             logger.error(f"Loteria desconhecida: {loteria}")
             return None
         _data_cache_mtime[loteria] = current_mtime
+        # Agregados correntes: concursos novos entram como delta
+        try:
+            agregados_incrementais.sincronizar(loteria)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar agregados da {loteria}: {e}")
     
     return _data_cache.get(loteria)
 
@@ -1758,6 +1774,7 @@ def dashboard_milionaria():
 # Para evitar confusão e manter consistência, use apenas a nova rota
 
 @app.route('/api/analise-frequencia')
+@cache_analise("mais_milionaria")
 def get_analise_frequencia_nova():
     """Nova rota para análise de frequência com dados reais dos últimos 50 concursos."""
     try:
@@ -1805,6 +1822,7 @@ def get_analise_frequencia_nova():
 
 
 @app.route('/api/analise_padroes_sequencias', methods=['GET'])
+@cache_analise("mais_milionaria")
 def get_analise_padroes_sequencias():
     """Retorna os dados da análise de padrões e sequências."""
     df_milionaria = carregar_dados_da_loteria("mais_milionaria")
@@ -1820,6 +1838,7 @@ def get_analise_padroes_sequencias():
     return jsonify(resultado)
 
 @app.route('/api/analise_de_distribuicao', methods=['GET'])
+@cache_analise("mais_milionaria")
 def get_analise_de_distribuicao():
     """Retorna os dados da análise de distribuição da +Milionária."""
     try:
@@ -1841,9 +1860,11 @@ def get_analise_de_distribuicao():
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
 @app.route('/api/analise_de_distribuicao-MS', methods=['GET'])
+@cache_analise("megasena")
 def get_analise_de_distribuicao_megasena():
     """Retorna os dados da análise de distribuição da Mega Sena."""
     try:
+        df_megasena = carregar_dados_da_loteria("megasena")
         if df_megasena.empty:
             return jsonify({"error": "Dados da Mega Sena não carregados."}), 500
 
@@ -1870,6 +1891,7 @@ def get_analise_de_distribuicao_megasena():
 
 # --- Rotas de API da Quina ---
 @app.route('/api/analise-frequencia-quina')
+@cache_analise("quina")
 def get_analise_frequencia_quina():
     """Nova rota para análise de frequência da Quina com dados reais dos últimos 100 concursos."""
     try:
@@ -1985,6 +2007,7 @@ def get_analise_frequencia_quina():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise-frequencia-lotomania')
+@cache_analise("lotomania")
 def analise_frequencia_lotomania_api():
     """API para análise de frequência da Lotomania"""
     try:
@@ -2047,6 +2070,7 @@ def analise_frequencia_lotomania_api():
         return jsonify({"error": "Erro interno do servidor"}), 500
 
 @app.route('/api/analise-frequencia-lotofacil')
+@cache_analise("lotofacil")
 def analise_frequencia_lotofacil_api():
     """API para análise de frequência da Lotofácil"""
     try:
@@ -2078,6 +2102,7 @@ def analise_frequencia_lotofacil_api():
 
 
 @app.route('/api/analise-frequencia-lotofacil-v2')
+@cache_analise("lotofacil")
 def analise_frequencia_lotofacil_v2_api():
     """API v2 para análise de frequência da Lotofácil (fluxo Premium, 15 bolas)."""
     try:
@@ -2158,6 +2183,7 @@ def analise_frequencia_lotofacil_v2_api():
         return jsonify({"error": "Erro interno do servidor"}), 500
 
 @app.route('/api/analise_de_distribuicao-quina', methods=['GET'])
+@cache_analise("quina")
 def get_analise_de_distribuicao_quina():
     """Retorna os dados da análise de distribuição da Quina."""
     try:
@@ -2184,6 +2210,7 @@ def get_analise_de_distribuicao_quina():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_de_distribuicao-lotofacil', methods=['GET'])
+@cache_analise("lotofacil")
 def get_analise_de_distribuicao_lotofacil():
     """Retorna os dados da análise de distribuição da Lotofácil."""
     try:
@@ -2201,6 +2228,7 @@ def get_analise_de_distribuicao_lotofacil():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_de_combinacoes-quina', methods=['GET'])
+@cache_analise("quina")
 def get_analise_de_combinacoes_quina():
     """Retorna os dados da análise de combinações da Quina."""
     try:
@@ -2223,6 +2251,7 @@ def get_analise_de_combinacoes_quina():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_de_combinacoes-lotofacil', methods=['GET'])
+@cache_analise("lotofacil")
 def get_analise_de_combinacoes_lotofacil():
     """Retorna os dados da análise de combinações da Lotofácil."""
     try:
@@ -2239,6 +2268,7 @@ def get_analise_de_combinacoes_lotofacil():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_padroes_sequencias-quina', methods=['GET'])
+@cache_analise("quina")
 def get_analise_padroes_sequencias_quina():
     """Retorna os dados da análise de padrões e sequências da Quina."""
     try:
@@ -2261,6 +2291,7 @@ def get_analise_padroes_sequencias_quina():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_padroes_sequencias-lotofacil', methods=['GET'])
+@cache_analise("lotofacil")
 def get_analise_padroes_sequencias_lotofacil():
     """Retorna os dados da análise de padrões e sequências da Lotofácil."""
     try:
@@ -2289,89 +2320,53 @@ def api_analise_seca_lotofacil():
             qtd_concursos = 200
         qtd_concursos = min(qtd_concursos, 200)
 
-        # Detectores locais de colunas (concurso e bolas 1..15)
-        # Importar pandas para uso local
-        pd = _lazy_import_pandas()
-        
-        def _detectar_coluna_concurso_local(df: pd.DataFrame):
-            possiveis = ['concurso', 'nrconcurso', 'n_concurso', 'numero_concurso', 'idconcurso']
-            lower = {str(c).strip().lower(): c for c in df.columns}
-            for k in possiveis:
-                if k in lower:
-                    return lower[k]
-            for k, v in lower.items():
-                if 'concurso' in k:
-                    return v
-            return None
-
-        def _detectar_colunas_bolas_local(df: pd.DataFrame):
-            lower = {str(c).strip().lower(): c for c in df.columns}
-            def achar(n):
-                chaves = [f'bola{n}', f'bola{n:02d}', f'dezena{n}', f'd{n}', f'num{n}', f'n{n}', f'b{n}']
-                for key in chaves:
-                    if key in lower:
-                        return lower[key]
-                for k, v in lower.items():
-                    if k.endswith(str(n)) and any(p in k for p in ('bola','dez','d','num','n','b')):
-                        return v
-                return None
-            cols = []
-            for n in range(1, 16):
-                c = achar(n)
-                if c is None:
-                    return None
-                cols.append(c)
-            return cols
+        from funcoes.common import detect_concurso_column, detect_bolas_columns
+        from funcoes.common.incidencia import MatrizIncidencia
+        from funcoes.common.seca import calcular_seca, filtrar_concursos_validos, seca_dos_agregados
 
-        concurso_col = _detectar_coluna_concurso_local(df_lotofacil)
-        bolas = _detectar_colunas_bolas_local(df_lotofacil)
+        concurso_col = detect_concurso_column(df_lotofacil)
+        bolas = detect_bolas_columns(df_lotofacil, 15)
         if concurso_col is None or not bolas:
             return jsonify({'error': 'Colunas de concurso/bolas não detectadas.'}), 500
 
-        # Importar pandas para uso local
-        pd = _lazy_import_pandas()
-        
-        df = df_lotofacil.copy()
-        for col in bolas:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        df = df.dropna(subset=bolas)
-        mask_validos = (df[bolas] >= 1).all(axis=1) & (df[bolas] <= 25).all(axis=1)
-        df = df[mask_validos]
+        df = filtrar_concursos_validos(df_lotofacil, bolas, (1, 25))
         if df.empty:
             return jsonify({'error': 'Sem linhas válidas após limpeza.'}), 500
+        df = df.tail(qtd_concursos)
 
-        df = df.tail(qtd_concursos).copy()
-
-        # Calcular seca atual por número (contando a partir do último concurso)
-        seca_por_numero = {n: {'seca_atual': 0} for n in range(1, 26)}
-        # Lista de sorteios do mais recente para o mais antigo
-        sorteios = list(reversed(df[bolas].values.tolist()))
-        for n in range(1, 26):
-            cont = 0
-            for sorteio in sorteios:
-                if n in sorteio:
-                    break
-                cont += 1
-            seca_por_numero[n]['seca_atual'] = cont
+        # Seca atual de todos os números: agregados correntes se o recorte é a
+        # cauda do histórico; senão o kernel vetorizado em uma passada
+        kernel = None
+        if concurso_col == 'Concurso' and bolas == [f'Bola{i}' for i in range(1, 16)]:
+            pd = _lazy_import_pandas()
+            concursos = pd.to_numeric(df['Concurso'], errors='coerce')
+            if concursos.notna().all():
+                kernel = seca_dos_agregados("lotofacil", concursos.to_numpy(dtype='int64'))
+        if kernel is None:
+            incidencia = MatrizIncidencia.from_dataframe(df, "lotofacil", colunas=bolas, ordenar=False)
+            kernel = calcular_seca(incidencia)
+        seca_por_numero = {
+            int(n): {
+                'seca_atual': int(kernel['seca_atual'][j]),
+                'maior_seca': int(kernel['maior_seca'][j]),
+                'seca_media_historica': round(float(kernel['seca_media'][j]), 2),
+            }
+            for j, n in enumerate(kernel['numeros'])
+        }
 
         # Estatísticas simples
-        # Importar pandas para uso local
-        pd = _lazy_import_pandas()
-        
-        valores = [v['seca_atual'] for v in seca_por_numero.values()]
-        seca_max = int(max(valores) if valores else 0)
-        seca_med = float(pd.Series(valores).median()) if valores else 0.0
-        seca_media = float(pd.Series(valores).mean()) if valores else 0.0
+        np = _lazy_import_numpy()
+        valores = kernel['seca_atual']
+        seca_max = int(valores.max())
+        seca_med = float(np.median(valores))
+        seca_media = float(valores.mean())
 
         # Top números em maior seca
         numeros_maior_seca = sorted([(n, seca_por_numero[n]) for n in range(1, 26)],
                                      key=lambda x: x[1]['seca_atual'], reverse=True)
 
-        # Números que saíram mais recentemente (último concurso)
-        ultimo = df[bolas].iloc[-1].tolist()
-        # Importar pandas para uso local
-        pd = _lazy_import_pandas()
-        numeros_recentes = [int(x) for x in ultimo if pd.notna(x)]
+        # Números que saíram mais recentemente (último concurso: seca 0)
+        numeros_recentes = kernel['numeros'][kernel['seca_atual'] == 0].tolist()
 
         payload = {
             'numeros_seca': {
@@ -2434,6 +2429,7 @@ def get_lotofacil_sequencias_detalhe():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/estatisticas_avancadas_quina', methods=['GET'])
+@cache_analise("quina")
 def get_estatisticas_avancadas_quina():
     """Retorna os dados das estatísticas avançadas da Quina."""
     try:
@@ -2518,66 +2514,95 @@ def gerar_aposta_premium_quina():
         # O frontend envia o objeto userPremiumPreferences completo
         preferencias_ml = data  # Usar diretamente o objeto enviado
         
-        # Carregar dados de análise para o cache
-        analysis_cache = {}
-        
-        # Carregar dados de frequência se necessário
-        if any(key in preferencias_ml for key in ['frequencia']):
-            try:
-                from funcoes.quina.funcao_analise_de_frequencia_quina import analisar_frequencia_quina
-                dados_freq = analisar_frequencia_quina(qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['frequencia_completa'] = dados_freq
-                analysis_cache['frequencia_25'] = analisar_frequencia_quina(qtd_concursos=25)  # Últimos 25 concursos
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar frequência: {e}")
-        
-        # Carregar dados de padrões se necessário
-        if any(key in preferencias_ml for key in ['padroes']):
-            try:
-                from funcoes.quina.funcao_analise_de_padroes_sequencia_quina import analise_padroes_sequencias_quina
-                dados_padroes = analise_padroes_sequencias_quina()
-                analysis_cache['padroes_completa'] = dados_padroes
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar padrões: {e}")
+        # Insumos das análises prontos por versão dos dados: só o sorteio roda aqui
+        contexto = contexto_geracao.obter_contexto("quina", carregar_dados_da_loteria)
+        if contexto is None:
+            return jsonify({'error': 'Dados da Quina não disponíveis'}), 500
+        analysis_cache = contexto.analysis_cache(preferencias_ml)
         
-        # Carregar dados de afinidades (combinacoes) se necessário
-        if any(key in preferencias_ml for key in ['afinidades']):
-            try:
-                from funcoes.quina.funcao_analise_de_combinacoes_quina import analisar_combinacoes_quina
-                dados_afinidades = analisar_combinacoes_quina(df_quina, qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['afinidades_completa'] = dados_afinidades
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar afinidades: {e}")
-        
-        # Carregar dados de distribuição se necessário
-        if any(key in preferencias_ml for key in ['distribuicao']):
-            try:
-                from funcoes.quina.funcao_analise_de_distribuicao_quina import analisar_distribuicao_quina
-                dados_distribuicao = analisar_distribuicao_quina(df_quina, qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['distribuicao_completa'] = dados_distribuicao
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar distribuição: {e}")
-        
-        # Carregar dados avançados se necessário
-        if any(key in preferencias_ml for key in ['clusters']):
-            try:
-                analise = AnaliseEstatisticaAvancadaQuina(df_quina)
-                dados_avancados = analise.executar_analise_completa()
-                analysis_cache['avancada'] = dados_avancados
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar dados avançados: {e}")
-        
-        # Gerar aposta inteligente
-        resultado = gerar_aposta_inteligente_quina(preferencias_ml, analysis_cache)
+        # Fluxo aleatório do pedido; a semente devolvida refaz as mesmas apostas
+        # (a resposta é a lista de apostas, então a semente vai em cada uma)
+        rng, semente = criar_rng(preferencias_ml.get('semente'))
+        resultado = gerar_aposta_inteligente_quina(preferencias_ml, analysis_cache, rng=rng)
+        for aposta in resultado:
+            aposta['semente'] = str(semente)
         
         return jsonify(resultado)
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (Quina): {e}")
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro na API de geração premium Quina: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/probabilidade/<loteria>', methods=['POST'])
+def probabilidade_filtros(loteria):
+    """
+    Parcela exata das apostas que um filtro mantém (contagem combinatória,
+    sem enumerar as apostas).
+
+    Corpo: {"qtd_numeros": 6, "pares": [3, 3], "primos": [0, 2],
+            "moldura": {"min": 2}, "soma": [150, 210]}
+    """
+    try:
+        from funcoes.common.probabilidades import CARACTERISTICAS, probabilidade
+
+        data = request.get_json(silent=True) or {}
+        faixas = {c: data.get(c) for c in CARACTERISTICAS if data.get(c) is not None}
+        return jsonify(probabilidade(loteria, data.get('qtd_numeros'), **faixas))
+    except KeyError:
+        return jsonify({'error': f'Loteria inválida: {loteria}'}), 404
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+# Limites do backtest servido pela API (o CLI scripts/backtest.py não tem teto).
+# Roda síncrono dentro da requisição, ~3,7 ms por aposta gerada (Mega Sena e
+# Quina): o padrão 100 x 10 leva ~4s e o teto 200 x 10 ~8s, longe do timeout
+# do gunicorn. Janelas maiores ficam para o CLI.
+BACKTEST_CONCURSOS_PADRAO = 100
+BACKTEST_APOSTAS_PADRAO = 10
+BACKTEST_MAX_CONCURSOS = int(os.environ.get("BACKTEST_MAX_CONCURSOS", "200"))
+BACKTEST_MAX_APOSTAS = int(os.environ.get("BACKTEST_MAX_APOSTAS", "10"))
+
+@app.route('/api/backtest/<loteria>', methods=['POST'])
+def backtest_preferencias(loteria):
+    """
+    Como as preferências premium teriam se saído nos últimos concursos.
+    Exige usuário logado (cada chamada ocupa uma thread por alguns segundos).
+
+    Corpo: {"preferencias": {...}, "concursos": 100, "apostas_por_concurso": 10}
+    """
+    if not verificar_usuario_logado():
+        return jsonify({'error': 'Login necessário'}), 401
+    try:
+        data = request.get_json(silent=True) or {}
+        preferencias = data.get('preferencias') or {}
+        qtd_concursos = max(1, min(int(data.get('concursos', BACKTEST_CONCURSOS_PADRAO)), BACKTEST_MAX_CONCURSOS))
+        apostas = max(1, min(int(data.get('apostas_por_concurso', BACKTEST_APOSTAS_PADRAO)), BACKTEST_MAX_APOSTAS))
+        if loteria not in backtest_service.GERADORES:
+            return jsonify({'error': f'Loteria sem gerador inteligente: {loteria}'}), 404
+
+        historico = carregar_historico(loteria)
+        if historico is None:
+            return jsonify({'error': 'Dados não disponíveis'}), 500
+        concursos = historico[1]
+        inicial = int(concursos[max(0, len(concursos) - qtd_concursos)])
+        # Um processo só: o pool é para o CLI, não para uma requisição web
+        resultado = backtest_service.backtest(
+            loteria, preferencias, apostas_por_concurso=apostas, concurso_inicial=inicial,
+            processos=1, historico=historico, semente=data.get('semente'),
+        )
+        return jsonify(resultado)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Erro no backtest da {loteria}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/estatisticas_avancadas_lotofacil', methods=['GET'])
+@cache_analise("lotofacil")
 def get_estatisticas_avancadas_lotofacil():
     """Retorna os dados das estatísticas avançadas da Lotofácil."""
     try:
@@ -2608,11 +2633,16 @@ def gerar_aposta_aleatoria_lotofacil_api():
             qtde_num = 20
 
         from funcoes.lotofacil.gerarCombinacao_numeros_aleatoriosL_lotofacil import gerar_aposta_aleatoria_lotofacil
-        numeros = gerar_aposta_aleatoria_lotofacil(qtde_num)
+        rng, semente = criar_rng(payload.get('semente'))
+        numeros = gerar_aposta_aleatoria_lotofacil(qtde_num, rng=rng)
         return jsonify({
             'numeros': numeros,
-            'qtde_apostas': 1
+            'qtde_apostas': 1,
+            'semente': str(semente)
         })
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (Lotofácil aleatória): {e}")
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro na API de aposta aleatória Lotofácil: {e}")
         import traceback
@@ -2620,9 +2650,11 @@ def gerar_aposta_aleatoria_lotofacil_api():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analise_de_combinacoes-MS', methods=['GET'])
+@cache_analise("megasena")
 def get_analise_de_combinacoes_megasena():
     """Retorna os dados da análise de combinações da Mega Sena."""
     try:
+        df_megasena = carregar_dados_da_loteria("megasena")
         if df_megasena.empty:
             return jsonify({"error": "Dados da Mega Sena não carregados."}), 500
 
@@ -2644,9 +2676,11 @@ def get_analise_de_combinacoes_megasena():
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
 @app.route('/api/analise_padroes_sequencias-MS', methods=['GET'])
+@cache_analise("megasena")
 def get_analise_padroes_sequencias_megasena():
     """Retorna os dados da análise de padrões e sequências da Mega Sena."""
     try:
+        df_megasena = carregar_dados_da_loteria("megasena")
         if df_megasena.empty:
             return jsonify({"error": "Dados da Mega Sena não carregados."}), 500
 
@@ -2668,9 +2702,11 @@ def get_analise_padroes_sequencias_megasena():
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
 @app.route('/api/analise_de_combinacoes', methods=['GET'])
+@cache_analise("mais_milionaria")
 def get_analise_de_combinacoes():
     """Retorna os dados da análise de combinações."""
     try:
+        df_milionaria = carregar_dados_da_loteria("mais_milionaria")
         # Verificar se df_milionaria é DataFrame ou lista
         if df_milionaria is None:
             return jsonify({"error": "Dados da +Milionária não carregados."}), 500
@@ -2831,6 +2867,7 @@ def get_analise_seca_megasena():
 
 
 @app.route('/api/estatisticas_avancadas', methods=['GET'])
+@cache_analise("mais_milionaria")
 def get_estatisticas_avancadas():
     """Retorna os dados das estatísticas avançadas."""
     try:
@@ -2914,9 +2951,11 @@ def get_estatisticas_avancadas():
 
 
 @app.route('/api/estatisticas_avancadas_MS', methods=['GET'])
+@cache_analise("megasena")
 def get_estatisticas_avancadas_megasena():
     """Retorna os dados das estatísticas avançadas da Mega Sena."""
     try:
+        df_megasena = carregar_dados_da_loteria("megasena")
         # print("🔍 Iniciando requisição para /api/estatisticas_avancadas_MS")  # DEBUG - COMENTADO
         
         if df_megasena is None or df_megasena.empty:
@@ -2972,12 +3011,9 @@ def get_estatisticas_avancadas_megasena():
 
 # --- Rota para manifestação de interesse em bolões (sem persistência para este exemplo) ---
 # Funções de geração de números movidas para services/geradores/numeros_aleatorios.py
-from services.geradores.numeros_aleatorios import (
-    gerar_numeros_aleatorios,
-    gerar_numeros_aleatorios_megasena,
-    gerar_numeros_aleatorios_quina,
-    gerar_numeros_aleatorios_lotomania
-)
+# (módulo importado com nome próprio: as rotas abaixo têm os mesmos nomes das funções)
+from services.geradores import numeros_aleatorios as geradores_aleatorios
+from funcoes.common.rng import criar_rng, normalizar_semente
 
 # Importar funções da Lotomania
 from funcoes.lotomania.gerarCombinacao_numeros_aleatoriosLotomania import gerar_aposta_personalizada_lotomania
@@ -2987,11 +3023,15 @@ from funcoes.lotomania.funcao_analise_de_frequencia_lotomania import analisar_fr
 def gerar_numeros_aleatorios():
     """Gera números aleatórios para +Milionária (6 números + 2 trevos)."""
     try:
-        resultado = gerar_numeros_aleatorios()
+        # ?semente=... refaz o sorteio de uma aposta anterior
+        semente = normalizar_semente(request.args.get('semente'))
+        resultado = geradores_aleatorios.gerar_numeros_aleatorios(semente)
         if resultado["success"]:
             return jsonify(resultado)
         else:
             return jsonify(resultado), 500
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao gerar números aleatórios: {e}")
         return jsonify({
@@ -3003,11 +3043,15 @@ def gerar_numeros_aleatorios():
 def gerar_numeros_aleatorios_megasena():
     """Gera números aleatórios para Mega Sena (6 números de 1-60)."""
     try:
-        resultado = gerar_numeros_aleatorios_megasena()
+        # ?semente=... refaz o sorteio de uma aposta anterior
+        semente = normalizar_semente(request.args.get('semente'))
+        resultado = geradores_aleatorios.gerar_numeros_aleatorios_megasena(semente)
         if resultado["success"]:
             return jsonify(resultado)
         else:
             return jsonify(resultado), 500
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao gerar números aleatórios da Mega Sena: {e}")
         return jsonify({
@@ -3019,11 +3063,15 @@ def gerar_numeros_aleatorios_megasena():
 def gerar_numeros_aleatorios_quina():
     """Gera números aleatórios para Quina (5 números de 1-80)."""
     try:
-        resultado = gerar_numeros_aleatorios_quina()
+        # ?semente=... refaz o sorteio de uma aposta anterior
+        semente = normalizar_semente(request.args.get('semente'))
+        resultado = geradores_aleatorios.gerar_numeros_aleatorios_quina(semente)
         if resultado["success"]:
             return jsonify(resultado)
         else:
             return jsonify(resultado), 500
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao gerar números aleatórios da Quina: {e}")
         return jsonify({
@@ -3035,11 +3083,15 @@ def gerar_numeros_aleatorios_quina():
 def gerar_numeros_aleatorios_lotomania():
     """Gera números aleatórios para Lotomania com controle de qualidade de distribuição par/ímpar e repetição do último concurso."""
     try:
-        resultado = gerar_numeros_aleatorios_lotomania()
+        # ?semente=... refaz o sorteio de uma aposta anterior
+        semente = normalizar_semente(request.args.get('semente'))
+        resultado = geradores_aleatorios.gerar_numeros_aleatorios_lotomania(semente)
         if resultado["success"]:
             return jsonify(resultado)
         else:
             return jsonify(resultado), 500
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao gerar números aleatórios da Lotomania: {e}")
         return jsonify({
@@ -3063,7 +3115,8 @@ def gerar_aposta_milionaria_api():
         from funcoes.milionaria.gerarCombinacao_numeros_aleatoriosMilionaria import gerar_aposta_personalizada
         
         # Chama a função principal de geração de aposta
-        numeros, trevo1, trevo2, valor, qtde_apostas = gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2)
+        rng, semente = criar_rng(data.get('semente'))
+        numeros, trevo1, trevo2, valor, qtde_apostas = gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2, rng=rng)
 
         return jsonify({
             'success': True,
@@ -3072,6 +3125,7 @@ def gerar_aposta_milionaria_api():
             'trevo2': trevo2,
             'valor': valor,
             'qtde_apostas': qtde_apostas,
+            'semente': str(semente),
             'mensagem': 'Aposta gerada com sucesso!'
         })
 
@@ -3096,13 +3150,15 @@ def gerar_aposta_megasena_api():
         from funcoes.megasena.gerarCombinacao_numeros_aleatoriosMegasena_MS import gerar_aposta_personalizada
         
         # Chama a função principal de geração de aposta
-        numeros, valor, qtde_apostas = gerar_aposta_personalizada(qtde_num)
+        rng, semente = criar_rng(data.get('semente'))
+        numeros, valor, qtde_apostas = gerar_aposta_personalizada(qtde_num, rng=rng)
 
         return jsonify({
             'success': True,
             'numeros': numeros,
             'valor': valor,
             'qtde_apostas': qtde_apostas,
+            'semente': str(semente),
             'mensagem': 'Aposta gerada com sucesso!'
         })
 
@@ -3127,13 +3183,15 @@ def gerar_aposta_quina_api():
         from funcoes.quina.gerarCombinacao_numeros_aleatoriosQuina_quina import gerar_aposta_personalizada_quina
         
         # Chama a função principal de geração de aposta
-        numeros, valor, qtde_apostas = gerar_aposta_personalizada_quina(qtde_num)
+        rng, semente = criar_rng(data.get('semente'))
+        numeros, valor, qtde_apostas = gerar_aposta_personalizada_quina(qtde_num, rng=rng)
 
         return jsonify({
             'success': True,
             'numeros': numeros,
             'valor': valor,
             'qtde_apostas': qtde_apostas,
+            'semente': str(semente),
             'mensagem': 'Aposta da Quina gerada com sucesso!'
         })
 
@@ -3149,13 +3207,15 @@ def gerar_aposta_lotomania_api():
     """Gera aposta personalizada para Lotomania (50 números fixos)."""
     try:
         # Chama a função principal de geração de aposta (sempre 50 números)
-        numeros, valor, qtde_apostas = gerar_aposta_personalizada_lotomania()
+        rng, semente = criar_rng((request.get_json(silent=True) or {}).get('semente'))
+        numeros, valor, qtde_apostas = gerar_aposta_personalizada_lotomania(rng=rng)
 
         return jsonify({
             'success': True,
             'numeros': numeros,
             'valor': valor,
             'qtde_apostas': qtde_apostas,
+            'semente': str(semente),
             'mensagem': 'Aposta da Lotomania gerada com sucesso! (50 números fixos)'
         })
 
@@ -3216,7 +3276,8 @@ def gerar_aposta_lotofacil_api():
         
         # Chama a função principal de geração de aposta com quantidade e preferências
         logger.info(f"Gerando aposta Lotofácil: quantidade={quantidade}, preferencias={preferencias_backend}")
-        numeros = gerar_aposta_personalizada_lotofacil(quantidade, preferencias_backend)
+        rng, semente = criar_rng(data.get('semente') if data else None)
+        numeros = gerar_aposta_personalizada_lotofacil(quantidade, preferencias_backend, rng=rng)
         logger.info(f"Aposta gerada: {numeros}")
         
         # Tabela de valores da Lotofácil
@@ -3238,6 +3299,7 @@ def gerar_aposta_lotofacil_api():
             'valor': valor,
             'qtde_apostas': qtde_apostas,
             'quantidade': quantidade,
+            'semente': str(semente),
             'mensagem': f'Aposta da Lotofácil gerada com sucesso! ({quantidade} números)'
         })
 
@@ -3248,6 +3310,85 @@ def gerar_aposta_lotofacil_api():
         logger.error(f"Erro inesperado ao gerar aposta Lotofácil: {e}")
         return jsonify({'error': 'Erro interno do servidor ao gerar aposta.'}), 500
 
+@app.route('/api/gerar-apostas-lote', methods=['POST'])
+def gerar_apostas_lote_api():
+    """Gera N apostas de uma vez (bolões) para qualquer loteria.
+
+    Corpo JSON: loteria, quantidade, qtde_numeros, qtde_trevos (+Milionária),
+    pesos / pesos_trevos ({número: peso}), restricoes (pares_permitidos,
+    soma_min, soma_max, evitar_consecutivos, marcados, max_marcados),
+    semente (refaz um lote anterior) e formato ("json" ou "ndjson"). A
+    resposta é enviada em streaming e traz a semente no cabeçalho.
+    """
+    try:
+        from services.geradores.lote import gerar_lote, iterar_json, iterar_ndjson
+
+        data = request.get_json(silent=True) or {}
+        restricoes_req = data.get('restricoes') or {}
+        restricoes = {
+            'pares_permitidos': restricoes_req.get('pares_permitidos'),
+            'evitar_consecutivos': bool(restricoes_req.get('evitar_consecutivos')),
+            'marcados': restricoes_req.get('marcados'),
+            'max_marcados': restricoes_req.get('max_marcados'),
+        }
+        if restricoes_req.get('soma_min') is not None or restricoes_req.get('soma_max') is not None:
+            restricoes['soma'] = (int(restricoes_req.get('soma_min') or 0), int(restricoes_req.get('soma_max') or 10 ** 6))
+
+        resultado = gerar_lote(
+            data.get('loteria'),
+            data.get('quantidade', 1),
+            data.get('qtde_numeros') or 0,
+            pesos=data.get('pesos'),
+            restricoes=restricoes,
+            qtd_trevos=data.get('qtde_trevos'),
+            pesos_trevos=data.get('pesos_trevos'),
+            semente=data.get('semente'),
+        )
+
+        if data.get('formato') == 'ndjson':
+            return Response(stream_with_context(iterar_ndjson(resultado)), mimetype='application/x-ndjson')
+        return Response(stream_with_context(iterar_json(resultado)), mimetype='application/json')
+
+    except (TypeError, ValueError) as e:
+        logger.error(f"Erro de validação ao gerar lote de apostas: {e}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro inesperado ao gerar lote de apostas: {e}")
+        return jsonify({'error': 'Erro interno do servidor ao gerar apostas.'}), 500
+
+@app.route('/api/conferir-apostas', methods=['POST'])
+def conferir_apostas_api():
+    """Confere um conjunto de apostas contra todos os concursos de um período.
+
+    Corpo JSON: loteria, apostas (listas de números ou {"numeros", "trevos"}),
+    trevos (+Milionária, quando apostas são listas), concurso_inicial,
+    concurso_final e formato ("json" ou "ndjson"). A resposta traz, por
+    aposta, quantas vezes cada faixa saiu e, no fim, os totais por faixa;
+    é enviada em streaming.
+    """
+    try:
+        from services.conferencia import Conferencia, iterar_json, iterar_ndjson
+
+        data = request.get_json(silent=True) or {}
+        conferencia = Conferencia(
+            data.get('loteria'),
+            data.get('apostas') or [],
+            trevos=data.get('trevos'),
+            concurso_inicial=data.get('concurso_inicial'),
+            concurso_final=data.get('concurso_final'),
+        )
+
+        if data.get('formato') == 'ndjson':
+            return Response(stream_with_context(iterar_ndjson(conferencia)), mimetype='application/x-ndjson')
+        return Response(stream_with_context(iterar_json(conferencia)), mimetype='application/json')
+
+    except (TypeError, ValueError) as e:
+        logger.error(f"Erro de validação ao conferir apostas: {e}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro inesperado ao conferir apostas: {e}")
+        return jsonify({'error': 'Erro interno do servidor ao conferir apostas.'}), 500
+
 @app.route('/api/bolao_interesse', methods=['POST'])
 def bolao_interesse():
     data = request.json
@@ -3565,63 +3706,29 @@ def gerar_aposta_premium():
         
         # print(f"📊 Preferências recebidas: {preferencias_ml}")  # DEBUG - COMENTADO
         
-        # Carregar dados de análise para o cache
-        analysis_cache = {}
-        
-        # Carregar dados de frequência se necessário
-        if any(key in preferencias_ml for key in ['frequencia', 'trevos']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_frequencia import analisar_frequencia
-                dados_freq = analisar_frequencia(qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['frequencia_completa'] = dados_freq
-                analysis_cache['frequencia_25'] = analisar_frequencia(qtd_concursos=25)  # Últimos 25 concursos
-                # print("✅ Dados de frequência carregados (50 e 25 concursos)")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar frequência: {e}")
-        
-        # Carregar dados de padrões se necessário
-        if any(key in preferencias_ml for key in ['padroes']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_padroes_sequencia import analise_padroes_sequencias_milionaria
-                dados_padroes = analise_padroes_sequencias_milionaria()
-                analysis_cache['padroes_completa'] = dados_padroes
-                # print("✅ Dados de padrões carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar padrões: {e}")
-        
-        # Carregar dados de trevos se necessário
-        if any(key in preferencias_ml for key in ['trevos']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_trevodasorte_frequencia import analise_trevos_da_sorte
-                dados_trevos = analise_trevos_da_sorte()
-                analysis_cache['trevos_completa'] = dados_trevos
-                # print("✅ Dados de trevos carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar trevos: {e}")
-        
-        # Carregar dados avançados se necessário
-        if any(key in preferencias_ml for key in ['clusters']):
-            try:
-                from funcoes.milionaria.analise_estatistica_avancada import realizar_analise_estatistica_avancada
-                dados_avancados = realizar_analise_estatistica_avancada()
-                analysis_cache['avancada'] = dados_avancados
-                print("✅ Dados avançados carregados")
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar dados avançados: {e}")
-        
-        # print(f"📊 Cache de análise preparado: {list(analysis_cache.keys())}")  # DEBUG - COMENTADO
+        # Insumos das análises prontos por versão dos dados: só o sorteio roda aqui
+        contexto = contexto_geracao.obter_contexto("mais_milionaria", carregar_dados_da_loteria)
+        if contexto is None:
+            return jsonify({'success': False, 'error': 'Dados da +Milionária não disponíveis'}), 500
+        analysis_cache = contexto.analysis_cache(preferencias_ml)
         
         # Gerar apostas usando Machine Learning
-        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache)
+        # Fluxo aleatório do pedido; a semente devolvida refaz as mesmas apostas
+        rng, semente = criar_rng(preferencias_ml.get('semente'))
+        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache, rng=rng)
         
         # print(f"🎯 Apostas geradas: {len(apostas_geradas)}")  # DEBUG - COMENTADO
         
         return jsonify({
             'success': True,
             'apostas': apostas_geradas,
+            'semente': str(semente),
             'mensagem': f'Aposta inteligente gerada com sucesso! ({len(apostas_geradas)} apostas)'
         })
         
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (+Milionária): {e}")
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro ao gerar aposta premium: {e}")
         import traceback
@@ -3638,26 +3745,25 @@ def gerar_aposta_premium_lotofacil():
         from funcoes.lotofacil.geracao_inteligente_lotofacil import gerar_aposta_inteligente_lotofacil
         preferencias_ml = request.get_json(silent=True) or {}
 
-        analysis_cache = {}
-        try:
-            from funcoes.lotofacil.funcao_analise_de_frequencia_lotofacil_2 import analisar_frequencia_lotofacil2
-            analysis_cache['frequencia'] = analisar_frequencia_lotofacil2(None, qtd_concursos=preferencias_ml.get('qtd_concursos', 25))
-        except Exception:
-            pass
-        try:
-            from funcoes.lotofacil.funcao_analise_de_combinacoes_lotofacil import analisar_combinacoes_lotofacil
-            analysis_cache['afinidades_completa'] = analisar_combinacoes_lotofacil(None, qtd_concursos=min(200, preferencias_ml.get('qtd_concursos', 50)))
-        except Exception:
-            pass
+        # Insumos das análises prontos por versão dos dados: só o sorteio roda aqui
+        contexto = contexto_geracao.obter_contexto("lotofacil", carregar_dados_da_loteria)
+        if contexto is None:
+            return jsonify({'success': False, 'error': 'Dados da Lotofácil não disponíveis'}), 500
+        analysis_cache = contexto.analysis_cache(preferencias_ml)
 
         qtde = preferencias_ml.get('qtdeNumerosAposta')
         preferencias_ml['qtdeNumerosAposta'] = max(15, min(20, int(qtde) if isinstance(qtde, int) else 15))
 
-        apostas = gerar_aposta_inteligente_lotofacil(preferencias_ml, analysis_cache)
+        # Fluxo aleatório do pedido; a semente devolvida refaz as mesmas apostas
+        rng, semente = criar_rng(preferencias_ml.get('semente'))
+        apostas = gerar_aposta_inteligente_lotofacil(preferencias_ml, analysis_cache, rng=rng)
         for a in apostas:
             a['numeros'] = sorted([n for n in a.get('numeros', []) if isinstance(n, int) and 1 <= n <= 25])
 
-        return jsonify({'success': True, 'apostas': apostas, 'qtde_apostas': len(apostas)})
+        return jsonify({'success': True, 'apostas': apostas, 'qtde_apostas': len(apostas), 'semente': str(semente)})
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (Lotofácil): {e}")
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro ao gerar aposta premium Lotofácil: {e}")
         import traceback
@@ -3678,84 +3784,29 @@ def gerar_aposta_premium_megasena():
         
         # print(f"📊 Preferências recebidas (Mega Sena): {preferencias_ml}")  # DEBUG - COMENTADO
         
-        # Carregar dados da Mega Sena
-        df_megasena = carregar_dados_megasena_app()
-        
-        if df_megasena.empty:
-            return jsonify({
-                'success': False,
-                'error': 'Dados da Mega Sena não disponíveis'
-            }), 500
-        
-        # print(f"📊 Dados da Mega Sena carregados: {len(df_megasena)} concursos")  # DEBUG - COMENTADO
-        
-        # Preparar cache de análise baseado nas preferências
-        analysis_cache = {}
-        
-        # Carregar dados de frequência se necessário
-        if any(key in preferencias_ml for key in ['frequencia']):
-            try:
-                from funcoes.megasena.funcao_analise_de_frequencia_MS import analise_frequencia_megasena_completa
-                dados_freq = analise_frequencia_megasena_completa(df_megasena)
-                analysis_cache['frequencia_completa'] = dados_freq
-                # print("✅ Dados de frequência carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar frequência: {e}")
-        
-        # Carregar dados de distribuição se necessário
-        if any(key in preferencias_ml for key in ['distribuicao']):
-            try:
-                from funcoes.megasena.funcao_analise_de_distribuicao_MS import analise_distribuicao_megasena
-                dados_dist = analise_distribuicao_megasena(df_megasena)
-                analysis_cache['distribuicao_completa'] = dados_dist
-                # print("✅ Dados de distribuição carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar distribuição: {e}")
-        
-        # Carregar dados de padrões se necessário
-        if any(key in preferencias_ml for key in ['padroes', 'sequencias']):
-            try:
-                from funcoes.megasena.funcao_analise_de_padroes_sequencia_MS import analise_padroes_sequencias_megasena
-                dados_padroes = analise_padroes_sequencias_megasena(df_megasena)
-                analysis_cache['padroes_completa'] = dados_padroes
-                # print("✅ Dados de padrões carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar padrões: {e}")
-        
-        # Carregar dados de afinidades (combinacoes) se necessário
-        if any(key in preferencias_ml for key in ['afinidades']):
-            try:
-                from funcoes.megasena.funcao_analise_de_combinacoes_MS import analise_combinacoes_megasena
-                dados_afinidades = analise_combinacoes_megasena(df_megasena, qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['afinidades_completa'] = dados_afinidades
-                # print("✅ Dados de afinidades carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar afinidades: {e}")
-        
-        # Carregar dados avançados se necessário
-        if any(key in preferencias_ml for key in ['clusters']):
-            try:
-                from funcoes.megasena.analise_estatistica_avancada_MS import AnaliseEstatisticaAvancada
-                analise = AnaliseEstatisticaAvancada(df_megasena)
-                dados_avancados = analise.executar_analise_completa()
-                analysis_cache['avancada'] = dados_avancados
-                print("✅ Dados avançados carregados")
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar dados avançados: {e}")
-        
-        # print(f"📊 Cache de análise preparado: {list(analysis_cache.keys())}")  # DEBUG - COMENTADO
+        # Insumos das análises prontos por versão dos dados: só o sorteio roda aqui
+        contexto = contexto_geracao.obter_contexto("megasena", carregar_dados_da_loteria)
+        if contexto is None:
+            return jsonify({'success': False, 'error': 'Dados da Mega Sena não disponíveis'}), 500
+        analysis_cache = contexto.analysis_cache(preferencias_ml)
         
         # Gerar apostas usando Machine Learning
-        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache)
+        # Fluxo aleatório do pedido; a semente devolvida refaz as mesmas apostas
+        rng, semente = criar_rng(preferencias_ml.get('semente'))
+        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache, rng=rng)
         
         # print(f"🎯 Apostas geradas (Mega Sena): {len(apostas_geradas)}")  # DEBUG - COMENTADO
         
         return jsonify({
             'success': True,
             'apostas': apostas_geradas,
+            'semente': str(semente),
             'mensagem': f'Aposta inteligente gerada com sucesso! ({len(apostas_geradas)} apostas)'
         })
         
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (Mega Sena): {e}")
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro ao gerar aposta premium (Mega Sena): {e}")
         import traceback
@@ -3879,24 +3930,12 @@ def api_lotofacil_matriz():
         # print(f"✅ Fatia criada: {len(fatia)} linhas")
         
         # Monta matriz de 26 colunas (0 = concurso, 1..25 = números)
-        import numpy as np
-        pd = _lazy_import_pandas()
-        matriz = []
-        for _, row in fatia.iterrows():
-            linha = [int(row["Concurso"])] + [0]*25
-            for j in range(1,16):
-                try:
-                    valor_bola = row[f"Bola{j}"]
-                    # Valida se não é NaN/None e está no range válido
-                    if pd.notna(valor_bola):
-                        n = int(valor_bola)
-                        # Valida se está no range 1-25 (índices válidos da lista)
-                        if 1 <= n <= 25:
-                            linha[n] = n
-                except (ValueError, TypeError):
-                    # Ignora valores inválidos e continua
-                    continue
-            matriz.append(linha)
+        # a partir da matriz de incidência (valores inválidos são ignorados)
+        np = _lazy_import_numpy()
+        from funcoes.common.incidencia import MatrizIncidencia
+        incidencia = MatrizIncidencia.from_dataframe(fatia, "lotofacil", ordenar=False)
+        valores = np.where(incidencia.matriz, incidencia.numeros, 0)
+        matriz = np.column_stack([incidencia.concursos, valores]).tolist()
         
         # Último concurso completo (para o modal "Escolhidos × Próximo")
         ultimo = df.head(1)[["Concurso"] + [f"Bola{i}" for i in range(1,16)]].iloc[0].tolist()
@@ -4103,6 +4142,51 @@ def analisar_cartoes():
         # traceback.print_exc()
         return jsonify({"error": f"Erro interno do servidor: {str(e)}"}), 500
 
+# Maior amostra de apostas devolvida pelo laboratório
+ESPACO_MAX_AMOSTRA = 100
+
+@app.route('/api/lotofacil_laboratorio/espaco', methods=['POST'])
+def lotofacil_laboratorio_espaco():
+    """
+    Quantas apostas de 15 números atendem aos filtros do laboratório e uma
+    amostra uniforme delas (índice do espaço completo da Lotofácil).
+
+    Corpo: {"filtros": {"pares": [7, 8], "primos": {"min": 4, "max": 6},
+            "repetidos": [8, 10]}, "fixos": [1], "excluidos": [13],
+            "amostra": 10}
+    """
+    try:
+        from funcoes.lotofacil.espaco_lotofacil import CARACTERISTICAS, TOTAL_APOSTAS, obter_espaco_lotofacil
+
+        data = request.get_json(silent=True) or {}
+        filtros = data.get('filtros') or {}
+        faixas = {c: filtros.get(c) for c in CARACTERISTICAS if filtros.get(c) is not None}
+        amostra = max(0, min(int(data.get('amostra', 10)), ESPACO_MAX_AMOSTRA))
+
+        historico = carregar_historico('lotofacil')
+        ultimo_concurso = historico[0][-1].tolist() if historico is not None else None
+        opcoes = dict(faixas, ultimo_concurso=ultimo_concurso, fixos=data.get('fixos'),
+                      excluidos=data.get('excluidos'), evitar_consecutivos=bool(data.get('evitar_consecutivos')))
+
+        espaco = obter_espaco_lotofacil()
+        selecao = espaco.filtrar(**opcoes)
+        combinacoes = int(selecao.sum())
+        distribuicoes = {
+            c: espaco.distribuicao(c, selecao, ultimo_concurso)
+            for c in CARACTERISTICAS if c != 'repetidos' or ultimo_concurso
+        }
+        return jsonify({
+            'success': True,
+            'total': TOTAL_APOSTAS,
+            'combinacoes': combinacoes,
+            'percentual': round(100.0 * combinacoes / TOTAL_APOSTAS, 4),
+            'ultimo_concurso': ultimo_concurso,
+            'distribuicoes': distribuicoes,
+            'apostas': espaco.amostrar(amostra, **opcoes) if amostra else [],
+        })
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/api/gerar_aposta_premium_milionaria', methods=['POST'])
 def gerar_aposta_premium_milionaria():
     """Gera aposta inteligente da +Milionária usando Machine Learning."""
@@ -4117,94 +4201,29 @@ def gerar_aposta_premium_milionaria():
         
         # print(f"📊 Preferências recebidas (+Milionária): {preferencias_ml}")  # DEBUG - COMENTADO
         
-        # Carregar dados da +Milionária
-        df_milionaria = carregar_dados_milionaria()
-        
-        if df_milionaria.empty:
-            return jsonify({
-                'success': False,
-                'error': 'Dados da +Milionária não disponíveis'
-            }), 500
-        
-        # print(f"📊 Dados da +Milionária carregados: {len(df_milionaria)} concursos")  # DEBUG - COMENTADO
-        
-        # Preparar cache de análise baseado nas preferências
-        analysis_cache = {}
-        
-        # Carregar dados de frequência se necessário
-        if any(key in preferencias_ml for key in ['frequencia']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_frequencia import analise_frequencia_milionaria_completa
-                dados_freq = analise_frequencia_milionaria_completa(df_milionaria)
-                analysis_cache['frequencia_completa'] = dados_freq
-                # print("✅ Dados de frequência carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar frequência: {e}")
-        
-        # Carregar dados de distribuição se necessário
-        if any(key in preferencias_ml for key in ['distribuicao']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_distribuicao import analise_distribuicao_milionaria
-                dados_dist = analise_distribuicao_milionaria(df_milionaria)
-                analysis_cache['distribuicao_completa'] = dados_dist
-                # print("✅ Dados de distribuição carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar distribuição: {e}")
-        
-        # Carregar dados de padrões se necessário
-        if any(key in preferencias_ml for key in ['padroes', 'sequencias']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_padroes_sequencia import analise_padroes_sequencias_milionaria
-                dados_padroes = analise_padroes_sequencias_milionaria(df_milionaria)
-                analysis_cache['padroes_completa'] = dados_padroes
-                # print("✅ Dados de padrões carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar padrões: {e}")
-        
-        # Carregar dados de afinidades (combinacoes) se necessário
-        if any(key in preferencias_ml for key in ['afinidades']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_combinacoes import analise_combinacoes_milionaria
-                dados_afinidades = analise_combinacoes_milionaria(df_milionaria, qtd_concursos=50)  # Últimos 50 concursos
-                analysis_cache['afinidades_completa'] = dados_afinidades
-                # print("✅ Dados de afinidades carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar afinidades: {e}")
-        
-        # Carregar dados avançados se necessário
-        if any(key in preferencias_ml for key in ['clusters']):
-            try:
-                from funcoes.milionaria.analise_estatistica_avancada import AnaliseEstatisticaAvancada
-                analise = AnaliseEstatisticaAvancada(df_milionaria)
-                dados_avancados = analise.executar_analise_completa()
-                analysis_cache['avancada'] = dados_avancados
-                print("✅ Dados avançados carregados")
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar dados avançados: {e}")
-        
-        # Carregar dados de trevos da sorte se necessário
-        if any(key in preferencias_ml for key in ['trevos']):
-            try:
-                from funcoes.milionaria.funcao_analise_de_trevodasorte_frequencia import analise_trevos_da_sorte
-                dados_trevos = analise_trevos_da_sorte(df_milionaria)
-                analysis_cache['trevos_completa'] = dados_trevos
-                # print("✅ Dados de trevos da sorte carregados")  # DEBUG - COMENTADO
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar dados de trevos: {e}")
-        
-        # print(f"📊 Cache de análise preparado: {list(analysis_cache.keys())}")  # DEBUG - COMENTADO
+        # Insumos das análises prontos por versão dos dados: só o sorteio roda aqui
+        contexto = contexto_geracao.obter_contexto("mais_milionaria", carregar_dados_da_loteria)
+        if contexto is None:
+            return jsonify({'success': False, 'error': 'Dados da +Milionária não disponíveis'}), 500
+        analysis_cache = contexto.analysis_cache(preferencias_ml)
         
         # Gerar apostas usando Machine Learning
-        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache)
+        # Fluxo aleatório do pedido; a semente devolvida refaz as mesmas apostas
+        rng, semente = criar_rng(preferencias_ml.get('semente'))
+        apostas_geradas = gerar_aposta_inteligente(preferencias_ml, analysis_cache, rng=rng)
         
         # print(f"🎯 Apostas geradas (+Milionária): {len(apostas_geradas)}")  # DEBUG - COMENTADO
         
         return jsonify({
             'success': True,
             'apostas': apostas_geradas,
+            'semente': str(semente),
             'mensagem': f'Aposta inteligente gerada com sucesso! ({len(apostas_geradas)} apostas)'
         })
         
+    except ValueError as e:
+        logger.error(f"Erro de validação ao gerar aposta (+Milionária): {e}")
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"❌ Erro ao gerar aposta premium (+Milionária): {e}")
         import traceback
@@ -5325,6 +5344,7 @@ def api_milionaria_dados_reais():
         return jsonify({'erro': f'Erro interno: {str(e)}'}), 500
 
 @app.route('/api/analise-frequencia-MS')
+@cache_analise("megasena")
 def get_analise_frequencia_MS():
     """API específica para o dashboard da Megasena - retorna dados no formato esperado pelo JavaScript."""
     try:
@@ -5385,6 +5405,7 @@ def get_analise_frequencia_MS():
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @app.route('/api/analise-frequencia-megasena')
+@cache_analise("megasena")
 def get_analise_frequencia_megasena():
     """Nova rota para análise de frequência da Megasena com dados reais dos últimos 100 concursos."""
     try:
@@ -5479,6 +5500,7 @@ def get_analise_frequencia_megasena():
         return jsonify({'error': f'Erro interno: {str(e)}'}), 500
 
 @app.route('/api/analise-frequencia-lotofacil-completa')
+@cache_analise("lotofacil")
 def get_analise_frequencia_lotofacil_completa():
     """Nova rota para análise de frequência da Lotofácil com dados reais dos últimos 100 concursos."""
     try:
@@ -5678,89 +5700,18 @@ def favicon():
 
 @app.post("/api/track")
 def track():
+    """
+    Recebe o beacon do analytics: valida e enfileira o evento; a gravação em
+    li_events é feita em lote pelo escritor de services/analytics_ingestao.py.
+    Sempre 204, mesmo para eventos rejeitados ou descartados.
+    """
     try:
-      if request.content_length and request.content_length > 50000:  # proteção
-          logger.warning("Analytics: Payload muito grande rejeitado")
-          return "", 204
-      
-      # ⚡ DEBUG: Log do payload recebido
-      raw_data = request.get_data()
-      logger.info(f"Analytics: Payload recebido - {len(raw_data)} bytes")
-      logger.info(f"Analytics: Raw data: {raw_data.decode('utf-8', errors='ignore')[:200]}")
-      logger.info(f"Analytics: Content-Type: {request.headers.get('content-type')}")
-      logger.info(f"Analytics: Method: {request.method}")
-      
-      # ⚡ CORREÇÃO: Tentar diferentes formas de parsear os dados
-      data = {}
-      content_type = request.headers.get('content-type', '')
-      
-      if 'application/json' in content_type:
-        data = request.get_json(silent=True) or {}
-        logger.info(f"Analytics: JSON parseado: {data}")
-      else:
-        # Tentar parsear como texto simples
-        try:
-          text_data = raw_data.decode('utf-8')
-          logger.info(f"Analytics: Texto recebido: {text_data[:200]}")
-          data = json.loads(text_data)
-          logger.info(f"Analytics: JSON parseado do texto: {data}")
-        except Exception as parse_error:
-          logger.error(f"Analytics: Erro ao parsear dados: {parse_error}")
-          data = {}
-      
-      ua = request.headers.get("User-Agent","")
-      # filtro simples de bots
-      low = ua.lower()
-      if any(b in low for b in ["bot","spider","crawler","monitor","uptime"]):
-          logger.debug("Analytics: Bot detectado e ignorado")
-          return "", 204
-      
-      # ⚡ DEBUG: Log dos campos antes de salvar
-      logger.info(f"Analytics: Event: '{data.get('event')}'")
-      logger.info(f"Analytics: Path: '{data.get('path')}'")
-      logger.info(f"Analytics: Session ID: '{data.get('session_id')}'")
-      logger.info(f"Analytics: Visitor ID: '{data.get('visitor_id')}'")
-      
-      # ⚡ CORREÇÃO: Tratamento seguro de dados antes de criar Event
-      try:
-        duration_ms = data.get("duration_ms")
-        if duration_ms is None or duration_ms == "":
-          duration_ms = 0
-        else:
-          duration_ms = int(duration_ms)
-      except (ValueError, TypeError):
-        duration_ms = 0
-      
-      ev = Event(
-          ts=datetime.utcnow(),
-          event=(data.get("event") or "")[:32],
-          label=(data.get("label") or "")[:128],        # <-- salvar label
-          path=(data.get("path") or "")[:255],
-          referrer=(data.get("ref") or "")[:255],
-          utm_source=(data.get("utm_source") or "")[:80],
-          utm_medium=(data.get("utm_medium") or "")[:80],
-          utm_campaign=(data.get("utm_campaign") or "")[:80],
-          session_id=(data.get("session_id") or "")[:64],
-          visitor_id=(data.get("visitor_id") or "")[:64],
-          duration_ms=duration_ms,  # ⚡ CORRIGIDO: tratamento seguro
-          ua=ua[:200],
-          country=(request.headers.get("CF-IPCountry") or "")[:2],
-          device=(data.get("device") or "")[:32],
-          props=data.get("props") or None,              # <-- extras (se mandar)
-      )
-      db.session.add(ev)
-      db.session.commit()
-      logger.info(f"Analytics: Evento salvo com sucesso - {data.get('event', 'unknown')} em {data.get('path', 'unknown')}")
-      return "", 204
+        evento = evento_da_requisicao(request)
+        if evento is not None:
+            ingestor_analytics.enfileirar(evento)
     except Exception as e:
-      logger.error(f"Analytics: Erro ao salvar evento - {str(e)}")
-      logger.error(f"Analytics: Traceback completo: {str(e)}")
-      # ⚡ CORREÇÃO: Sempre retornar 204 mesmo com erro para evitar 500
-      try:
-        db.session.rollback()  # Rollback em caso de erro
-      except:
-        pass
-      return "", 204
+        logger.error(f"Analytics: Erro ao receber evento - {str(e)}")
+    return "", 204
 
 # Registrar blueprints
 from routes_admin import bp_admin
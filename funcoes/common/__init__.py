@@ -9,7 +9,16 @@ o comportamento do app.
 from .deteccao_colunas import detect_concurso_column, detect_bolas_columns
 from .serializacao import to_python_scalar, sanitize_for_json, limpar_nan_do_dict
 from .validacao import clamp, clamp_janela
-from .config import LOTERIA_CONFIG
+from .config import LOTERIA_CONFIG, obter_config
+from .incidencia import MatrizIncidencia, obter_matriz_incidencia, limpar_cache_incidencia
+from .coocorrencia import MatrizCoocorrencia
+from .subconjuntos import ContadorSubconjuntos
+from .agregados import AgregadosIncrementais
+from .gerador_restrito import GeradorRestrito, obter_gerador_restrito, sortear_aposta
+from .fechamento import Fechamento, gerar_fechamento
+from .bitmask import empacotar, desempacotar, contar_acertos, matriz_acertos
+from .probabilidades import contar_apostas, probabilidade, tabela_contagens, preco_aposta
+from .rng import criar_rng, fluxo, fluxos, sortear_numeros
 
 __all__ = [
     "detect_concurso_column",
@@ -20,6 +29,30 @@ __all__ = [
     "clamp",
     "clamp_janela",
     "LOTERIA_CONFIG",
+    "obter_config",
+    "MatrizIncidencia",
+    "obter_matriz_incidencia",
+    "limpar_cache_incidencia",
+    "MatrizCoocorrencia",
+    "ContadorSubconjuntos",
+    "AgregadosIncrementais",
+    "GeradorRestrito",
+    "obter_gerador_restrito",
+    "sortear_aposta",
+    "Fechamento",
+    "gerar_fechamento",
+    "empacotar",
+    "desempacotar",
+    "contar_acertos",
+    "matriz_acertos",
+    "contar_apostas",
+    "probabilidade",
+    "tabela_contagens",
+    "preco_aposta",
+    "criar_rng",
+    "fluxo",
+    "fluxos",
+    "sortear_numeros",
 ]
 
 
@@ -0,0 +1,272 @@
+"""
+Agregados incrementais por loteria.
+
+Mantém contagens correntes (frequência por número, última posição em que cada
+número saiu, matriz de pares, histogramas de paridade, soma e repetições em
+relação ao concurso anterior e as secas entre aparições de cada número) que
+são atualizadas por delta a cada concurso novo, em O(bolas²) por sorteio, sem
+reprocessar o histórico. A variante com janela fixa também subtrai o
+concurso que sai da janela; a maior seca da janela sai de uma fila monótona
+por número.
+
+As posições são absolutas no histórico (0 = concurso mais antigo) e seguem a
+mesma convenção de ``MatrizIncidencia``: ``pares`` equivale a
+``coocorrencia()`` (diagonal = frequência) e ``ultima_posicao`` a
+``ultima_posicao()``.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .incidencia import MatrizIncidencia
+
+logger = logging.getLogger(__name__)
+
+
+class AgregadosIncrementais:
+    """Agregados correntes de uma loteria, opcionalmente numa janela fixa.
+
+    Args:
+        num_min, num_max: faixa de números da loteria.
+        bolas: quantidade de números por sorteio (tamanho dos histogramas).
+        janela: quantidade de concursos mais recentes considerados
+            (None = histórico inteiro).
+    """
+
+    def __init__(self, num_min: int, num_max: int, bolas: int, janela: Optional[int] = None):
+        if janela is not None and janela <= 0:
+            raise ValueError("janela deve ser positiva")
+        self.num_min = int(num_min)
+        self.num_max = int(num_max)
+        self.bolas = int(bolas)
+        self.janela = janela
+        self._zerar()
+
+    def _zerar(self) -> None:
+        tamanho = self.num_max - self.num_min + 1
+        self.total = 0  # concursos já aplicados (posição do próximo)
+        self.frequencia = np.zeros(tamanho, dtype=np.int64)
+        self.pares = np.zeros((tamanho, tamanho), dtype=np.int64)
+        self.ultima_posicao = np.full(tamanho, -1, dtype=np.int64)
+        self.hist_paridade = np.zeros(self.bolas + 1, dtype=np.int64)  # por qtd de pares
+        self.hist_soma = np.zeros(self.bolas * self.num_max + 1, dtype=np.int64)
+        self.hist_repeticoes = np.zeros(self.bolas + 1, dtype=np.int64)  # vs concurso anterior
+
+        # Sorteios dentro da janela: (índices, qtd de pares, soma, repetições)
+        self._recentes: deque = deque()
+        self._anterior: Optional[np.ndarray] = None
+
+        # Secas entre aparições consecutivas dentro da janela: quantidade,
+        # soma, posições das aparições e fila monótona (início, seca) do máximo
+        self.qtd_secas = np.zeros(tamanho, dtype=np.int64)
+        self.soma_secas = np.zeros(tamanho, dtype=np.int64)
+        self._aparicoes = [deque() for _ in range(tamanho)]
+        self._maiores_secas = [deque() for _ in range(tamanho)]
+
+    @classmethod
+    def from_sorteios(cls, sorteios, num_min: int, num_max: int,
+                      janela: Optional[int] = None) -> "AgregadosIncrementais":
+        """Monta os agregados de uma vez a partir da matriz (concursos x bolas)."""
+        sorteios = np.asarray(sorteios, dtype=np.int64)
+        agregados = cls(num_min, num_max, sorteios.shape[1], janela)
+        agregados.reconstruir(sorteios)
+        return agregados
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+    def _indices(self, sorteio) -> np.ndarray:
+        valores = np.asarray(sorteio, dtype=np.int64)
+        valores = valores[(valores >= self.num_min) & (valores <= self.num_max)]
+        return np.unique(valores) - self.num_min
+
+    def _somar(self, indices: np.ndarray, pares: int, soma: int, repeticoes: Optional[int], sinal: int) -> None:
+        self.frequencia[indices] += sinal
+        self.pares[np.ix_(indices, indices)] += sinal
+        self.hist_paridade[pares] += sinal
+        self.hist_soma[soma] += sinal
+        if repeticoes is not None:
+            self.hist_repeticoes[repeticoes] += sinal
+
+    def _aparecer(self, indices: np.ndarray, posicao: int) -> None:
+        """Registra as secas fechadas pelos números que saíram em ``posicao``."""
+        for i in indices.tolist():
+            aparicoes = self._aparicoes[i]
+            if aparicoes:
+                anterior = aparicoes[-1]
+                seca = posicao - anterior - 1
+                self.qtd_secas[i] += 1
+                self.soma_secas[i] += seca
+                maiores = self._maiores_secas[i]
+                while maiores and maiores[-1][1] <= seca:
+                    maiores.pop()
+                maiores.append((anterior, seca))
+                if self.janela is None:
+                    aparicoes.popleft()  # sem janela só a última aparição importa
+            aparicoes.append(posicao)
+
+    def _sair(self, indices: np.ndarray, posicao: int) -> None:
+        """Desfaz as secas que começavam no concurso que saiu da janela."""
+        for i in indices.tolist():
+            aparicoes = self._aparicoes[i]
+            aparicoes.popleft()
+            if aparicoes:
+                self.qtd_secas[i] -= 1
+                self.soma_secas[i] -= aparicoes[0] - posicao - 1
+                maiores = self._maiores_secas[i]
+                if maiores and maiores[0][0] == posicao:
+                    maiores.popleft()
+
+    def adicionar(self, sorteio) -> None:
+        """Aplica um concurso novo (e remove o que sai da janela, se houver)."""
+        indices = self._indices(sorteio)
+        numeros = indices + self.num_min
+        pares = int(np.count_nonzero(numeros % 2 == 0))
+        soma = int(numeros.sum())
+        repeticoes = None
+        if self._anterior is not None:
+            repeticoes = int(np.intersect1d(indices, self._anterior, assume_unique=True).size)
+
+        self._somar(indices, pares, soma, repeticoes, 1)
+        self._aparecer(indices, self.total)
+        self.ultima_posicao[indices] = self.total
+        self.total += 1
+        self._anterior = indices
+
+        if self.janela is not None:
+            self._recentes.append((indices, pares, soma, repeticoes))
+            if len(self._recentes) > self.janela:
+                posicao = self.total - len(self._recentes)
+                saindo = self._recentes.popleft()
+                self._somar(*saindo, -1)
+                self._sair(saindo[0], posicao)
+
+    def estender(self, sorteios) -> None:
+        """Aplica, em ordem, os concursos acrescentados ao fim do histórico."""
+        for sorteio in np.asarray(sorteios, dtype=np.int64):
+            self.adicionar(sorteio)
+
+    def reconstruir(self, sorteios) -> None:
+        """Recalcula tudo a partir do histórico completo (ex.: histórico editado)."""
+        sorteios = np.asarray(sorteios, dtype=np.int64)
+        self._zerar()
+        if len(sorteios) == 0:
+            return
+
+        incidencia = MatrizIncidencia(sorteios, np.arange(len(sorteios)), self.num_min, self.num_max)
+        self.total = len(incidencia)
+        self.ultima_posicao = incidencia.ultima_posicao().astype(np.int64)
+        if len(incidencia) > 1:
+            repeticoes_todas = np.count_nonzero(incidencia.matriz[1:] & incidencia.matriz[:-1], axis=1)
+        else:
+            repeticoes_todas = np.zeros(0, dtype=np.int64)
+
+        inicio = 0 if self.janela is None else max(len(incidencia) - self.janela, 0)
+        matriz = incidencia.matriz[inicio:]
+        numeros = incidencia.numeros
+        pares = matriz[:, numeros % 2 == 0].sum(axis=1)
+        somas = matriz.astype(np.int64) @ numeros
+        repeticoes = repeticoes_todas[max(inicio - 1, 0):]
+
+        self.frequencia = matriz.sum(axis=0, dtype=np.int64)
+        self.pares = matriz.T.astype(np.int64) @ matriz.astype(np.int64)
+        self.hist_paridade = np.bincount(pares, minlength=self.bolas + 1).astype(np.int64)
+        self.hist_soma = np.bincount(somas, minlength=self.bolas * self.num_max + 1).astype(np.int64)
+        self.hist_repeticoes = np.bincount(repeticoes, minlength=self.bolas + 1).astype(np.int64)
+
+        self._anterior = np.flatnonzero(incidencia.matriz[-1])
+        for posicao, linha in enumerate(matriz, start=inicio):
+            self._aparecer(np.flatnonzero(linha), posicao)
+        if self.janela is not None:
+            # O primeiro concurso do histórico não tem repetição a contar
+            reps = [None] * (1 if inicio == 0 else 0) + repeticoes.tolist()
+            for linha, p, s, r in zip(matriz, pares.tolist(), somas.tolist(), reps):
+                self._recentes.append((np.flatnonzero(linha), p, s, r))
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        """Concursos considerados (o tamanho da janela, se houver)."""
+        return self.total if self.janela is None else len(self._recentes)
+
+    @property
+    def numeros(self) -> np.ndarray:
+        return np.arange(self.num_min, self.num_max + 1)
+
+    def atraso_atual(self) -> np.ndarray:
+        """Concursos desde a última aparição (seca); ``len`` se não saiu na janela."""
+        inicio = self.total - len(self)
+        atraso = self.total - 1 - self.ultima_posicao
+        return np.where(self.ultima_posicao >= inicio, atraso, len(self))
+
+    def seca(self) -> dict:
+        """Estatísticas de seca da janela no formato de ``calcular_seca``
+        (funcoes/common/seca.py), com ``ultima_posicao`` (posição absoluta, -1
+        se não saiu na janela) no lugar do número do concurso."""
+        seca_atual = self.atraso_atual()
+        maior_seca = seca_atual.copy()
+        for i, maiores in enumerate(self._maiores_secas):
+            if maiores and maiores[0][1] > maior_seca[i]:
+                maior_seca[i] = maiores[0][1]
+        inicio = self.total - len(self)
+        return {
+            "numeros": self.numeros,
+            "seca_atual": seca_atual,
+            "ultima_posicao": np.where(self.ultima_posicao >= inicio, self.ultima_posicao, -1),
+            "aparicoes": self.frequencia.copy(),
+            "maior_seca": maior_seca,
+            "seca_media": np.divide(self.soma_secas, self.qtd_secas, out=np.zeros(len(self.qtd_secas)),
+                                    where=self.qtd_secas > 0),
+        }
+
+    def como_dict(self) -> dict:
+        """Resumo serializável: frequência e seca por número e histogramas."""
+        numeros = self.numeros.tolist()
+        somas = np.flatnonzero(self.hist_soma)
+        return {
+            "total_concursos": len(self),
+            "frequencia": dict(zip(numeros, self.frequencia.tolist())),
+            "atraso_atual": dict(zip(numeros, self.atraso_atual().tolist())),
+            "paridade": {int(p): int(c) for p, c in enumerate(self.hist_paridade) if c},
+            "soma": dict(zip(somas.tolist(), self.hist_soma[somas].tolist())),
+            "repeticoes": {int(r): int(c) for r, c in enumerate(self.hist_repeticoes) if c},
+        }
+
+
+def consultar_agregados(loteria: str, concursos: Sequence[int], consulta: Callable):
+    """``consulta(agregados, concursos_do_store)`` pelos agregados correntes
+    (services/agregados_incrementais.py) quando ``concursos`` são os últimos
+    do store; None para quem chama recalcular a partir dos dados."""
+    try:
+        from services.agregados_incrementais import consultar_recorte
+        return consultar_recorte(loteria, concursos, consulta)
+    except Exception as e:
+        logger.debug(f"Agregados indisponíveis para {loteria}: {e}")
+        return None
+
+
+def frequencia_e_atraso(loteria: str, concursos: Sequence[int]) -> Optional[tuple]:
+    """(frequência, atraso atual) por número do recorte, como dicts, ou None."""
+    def consulta(agregados, _):
+        numeros = agregados.numeros.tolist()
+        return (dict(zip(numeros, agregados.frequencia.tolist())),
+                dict(zip(numeros, agregados.atraso_atual().tolist())))
+    return consultar_agregados(loteria, concursos, consulta)
+
+
+def ordem_de_aparicao(sorteios, universo: int) -> dict:
+    """Números na ordem da primeira aparição nos ``sorteios`` (a ordem das
+    chaves de ``Counter`` sobre todos eles), parando assim que os ``universo``
+    números já apareceram."""
+    vistos = {}
+    for numeros in sorteios:
+        for numero in numeros:
+            vistos.setdefault(numero, None)
+        if len(vistos) >= universo:
+            break
+    return vistos
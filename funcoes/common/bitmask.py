@@ -0,0 +1,73 @@
+"""
+Apostas e sorteios como bitmasks.
+
+Cada conjunto de números vira uma linha de palavras uint64 (bit ``n`` = número
+``n``; duas palavras cobrem até o 127, o que atende Quina e Lotomania). Os
+acertos entre uma aposta e um sorteio são o popcount da interseção, somado
+pelas palavras, o que permite conferir milhares de apostas contra milhares de
+concursos com operações vetorizadas.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def palavras_para(num_max: int) -> int:
+    """Quantidade de palavras uint64 para representar números até ``num_max``."""
+    return int(num_max) // 64 + 1
+
+
+def empacotar(conjuntos, num_max: int) -> np.ndarray:
+    """
+    Converte conjuntos de números em bitmasks.
+
+    Args:
+        conjuntos: matriz (N x bolas) ou sequência de listas, de tamanhos
+            possivelmente diferentes. Valores fora de 0..num_max (ex.: 0 ou
+            -1 de preenchimento) são ignorados.
+        num_max: maior número possível da loteria.
+
+    Returns:
+        np.ndarray: uint64 (N x palavras).
+    """
+    if isinstance(conjuntos, np.ndarray):
+        valores = conjuntos.astype(np.int64, copy=False)
+    else:
+        conjuntos = [list(c) for c in conjuntos]
+        largura = max((len(c) for c in conjuntos), default=0)
+        valores = np.full((len(conjuntos), largura), -1, dtype=np.int64)
+        for i, c in enumerate(conjuntos):
+            valores[i, :len(c)] = c
+    if valores.ndim == 1:
+        valores = valores[None, :]
+
+    palavras = palavras_para(num_max)
+    mascaras = np.zeros((valores.shape[0], palavras), dtype=np.uint64)
+    validos = (valores >= 0) & (valores <= num_max)
+    linhas = np.broadcast_to(np.arange(valores.shape[0])[:, None], valores.shape)[validos]
+    numeros = valores[validos]
+    bits = np.left_shift(np.uint64(1), (numeros % 64).astype(np.uint64))
+    np.bitwise_or.at(mascaras, (linhas, numeros // 64), bits)
+    return mascaras
+
+
+def desempacotar(mascara: np.ndarray) -> list:
+    """Números (em ordem) de uma linha de bitmask."""
+    numeros = []
+    for w, palavra in enumerate(np.asarray(mascara, dtype=np.uint64)):
+        palavra = int(palavra)
+        numeros.extend(64 * w + b for b in range(palavra.bit_length()) if palavra >> b & 1)
+    return numeros
+
+
+def contar_acertos(apostas: np.ndarray, sorteio: np.ndarray) -> np.ndarray:
+    """Acertos de cada aposta (N x palavras) contra um sorteio (palavras,)."""
+    return np.bitwise_count(apostas & sorteio).sum(axis=1, dtype=np.uint8)
+
+
+def matriz_acertos(apostas: np.ndarray, sorteios: np.ndarray) -> np.ndarray:
+    """Matriz (apostas x sorteios) uint8 de acertos."""
+    acertos = np.zeros((apostas.shape[0], sorteios.shape[0]), dtype=np.uint8)
+    for w in range(apostas.shape[1]):
+        acertos += np.bitwise_count(apostas[:, None, w] & sorteios[None, :, w])
+    return acertos
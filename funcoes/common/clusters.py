@@ -0,0 +1,90 @@
+"""
+Vetores de características por número para a análise de clusters.
+
+Substitui os loops ``for numero in ...`` + ``iterrows`` das classes
+``AnaliseEstatisticaAvancada``: todas as características saem de uma única
+matriz de incidência. As linhas seguem a ordem do DataFrame analisado (a
+posição 0 é a primeira linha), exatamente como nos loops originais.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .incidencia import MatrizIncidencia
+
+
+def _posicoes_por_numero(incidencia: MatrizIncidencia):
+    """Posições de aparição agrupadas por número (ordem crescente) e cortes."""
+    idx_numeros, posicoes = np.nonzero(incidencia.matriz.T)
+    cortes = np.searchsorted(idx_numeros, np.arange(incidencia.matriz.shape[1] + 1))
+    return idx_numeros, posicoes, cortes
+
+
+def caracteristicas_avancadas(incidencia: MatrizIncidencia, fracao_recente: float = 0.3) -> np.ndarray:
+    """Matriz (números x 10) usada pelo KMeans da Mega Sena e da +Milionária.
+
+    Colunas: frequência total, frequência nas primeiras ``fracao_recente``
+    linhas, última aparição (``n - posição``), média de aparições, intervalo
+    médio, desvio do intervalo, score de atraso, volatilidade, tendência e o
+    próprio número.
+    """
+    matriz = incidencia.matriz
+    n = matriz.shape[0]
+    n_numeros = matriz.shape[1]
+    idx_numeros, posicoes, cortes = _posicoes_por_numero(incidencia)
+
+    freq_total = matriz.sum(axis=0, dtype=np.int64)
+    freq_recente = matriz[np.arange(n) < n * fracao_recente].sum(axis=0, dtype=np.int64)
+    ultima = incidencia.ultima_posicao()
+    ultima_aparicao = np.where(ultima >= 0, n - ultima, 0)
+    media_aparicoes = freq_total / n if n > 0 else np.zeros(n_numeros)
+
+    # Intervalos entre aparições consecutivas, contíguos por número
+    mesmo_numero = idx_numeros[1:] == idx_numeros[:-1]
+    intervalos = (posicoes[1:] - posicoes[:-1])[mesmo_numero]
+    qtd_intervalos = np.maximum(freq_total - 1, 0)
+    inicio = np.concatenate(([0], np.cumsum(qtd_intervalos)[:-1]))
+
+    intervalo_medio = np.full(n_numeros, float(n))
+    desvio_intervalo = np.zeros(n_numeros)
+    com_intervalo = qtd_intervalos > 0
+    somas = np.add.reduceat(intervalos, inicio[com_intervalo]) if intervalos.size else np.zeros(0)
+    intervalo_medio[com_intervalo] = somas / qtd_intervalos[com_intervalo]
+    # np.std por número preserva bit a bit o arredondamento do cálculo original
+    for j in np.flatnonzero(qtd_intervalos > 1):
+        desvio_intervalo[j] = np.std(intervalos[inicio[j]:inicio[j] + qtd_intervalos[j]])
+
+    positivo = intervalo_medio > 0
+    score_atraso = np.divide(ultima_aparicao, intervalo_medio, out=np.zeros(n_numeros), where=positivo)
+    volatilidade = np.divide(desvio_intervalo, intervalo_medio, out=np.zeros(n_numeros), where=positivo)
+    tendencia = (freq_recente / max(n * fracao_recente, 1)) - media_aparicoes
+
+    return np.column_stack([
+        freq_total,
+        freq_recente,
+        ultima_aparicao,
+        media_aparicoes,
+        intervalo_medio,
+        desvio_intervalo,
+        score_atraso,
+        volatilidade,
+        tendencia,
+        incidencia.numeros,
+    ]).astype(np.float64)
+
+
+def caracteristicas_simples(incidencia: MatrizIncidencia, ultimos: int = 5) -> np.ndarray:
+    """Matriz (números x 5) usada pelo KMeans da Quina e da Lotofácil.
+
+    Colunas: frequência total, frequência nas últimas ``ultimos`` linhas,
+    posição da última aparição (0 se nunca saiu), score de atraso
+    (``n - posição``) e tendência (recente / total).
+    """
+    matriz = incidencia.matriz
+    n = matriz.shape[0]
+    freq_total = matriz.sum(axis=0, dtype=np.int64)
+    freq_recente = matriz[np.arange(n) >= n - ultimos].sum(axis=0, dtype=np.int64)
+    ultima_aparicao = np.maximum(incidencia.ultima_posicao(), 0)
+    score_atraso = n - ultima_aparicao
+    tendencia = np.divide(freq_recente, freq_total, out=np.zeros(len(freq_total)), where=freq_total > 0)
+    return np.column_stack([freq_total, freq_recente, ultima_aparicao, score_atraso, tendencia]).astype(np.float64)
@@ -1,26 +1,40 @@
 """
 Configurações por loteria (stubs).
 
-Fornece valores canônicos de intervalo de números, quantidade sorteada e
-limites de janelas recomendados para análises específicas.
+Fornece valores canônicos de intervalo de números, quantidade sorteada,
+tamanhos de aposta aceitos e preço da aposta simples, colunas do volante,
+faixas de premiação (acertos -> nome da faixa) e limites de janelas
+recomendados para análises específicas.
 """
 
 LOTERIA_CONFIG = {
     "lotofacil": {
         "range": (1, 25),
         "drawn": 15,
+        "qtd_aposta": (15, 20),
+        "preco": 3.50,
+        "colunas_volante": 5,
+        "faixas": {15: "15 pontos", 14: "14 pontos", 13: "13 pontos", 12: "12 pontos", 11: "11 pontos"},
         "max_janela_afinidades": 200,
         "max_janela_frequencia": 400,
     },
     "quina": {
         "range": (1, 80),
         "drawn": 5,
+        "qtd_aposta": (5, 15),
+        "preco": 3.00,
+        "colunas_volante": 10,
+        "faixas": {5: "quina", 4: "quadra", 3: "terno", 2: "duque"},
         "max_janela_afinidades": 300,
         "max_janela_frequencia": 500,
     },
     "megasena": {
         "range": (1, 60),
         "drawn": 6,
+        "qtd_aposta": (6, 20),
+        "preco": 6.00,
+        "colunas_volante": 10,
+        "faixas": {6: "sena", 5: "quina", 4: "quadra"},
         "max_janela_afinidades": 300,
         "max_janela_frequencia": 500,
     },
@@ -29,23 +43,47 @@ LOTERIA_CONFIG = {
         "drawn": 6,
         "trevos_range": (1, 6),
         "trevos_drawn": 2,
+        "qtd_aposta": (6, 12),
+        "qtd_trevos_aposta": (2, 6),
+        "preco": 6.00,
+        "colunas_volante": 10,
+        # (acertos nos números, acertos nos trevos) -> faixa
+        "faixas": {
+            (6, 2): "1ª faixa", (6, 1): "2ª faixa", (6, 0): "2ª faixa",
+            (5, 2): "3ª faixa", (5, 1): "4ª faixa", (5, 0): "4ª faixa",
+            (4, 2): "5ª faixa", (4, 1): "6ª faixa", (4, 0): "6ª faixa",
+            (3, 2): "7ª faixa", (3, 1): "8ª faixa",
+            (2, 2): "9ª faixa", (2, 1): "10ª faixa",
+        },
         "max_janela_afinidades": 300,
         "max_janela_frequencia": 500,
     },
     "lotomania": {
         "range": (0, 99),
-        "drawn": 50,
+        "drawn": 20,  # sorteio: 20 dezenas; aposta: 50
+        "aposta": 50,
+        "qtd_aposta": (50, 50),
+        "preco": 3.00,
+        "colunas_volante": 10,
+        "faixas": {20: "20 acertos", 19: "19 acertos", 18: "18 acertos", 17: "17 acertos",
+                   16: "16 acertos", 15: "15 acertos", 0: "0 acertos"},
         "max_janela_afinidades": 300,
         "max_janela_frequencia": 500,
     },
 }
 
+# Apelidos usados pelo app/rotas para as mesmas loterias
+LOTERIA_ALIASES = {
+    "mais_milionaria": "+milionaria",
+    "milionaria": "+milionaria",
+    "mega_sena": "megasena",
+}
 
 
+def obter_config(loteria: str) -> dict:
+    """Retorna a configuração canônica da loteria, aceitando apelidos.
 
-
-
-
-
-
-
+    Levanta KeyError para loterias desconhecidas.
+    """
+    chave = LOTERIA_ALIASES.get(loteria, loteria)
+    return LOTERIA_CONFIG[chave]
@@ -0,0 +1,147 @@
+"""
+Motor de coocorrência e probabilidades condicionais entre números.
+
+Toda a contagem de pares sai de um único produto ``M.T @ M`` da matriz de
+incidência; probabilidades marginais, conjuntas, condicionais, o lift
+(dependência) e as dependências mais fortes são derivados por operações de
+array. Serve qualquer loteria e qualquer janela de concursos; quando a
+janela é a cauda do histórico do store, os pares já somados pelos agregados
+incrementais são reaproveitados (``do_recorte``).
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .agregados import consultar_agregados
+from .config import obter_config
+from .incidencia import MatrizIncidencia
+
+
+class MatrizCoocorrencia:
+    """Contagens e probabilidades de pares de uma janela de concursos.
+
+    As matrizes são indexadas por ``[a, b]`` na ordem de ``numeros``;
+    ``probabilidade_condicional()[a, b]`` é P(b | a).
+    """
+
+    def __init__(self, incidencia: MatrizIncidencia):
+        pares = incidencia.coocorrencia().astype(np.int64)
+        self.numeros = incidencia.numeros
+        self.total = len(incidencia)
+        self.frequencia = np.diag(pares).copy()
+        np.fill_diagonal(pares, 0)
+        self.pares = pares
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, loteria: str, colunas: Optional[List[str]] = None,
+                       qtd_concursos: Optional[int] = None, ordenar: bool = False) -> "MatrizCoocorrencia":
+        """Monta o motor a partir de um DataFrame (últimos ``qtd_concursos``, se informado)."""
+        incidencia = MatrizIncidencia.from_dataframe(df, loteria, colunas=colunas, ordenar=ordenar)
+        return cls(incidencia.janela(qtd_concursos))
+
+    @classmethod
+    def from_agregados(cls, agregados) -> "MatrizCoocorrencia":
+        """Motor a partir de ``AgregadosIncrementais`` (pares já somados)."""
+        motor = cls.__new__(cls)
+        pares = agregados.pares.copy()
+        motor.numeros = agregados.numeros
+        motor.total = len(agregados)
+        motor.frequencia = np.diag(pares).copy()
+        np.fill_diagonal(pares, 0)
+        motor.pares = pares
+        return motor
+
+    @classmethod
+    def do_recorte(cls, df: pd.DataFrame, loteria: str, colunas: Optional[List[str]] = None) -> "MatrizCoocorrencia":
+        """Motor dos concursos de ``df`` (na ordem do DataFrame): pelos agregados
+        correntes quando ``df`` são os últimos concursos do store; senão pela
+        matriz de incidência."""
+        config = obter_config(loteria)
+        principais = [f"Bola{i}" for i in range(1, config["drawn"] + 1)]
+        if "Concurso" in df.columns and (colunas is None or list(colunas) == principais):
+            concursos = pd.to_numeric(df["Concurso"], errors="coerce")
+            if concursos.notna().all():
+                motor = consultar_agregados(loteria, concursos.to_numpy(dtype=np.int64),
+                                            lambda agregados, _: cls.from_agregados(agregados))
+                if motor is not None:
+                    return motor
+        return cls(MatrizIncidencia.from_dataframe(df, loteria, colunas=colunas, ordenar=False))
+
+    def indices(self, numeros: Sequence[int]) -> np.ndarray:
+        """Índices das linhas/colunas dos números informados."""
+        return np.asarray(numeros, dtype=np.int64) - int(self.numeros[0])
+
+    # ------------------------------------------------------------------
+    # Probabilidades
+    # ------------------------------------------------------------------
+    def probabilidade_marginal(self) -> np.ndarray:
+        """P(a): fração dos concursos em que cada número saiu."""
+        if self.total == 0:
+            return np.zeros(len(self.numeros))
+        return self.frequencia / self.total
+
+    def probabilidade_conjunta(self) -> np.ndarray:
+        """P(a, b): fração dos concursos em que o par saiu junto (diagonal 0)."""
+        if self.total == 0:
+            return np.zeros(self.pares.shape)
+        return self.pares / self.total
+
+    def probabilidade_condicional(self) -> np.ndarray:
+        """P(b | a) = P(a, b) / P(a); 0 quando ``a`` não saiu na janela."""
+        marginal = self.probabilidade_marginal()[:, None]
+        conjunta = self.probabilidade_conjunta()
+        return np.divide(conjunta, marginal, out=np.zeros(conjunta.shape), where=marginal > 0)
+
+    def lift(self) -> np.ndarray:
+        """Dependência P(b | a) / P(b): > 1 indica que os números saem juntos
+        mais que o esperado ao acaso. 0 quando ``a`` ou ``b`` não saíram."""
+        marginal = self.probabilidade_marginal()
+        condicional = self.probabilidade_condicional()
+        validos = (marginal[:, None] > 0) & (marginal[None, :] > 0)
+        return np.divide(condicional, marginal[None, :], out=np.zeros(condicional.shape), where=validos)
+
+    # ------------------------------------------------------------------
+    # Dependências
+    # ------------------------------------------------------------------
+    def dependencias(self, numeros: Optional[Sequence[int]] = None, direcao: str = "mais_forte",
+                     limiar: Optional[float] = None, k: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """Pares (origem, destino, lift), do maior para o menor lift.
+
+        Args:
+            numeros: restringe aos pares entre estes números (None = todos).
+            direcao: ``"mais_forte"`` usa, em cada par, a direção de maior lift;
+                ``"crescente"`` usa sempre menor -> maior número.
+            limiar: mantém só lifts acima deste valor.
+            k: limita a quantidade de pares retornados.
+
+        Empates mantêm a ordem crescente dos pares.
+        """
+        numeros = self.numeros if numeros is None else np.sort(np.asarray(numeros, dtype=np.int64))
+        idx = self.indices(numeros)
+        lift = self.lift()[np.ix_(idx, idx)]
+        a, b = np.triu_indices(len(idx), 1)
+        ida, volta = lift[a, b], lift[b, a]
+
+        if direcao == "mais_forte":
+            usa_ida = ida > volta
+            origem = np.where(usa_ida, a, b)
+            destino = np.where(usa_ida, b, a)
+            valor = np.where(usa_ida, ida, volta)
+        elif direcao == "crescente":
+            origem, destino, valor = a, b, ida
+        else:
+            raise ValueError(f"direcao inválida: {direcao}")
+
+        ordem = np.argsort(-valor, kind="stable")
+        if limiar is not None:
+            ordem = ordem[valor[ordem] > limiar]
+        ordem = ordem[:k]
+        return list(zip(numeros[origem[ordem]].tolist(), numeros[destino[ordem]].tolist(), valor[ordem].tolist()))
+
+    def top_dependencias(self, k: int = 20, limiar: float = 1.5, numeros: Optional[Sequence[int]] = None,
+                         direcao: str = "mais_forte") -> List[Tuple[int, int, float]]:
+        """As ``k`` dependências com lift acima de ``limiar``."""
+        return self.dependencias(numeros, direcao, limiar=limiar, k=k)
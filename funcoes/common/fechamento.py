@@ -0,0 +1,308 @@
+"""
+Fechamentos (desdobramentos com garantia) para bolões.
+
+Dadas ``n`` dezenas escolhidas, apostas de ``k`` dezenas e uma garantia
+``(t, m)``, um fechamento é um conjunto de apostas tal que, se ``m`` das
+dezenas sorteadas estiverem entre as escolhidas, ao menos uma aposta acerta
+``t`` delas. Ex.: 10 dezenas da Mega Sena em apostas de 6 com garantia
+(4, 6) = quadra garantida se as 6 sorteadas estiverem entre as 10.
+
+Apostas e alvos (todos os subconjuntos de ``m`` das ``n`` dezenas) são
+bitsets uint64 sobre os índices 0..n-1; "a aposta cobre o alvo" é um
+popcount vetorizado da interseção. O fechamento sai de um guloso (a cada
+passo, a melhor entre candidatas montadas a partir de alvos ainda
+descobertos) refinado por busca local (recozimento simulado, como em
+Nurmela e Östergård) que tenta cobrir tudo com uma aposta a menos. Os
+casos comuns da Mega Sena, Quina e Lotofácil vêm prontos da tabela
+``fechamentos_tabela.json`` (gerada por scripts/gerar_tabela_fechamentos.py).
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_DEZENAS = 64          # bitsets uint64
+MAX_ALVOS = 2_000_000     # subconjuntos de m dezenas avaliados por aposta
+MAX_APOSTAS = 1_000       # limite inferior acima disso: recusado antes de calcular
+TEMPO_GULOSO = 20.0       # segundos do guloso antes de desistir
+CAMINHO_TABELA = os.path.join(os.path.dirname(__file__), "fechamentos_tabela.json")
+
+_CANDIDATAS = 96          # candidatas avaliadas por passo do guloso
+_BLOCO = 4096             # alvos por bloco na avaliação das candidatas
+_TEMPERATURA = 0.3
+_RESFRIAMENTO = 0.9995
+_TEMPERATURA_MIN = 0.05
+_ITERACOES_SEM_MELHORA = 5_000
+
+
+def _mascaras(indices: np.ndarray) -> np.ndarray:
+    """Bitsets uint64 das linhas de uma matriz de índices."""
+    indices = np.asarray(indices, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), indices), axis=1)
+
+
+def _indices(mascara: int) -> List[int]:
+    mascara = int(mascara)
+    return [j for j in range(mascara.bit_length()) if mascara >> j & 1]
+
+
+def limite_schonheim(n: int, k: int, t: int) -> int:
+    """Limite inferior de Schönheim para cobrir todos os t-subconjuntos (caso m = t)."""
+    limite = 1
+    for i in range(t - 1, -1, -1):
+        limite = math.ceil((n - i) / (k - i) * limite)
+    return limite
+
+
+def limite_inferior(n: int, k: int, t: int, m: int) -> int:
+    """Limite inferior de apostas: alvos / alvos que uma aposta cobre."""
+    por_aposta = sum(math.comb(k, i) * math.comb(n - k, m - i) for i in range(t, min(k, m) + 1))
+    return math.ceil(math.comb(n, m) / max(por_aposta, 1))
+
+
+class TempoEsgotado(ValueError):
+    """O guloso passou do prazo sem fechar a cobertura."""
+
+
+class Fechamento:
+    """Motor de cobertura para ``n`` dezenas, apostas de ``k`` e garantia ``(t, m)``."""
+
+    def __init__(self, n: int, k: int, t: int, m: int):
+        if not 1 <= k <= n <= MAX_DEZENAS:
+            raise ValueError(f"É preciso 1 <= tamanho da aposta <= dezenas <= {MAX_DEZENAS}")
+        if not 1 <= t <= min(k, m) or m > n:
+            raise ValueError("Garantia inválida: é preciso 1 <= acertos <= min(tamanho da aposta, sorteadas) e sorteadas <= dezenas")
+        if math.comb(n, m) > MAX_ALVOS:
+            raise ValueError(f"Fechamento grande demais: C({n}, {m}) subconjuntos a cobrir")
+        if limite_inferior(n, k, t, m) > MAX_APOSTAS:
+            raise ValueError(f"Fechamento grande demais: pelo menos {limite_inferior(n, k, t, m)} apostas")
+        self.n, self.k, self.t, self.m = n, k, t, m
+        self.alvos = _mascaras(np.array(list(combinations(range(n), m)), dtype=np.int64).reshape(-1, m))
+
+    # ------------------------------------------------------------------
+    # Cobertura
+    # ------------------------------------------------------------------
+    def _cobre(self, aposta, alvos: Optional[np.ndarray] = None) -> np.ndarray:
+        alvos = self.alvos if alvos is None else alvos
+        return np.bitwise_count(alvos & np.uint64(aposta)) >= self.t
+
+    def _matriz_cobertura(self, apostas: np.ndarray) -> np.ndarray:
+        return np.stack([self._cobre(a) for a in apostas]) if len(apostas) else np.zeros((0, len(self.alvos)), bool)
+
+    def descobertos(self, apostas: Sequence[Sequence[int]]) -> int:
+        """Quantos alvos ficam sem cobertura com as apostas (índices 0..n-1)."""
+        mascaras = _mascaras(np.array(apostas, dtype=np.int64).reshape(-1, self.k))
+        cobertos = np.zeros(len(self.alvos), bool)
+        for aposta in mascaras:
+            cobertos |= self._cobre(aposta)
+        return int((~cobertos).sum())
+
+    # ------------------------------------------------------------------
+    # Guloso
+    # ------------------------------------------------------------------
+    def _candidatas(self, restantes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Apostas com t dezenas de um alvo descoberto, completadas pelas
+        dezenas mais presentes nos alvos ainda descobertos."""
+        n, k, t = self.n, self.k, self.t
+        bits = (restantes[:, None] >> np.arange(n, dtype=np.uint64)) & np.uint64(1)
+        presenca = bits.sum(axis=0, dtype=np.int64)
+
+        q = _CANDIDATAS
+        sementes = bits[rng.integers(len(restantes), size=q)].astype(bool)
+        ordem = np.argsort(np.where(sementes, rng.random((q, n)), 2.0), axis=1)
+        # Corrida exponencial: dezenas mais presentes tendem a sair antes
+        chaves = rng.exponential(size=(q, n)) / (presenca + 1.0)
+        np.put_along_axis(chaves, ordem[:, :t], -1.0, axis=1)
+        return np.unique(_mascaras(np.argsort(chaves, axis=1)[:, :k]))
+
+    def _ganhos(self, candidatas: np.ndarray, restantes: np.ndarray) -> np.ndarray:
+        ganhos = np.zeros(len(candidatas), dtype=np.int64)
+        for inicio in range(0, len(restantes), _BLOCO):
+            bloco = restantes[inicio:inicio + _BLOCO]
+            ganhos += (np.bitwise_count(candidatas[:, None] & bloco[None, :]) >= self.t).sum(axis=1)
+        return ganhos
+
+    def guloso(self, rng: np.random.Generator, prazo: Optional[float] = None) -> np.ndarray:
+        """Fechamento completo pelo guloso (bitsets das apostas).
+
+        Levanta TempoEsgotado se ``prazo`` (``time.perf_counter``) passar antes
+        de cobrir todos os alvos.
+        """
+        descobertos = np.ones(len(self.alvos), bool)
+        apostas = []
+        while True:
+            idx = np.flatnonzero(descobertos)
+            if idx.size == 0:
+                break
+            if prazo is not None and time.perf_counter() > prazo:
+                raise TempoEsgotado(f"Fechamento demorado demais ({len(apostas)} apostas e "
+                                    f"{idx.size} alvos ainda descobertos); reduza as dezenas ou a garantia")
+            restantes = self.alvos[idx]
+            candidatas = self._candidatas(restantes, rng)
+            melhor = candidatas[int(np.argmax(self._ganhos(candidatas, restantes)))]
+            apostas.append(melhor)
+            descobertos[idx[self._cobre(melhor, restantes)]] = False
+        return np.array(apostas, dtype=np.uint64)
+
+    # ------------------------------------------------------------------
+    # Busca local
+    # ------------------------------------------------------------------
+    def _recozer(self, apostas: np.ndarray, rng: np.random.Generator, prazo: float) -> Tuple[bool, np.ndarray]:
+        """Tenta zerar os alvos descobertos trocando uma dezena por vez.
+
+        Returns:
+            (coberto, apostas): sem sucesso, o melhor estado visitado.
+        """
+        apostas = apostas.copy()
+        cobertura = self._matriz_cobertura(apostas)
+        contagem = cobertura.sum(axis=0, dtype=np.int32)
+        custo = int((contagem == 0).sum())
+        melhor_custo, melhor = custo, apostas.copy()
+        temperatura = _TEMPERATURA
+        sem_melhora = 0
+
+        while custo > 0:
+            if sem_melhora >= _ITERACOES_SEM_MELHORA or time.perf_counter() > prazo:
+                return False, melhor
+            alvo = self.alvos[rng.choice(np.flatnonzero(contagem == 0))]
+            intersecao = np.bitwise_count(apostas & alvo)
+            i = int(rng.choice(np.flatnonzero(intersecao == intersecao.max())))
+            aposta = int(apostas[i])
+            sai = rng.choice(_indices(aposta & ~int(alvo)))
+            entra = rng.choice(_indices(int(alvo) & ~aposta))
+            nova = aposta ^ (1 << int(sai)) ^ (1 << int(entra))
+
+            cobre_nova = self._cobre(nova)
+            ganho = int((cobre_nova & ~cobertura[i] & (contagem == 0)).sum())
+            perda = int((cobertura[i] & ~cobre_nova & (contagem == 1)).sum())
+            delta = perda - ganho
+            if delta <= 0 or rng.random() < math.exp(-delta / temperatura):
+                contagem += cobre_nova.astype(np.int32) - cobertura[i].astype(np.int32)
+                cobertura[i] = cobre_nova
+                apostas[i] = np.uint64(nova)
+                custo += delta
+            temperatura = max(_TEMPERATURA_MIN, temperatura * _RESFRIAMENTO)
+            if custo < melhor_custo:
+                melhor_custo, melhor, sem_melhora = custo, apostas.copy(), 0
+            else:
+                sem_melhora += 1
+        return True, apostas
+
+    def reduzir(self, apostas: np.ndarray, rng: np.random.Generator, prazo: float,
+                tamanho_alvo: Optional[int] = None) -> np.ndarray:
+        """Remove apostas enquanto a busca local conseguir recobrir tudo.
+
+        Sem sucesso, a busca recomeça aquecida a partir do melhor estado da
+        rodada anterior, até o prazo.
+        """
+        piso = max(1, tamanho_alvo or 1)
+        if self.m == self.t:
+            piso = max(piso, limite_schonheim(self.n, self.k, self.t))
+        melhor, atual = apostas, None
+        while len(melhor) > piso and time.perf_counter() < prazo:
+            if atual is None:
+                # Sai a aposta que cobre sozinha o menor número de alvos
+                cobertura = self._matriz_cobertura(melhor)
+                exclusivos = (cobertura & (cobertura.sum(axis=0) == 1)).sum(axis=1)
+                atual = np.delete(melhor, int(np.argmin(exclusivos)))
+            ok, atual = self._recozer(atual, rng, prazo)
+            if ok:
+                melhor, atual = atual, None
+        return melhor
+
+    def calcular(self, tempo_max: float = 2.0, tamanho_alvo: Optional[int] = None,
+                 seed: Optional[int] = None, tempo_guloso: Optional[float] = TEMPO_GULOSO) -> List[Tuple[int, ...]]:
+        """
+        Fechamento com o menor número de apostas encontrado no tempo dado.
+
+        Args:
+            tempo_max: segundos para a busca local.
+            tempo_guloso: segundos para o guloso (None = sem limite); passou
+                disso, levanta TempoEsgotado.
+            tamanho_alvo: para assim que chegar a esse número de apostas.
+            seed: semente para resultados reprodutíveis.
+
+        Returns:
+            list[tuple]: apostas como índices 0..n-1, em ordem.
+        """
+        if self.k == self.n:
+            return [tuple(range(self.n))]
+        rng = np.random.default_rng(seed)
+        inicio = time.perf_counter()
+        apostas = self.guloso(rng, None if tempo_guloso is None else inicio + tempo_guloso)
+        prazo = inicio + tempo_max
+        if tamanho_alvo is None or len(apostas) > tamanho_alvo:
+            apostas = self.reduzir(apostas, rng, prazo, tamanho_alvo)
+        return sorted(tuple(_indices(a)) for a in apostas)
+
+
+# ----------------------------------------------------------------------
+# Tabela pré-calculada
+# ----------------------------------------------------------------------
+_tabela: Optional[Dict[str, List[List[int]]]] = None
+_tabela_lock = threading.Lock()
+
+
+def chave_tabela(n: int, k: int, t: int, m: int) -> str:
+    return f"{n}-{k}-{t}-{m}"
+
+
+def fechamento_tabelado(n: int, k: int, t: int, m: int) -> Optional[List[Tuple[int, ...]]]:
+    """Apostas (índices 0..n-1) da tabela pré-calculada, ou None."""
+    global _tabela
+    with _tabela_lock:
+        if _tabela is None:
+            try:
+                with open(CAMINHO_TABELA, "r", encoding="utf-8") as f:
+                    _tabela = json.load(f).get("fechamentos", {})
+            except (OSError, ValueError):
+                _tabela = {}
+    apostas = _tabela.get(chave_tabela(n, k, t, m))
+    return [tuple(a) for a in apostas] if apostas else None
+
+
+def gerar_fechamento(numeros: Sequence[int], tamanho_aposta: int, acertos: int,
+                     sorteados: Optional[int] = None, tempo_max: float = 2.0,
+                     seed: Optional[int] = None, tempo_guloso: Optional[float] = TEMPO_GULOSO) -> dict:
+    """
+    Fechamento das dezenas escolhidas.
+
+    Args:
+        numeros: dezenas escolhidas para o bolão.
+        tamanho_aposta: dezenas por aposta.
+        acertos: acertos garantidos (t).
+        sorteados: quantas sorteadas precisam estar entre as escolhidas (m);
+            padrão = ``acertos``.
+        tempo_max: segundos de busca quando o caso não está na tabela.
+        tempo_guloso: prazo do guloso (levanta TempoEsgotado).
+        seed: semente para resultados reprodutíveis.
+
+    Returns:
+        dict: ``apostas`` (listas de dezenas), ``quantidade``, ``origem``
+        ("tabela" ou "calculado") e os parâmetros da garantia.
+    """
+    dezenas = sorted({int(n) for n in numeros})
+    n, k, t = len(dezenas), int(tamanho_aposta), int(acertos)
+    m = t if sorteados is None else int(sorteados)
+
+    apostas = fechamento_tabelado(n, k, t, m)
+    origem = "tabela"
+    if apostas is None:
+        apostas = Fechamento(n, k, t, m).calcular(tempo_max=tempo_max, seed=seed, tempo_guloso=tempo_guloso)
+        origem = "calculado"
+
+    return {
+        "apostas": [[dezenas[i] for i in aposta] for aposta in apostas],
+        "quantidade": len(apostas),
+        "tamanho_aposta": k,
+        "acertos": t,
+        "sorteados": m,
+        "origem": origem,
+    }
@@ -0,0 +1,290 @@
+"""
+Gerador de apostas que amostra direto do espaço restrito.
+
+Os geradores inteligentes sorteavam com ``random.choices`` e descartavam a
+aposta se ela violasse paridade, soma, consecutivos ou repetições, até 100
+vezes, caindo para um sorteio uniforme quando nada passava. Aqui a aposta é
+sorteada exatamente da distribuição que aquele laço buscava:
+P(aposta) proporcional ao produto dos pesos dos números, restrita às apostas
+que atendem às preferências.
+
+Uma programação dinâmica percorre os números em ordem crescente acumulando o
+peso total por estado (quantidade escolhida, quantidade de pares, soma,
+quantidade de números "marcados" e se o número anterior foi escolhido). O
+sorteio escolhe um estado final válido proporcional ao peso e refaz o
+caminho de trás para frente, decidindo número a número se ele entrou. Toda
+aposta devolvida atende às restrições na primeira tentativa e o custo não
+depende de quão apertadas elas são. Só as dimensões das restrições ativas
+entram no estado.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Teto das tabelas da programação dinâmica (células somadas de todas as
+# tabelas, 8 bytes cada): a faixa de soma vem do pedido e, sem teto, um
+# ``somaMax`` enorme aloca gigabytes.
+CELULAS_MAX = 20_000_000
+
+
+class GeradorRestrito:
+    """Amostrador exato de apostas de ``qtd`` números com restrições.
+
+    Args:
+        pesos: peso de cada número (dict número -> peso ou sequência alinhada
+            a ``num_min..num_max``); números fora da faixa são ignorados e
+            peso 0 exclui o número.
+        num_min, num_max: faixa de números da loteria.
+        qtd: quantidade de números por aposta.
+        pares_permitidos: quantidades de números pares aceitas (None = livre).
+        soma: faixa ``(mínimo, máximo)`` inclusiva da soma (None = livre).
+        evitar_consecutivos: proíbe dois números consecutivos.
+        marcados, max_marcados: no máximo ``max_marcados`` números de
+            ``marcados`` (ex.: o último concurso) na aposta.
+        min_marcados: no mínimo ``min_marcados`` números de ``marcados``
+            (com ``max_marcados`` igual, exatamente essa quantidade).
+
+    Levanta ValueError se as tabelas passarem de ``CELULAS_MAX`` células.
+    """
+
+    def __init__(self, pesos: Union[Mapping[int, float], Iterable[float]], num_min: int, num_max: int, qtd: int,
+                 pares_permitidos: Optional[Iterable[int]] = None, soma: Optional[Tuple[int, int]] = None,
+                 evitar_consecutivos: bool = False, marcados: Optional[Iterable[int]] = None,
+                 max_marcados: Optional[int] = None, min_marcados: Optional[int] = None):
+        self.num_min = int(num_min)
+        self.num_max = int(num_max)
+        self.qtd = int(qtd)
+        self.numeros = np.arange(self.num_min, self.num_max + 1)
+        self.pesos = self._vetor_pesos(pesos)
+
+        pares = self.numeros % 2 == 0
+        self.pares_permitidos = None if pares_permitidos is None else sorted(
+            {int(p) for p in pares_permitidos if 0 <= int(p) <= self.qtd})
+        self.soma = None if soma is None else self._faixa_soma(int(soma[0]), int(soma[1]))
+        self.evitar_consecutivos = bool(evitar_consecutivos)
+        marcados = {int(m) for m in (marcados or [])}
+        self.min_marcados = int(min_marcados) if min_marcados and marcados else 0
+        if self.min_marcados and max_marcados is None:
+            max_marcados = len(marcados)
+        self.max_marcados = None if max_marcados is None or not marcados else int(max_marcados)
+        if self.max_marcados is not None and self.max_marcados <= 0 and not self.min_marcados:
+            # Nenhum marcado permitido: basta zerar o peso deles
+            self.pesos = np.where(np.isin(self.numeros, list(marcados)), 0.0, self.pesos)
+            self.max_marcados = None
+
+        # Dimensões do estado: (quantidade, pares, soma, marcados, anterior)
+        qtd_pares = int(pares.sum())
+        self._dim_pares = min(self.qtd, qtd_pares) + 1 if self.pares_permitidos is not None else 1
+        self._dim_soma = max(self.soma[1] + 1, 1) if self.soma is not None else 1
+        self._dim_marcados = self.max_marcados + 1 if self.max_marcados is not None else 1
+        self._dim_anterior = 2 if self.evitar_consecutivos else 1
+        self._forma = (self.qtd + 1, self._dim_pares, self._dim_soma, self._dim_marcados, self._dim_anterior)
+        self.celulas = (len(self.numeros) + 1) * int(np.prod(self._forma))
+        if self.celulas > CELULAS_MAX:
+            raise ValueError("restrições apertadas demais para o tamanho da aposta")
+
+        # Deslocamento de cada número no estado (0 nas dimensões inativas)
+        self._delta_pares = pares.astype(np.int64) if self.pares_permitidos is not None else np.zeros(len(self.numeros), np.int64)
+        self._delta_soma = self.numeros.astype(np.int64) if self.soma is not None else np.zeros(len(self.numeros), np.int64)
+        marcado = np.isin(self.numeros, list(marcados))
+        self._delta_marcados = marcado.astype(np.int64) if self.max_marcados is not None else np.zeros(len(self.numeros), np.int64)
+
+        self._tabelas = self._programacao_dinamica()
+        self._finais, self._pesos_finais = self._estados_finais()
+        self._reserva: list = []
+        self._lock = threading.Lock()
+
+    def _faixa_soma(self, minimo: int, maximo: int) -> Tuple[int, int]:
+        """Faixa de soma recortada às somas possíveis de ``qtd`` números (o
+        máximo define o tamanho do estado). Faixa vazia vira uma faixa
+        impossível pequena: o gerador fica inviável sem alocar nada grande."""
+        menor = int(self.numeros[:self.qtd].sum())
+        maior = int(self.numeros[-self.qtd:].sum()) if self.qtd > 0 else 0
+        minimo, maximo = max(minimo, menor), min(maximo, maior)
+        if minimo > maximo:
+            return maior + 1, maior
+        return minimo, maximo
+
+    def _vetor_pesos(self, pesos) -> np.ndarray:
+        vetor = np.ones(len(self.numeros))
+        if isinstance(pesos, Mapping):
+            for numero, peso in pesos.items():
+                if isinstance(numero, (int, np.integer)) and self.num_min <= numero <= self.num_max:
+                    vetor[int(numero) - self.num_min] = float(peso)
+        else:
+            vetor = np.asarray(list(pesos), dtype=np.float64)
+            if vetor.shape != (len(self.numeros),):
+                raise ValueError("pesos deve ter um valor por número da faixa")
+        if (vetor < 0).any() or not np.isfinite(vetor).all():
+            raise ValueError("pesos devem ser finitos e não negativos")
+        return vetor
+
+    # ------------------------------------------------------------------
+    # Programação dinâmica
+    # ------------------------------------------------------------------
+    def _programacao_dinamica(self):
+        """Tabelas ``F[i]``: peso total das escolhas entre os ``i`` primeiros
+        números que terminam em cada estado."""
+        atual = np.zeros(self._forma)
+        atual[0, 0, 0, 0, 0] = 1.0
+        tabelas = [atual]
+        q, e, s, r, _ = self._forma
+        for i, peso in enumerate(self.pesos):
+            proxima = np.zeros(self._forma)
+            # Número fora da aposta: o "anterior" do próximo passa a 0
+            proxima[..., 0] = atual.sum(axis=4)
+            if peso > 0:
+                de, ds, dr = self._delta_pares[i], self._delta_soma[i], self._delta_marcados[i]
+                if ds < s and dr < r and de < e:
+                    # Número na aposta; com consecutivos proibidos só a partir
+                    # de estados em que o anterior ficou de fora
+                    origem = atual[:q - 1, :e - de, :s - ds, :r - dr, 0]
+                    proxima[1:, de:, ds:, dr:, -1] += peso * origem
+            atual = proxima
+            tabelas.append(atual)
+        return tabelas
+
+    def _estados_finais(self):
+        final = self._tabelas[-1][self.qtd]
+        valido = np.ones(final.shape, dtype=bool)
+        if self.pares_permitidos is not None:
+            permitidos = np.zeros(self._dim_pares, dtype=bool)
+            permitidos[[p for p in self.pares_permitidos if p < self._dim_pares]] = True
+            valido &= permitidos[:, None, None, None]
+        if self.soma is not None:
+            somas = np.arange(self._forma[2])
+            valido &= (somas >= self.soma[0])[None, :, None, None]
+        if self.min_marcados:
+            valido &= (np.arange(self._dim_marcados) >= self.min_marcados)[None, None, :, None]
+        indices = np.flatnonzero(valido & (final > 0))
+        return indices, final.ravel()[indices]
+
+    @property
+    def viavel(self) -> bool:
+        """Se existe ao menos uma aposta que atende às restrições."""
+        return len(self._finais) > 0
+
+    # ------------------------------------------------------------------
+    # Sorteio
+    # ------------------------------------------------------------------
+    def sortear(self, quantidade: int = 1, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Sorteia ``quantidade`` apostas (matriz quantidade x qtd, crescente).
+
+        Levanta ValueError se nenhuma aposta atende às restrições.
+        """
+        if not self.viavel:
+            raise ValueError("nenhuma aposta atende às restrições")
+        rng = rng if rng is not None else np.random.default_rng()
+        acumulado = np.cumsum(self._pesos_finais)
+        sorteio = rng.random(quantidade) * acumulado[-1]
+        escolhidos = self._finais[np.minimum(np.searchsorted(acumulado, sorteio, side="right"), len(acumulado) - 1)]
+        e, s, r, a = np.unravel_index(escolhidos, self._forma[1:])
+        c = np.full(quantidade, self.qtd, dtype=np.int64)
+
+        apostas = np.zeros((quantidade, self.qtd), dtype=np.int64)
+        sorteios_volta = rng.random((len(self.pesos), quantidade))
+        for i in range(len(self.pesos) - 1, -1, -1):
+            anterior = self._tabelas[i]
+            peso = self.pesos[i]
+            de, ds, dr = self._delta_pares[i], self._delta_soma[i], self._delta_marcados[i]
+            pode = (c > 0) & (e >= de) & (s >= ds) & (r >= dr) & (peso > 0)
+            ci, ei, si, ri = (np.where(pode, v - d, 0) for v, d in ((c, 1), (e, de), (s, ds), (r, dr)))
+            if self.evitar_consecutivos:
+                # Estado com "anterior" = 1 só vem de incluir este número
+                entrou = a == 1
+            else:
+                peso_dentro = np.where(pode, peso * anterior[ci, ei, si, ri, 0], 0.0)
+                peso_fora = anterior[c, e, s, r, 0]
+                entrou = sorteios_volta[i] * (peso_dentro + peso_fora) < peso_dentro
+            linhas = np.flatnonzero(entrou)
+            apostas[linhas, c[linhas] - 1] = self.numeros[i]
+            c, e, s, r = (np.where(entrou, novo, v) for novo, v in ((ci, c), (ei, e), (si, s), (ri, r)))
+            if self.evitar_consecutivos:
+                # Antes de um número escolhido o anterior ficou de fora; se
+                # este ficou de fora, o anterior é sorteado pelo peso
+                fora = anterior[c, e, s, r]
+                p_ant = np.where(fora.sum(axis=-1) > 0, fora[:, 1] / np.maximum(fora.sum(axis=-1), 1e-300), 0.0)
+                a = np.where(entrou, 0, (sorteios_volta[i] < p_ant).astype(np.int64))
+        return apostas
+
+    def proxima(self) -> list:
+        """Uma aposta (lista crescente). As apostas são independentes entre si,
+        então são sorteadas em blocos e servidas de uma reserva: o custo fixo
+        de refazer o caminho é dividido pelo bloco."""
+        with self._lock:
+            if not self._reserva:
+                self._reserva = self.sortear(_BLOCO).tolist()
+            return self._reserva.pop()
+
+
+_BLOCO = 64
+_cache: "OrderedDict[tuple, GeradorRestrito]" = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_MAX = 32
+_CACHE_CELULAS = 2 * CELULAS_MAX
+
+
+def obter_gerador_restrito(pesos: Mapping[int, float], num_min: int, num_max: int, qtd: int,
+                           pares_permitidos: Optional[Iterable[int]] = None, soma: Optional[Tuple[int, int]] = None,
+                           evitar_consecutivos: bool = False, marcados: Optional[Iterable[int]] = None,
+                           max_marcados: Optional[int] = None, min_marcados: Optional[int] = None) -> GeradorRestrito:
+    """``GeradorRestrito`` com cache LRU pelos pesos e restrições (as tabelas
+    são reaproveitadas entre apostas e requisições com as mesmas preferências).
+    O cache é limitado em entradas e no total de células e é compartilhado
+    pelos threads do worker."""
+    chave = (
+        tuple(sorted((int(n), float(p)) for n, p in pesos.items() if isinstance(n, (int, np.integer)))),
+        int(num_min), int(num_max), int(qtd),
+        None if pares_permitidos is None else tuple(sorted(set(pares_permitidos))),
+        None if soma is None else tuple(soma),
+        bool(evitar_consecutivos),
+        tuple(sorted({int(m) for m in marcados})) if marcados else None,
+        max_marcados,
+        min_marcados,
+    )
+    with _cache_lock:
+        gerador = _cache.get(chave)
+        if gerador is not None:
+            _cache.move_to_end(chave)
+            return gerador
+    gerador = GeradorRestrito(pesos, num_min, num_max, qtd, pares_permitidos, soma,
+                              evitar_consecutivos, marcados, max_marcados, min_marcados)
+    with _cache_lock:
+        gerador = _cache.setdefault(chave, gerador)
+        _cache.move_to_end(chave)
+        while len(_cache) > 1 and (len(_cache) > _CACHE_MAX
+                                   or sum(g.celulas for g in _cache.values()) > _CACHE_CELULAS):
+            _cache.popitem(last=False)
+    return gerador
+
+
+def sortear_aposta(pesos: Mapping[int, float], num_min: int, num_max: int, qtd: int,
+                   rng: Optional[np.random.Generator] = None, **restricoes) -> list:
+    """Uma aposta (lista crescente) que atende às restrições.
+
+    Se as restrições forem impossíveis de atender juntas (ou pesadas demais
+    para as tabelas), registra um aviso e sorteia só com os pesos, como o
+    fallback dos geradores antigos. Com
+    ``rng`` (fluxo do pedido, funcoes/common/rng.py) a aposta sai direto
+    dele, sem a reserva compartilhada, e pode ser refeita pela semente.
+    """
+    try:
+        gerador = obter_gerador_restrito(pesos, num_min, num_max, qtd, **restricoes)
+    except ValueError as e:
+        logger.warning(f"Preferências rejeitadas ({e}); gerando só com os pesos.")
+        gerador = None
+    if gerador is None or not gerador.viavel:
+        logger.warning("Nenhuma aposta atende às preferências; gerando só com os pesos.")
+        gerador = obter_gerador_restrito(pesos, num_min, num_max, qtd)
+        if not gerador.viavel:
+            gerador = obter_gerador_restrito({}, num_min, num_max, qtd)
+    if rng is not None:
+        return gerador.sortear(1, rng)[0].tolist()
+    return gerador.proxima()
@@ -0,0 +1,216 @@
+"""
+Matriz de incidência concursos x números.
+
+Motor compartilhado que monta, uma vez por versão dos dados, a matriz booleana
+"qual número saiu em qual concurso" de cada loteria e expõe primitivas
+vetorizadas (frequência por janela, atraso atual, histórico de atrasos e
+coocorrência). As linhas seguem a ordem cronológica (mais antigo primeiro).
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import obter_config
+
+
+class MatrizIncidencia:
+    """Matriz booleana (concursos x números) com primitivas vetorizadas.
+
+    A coluna ``j`` corresponde ao número ``num_min + j``.
+    """
+
+    def __init__(self, sorteios: np.ndarray, concursos: Sequence[int], num_min: int, num_max: int):
+        sorteios = np.asarray(sorteios)
+        if sorteios.ndim != 2:
+            raise ValueError("sorteios deve ser uma matriz 2D (concursos x bolas)")
+        self.num_min = int(num_min)
+        self.num_max = int(num_max)
+        self.concursos = np.asarray(concursos, dtype=np.int64)
+        self.sorteios = sorteios
+
+        n_linhas = sorteios.shape[0]
+        tamanho = self.num_max - self.num_min + 1
+        self.matriz = np.zeros((n_linhas, tamanho), dtype=bool)
+        if sorteios.size:
+            valores = sorteios.astype(np.int64, copy=False)
+            validos = (valores >= self.num_min) & (valores <= self.num_max)
+            linhas = np.broadcast_to(np.arange(n_linhas)[:, None], valores.shape)
+            self.matriz[linhas[validos], valores[validos] - self.num_min] = True
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, loteria: str, colunas: Optional[List[str]] = None,
+                       numero_range: Optional[tuple] = None, ordenar: bool = True) -> "MatrizIncidencia":
+        """Monta a matriz a partir de um DataFrame com ``Concurso`` + bolas.
+
+        Valores ausentes ou fora do range são ignorados. Com ``ordenar=True``
+        as linhas são ordenadas por concurso crescente.
+        """
+        config = obter_config(loteria)
+        num_min, num_max = numero_range or config["range"]
+        if colunas is None:
+            colunas = [f"Bola{i}" for i in range(1, config["drawn"] + 1)]
+            colunas = [c for c in colunas if c in df.columns]
+        if ordenar and "Concurso" in df.columns:
+            df = df.sort_values("Concurso", kind="stable")
+        valores = df[colunas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        # NaN vira -1 e é descartado pelo filtro de range
+        sorteios = np.where(np.isnan(valores), -1, valores).astype(np.int64)
+        if "Concurso" in df.columns:
+            concursos = pd.to_numeric(df["Concurso"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        else:
+            concursos = np.arange(len(df), dtype=np.int64)
+        return cls(sorteios, concursos, num_min, num_max)
+
+    # ------------------------------------------------------------------
+    # Acesso básico
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self.matriz.shape[0]
+
+    @property
+    def numeros(self) -> np.ndarray:
+        """Números representados pelas colunas da matriz."""
+        return np.arange(self.num_min, self.num_max + 1)
+
+    def indice(self, numero: int) -> int:
+        """Índice da coluna de um número."""
+        return int(numero) - self.num_min
+
+    def janela(self, qtd_concursos: Optional[int] = None) -> "MatrizIncidencia":
+        """Nova matriz restrita aos últimos ``qtd_concursos`` (sem copiar)."""
+        if not qtd_concursos or qtd_concursos <= 0 or qtd_concursos >= len(self):
+            return self
+        sub = MatrizIncidencia.__new__(MatrizIncidencia)
+        sub.num_min, sub.num_max = self.num_min, self.num_max
+        sub.matriz = self.matriz[-qtd_concursos:]
+        sub.concursos = self.concursos[-qtd_concursos:]
+        sub.sorteios = self.sorteios[-qtd_concursos:]
+        return sub
+
+    def ate(self, posicao: int) -> "MatrizIncidencia":
+        """Nova matriz só com as primeiras ``posicao`` linhas (sem copiar).
+
+        Útil para ver o histórico como era antes de um concurso."""
+        if posicao >= len(self):
+            return self
+        sub = MatrizIncidencia.__new__(MatrizIncidencia)
+        sub.num_min, sub.num_max = self.num_min, self.num_max
+        sub.matriz = self.matriz[:max(posicao, 0)]
+        sub.concursos = self.concursos[:max(posicao, 0)]
+        sub.sorteios = self.sorteios[:max(posicao, 0)]
+        return sub
+
+    def linha(self, posicao: int) -> List[int]:
+        """Números sorteados na linha ``posicao`` (aceita índices negativos)."""
+        return (np.flatnonzero(self.matriz[posicao]) + self.num_min).tolist()
+
+    # ------------------------------------------------------------------
+    # Primitivas vetorizadas
+    # ------------------------------------------------------------------
+    def frequencia(self, qtd_concursos: Optional[int] = None) -> np.ndarray:
+        """Quantidade de aparições de cada número na janela."""
+        return self.janela(qtd_concursos).matriz.sum(axis=0, dtype=np.int64)
+
+    def ultima_posicao(self) -> np.ndarray:
+        """Posição (linha) da última aparição de cada número; -1 se nunca saiu."""
+        n = len(self)
+        if n == 0:
+            return np.full(self.matriz.shape[1], -1, dtype=np.int64)
+        invertida = self.matriz[::-1]
+        saiu = invertida.any(axis=0)
+        return np.where(saiu, n - 1 - invertida.argmax(axis=0), -1).astype(np.int64)
+
+    def atraso_atual(self) -> np.ndarray:
+        """Concursos desde a última aparição (0 = saiu no último; len se nunca saiu)."""
+        n = len(self)
+        ultima = self.ultima_posicao()
+        return np.where(ultima >= 0, n - 1 - ultima, n).astype(np.int64)
+
+    def ultimo_concurso(self) -> np.ndarray:
+        """Número do concurso da última aparição de cada número (-1 se nunca saiu)."""
+        ultima = self.ultima_posicao()
+        if len(self) == 0:
+            return ultima
+        return np.where(ultima >= 0, self.concursos[np.maximum(ultima, 0)], -1)
+
+    def historico_atrasos(self) -> Dict[int, np.ndarray]:
+        """Intervalos (em concursos) entre aparições consecutivas de cada número."""
+        # nonzero na transposta agrupa por número, com posições crescentes
+        idx_numeros, posicoes = np.nonzero(self.matriz.T)
+        cortes = np.searchsorted(idx_numeros, np.arange(self.matriz.shape[1] + 1))
+        return {
+            self.num_min + j: np.diff(posicoes[cortes[j]:cortes[j + 1]])
+            for j in range(self.matriz.shape[1])
+        }
+
+    def coocorrencia(self, qtd_concursos: Optional[int] = None) -> np.ndarray:
+        """Matriz (números x números) de quantas vezes cada par saiu junto.
+
+        A diagonal contém a frequência de cada número.
+        """
+        m = self.janela(qtd_concursos).matriz.astype(np.int32)
+        return m.T @ m
+
+    def presenca_float(self, qtd_concursos: Optional[int] = None) -> np.ndarray:
+        """Matriz 0/1 em float64, formato esperado por ``np.corrcoef``."""
+        return self.janela(qtd_concursos).matriz.astype(np.float64)
+
+
+# ----------------------------------------------------------------------
+# Cache por versão dos dados
+# ----------------------------------------------------------------------
+_CACHE_MAX = 32
+_cache: "OrderedDict[tuple, MatrizIncidencia]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _chave_dataframe(df: pd.DataFrame) -> Optional[tuple]:
+    """Identifica o recorte de concursos do DataFrame (None = não cacheável)."""
+    if "Concurso" not in df.columns or len(df) == 0:
+        return None
+    try:
+        return (len(df), int(df["Concurso"].iloc[0]), int(df["Concurso"].iloc[-1]))
+    except (TypeError, ValueError):
+        return None
+
+
+def obter_matriz_incidencia(loteria: str, df: pd.DataFrame, versao: Optional[str] = None,
+                            colunas: Optional[List[str]] = None,
+                            numero_range: Optional[tuple] = None) -> MatrizIncidencia:
+    """Retorna a matriz de incidência da loteria, reaproveitando-a por versão.
+
+    A chave combina loteria, versão dos dados (mtime/tamanho da planilha, se
+    não informada), colunas e o recorte de concursos do DataFrame.
+    """
+    if versao is None:
+        try:
+            from services.draw_store import versao_dados
+            versao = versao_dados(loteria)
+        except Exception:
+            versao = None
+    recorte = _chave_dataframe(df)
+    if recorte is None:
+        return MatrizIncidencia.from_dataframe(df, loteria, colunas=colunas, numero_range=numero_range)
+    chave = (loteria, versao, tuple(colunas or ()), numero_range, recorte)
+    with _cache_lock:
+        matriz = _cache.get(chave)
+        if matriz is not None:
+            _cache.move_to_end(chave)
+            return matriz
+    matriz = MatrizIncidencia.from_dataframe(df, loteria, colunas=colunas, numero_range=numero_range)
+    with _cache_lock:
+        _cache[chave] = matriz
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return matriz
+
+
+def limpar_cache_incidencia() -> None:
+    """Descarta todas as matrizes em cache."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,294 @@
+"""
+Contagens exatas do espaço de apostas por característica.
+
+Responde perguntas como "qual a chance de uma aposta aleatória de 6 números
+da Mega Sena ter 3 pares e soma entre 150 e 210?" sem enumerar as apostas.
+Uma programação dinâmica percorre os números da loteria em ordem acumulando,
+por estado (quantidade escolhida, pares, primos, números da moldura, soma),
+quantas escolhas levam até ele. A tabela final dá a quantidade exata de
+apostas para cada combinação de características; qualquer filtro por faixas
+dessas características é só a soma de uma fatia dela.
+
+As tabelas só dependem da loteria, do tamanho da aposta e das
+características pedidas (não dos sorteios), então ficam em cache: a primeira
+consulta monta a tabela e as seguintes, com quaisquer faixas, só a fatiam.
+As contagens são inteiros exatos (int64, ou inteiros Python quando o total
+de apostas não cabe em 64 bits, como na Lotomania).
+
+Também centraliza o preço das apostas: uma aposta com mais números custa o
+preço da aposta simples vezes a quantidade de apostas simples que ela contém.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from fractions import Fraction
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import obter_config
+
+CARACTERISTICAS = ("pares", "primos", "moldura", "soma")
+MAX_CELULAS = 20_000_000   # limite do estado da programação dinâmica
+_CACHE_MAX = 64
+
+_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# Conjuntos de números por característica
+# ----------------------------------------------------------------------
+def _eh_primo(n: int) -> bool:
+    return n >= 2 and all(n % d for d in range(2, math.isqrt(n) + 1))
+
+
+def ordem_volante(loteria: str) -> list:
+    """Números na ordem do volante (na Lotomania o 00 ocupa a última casa)."""
+    num_min, num_max = obter_config(loteria)["range"]
+    numeros = list(range(num_min, num_max + 1))
+    return numeros[1:] + numeros[:1] if num_min == 0 else numeros
+
+
+def numeros_moldura(loteria: str) -> set:
+    """Números da borda do volante (primeira/última linha e coluna)."""
+    colunas = obter_config(loteria)["colunas_volante"]
+    ordem = ordem_volante(loteria)
+    linhas = math.ceil(len(ordem) / colunas)
+    return {
+        n for i, n in enumerate(ordem)
+        if i // colunas in (0, linhas - 1) or i % colunas in (0, colunas - 1)
+    }
+
+
+@lru_cache(maxsize=None)
+def _indicadores(loteria: str) -> Dict[str, np.ndarray]:
+    """Incremento de cada número em cada característica (0/1, ou o próprio número na soma)."""
+    num_min, num_max = obter_config(loteria)["range"]
+    numeros = np.arange(num_min, num_max + 1)
+    moldura = numeros_moldura(loteria)
+    return {
+        "pares": (numeros % 2 == 0).astype(np.int64),
+        "primos": np.array([_eh_primo(int(n)) for n in numeros], dtype=np.int64),
+        "moldura": np.array([int(n) in moldura for n in numeros], dtype=np.int64),
+        "soma": numeros.astype(np.int64),
+    }
+
+
+def caracteristicas_aposta(loteria: str, numeros: Iterable[int]) -> Dict[str, int]:
+    """Valor de cada característica numa aposta."""
+    num_min = obter_config(loteria)["range"][0]
+    indicadores = _indicadores(loteria)
+    posicoes = [int(n) - num_min for n in numeros]
+    return {c: int(indicadores[c][posicoes].sum()) for c in CARACTERISTICAS}
+
+
+# ----------------------------------------------------------------------
+# Programação dinâmica
+# ----------------------------------------------------------------------
+def _validar(loteria: str, qtd: int, caracteristicas: Sequence[str]) -> Tuple[int, int]:
+    num_min, num_max = obter_config(loteria)["range"]
+    universo = num_max - num_min + 1
+    if not 1 <= qtd <= universo:
+        raise ValueError(f"Aposta deve ter de 1 a {universo} números")
+    invalidas = set(caracteristicas) - set(CARACTERISTICAS)
+    if invalidas:
+        raise ValueError(f"Características inválidas: {sorted(invalidas)}")
+    return universo, qtd
+
+
+def _forma(indicadores, qtd, caracteristicas):
+    forma = [qtd + 1]
+    for c in caracteristicas:
+        # Maior valor atingível: a soma dos qtd maiores incrementos
+        forma.append(int(np.sort(indicadores[c])[::-1][:qtd].sum()) + 1)
+    return tuple(forma)
+
+
+_PRIMOS = (2 ** 61 - 1, 2 ** 61 - 31)   # produto > C(100, 50)
+
+
+def _programacao_dinamica(deltas: np.ndarray, forma: tuple, qtd: int, modulo: Optional[int] = None) -> np.ndarray:
+    """Contagens (int64, ou módulo ``modulo``) das escolhas de ``qtd`` números por estado."""
+    universo = len(deltas)
+    atual = np.zeros(forma, dtype=np.int64)
+    atual[(0,) * len(forma)] = 1
+    for i, incrementos in enumerate(deltas):
+        # Escolhidos antes do número i que ainda podem chegar a qtd: o
+        # restante da tabela não contribui e fica de fora da conta
+        ate = min(i, qtd - 1) + 1
+        desde = max(0, qtd - universo + i)
+        if desde >= ate:
+            continue
+        destino = (slice(desde + 1, ate + 1),) + tuple(slice(int(d), None) for d in incrementos)
+        origem = (slice(desde, ate),) + tuple(
+            slice(None, tamanho - int(d)) for d, tamanho in zip(incrementos, forma[1:]))
+        # Fatias sobrepostas: o numpy usa os valores de antes da soma
+        atual[destino] += atual[origem]
+        if modulo is not None:
+            regiao = atual[destino]
+            np.subtract(regiao, modulo, out=regiao, where=regiao >= modulo)
+    return atual[qtd]
+
+
+def tabela_contagens(loteria: str, qtd: int, caracteristicas: Sequence[str] = CARACTERISTICAS) -> np.ndarray:
+    """
+    Quantidade exata de apostas de ``qtd`` números por combinação de valores.
+
+    Args:
+        loteria: chave de LOTERIA_CONFIG (ou apelido).
+        qtd: números por aposta.
+        caracteristicas: subconjunto ordenado de CARACTERISTICAS.
+
+    Returns:
+        np.ndarray: uma dimensão por característica, indexada pelo valor
+        (ex.: ``tabela[3, 180]`` = apostas com 3 pares e soma 180). É
+        compartilhada pelo cache; não modifique.
+
+    Raises:
+        ValueError: parâmetros inválidos ou estado grande demais.
+    """
+    caracteristicas = tuple(caracteristicas)
+    universo, qtd = _validar(loteria, int(qtd), caracteristicas)
+    chave = (obter_config(loteria)["range"], qtd, caracteristicas)
+    with _lock:
+        tabela = _cache.get(chave)
+        if tabela is not None:
+            _cache.move_to_end(chave)
+            return tabela
+
+    indicadores = _indicadores(loteria)
+    forma = _forma(indicadores, qtd, caracteristicas)
+    if math.prod(forma) > MAX_CELULAS:
+        raise ValueError("Combinação de características grande demais para esse tamanho de aposta")
+    deltas = np.stack([indicadores[c] for c in caracteristicas], axis=1)
+
+    if math.comb(universo, qtd) < 2 ** 63:
+        tabela = _programacao_dinamica(deltas, forma, qtd)
+    else:
+        # O total não cabe em int64 (ex.: Lotomania): a DP roda módulo dois
+        # primos de 61 bits e o valor exato sai pelo teorema chinês do resto
+        p1, p2 = _PRIMOS
+        r1 = _programacao_dinamica(deltas, forma, qtd, p1).astype(object)
+        r2 = _programacao_dinamica(deltas, forma, qtd, p2).astype(object)
+        tabela = r1 + p1 * (((r2 - r1) * pow(p1, -1, p2)) % p2)
+
+    with _lock:
+        _cache[chave] = tabela
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return tabela
+
+
+def limpar_cache_probabilidades() -> None:
+    with _lock:
+        _cache.clear()
+
+
+# ----------------------------------------------------------------------
+# Consultas
+# ----------------------------------------------------------------------
+def normalizar_faixa(valor) -> Tuple[int, int]:
+    """Faixa inclusiva ``(mínimo, máximo)`` a partir de uma tupla ou de ``{"min", "max"}``."""
+    if isinstance(valor, dict):
+        minimo, maximo = valor.get("min"), valor.get("max")
+    else:
+        minimo, maximo = valor
+    minimo = 0 if minimo is None else int(minimo)
+    maximo = 10 ** 9 if maximo is None else int(maximo)
+    if minimo > maximo:
+        raise ValueError("Faixa com mínimo maior que o máximo")
+    return minimo, maximo
+
+
+def contar_apostas(loteria: str, qtd: Optional[int] = None, **faixas) -> int:
+    """
+    Quantidade exata de apostas de ``qtd`` números cujas características
+    estão nas faixas pedidas (inclusivas).
+
+    Exemplo: ``contar_apostas("megasena", 6, pares=(3, 3), soma=(150, 210))``.
+    Cada faixa é ``(mínimo, máximo)`` ou ``{"min": .., "max": ..}``; faixas
+    ausentes ou None não restringem.
+    """
+    config = obter_config(loteria)
+    qtd = int(qtd or config["qtd_aposta"][0])
+    faixas = {c: normalizar_faixa(v) for c, v in faixas.items() if v is not None}
+    caracteristicas = tuple(c for c in CARACTERISTICAS if c in faixas)
+    _validar(loteria, qtd, list(faixas))
+    if not caracteristicas:
+        num_min, num_max = config["range"]
+        return math.comb(num_max - num_min + 1, qtd)
+
+    tabela = tabela_contagens(loteria, qtd, caracteristicas)
+    fatia = tuple(slice(max(faixas[c][0], 0), max(faixas[c][1] + 1, 0)) for c in caracteristicas)
+    return int(tabela[fatia].sum())
+
+
+def probabilidade(loteria: str, qtd: Optional[int] = None, **faixas) -> Dict:
+    """
+    Parcela exata do espaço de apostas que atende às faixas.
+
+    Returns:
+        dict: combinacoes (apostas que atendem), total (todas as apostas de
+        ``qtd`` números), probabilidade (float), percentual e um_em
+        (1 em N; None se nenhuma aposta atende).
+    """
+    config = obter_config(loteria)
+    qtd = int(qtd or config["qtd_aposta"][0])
+    num_min, num_max = config["range"]
+    total = math.comb(num_max - num_min + 1, qtd)
+    combinacoes = contar_apostas(loteria, qtd, **faixas)
+    fracao = Fraction(combinacoes, total)
+    return {
+        "qtd_numeros": qtd,
+        "combinacoes": combinacoes,
+        "total": total,
+        "probabilidade": float(fracao),
+        "percentual": round(float(fracao) * 100, 4),
+        "um_em": round(total / combinacoes, 2) if combinacoes else None,
+    }
+
+
+def distribuicao(loteria: str, caracteristica: str, qtd: Optional[int] = None) -> Dict[int, float]:
+    """Probabilidade de cada valor de uma característica (ex.: quantidade de pares)."""
+    config = obter_config(loteria)
+    qtd = int(qtd or config["qtd_aposta"][0])
+    tabela = tabela_contagens(loteria, qtd, (caracteristica,))
+    total = math.comb(config["range"][1] - config["range"][0] + 1, qtd)
+    return {valor: float(Fraction(int(c), total)) for valor, c in enumerate(tabela) if c}
+
+
+# ----------------------------------------------------------------------
+# Preço das apostas
+# ----------------------------------------------------------------------
+def apostas_simples(loteria: str, qtd: int, qtd_trevos: Optional[int] = None) -> int:
+    """Quantas apostas simples uma aposta com ``qtd`` números (e trevos) contém."""
+    config = obter_config(loteria)
+    quantidade = math.comb(int(qtd), config["qtd_aposta"][0])
+    if "qtd_trevos_aposta" in config:
+        minimo = config["qtd_trevos_aposta"][0]
+        quantidade *= math.comb(int(qtd_trevos or minimo), minimo)
+    return quantidade
+
+
+def preco_aposta(loteria: str, qtd: int, qtd_trevos: Optional[int] = None) -> float:
+    """
+    Preço de uma aposta: preço da aposta simples x apostas simples contidas.
+    0.0 quando a quantidade de números (ou de trevos) não é aceita.
+    """
+    config = obter_config(loteria)
+    qtd_min, qtd_max = config["qtd_aposta"]
+    try:
+        qtd = int(qtd)
+    except (TypeError, ValueError):
+        return 0.0
+    if not qtd_min <= qtd <= qtd_max:
+        return 0.0
+    if "qtd_trevos_aposta" in config:
+        trevos_min, trevos_max = config["qtd_trevos_aposta"]
+        if not trevos_min <= int(qtd_trevos or trevos_min) <= trevos_max:
+            return 0.0
+    return round(config["preco"] * apostas_simples(loteria, qtd, qtd_trevos), 2)
@@ -0,0 +1,155 @@
+"""
+Kernel vetorizado de "seca" (atraso) dos números.
+
+Calcula, em uma única passada sobre a matriz de incidência, o atraso atual,
+a última aparição e as estatísticas de intervalos de todos os números. É a
+base de todas as análises de seca (+Milionária, Mega Sena, Quina, Lotofácil).
+Quando o recorte analisado é a cauda do histórico do store, o mesmo resultado
+sai dos agregados incrementais (``seca_dos_agregados``) sem montar a matriz.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .agregados import consultar_agregados
+from .config import obter_config
+from .incidencia import MatrizIncidencia
+
+
+def calcular_seca(incidencia: MatrizIncidencia) -> Dict[str, np.ndarray]:
+    """Estatísticas de seca de todos os números da matriz.
+
+    Returns:
+        dict de arrays alinhados com ``incidencia.numeros``:
+            - ``seca_atual``: concursos desde a última aparição (len se nunca saiu)
+            - ``ultimo_concurso``: concurso da última aparição (-1 se nunca saiu)
+            - ``aparicoes``: quantidade de aparições na janela
+            - ``maior_seca``: maior sequência sem sair (intervalos + seca atual)
+            - ``seca_media``: média das secas entre aparições (0 se < 2 aparições)
+    """
+    matriz = incidencia.matriz
+    n_linhas, n_numeros = matriz.shape
+
+    # Posições de todas as aparições, agrupadas por número em ordem crescente
+    idx_numeros, posicoes = np.nonzero(matriz.T)
+    aparicoes = np.bincount(idx_numeros, minlength=n_numeros)
+
+    # Secas entre aparições consecutivas do mesmo número
+    mesmo_numero = idx_numeros[1:] == idx_numeros[:-1]
+    secas = (posicoes[1:] - posicoes[:-1] - 1)[mesmo_numero]
+    donos = idx_numeros[1:][mesmo_numero]
+    qtd_secas = np.bincount(donos, minlength=n_numeros)
+    soma_secas = np.bincount(donos, weights=secas, minlength=n_numeros)
+    seca_media = np.divide(soma_secas, qtd_secas, out=np.zeros(n_numeros), where=qtd_secas > 0)
+
+    seca_atual = incidencia.atraso_atual()
+    maior_seca = seca_atual.copy()
+    np.maximum.at(maior_seca, donos, secas)
+
+    return {
+        "numeros": incidencia.numeros,
+        "seca_atual": seca_atual,
+        "ultimo_concurso": incidencia.ultimo_concurso(),
+        "aparicoes": aparicoes.astype(np.int64),
+        "maior_seca": maior_seca,
+        "seca_media": seca_media,
+    }
+
+
+def seca_dos_agregados(loteria: str, concursos) -> Optional[Dict[str, np.ndarray]]:
+    """``calcular_seca`` dos ``concursos`` (ordem crescente) pelos agregados
+    correntes; None se eles não são os últimos concursos do store."""
+    def consulta(agregados, concursos_store):
+        kernel = agregados.seca()
+        posicao = kernel.pop("ultima_posicao")
+        kernel["ultimo_concurso"] = np.where(posicao >= 0, concursos_store[posicao], -1)
+        return kernel
+    return consultar_agregados(loteria, concursos, consulta)
+
+
+def _bolas_principais(loteria: str, colunas: List[str], numero_range: Tuple[int, int]) -> bool:
+    """Se a análise é das bolas sorteadas no range da loteria (o que os agregados guardam)."""
+    config = obter_config(loteria)
+    return (list(colunas) == [f"Bola{i}" for i in range(1, config["drawn"] + 1)]
+            and tuple(numero_range) == tuple(config["range"]))
+
+
+def filtrar_concursos_validos(df: pd.DataFrame, colunas: List[str], numero_range: Tuple[int, int],
+                              qtd_concursos: Optional[int] = None) -> pd.DataFrame:
+    """Recorta os últimos ``qtd_concursos`` e mantém só linhas com todas as
+    bolas presentes e dentro do range (mesma regra das análises de seca)."""
+    if qtd_concursos is not None and qtd_concursos > 0:
+        df = df.tail(qtd_concursos)
+    valores = df[colunas].apply(pd.to_numeric, errors="coerce")
+    num_min, num_max = numero_range
+    mask = valores.notna().all(axis=1) & (valores >= num_min).all(axis=1) & (valores <= num_max).all(axis=1)
+    return df[mask]
+
+
+def analisar_seca(df: pd.DataFrame, loteria: str, colunas: List[str], numero_range: Tuple[int, int],
+                  qtd_concursos: Optional[int] = None, top: int = 10, limite_recentes: int = 3,
+                  singular: str = "numero", plural: str = "numeros") -> dict:
+    """Análise de seca completa no formato consumido pelas rotas ``/api/analise_seca*``.
+
+    Args:
+        df: DataFrame com ``Concurso`` + colunas de bolas.
+        loteria: chave da loteria (ver ``LOTERIA_CONFIG``).
+        colunas: colunas de bolas analisadas (ex.: Bola1..Bola6 ou Trevo1..Trevo2).
+        numero_range: (mínimo, máximo) dos números analisados.
+        qtd_concursos: janela de últimos concursos (None = todos).
+        top: quantos itens em ``<plural>_maior_seca``.
+        limite_recentes: seca máxima para entrar em ``<plural>_recentes``.
+        singular/plural: nomes usados nas chaves (``numero``/``numeros``, ``trevo``/``trevos``).
+
+    Returns:
+        dict vazio se não houver concursos válidos.
+    """
+    df_validos = filtrar_concursos_validos(df, colunas, numero_range, qtd_concursos)
+    if df_validos.empty:
+        return {}
+
+    kernel = None
+    if "Concurso" in df_validos.columns and _bolas_principais(loteria, colunas, numero_range):
+        concursos = pd.to_numeric(df_validos["Concurso"], errors="coerce")
+        if concursos.notna().all():
+            kernel = seca_dos_agregados(loteria, np.sort(concursos.to_numpy(dtype=np.int64)))
+    if kernel is None:
+        incidencia = MatrizIncidencia.from_dataframe(df_validos, loteria, colunas=colunas, numero_range=numero_range)
+        kernel = calcular_seca(incidencia)
+
+    seca_por_numero = {}
+    for j, numero in enumerate(kernel["numeros"].tolist()):
+        seca_atual = int(kernel["seca_atual"][j])
+        ultimo = int(kernel["ultimo_concurso"][j])
+        seca_por_numero[numero] = {
+            "seca_atual": seca_atual,
+            "ultima_aparicao": ultimo if ultimo >= 0 else None,
+            "status": "em_seca" if seca_atual > 0 else "saiu_ultimo",
+            "aparicoes": int(kernel["aparicoes"][j]),
+            "maior_seca": int(kernel["maior_seca"][j]),
+            "seca_media_historica": round(float(kernel["seca_media"][j]), 2),
+        }
+
+    # sorted é estável: empates mantêm a ordem crescente dos números
+    secas_ordenadas = sorted(seca_por_numero.items(), key=lambda x: x[1]["seca_atual"], reverse=True)
+    secas = kernel["seca_atual"]
+
+    return {
+        f"seca_por_{singular}": seca_por_numero,
+        f"{plural}_maior_seca": secas_ordenadas[:top],
+        f"{plural}_recentes": [num for num, info in seca_por_numero.items() if info["seca_atual"] <= limite_recentes],
+        "estatisticas": {
+            "seca_media": float(np.mean(secas)),
+            "seca_mediana": float(np.median(secas)),
+            "seca_maxima": int(secas.max()),
+            "total_concursos_analisados": len(df_validos),
+        },
+        "periodo_analisado": {
+            "total_concursos": len(df),
+            "concursos_analisados": len(df_validos),
+            "qtd_concursos_especificada": qtd_concursos,
+        },
+    }
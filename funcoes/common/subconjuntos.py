@@ -0,0 +1,104 @@
+"""
+Contador de k-subconjuntos (duplas, ternas, quadras) dos sorteios.
+
+Cada subconjunto é codificado como um inteiro pelo seu rank combinatório
+(combinadic, ordem colexicográfica), de modo que a contagem vira um
+``np.bincount`` sobre ``C(N, k)`` posições (ou um ``np.unique`` quando o
+espaço é muito maior que o número de subconjuntos vistos) em vez de um
+``Counter`` de tuplas. O top-k usa seleção parcial (``np.partition``) e só
+decodifica os vencedores de volta para tuplas.
+
+Empates seguem a ordem de primeira aparição (linha a linha, subconjuntos em
+ordem lexicográfica dentro da linha), igual a ``Counter.most_common``.
+"""
+from __future__ import annotations
+
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def _tabela_binomial(n: int, k: int) -> np.ndarray:
+    """Tabela ``C(a, b)`` para ``a`` em 0..n e ``b`` em 0..k (int64)."""
+    return np.array([[comb(a, b) for b in range(k + 1)] for a in range(n + 1)], dtype=np.int64)
+
+
+class ContadorSubconjuntos:
+    """Contagem de todos os k-subconjuntos de uma matriz de sorteios.
+
+    Args:
+        sorteios: matriz (concursos x bolas) com números distintos por linha,
+            em qualquer ordem.
+        k: tamanho do subconjunto (2 = duplas, 3 = ternas, 4 = quadras).
+        num_min, num_max: faixa de números da loteria.
+    """
+
+    def __init__(self, sorteios, k: int, num_min: int, num_max: int):
+        sorteios = np.sort(np.asarray(sorteios, dtype=np.int64), axis=1) - int(num_min)
+        self.k = int(k)
+        self.num_min = int(num_min)
+        self.binomial = _tabela_binomial(int(num_max) - int(num_min) + 1, self.k)
+        self.total_subconjuntos = int(self.binomial[-1, self.k])
+
+        bolas = sorteios.shape[1]
+        if sorteios.shape[0] == 0 or bolas < self.k:
+            codigos = np.zeros(0, dtype=np.int64)
+        else:
+            # Colunas de cada subconjunto em ordem lexicográfica (igual a itertools)
+            indices = np.array(list(combinations(range(bolas), self.k)), dtype=np.int64)
+            matriz = np.zeros((sorteios.shape[0], len(indices)), dtype=np.int64)
+            for i in range(self.k):
+                matriz += self.binomial[sorteios[:, indices[:, i]], i + 1]
+            # Linha a linha: a ordem do array é a ordem de primeira aparição
+            codigos = matriz.ravel()
+
+        # Só os subconjuntos observados são guardados: código, contagem e
+        # posição da primeira aparição (critério de desempate)
+        total = len(codigos)
+        if total * 8 >= self.total_subconjuntos:
+            # Denso (ex.: Lotofácil): bincount sobre todo o espaço C(N, k)
+            contagens = np.bincount(codigos, minlength=self.total_subconjuntos)
+            primeira = np.full(self.total_subconjuntos, total, dtype=np.int64)
+            np.minimum.at(primeira, codigos, np.arange(total, dtype=np.int64))
+            self.codigos = np.flatnonzero(contagens)
+            self.contagens = contagens[self.codigos]
+            self.primeira_aparicao = primeira[self.codigos]
+        else:
+            # Esparso (ex.: quadras da Quina): ordenação só dos códigos vistos
+            self.codigos, self.primeira_aparicao, self.contagens = np.unique(
+                codigos, return_index=True, return_counts=True
+            )
+
+    def decodificar(self, codigos) -> np.ndarray:
+        """Converte ranks em subconjuntos (matriz len(codigos) x k, crescente)."""
+        resto = np.asarray(codigos, dtype=np.int64).copy()
+        saida = np.empty((len(resto), self.k), dtype=np.int64)
+        for i in range(self.k, 0, -1):
+            valor = np.searchsorted(self.binomial[:, i], resto, side="right") - 1
+            saida[:, i - 1] = valor
+            resto -= self.binomial[valor, i]
+        return saida + self.num_min
+
+    def _como_lista(self, posicoes: np.ndarray) -> List[Tuple[Tuple[int, ...], int]]:
+        subconjuntos = self.decodificar(self.codigos[posicoes]).tolist()
+        return [(tuple(s), c) for s, c in zip(subconjuntos, self.contagens[posicoes].tolist())]
+
+    def mais_frequentes(self, top: int = 10) -> List[Tuple[Tuple[int, ...], int]]:
+        """Os ``top`` subconjuntos mais frequentes, como ``Counter.most_common``."""
+        observados = len(self.contagens)
+        if observados == 0 or top <= 0:
+            return []
+        if observados > top:
+            # Seleção parcial: só quem empata ou supera o top-ésimo é ordenado
+            corte = np.partition(self.contagens, observados - top)[observados - top]
+            candidatos = np.flatnonzero(self.contagens >= corte)
+        else:
+            candidatos = np.arange(observados)
+        ordem = np.lexsort((self.primeira_aparicao[candidatos], -self.contagens[candidatos]))
+        return self._como_lista(candidatos[ordem[:top]])
+
+    def como_dict(self) -> Dict[Tuple[int, ...], int]:
+        """Todos os subconjuntos observados, na ordem de primeira aparição."""
+        return dict(self._como_lista(np.argsort(self.primeira_aparicao)))
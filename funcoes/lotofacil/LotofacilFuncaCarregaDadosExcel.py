@@ -17,6 +17,12 @@ def carregar_dados_lotofacil():
         pandas.DataFrame: DataFrame com os dados da Lotofácil ou None se houver erro
     """
     try:
+        # Store binário (memory-mapped); a planilha só é lida se estiver desatualizado
+        from services.draw_store import carregar_ou_compilar
+        df = carregar_ou_compilar('lotofacil', dtype_bolas='int64')
+        if df is not None:
+            return df
+
         # Caminho para o arquivo Excel da Lotofácil
         # Usa caminho relativo correto a partir da pasta raiz do projeto
         caminho_arquivo = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "LoteriasExcel", "Lotofacil_edt2.xlsx")
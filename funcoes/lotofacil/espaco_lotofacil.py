@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Índice do espaço completo de apostas de 15 números da Lotofácil.
+
+São C(25, 15) = 3.268.760 apostas; cada uma vira uma máscara uint32 (bit
+``n`` = número ``n``, como em funcoes/common/bitmask.py), ~13 MB no total.
+Ao lado das máscaras ficam colunas com as características que o laboratório
+calcula em ``analisar_padroes_concurso`` (pares, primos, Fibonacci, moldura)
+e a soma; os repetidos do último concurso saem do popcount da interseção com
+a máscara do sorteio, calculados quando pedidos.
+
+Com isso "quantas apostas atendem a estes filtros?" é uma contagem sobre uma
+máscara booleana, e "sorteie k apostas do conjunto filtrado" escolhe índices
+direto do conjunto, uniformemente ou proporcional ao produto dos pesos dos
+números, sem gerar e descartar apostas. A enumeração leva ~0,2 s e o índice
+é montado uma vez por processo, no primeiro uso.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from funcoes.common.probabilidades import normalizar_faixa
+from .laboratorio_funcoes import obter_constantes_lotofacil
+
+NUM_MIN, NUM_MAX = 1, 25
+QTD_NUMEROS = 15
+TOTAL_APOSTAS = math.comb(NUM_MAX - NUM_MIN + 1, QTD_NUMEROS)
+CARACTERISTICAS = ("pares", "primos", "fibonacci", "moldura", "soma", "repetidos")
+
+_BLOCO = 1 << 21
+_indice = None
+_lock = threading.Lock()
+
+
+def mascara_de(numeros):
+    """Máscara uint32 de um conjunto de números da Lotofácil."""
+    mascara = 0
+    for n in numeros:
+        n = int(n)
+        if NUM_MIN <= n <= NUM_MAX:
+            mascara |= 1 << n
+    return np.uint32(mascara)
+
+
+def _enumerar():
+    """Todas as máscaras de 15 bits entre os bits 1 e 25, em ordem crescente."""
+    partes = []
+    for inicio in range(0, 1 << NUM_MAX, _BLOCO):
+        bloco = np.arange(inicio, inicio + _BLOCO, dtype=np.uint32)
+        partes.append(bloco[np.bitwise_count(bloco) == QTD_NUMEROS])
+    return np.concatenate(partes) << np.uint32(NUM_MIN)
+
+
+def _por_byte(mascaras, valores, dtype):
+    """Soma de ``valores[n]`` pelos bits ligados, com uma tabela por byte."""
+    total = np.zeros(len(mascaras), dtype=dtype)
+    bits = np.arange(8)
+    for b in range(4):
+        por_bit = np.array([valores.get(8 * b + i, 0) for i in bits], dtype=dtype)
+        tabela = np.array([por_bit[(v >> bits) & 1 == 1].sum() for v in range(256)], dtype=dtype)
+        total += tabela[(mascaras >> np.uint32(8 * b)) & np.uint32(0xFF)]
+    return total
+
+
+class EspacoLotofacil:
+    """
+    Máscaras e colunas de características de todas as apostas de 15 números.
+
+    Os filtros são faixas inclusivas, ``(mínimo, máximo)`` ou
+    ``{"min": .., "max": ..}``, como em funcoes/common/probabilidades.py:
+    ``pares``, ``primos``, ``fibonacci``, ``moldura``, ``soma`` e
+    ``repetidos`` (este exige ``ultimo_concurso``). Também aceitam
+    ``fixos`` (números obrigatórios), ``excluidos`` e
+    ``evitar_consecutivos``.
+    """
+
+    def __init__(self):
+        constantes = obter_constantes_lotofacil()
+        self.mascaras = _enumerar()
+        numeros = range(NUM_MIN, NUM_MAX + 1)
+        grupos = {
+            "pares": [n for n in numeros if n % 2 == 0],
+            "primos": constantes["primos"],
+            "fibonacci": constantes["fibonacci"],
+            "moldura": constantes["moldura"],
+        }
+        self.colunas = {
+            nome: np.bitwise_count(self.mascaras & mascara_de(grupo)).astype(np.uint8)
+            for nome, grupo in grupos.items()
+        }
+        self.colunas["soma"] = _por_byte(self.mascaras, {n: n for n in numeros}, np.uint16)
+        self._repetidos = (None, None)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.mascaras)
+
+    def repetidos(self, ultimo_concurso):
+        """Quantos números de cada aposta saíram em ``ultimo_concurso``."""
+        alvo = mascara_de(ultimo_concurso)
+        with self._lock:
+            chave, coluna = self._repetidos
+            if chave != int(alvo):
+                coluna = np.bitwise_count(self.mascaras & alvo).astype(np.uint8)
+                self._repetidos = (int(alvo), coluna)
+        return coluna
+
+    def filtrar(self, ultimo_concurso=None, fixos=None, excluidos=None, evitar_consecutivos=False, **faixas):
+        """
+        Máscara booleana das apostas que atendem a todos os filtros.
+
+        Raises:
+            ValueError: filtro desconhecido, faixa inválida ou ``repetidos``
+                sem ``ultimo_concurso``.
+        """
+        selecao = np.ones(len(self), dtype=bool)
+        for nome, valor in faixas.items():
+            if valor is None:
+                continue
+            if nome not in CARACTERISTICAS:
+                raise ValueError(f"Filtro desconhecido: {nome}")
+            if nome == "repetidos":
+                if not ultimo_concurso:
+                    raise ValueError("Filtro de repetidos exige o último concurso")
+                coluna = self.repetidos(ultimo_concurso)
+            else:
+                coluna = self.colunas[nome]
+            minimo, maximo = normalizar_faixa(valor)
+            selecao &= (coluna >= minimo) & (coluna <= maximo)
+        if fixos:
+            obrigatoria = mascara_de(fixos)
+            selecao &= (self.mascaras & obrigatoria) == obrigatoria
+        if excluidos:
+            selecao &= (self.mascaras & mascara_de(excluidos)) == 0
+        if evitar_consecutivos:
+            selecao &= (self.mascaras & (self.mascaras >> np.uint32(1))) == 0
+        return selecao
+
+    def contar(self, **filtros):
+        """Quantidade de apostas que atendem aos filtros."""
+        return int(np.count_nonzero(self.filtrar(**filtros)))
+
+    def distribuicao(self, caracteristica, selecao=None, ultimo_concurso=None):
+        """Apostas por valor da característica {valor: quantidade} dentro da seleção."""
+        if caracteristica == "repetidos":
+            coluna = self.repetidos(ultimo_concurso or [])
+        else:
+            coluna = self.colunas[caracteristica]
+        if selecao is not None:
+            coluna = coluna[selecao]
+        contagens = np.bincount(coluna)
+        return {int(v): int(c) for v, c in enumerate(contagens) if c}
+
+    def amostrar(self, quantidade, pesos=None, rng=None, **filtros):
+        """
+        Sorteia ``quantidade`` apostas distintas do conjunto filtrado.
+
+        Sem ``pesos`` o sorteio é uniforme; com pesos ({número: peso}) cada
+        aposta é sorteada proporcional ao produto dos pesos dos seus números
+        (sem reposição, via Gumbel-top-k), a mesma distribuição do
+        GeradorRestrito. Devolve menos apostas se o conjunto for menor.
+
+        Returns:
+            list: apostas como listas ordenadas de números.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        indices = np.flatnonzero(self.filtrar(**filtros))
+        quantidade = min(int(quantidade), len(indices))
+        if quantidade <= 0:
+            return []
+        if pesos is None:
+            escolhidos = rng.choice(indices, size=quantidade, replace=False)
+        else:
+            log_pesos = {int(n): (math.log(p) if p > 0 else -np.inf) for n, p in pesos.items()}
+            log_pesos.update({n: -np.inf for n in range(NUM_MIN, NUM_MAX + 1) if n not in log_pesos})
+            chaves = _por_byte(self.mascaras[indices], log_pesos, np.float64)
+            chaves += rng.gumbel(size=len(indices))
+            validos = np.isfinite(chaves)
+            quantidade = min(quantidade, int(np.count_nonzero(validos)))
+            if quantidade <= 0:
+                return []
+            topo = np.argpartition(-chaves, quantidade - 1)[:quantidade]
+            escolhidos = indices[topo]
+        return [self.numeros(m) for m in self.mascaras[escolhidos]]
+
+    @staticmethod
+    def numeros(mascara):
+        """Números (em ordem) de uma máscara."""
+        mascara = int(mascara)
+        return [n for n in range(NUM_MIN, NUM_MAX + 1) if mascara >> n & 1]
+
+
+def obter_espaco_lotofacil():
+    """Índice do espaço da Lotofácil (montado no primeiro uso e reaproveitado)."""
+    global _indice
+    with _lock:
+        if _indice is None:
+            _indice = EspacoLotofacil()
+        return _indice
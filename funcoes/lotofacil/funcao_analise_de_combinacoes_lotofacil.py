@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
 from collections import Counter, defaultdict
-from itertools import combinations
+
+from funcoes.common.subconjuntos import ContadorSubconjuntos
 
 def _detectar_coluna_concurso(df: pd.DataFrame):
     possiveis = ['concurso', 'nrconcurso', 'n_concurso', 'numero_concurso', 'idconcurso']
@@ -105,30 +106,14 @@ def analise_de_combinacoes_lotofacil(dados_sorteios, qtd_concursos=None):
 
     # 1. Duplas, Ternas, Quadras: Combinações que mais se repetem
     def analisar_combinacoes_frequentes():
-        combinacoes_stats = {
-            'duplas': Counter(),
-            'ternas': Counter(),
-            'quadras': Counter()
+        # Contagem por ranks inteiros (bincount); Counter mantém a ordem de
+        # primeira aparição esperada por converter_tuplas_para_listas
+        sorteios = df_sorteios_pd[num_cols].to_numpy(dtype=np.int64)
+        return {
+            nome: Counter(ContadorSubconjuntos(sorteios, k, 1, 25).como_dict())
+            for nome, k in (('duplas', 2), ('ternas', 3), ('quadras', 4))
         }
 
-        for _, row in df_sorteios_pd.iterrows():
-            numeros_lista = row['numeros_principais_ordenados']
-            numeros = tuple(numeros_lista) if isinstance(numeros_lista, list) else numeros_lista
-
-            # Duplas de números principais
-            for dupla in combinations(numeros, 2):
-                combinacoes_stats['duplas'][tuple(sorted(dupla))] += 1
-            
-            # Ternas de números principais
-                for terna in combinations(numeros, 3):
-                    combinacoes_stats['ternas'][tuple(sorted(terna))] += 1
-
-            # Quadras de números principais
-                for quadra in combinations(numeros, 4):
-                    combinacoes_stats['quadras'][tuple(sorted(quadra))] += 1
-            
-        return combinacoes_stats
-
     # 2. Afinidade: Números que mais aparecem juntos
     def analisar_afinidade():
         afinidade_stats = {
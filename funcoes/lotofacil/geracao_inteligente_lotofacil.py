@@ -7,10 +7,16 @@ Geração Inteligente de Aposta - Lotofácil (1..25, 15–20 dezenas)
 Alinha a geração às análises dos passos 1–6 (frequência, distribuição,
 afinidades, padrões/seq., seca, estatísticas) quando disponíveis via
 analysis_cache. Mantém comportamento seguro mesmo com preferências vazias.
+
+Apostas de 15 dezenas com ``filtros`` do laboratório (pares, primos,
+fibonacci, moldura, soma, repetidos) são sorteadas do índice do espaço
+completo (espaco_lotofacil.py), já restrito aos filtros e às preferências.
 """
 from __future__ import annotations
 from typing import Dict, Any, List, Tuple
-import random
+
+from funcoes.common.gerador_restrito import sortear_aposta
+from funcoes.common.probabilidades import normalizar_faixa, preco_aposta
 
 
 RANGE_MIN, RANGE_MAX = 1, 25
@@ -25,7 +31,39 @@ def _sanitize_pool(nums: List[int]) -> List[int]:
     return [n for n in nums if isinstance(n, int) and RANGE_MIN <= n <= RANGE_MAX]
 
 
-def gerar_aposta_inteligente_lotofacil(preferencias: Dict[str, Any], analysis_cache: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _intersecao(faixa, outra):
+    if faixa is None:
+        return outra
+    minimo, maximo = normalizar_faixa(faixa)
+    return max(minimo, outra[0]), min(maximo, outra[1])
+
+
+def _sortear_do_espaco(filtros: Dict[str, Any], restricoes: Dict[str, Any], pesos: Dict[int, float],
+                       ultimo_concurso: List[int], quantidade: int, rng=None) -> List[List[int]]:
+    """Apostas de 15 dezenas distintas sorteadas do índice, com filtros e restrições somados."""
+    from funcoes.lotofacil.espaco_lotofacil import obter_espaco_lotofacil, CARACTERISTICAS
+
+    faixas = {c: filtros.get(c) for c in CARACTERISTICAS if filtros.get(c) is not None}
+    if restricoes.get('pares_permitidos'):
+        permitidos = restricoes['pares_permitidos']
+        faixas['pares'] = _intersecao(faixas.get('pares'), (min(permitidos), max(permitidos)))
+    if restricoes.get('soma'):
+        faixas['soma'] = _intersecao(faixas.get('soma'), restricoes['soma'])
+    if restricoes.get('marcados'):
+        faixas['repetidos'] = _intersecao(faixas.get('repetidos'), (0, restricoes['max_marcados']))
+        ultimo_concurso = restricoes['marcados']
+
+    apostas = obter_espaco_lotofacil().amostrar(
+        quantidade, pesos=pesos, rng=rng, ultimo_concurso=ultimo_concurso,
+        evitar_consecutivos=restricoes.get('evitar_consecutivos', False), **faixas
+    )
+    if not apostas:
+        raise ValueError("Nenhuma aposta atende aos filtros escolhidos")
+    return apostas
+
+
+def gerar_aposta_inteligente_lotofacil(preferencias: Dict[str, Any], analysis_cache: Dict[str, Any],
+                                       rng=None) -> List[Dict[str, Any]]:
     num_apostas_gerar = int(preferencias.get('numApostasGerar', 1))
     qtde_numeros_aposta = _clamp_qtde(int(preferencias.get('qtdeNumerosAposta', QTDE_MIN)))
 
@@ -82,58 +120,38 @@ def gerar_aposta_inteligente_lotofacil(preferencias: Dict[str, Any], analysis_ca
     # 4) Distribuição (paridade e soma)
     dist_pref = preferencias.get('distribuicao', {}) or {}
 
+    # Restrições aplicadas direto na amostragem (sem tentativa e erro)
+    restricoes: Dict[str, Any] = {'evitar_consecutivos': bool(pad_pref.get('evitarConsecutivos'))}
+    if pad_pref.get('evitarRepeticoesSeguidas') and ultimos_sorteados:
+        restricoes['marcados'] = ultimos_sorteados
+        restricoes['max_marcados'] = 2
+    if dist_pref.get('priorizarParesImpares'):
+        alvo = dist_pref.get('paridadeDesejada', 'equilibrado')
+        regras = {
+            'equilibrado': lambda pares, impares: abs(pares - impares) <= 1,
+            'mais_pares': lambda pares, impares: pares >= impares,
+            'mais_impares': lambda pares, impares: impares >= pares,
+        }
+        if alvo in regras:
+            restricoes['pares_permitidos'] = [
+                p for p in range(qtde_numeros_aposta + 1) if regras[alvo](p, qtde_numeros_aposta - p)
+            ]
+    if dist_pref.get('priorizarSoma'):
+        restricoes['soma'] = (int(dist_pref.get('somaMin', 150)), int(dist_pref.get('somaMax', 260)))
+
     apostas: List[Dict[str, Any]] = []
+    filtros = preferencias.get('filtros') or {}
+    if filtros and qtde_numeros_aposta == QTDE_MIN:
+        ultimo_concurso = ultimos_sorteados or analysis_cache.get('ultimo_sorteio') or []
+        for escolhidos in _sortear_do_espaco(filtros, restricoes, pesos_numeros, ultimo_concurso, num_apostas_gerar, rng):
+            apostas.append({
+                'numeros': escolhidos,
+                'valor_estimado': calcular_valor_aposta_lotofacil(len(escolhidos))
+            })
+        return apostas
+
     for _ in range(num_apostas_gerar):
-        numeros_ponderados = list(pesos_numeros.keys())
-        pesos_lista = list(pesos_numeros.values())
-        escolhidos: List[int] = []
-
-        # multiple attempts para satisfazer restrições leves
-        for _tent in range(120):
-            tentativa = set(random.choices(numeros_ponderados, weights=pesos_lista, k=qtde_numeros_aposta))
-            tentativa = set(_sanitize_pool(list(tentativa)))
-            if len(tentativa) < qtde_numeros_aposta:
-                # completa aleatoriamente dentro do range válido
-                while len(tentativa) < qtde_numeros_aposta:
-                    tentativa.add(random.randint(RANGE_MIN, RANGE_MAX))
-
-            candidata = sorted(list(tentativa))
-
-            # regras leves
-            ok = True
-            if pad_pref.get('evitarConsecutivos'):
-                if any((candidata[i+1] - candidata[i]) == 1 for i in range(len(candidata)-1)):
-                    ok = False
-            if pad_pref.get('evitarRepeticoesSeguidas') and ultimos_sorteados:
-                repetidos = len(set(candidata) & set(ultimos_sorteados))
-                if repetidos > 2:
-                    ok = False
-
-            if dist_pref.get('priorizarParesImpares'):
-                alvo = dist_pref.get('paridadeDesejada', 'equilibrado')
-                pares = sum(1 for n in candidata if n % 2 == 0)
-                impares = qtde_numeros_aposta - pares
-                if alvo == 'equilibrado' and abs(pares - impares) > 1:
-                    ok = False
-                if alvo == 'mais_pares' and pares < impares:
-                    ok = False
-                if alvo == 'mais_impares' and impares < pares:
-                    ok = False
-
-            if dist_pref.get('priorizarSoma'):
-                soma = sum(candidata)
-                soma_min = int(dist_pref.get('somaMin', 150))
-                soma_max = int(dist_pref.get('somaMax', 260))
-                if not (soma_min <= soma <= soma_max):
-                    ok = False
-
-            if ok:
-                escolhidos = candidata
-                break
-
-        if not escolhidos:
-            # fallback aleatório seguro
-            escolhidos = sorted(random.sample(range(RANGE_MIN, RANGE_MAX + 1), qtde_numeros_aposta))
+        escolhidos = sortear_aposta(pesos_numeros, RANGE_MIN, RANGE_MAX, qtde_numeros_aposta, rng=rng, **restricoes)
 
         apostas.append({
             'numeros': escolhidos,
@@ -145,21 +163,10 @@ def gerar_aposta_inteligente_lotofacil(preferencias: Dict[str, Any], analysis_ca
 
 def calcular_valor_aposta_lotofacil(qtde_numeros: int) -> float:
     """
-    Calcula o valor estimado da aposta baseado na quantidade de números.
-    Valores baseados na tabela oficial da Lotofácil (atualizada).
+    Calcula o valor estimado da aposta baseado na quantidade de números:
+    preço da aposta simples x apostas simples contidas (C(n, 15)).
     """
-    # Tabela de valores da Lotofácil (valores oficiais)
-    tabela_valores = {
-        15: 3.50,      # 15 números
-        16: 56.00,     # 16 números
-        17: 476.00,    # 17 números
-        18: 2856.00,   # 18 números
-        19: 13566.00,  # 19 números
-        20: 54264.00   # 20 números
-    }
-    
-    return tabela_valores.get(qtde_numeros, 0.0)
-
+    return preco_aposta("lotofacil", qtde_numeros)
 
 # Função auxiliar para limpar NaN de dicionários aninhados (útil para resultados de análise avançada)
 def limpar_nan_do_dict(d):
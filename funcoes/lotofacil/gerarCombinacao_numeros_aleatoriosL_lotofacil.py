@@ -1,256 +1,234 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
+"""
+Geração de apostas personalizadas da Lotofácil (quentes, frios, secos,
+paridade e repetidos do último concurso).
+
+Os insumos (último concurso, quentes/frios/secos dos últimos 25 concursos)
+ficam num retrato em memória montado uma vez por versão dos dados. A faixa
+de repetidos é resolvida no próprio sorteio (GeradorRestrito com mínimo e
+máximo de números "marcados"), em vez de gerar e descartar apostas.
+"""
+
+import threading
 import numpy as np
 import logging
-from collections import Counter
-import pandas as pd # Added for controlling_qualidade_repetidos_lotofacil
+
+from funcoes.common.gerador_restrito import obter_gerador_restrito
+from funcoes.common.rng import criar_rng, sortear_numeros
 
 # Configuração do logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def controlar_qualidade_repetidos_lotofacil(numeros_gerados, quantidade, preferencias=None):
+JANELA_ESTATISTICAS = 25   # concursos das estatísticas rápidas (quentes/frios/secos)
+QTD_QUENTES_FRIOS = 8
+
+# Faixas de repetidos (ideal, conservadora) para 15 e para 16-20 números
+FAIXAS_REPETIDOS = {
+    15: {'repetidos_min': 7, 'repetidos_max': 11,
+         'repetidos_conservador_min': 6, 'repetidos_conservador_max': 12},
+    16: {'repetidos_min': 11, 'repetidos_max': 13,
+         'repetidos_conservador_min': 10, 'repetidos_conservador_max': 14},
+}
+
+PREFERENCIAS_PADRAO = {
+    'incluir_quentes': True,
+    'incluir_frios': True,
+    'incluir_secos': True,
+    'balancear_par_impar': True,
+    'controlar_repetidos': True,
+    'qtd_quentes': 6,
+    'qtd_frios': 4,
+    'qtd_secos': 2,
+    'qtd_aleatorios': 3,
+}
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+class SnapshotLotofacil:
+    """
+    Insumos do gerador numa versão dos dados: último concurso, números
+    quentes/frios/secos e frequência nos últimos concursos.
+
+    Args:
+        versao (str | None): versão dos dados (services.draw_store.versao_dados).
+        sorteios (np.ndarray): sorteios (concursos x 15) em ordem crescente de concurso.
+    """
+
+    def __init__(self, versao, sorteios, janela=JANELA_ESTATISTICAS):
+        self.versao = versao
+        sorteios = np.asarray(sorteios, dtype=np.int64)
+        recentes = sorteios[-janela:]
+        contagem = np.bincount(recentes[(recentes >= 1) & (recentes <= 25)], minlength=26)[1:26]
+        self.frequencia = {n: int(contagem[n - 1]) for n in range(1, 26)}
+
+        # Mesma ordem das estatísticas rápidas: mais frequente primeiro, empates pelo número
+        ordenados = sorted(self.frequencia, key=lambda n: -self.frequencia[n])
+        self.quentes = ordenados[:QTD_QUENTES_FRIOS]
+        self.frios = ordenados[-QTD_QUENTES_FRIOS:]
+        self.secos = [n for n, f in self.frequencia.items() if f == 0]
+        self.ultimo_concurso = sorted(int(n) for n in sorteios[-1] if 1 <= n <= 25) if len(sorteios) else []
+
+    def pesos(self, preferencias):
+        """
+        Peso de cada número: cada grupo incluído multiplica o peso dos seus
+        números por 1 + (quantidade pedida / tamanho do grupo).
+        """
+        pesos = {n: 1.0 for n in range(1, 26)}
+        for grupo, incluir, qtd in (
+            (self.quentes, 'incluir_quentes', 'qtd_quentes'),
+            (self.frios, 'incluir_frios', 'qtd_frios'),
+            (self.secos, 'incluir_secos', 'qtd_secos'),
+        ):
+            if preferencias.get(incluir, True) and grupo:
+                fator = 1.0 + min(int(preferencias.get(qtd, 0)), len(grupo)) / len(grupo)
+                for n in grupo:
+                    pesos[n] *= fator
+        return pesos
+
+
+def obter_snapshot_lotofacil():
+    """Retrato da versão atual dos dados (remontado só quando a planilha muda)."""
+    global _snapshot
+    from services.draw_store import carregar_historico, versao_dados
+
+    versao = versao_dados("lotofacil")
+    with _lock:
+        if _snapshot is not None and _snapshot.versao == versao:
+            return _snapshot
+
+    historico = carregar_historico("lotofacil")
+    if historico is None:
+        return None
+    sorteios, _, colunas = historico
+    bolas = [i for i, c in enumerate(colunas) if c.startswith("Bola")]
+    snapshot = SnapshotLotofacil(versao, sorteios[:, bolas])
+    with _lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def _mesclar_preferencias(quantidade, preferencias):
+    mescladas = dict(PREFERENCIAS_PADRAO, **FAIXAS_REPETIDOS[15 if quantidade == 15 else 16])
+    mescladas.update(preferencias or {})
+    return mescladas
+
+
+def _faixas_repetidos(preferencias):
+    return (
+        (int(preferencias['repetidos_min']), int(preferencias['repetidos_max'])),
+        (int(preferencias['repetidos_conservador_min']), int(preferencias['repetidos_conservador_max'])),
+    )
+
+
+def _sortear(snapshot, quantidade, preferencias, rng):
+    """Uma aposta com os pesos do retrato, paridade e faixa de repetidos resolvidas no sorteio."""
+    pesos = snapshot.pesos(preferencias) if snapshot is not None else {}
+    restricoes = {}
+    if preferencias.get('balancear_par_impar', True):
+        # Pares e ímpares com diferença de no máximo 1 (7-8 pares em 15 números)
+        restricoes['pares_permitidos'] = [p for p in range(quantidade + 1) if abs(2 * p - quantidade) <= 1]
+
+    faixas = [None]
+    if preferencias.get('controlar_repetidos', True) and snapshot is not None and snapshot.ultimo_concurso:
+        faixas = list(_faixas_repetidos(preferencias)) + faixas
+    for faixa in faixas:
+        opcoes = dict(restricoes)
+        if faixa is not None:
+            opcoes.update(marcados=snapshot.ultimo_concurso, min_marcados=faixa[0], max_marcados=faixa[1])
+        gerador = obter_gerador_restrito(pesos, 1, 25, quantidade, **opcoes)
+        if gerador.viavel:
+            return gerador.sortear(1, rng)[0].tolist()
+    logger.warning("Nenhuma aposta atende às preferências; gerando só com os pesos.")
+    return obter_gerador_restrito(pesos, 1, 25, quantidade).sortear(1, rng)[0].tolist()
+
+def controlar_qualidade_repetidos_lotofacil(numeros_gerados, quantidade, preferencias=None, rng=None):
     """
     Controla a qualidade dos números repetidos em relação ao último concurso.
+
+    Se a aposta já está na faixa ideal (ou na conservadora) de repetidos, é
+    mantida; senão é trocada por uma aposta sorteada direto na faixa, com os
+    mesmos pesos da aposta personalizada (sem tentativa e erro).
     
     Args:
         numeros_gerados (list): Lista de números gerados
         quantidade (int): Quantidade de números na aposta (15-20)
         preferencias (dict): Preferências de controle de repetidos
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
         
     Returns:
         list: Lista de números com qualidade controlada
     """
     try:
-        # Preferências padrão para controle de repetidos
-        if preferencias is None:
-            preferencias = {}
-        
-        # Obtém o último concurso para comparação
-        from funcoes.lotofacil.LotofacilFuncaCarregaDadosExcel import obter_ultimos_concursos_lotofacil
-        
-        df_ultimo = obter_ultimos_concursos_lotofacil(1)
-        if df_ultimo.empty:
+        preferencias = _mesclar_preferencias(quantidade, preferencias)
+        snapshot = obter_snapshot_lotofacil()
+        if snapshot is None or not snapshot.ultimo_concurso:
             logger.warning("Não foi possível obter o último concurso para controle de repetidos")
             return numeros_gerados
-        
-        # Números do último concurso
-        ultimo_concurso = []
-        for i in range(1, 16):  # Bola1 até Bola15
-            coluna = f'Bola{i}'
-            if coluna in df_ultimo.columns:
-                valor = df_ultimo.iloc[0][coluna]
-                if pd.notna(valor) and valor > 0:
-                    ultimo_concurso.append(int(valor))
-        
-        if not ultimo_concurso:
-            logger.warning("Último concurso não possui números válidos")
-            return numeros_gerados
-        
-        # Calcula repetidos atuais
-        repetidos_atuais = len(set(numeros_gerados) & set(ultimo_concurso))
-        
-        # Define faixas baseadas na quantidade de números
-        if quantidade == 15:
-            # Para 15 números: faixa ideal 7-11, conservadora 6-12
-            faixa_min = preferencias.get('repetidos_min', 7)
-            faixa_max = preferencias.get('repetidos_max', 11)
-            faixa_conservadora_min = preferencias.get('repetidos_conservador_min', 6)
-            faixa_conservadora_max = preferencias.get('repetidos_conservador_max', 12)
-        else:
-            # Para 16-20 números: faixa ideal 11-13, conservadora 10-14
-            faixa_min = preferencias.get('repetidos_min', 11)
-            faixa_max = preferencias.get('repetidos_max', 13)
-            faixa_conservadora_min = preferencias.get('repetidos_conservador_min', 10)
-            faixa_conservadora_max = preferencias.get('repetidos_conservador_max', 14)
-        
-        # Verifica se está na faixa ideal
-        if faixa_min <= repetidos_atuais <= faixa_max:
-            logger.info(f"✅ Repetidos ({repetidos_atuais}) está na faixa ideal ({faixa_min}-{faixa_max})")
-            return numeros_gerados
-        
-        # Verifica se está na faixa conservadora
-        if faixa_conservadora_min <= repetidos_atuais <= faixa_conservadora_max:
-            logger.info(f"⚠️ Repetidos ({repetidos_atuais}) está na faixa conservadora ({faixa_conservadora_min}-{faixa_conservadora_max})")
-            return numeros_gerados
-        
-        # Se não está nas faixas, tenta ajustar
-        logger.info(f"🔄 Ajustando repetidos: {repetidos_atuais} → alvo: {faixa_min}-{faixa_max}")
-        
-        tentativas_maximas = 50
-        tentativas = 0
-        
-        while tentativas < tentativas_maximas:
-            tentativas += 1
-            
-            # Gera nova combinação
-            numeros_novos = gerar_aposta_personalizada_lotofacil(quantidade, preferencias)
-            
-            # Calcula novos repetidos
-            novos_repetidos = len(set(numeros_novos) & set(ultimo_concurso))
-            
-            # Verifica se está na faixa desejada
-            if faixa_min <= novos_repetidos <= faixa_max:
-                logger.info(f"✅ Ajuste bem-sucedido: {novos_repetidos} repetidos em {tentativas} tentativas")
-                return numeros_novos
-            
-            # Se está na faixa conservadora, aceita após algumas tentativas
-            if tentativas > 20 and faixa_conservadora_min <= novos_repetidos <= faixa_conservadora_max:
-                logger.info(f"⚠️ Ajuste conservador aceito: {novos_repetidos} repetidos em {tentativas} tentativas")
-                return numeros_novos
-        
-        # Se não conseguiu ajustar, retorna o melhor resultado encontrado
-        logger.warning(f"⚠️ Não foi possível ajustar repetidos após {tentativas_maximas} tentativas. Mantendo original.")
-        return numeros_gerados
-        
+
+        repetidos_atuais = len(set(numeros_gerados) & set(snapshot.ultimo_concurso))
+        ideal, conservadora = _faixas_repetidos(preferencias)
+        for faixa in (ideal, conservadora):
+            if faixa[0] <= repetidos_atuais <= faixa[1]:
+                return numeros_gerados
+
+        logger.info(f"🔄 Ajustando repetidos: {repetidos_atuais} → alvo: {ideal[0]}-{ideal[1]}")
+        return _sortear(snapshot, quantidade, preferencias, rng if rng is not None else criar_rng()[0])
+
     except Exception as e:
         logger.error(f"Erro no controle de qualidade de repetidos: {str(e)}")
         return numeros_gerados
 
-def gerar_aposta_personalizada_lotofacil(quantidade=15, preferencias=None):
+def gerar_aposta_personalizada_lotofacil(quantidade=15, preferencias=None, rng=None):
     """
     Gera uma aposta personalizada da Lotofácil baseada em critérios inteligentes.
+
+    Números quentes, frios e secos ganham peso (proporcional a qtd_quentes,
+    qtd_frios e qtd_secos); a aposta é sorteada de uma vez com a paridade
+    equilibrada e exatamente r números do último concurso, r dentro da faixa
+    de repetidos. Os insumos vêm do retrato em memória da versão atual dos
+    dados, então cada aposta não lê planilha nem refaz estatísticas.
     
     Args:
         quantidade (int): Quantidade de números para a aposta (15-20)
         preferencias (dict): Dicionário com preferências de geração
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
         
     Returns:
         list: Lista com a quantidade especificada de números para a aposta
     """
+    rng = rng if rng is not None else criar_rng()[0]
     try:
-        # Preferências padrão se não fornecidas
-        if preferencias is None:
-            preferencias = {}
-        
-        # Preferências padrão para controle de repetidos
-        preferencias_padrao = {
-            'incluir_quentes': True,
-            'incluir_frios': True,
-            'incluir_secos': True,
-            'balancear_par_impar': True,
-            'controlar_repetidos': True,
-            'qtd_quentes': 6,
-            'qtd_frios': 4,
-            'qtd_secos': 2,
-            'qtd_aleatorios': 3,
-            # Controle de repetidos para 15 números
-            'repetidos_min': 7,
-            'repetidos_max': 11,
-            'repetidos_conservador_min': 6,
-            'repetidos_conservador_max': 12
-        }
-        
-        # Para 16-20 números, ajusta as faixas de repetidos
-        if quantidade > 15:
-            preferencias_padrao.update({
-                'repetidos_min': 11,
-                'repetidos_max': 13,
-                'repetidos_conservador_min': 10,
-                'repetidos_conservador_max': 14
-            })
-        
-        # Mescla preferências fornecidas com padrões
-        for key, value in preferencias.items():
-            preferencias_padrao[key] = value
-        
-        preferencias = preferencias_padrao
-        
-        logger.info("Gerando aposta personalizada da Lotofácil...")
-        
-        # Obtém estatísticas da Lotofácil
-        from funcoes.lotofacil.funcao_analise_de_frequencia_lotofacil import obter_estatisticas_rapidas_lotofacil
-        
-        stats = obter_estatisticas_rapidas_lotofacil()
-        
-        # Lista para armazenar números selecionados
-        numeros_selecionados = []
-        
-        # 1. Adiciona números quentes
-        if preferencias.get('incluir_quentes', True) and stats['numeros_quentes']:
-            qtd_quentes = min(preferencias.get('qtd_quentes', 6), len(stats['numeros_quentes']))
-            numeros_quentes_escolhidos = random.sample(stats['numeros_quentes'], qtd_quentes)
-            numeros_selecionados.extend(numeros_quentes_escolhidos)
-            logger.info(f"Adicionados {qtd_quentes} números quentes: {numeros_quentes_escolhidos}")
-        
-        # 2. Adiciona números frios
-        if preferencias.get('incluir_frios', True) and stats['numeros_frios']:
-            qtd_frios = min(preferencias.get('qtd_frios', 4), len(stats['numeros_frios']))
-            # Filtra números frios que não foram selecionados ainda
-            numeros_frios_disponiveis = [n for n in stats['numeros_frios'] if n not in numeros_selecionados]
-            if numeros_frios_disponiveis:
-                qtd_frios = min(qtd_frios, len(numeros_frios_disponiveis))
-                numeros_frios_escolhidos = random.sample(numeros_frios_disponiveis, qtd_frios)
-                numeros_selecionados.extend(numeros_frios_escolhidos)
-                logger.info(f"Adicionados {qtd_frios} números frios: {numeros_frios_escolhidos}")
-        
-        # 3. Adiciona números secos
-        if preferencias.get('incluir_secos', True) and stats['numeros_secos']:
-            qtd_secos = min(preferencias.get('qtd_secos', 2), len(stats['numeros_secos']))
-            # Filtra números secos que não foram selecionados ainda
-            numeros_secos_disponiveis = [n for n in stats['numeros_secos'] if n not in numeros_selecionados]
-            if numeros_secos_disponiveis:
-                qtd_secos = min(qtd_secos, len(numeros_secos_disponiveis))
-                numeros_secos_escolhidos = random.sample(numeros_secos_disponiveis, qtd_secos)
-                numeros_selecionados.extend(numeros_secos_escolhidos)
-                logger.info(f"Adicionados {qtd_secos} números secos: {numeros_secos_escolhidos}")
-        
-        # 4. Adiciona números aleatórios para completar a quantidade desejada
-        numeros_disponiveis = [n for n in range(1, 26) if n not in numeros_selecionados]
-        qtd_restante = quantidade - len(numeros_selecionados)
-        
-        if qtd_restante > 0 and numeros_disponiveis:
-            numeros_aleatorios = random.sample(numeros_disponiveis, qtd_restante)
-            numeros_selecionados.extend(numeros_aleatorios)
-            logger.info(f"Adicionados {qtd_restante} números aleatórios: {numeros_aleatorios}")
-        
-        # 5. Balanceia par/ímpar se solicitado
-        if preferencias.get('balancear_par_impar', True):
-            numeros_selecionados = balancear_par_impar_lotofacil(numeros_selecionados)
-        
-        # 6. Controle de qualidade para repetidos
-        if preferencias.get('controlar_repetidos', True):
-            numeros_selecionados = controlar_qualidade_repetidos_lotofacil(
-                numeros_selecionados, quantidade, preferencias
-            )
-        
-        # 7. Ordena os números
-        numeros_selecionados.sort()
-        
-        # Verifica se temos exatamente a quantidade desejada
-        if len(numeros_selecionados) != quantidade:
-            logger.warning(f"Quantidade incorreta de números: {len(numeros_selecionados)}")
-            # Completa ou remove números para ter exatamente a quantidade desejada
-            while len(numeros_selecionados) < quantidade:
-                numero_adicional = random.randint(1, 25)
-                if numero_adicional not in numeros_selecionados:
-                    numeros_selecionados.append(numero_adicional)
-            
-            while len(numeros_selecionados) > quantidade:
-                numeros_selecionados.pop()
-            
-            numeros_selecionados.sort()
-        
+        preferencias = _mesclar_preferencias(quantidade, preferencias)
+        numeros_selecionados = _sortear(obter_snapshot_lotofacil(), quantidade, preferencias, rng)
         logger.info(f"Aposta gerada com sucesso: {numeros_selecionados}")
         return numeros_selecionados
         
     except Exception as e:
         logger.error(f"Erro ao gerar aposta personalizada da Lotofácil: {str(e)}")
         # Retorna aposta aleatória em caso de erro
-        return sorted(random.sample(range(1, 26), quantidade))
+        return sortear_numeros(rng, 1, 25, quantidade)
 
-def balancear_par_impar_lotofacil(numeros):
+def balancear_par_impar_lotofacil(numeros, rng=None):
     """
     Balanceia a quantidade de números pares e ímpares na aposta.
     
     Args:
         numeros (list): Lista de números para balancear
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
         
     Returns:
         list: Lista balanceada
     """
+    rng = rng if rng is not None else criar_rng()[0]
+
+    def escolher(lista):
+        return lista[int(rng.integers(len(lista)))]
+
     try:
         numeros_pares = [n for n in numeros if n % 2 == 0]
         numeros_impares = [n for n in numeros if n % 2 == 1]
@@ -267,8 +245,8 @@ def balancear_par_impar_lotofacil(numeros):
             qtd_substituir = qtd_pares - 8
             if numeros_disponiveis:
                 for _ in range(min(qtd_substituir, len(numeros_disponiveis))):
-                    numero_par_remover = random.choice(numeros_pares)
-                    numero_impar_adicionar = random.choice(numeros_disponiveis)
+                    numero_par_remover = escolher(numeros_pares)
+                    numero_impar_adicionar = escolher(numeros_disponiveis)
                     numeros.remove(numero_par_remover)
                     numeros.append(numero_impar_adicionar)
                     numeros_pares.remove(numero_par_remover)
@@ -281,8 +259,8 @@ def balancear_par_impar_lotofacil(numeros):
             qtd_substituir = qtd_impares - 8
             if numeros_disponiveis:
                 for _ in range(min(qtd_substituir, len(numeros_disponiveis))):
-                    numero_impar_remover = random.choice(numeros_impares)
-                    numero_par_adicionar = random.choice(numeros_disponiveis)
+                    numero_impar_remover = escolher(numeros_impares)
+                    numero_par_adicionar = escolher(numeros_disponiveis)
                     numeros.remove(numero_impar_remover)
                     numeros.append(numero_par_adicionar)
                     numeros_impares.remove(numero_impar_remover)
@@ -299,18 +277,19 @@ def balancear_par_impar_lotofacil(numeros):
         logger.error(f"Erro ao balancear par/ímpar: {str(e)}")
         return numeros
 
-def gerar_aposta_aleatoria_lotofacil(quantidade=15):
+def gerar_aposta_aleatoria_lotofacil(quantidade=15, rng=None):
     """
     Gera uma aposta completamente aleatória da Lotofácil.
     
     Args:
         quantidade (int): Quantidade de números para a aposta (15-20)
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
         
     Returns:
         list: Lista com a quantidade especificada de números aleatórios
     """
     try:
-        numeros = sorted(random.sample(range(1, 26), quantidade))
+        numeros = sortear_numeros(rng if rng is not None else criar_rng()[0], 1, 25, quantidade)
         logger.info(f"Aposta aleatória gerada: {numeros}")
         return numeros
         
@@ -8,6 +8,8 @@ Extraídas do arquivo Lotofacil_LaboratorioSimulacao.py para uso web.
 
 import numpy as np
 
+from funcoes.common.probabilidades import preco_aposta
+
 def calcular_valor_pago(count):
     """
     Calcula o valor a ser pago baseado na quantidade de números selecionados.
@@ -18,20 +20,7 @@ def calcular_valor_pago(count):
     Returns:
         str: Valor formatado em reais
     """
-    if count == 15:
-        return "R$ {:,.2f}".format(3.00)
-    elif count == 16:
-        return "R$ {:,.2f}".format(48.00)
-    elif count == 17:
-        return "R$ {:,.2f}".format(408.00)
-    elif count == 18:
-        return "R$ {:,.2f}".format(2448.00)
-    elif count == 19:
-        return "R$ {:,.2f}".format(11628.00)
-    elif count == 20:
-        return "R$ {:,.2f}".format(46512.00)
-    else:
-        return "R$ 0.00"
+    return "R$ {:,.2f}".format(preco_aposta("lotofacil", count))
 
 def analisar_padroes_concurso(vetor, ultimo_concurso_referencia):
     """
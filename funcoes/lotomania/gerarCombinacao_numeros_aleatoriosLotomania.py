@@ -1,16 +1,13 @@
-import random
+from funcoes.common.probabilidades import apostas_simples, preco_aposta
+from funcoes.common.rng import criar_rng, sortear_numeros
 
-# Tabela de preços das apostas da Lotomania (50 números fixos, R$ 3,00)
-TABELA_PRECOS = {
-    50: {"apostas": 1, "valor": 3.00}
-}
-
-def gerar_aposta_personalizada_lotomania(qtde_num=None):
+def gerar_aposta_personalizada_lotomania(qtde_num=None, rng=None):
     """
     Gera uma aposta personalizada da Lotomania com 50 números fixos
     
     Args:
         qtde_num (int): Quantidade de números (ignorado, sempre 50 para Lotomania)
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
     
     Returns:
         tuple: (numeros, valor_aposta, qtde_apostas)
@@ -23,17 +20,16 @@ def gerar_aposta_personalizada_lotomania(qtde_num=None):
     if qtde_num != 50:
         raise ValueError("Lotomania aceita apenas 50 números fixos")
     
-    # Verificar se a quantidade existe na tabela
-    if qtde_num not in TABELA_PRECOS:
+    # Verificar se a quantidade tem preço (funcoes/common/config.py)
+    valor_aposta = preco_aposta("lotomania", qtde_num)
+    if not valor_aposta:
         raise ValueError(f"Quantidade de {qtde_num} números não disponível")
     
     # Gerar 50 números únicos entre 1 e 100 (Lotomania)
-    numeros = sorted(random.sample(range(1, 101), qtde_num))
+    rng = rng if rng is not None else criar_rng()[0]
+    numeros = sortear_numeros(rng, 1, 100, qtde_num)
     
-    # Buscar informações da aposta
-    info_aposta = TABELA_PRECOS[qtde_num]
-    valor_aposta = info_aposta["valor"]
-    qtde_apostas = info_aposta["apostas"]
+    qtde_apostas = apostas_simples("lotomania", qtde_num)
     
     return numeros, valor_aposta, qtde_apostas
 
@@ -47,9 +43,8 @@ def exibir_opcoes_disponiveis_lotomania():
     # print(f"{'Números':<8} {'Apostas':<10} {'Valor':<15}")  # DEBUG - COMENTADO
     # print("-" * 50)  # DEBUG - COMENTADO
     # 
-    # for nums, info in sorted(TABELA_PRECOS.items()):
-    #     valor_formatado = f"R$ {info['valor']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    #     print(f"{nums:<8} {info['apostas']:<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
+    # valor_formatado = f"R$ {preco_aposta('lotomania', 50):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    # print(f"{50:<8} {apostas_simples('lotomania', 50):<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
     # 
     # print("=" * 50)  # DEBUG - COMENTADO
 
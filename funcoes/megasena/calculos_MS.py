@@ -1,8 +1,9 @@
-import numpy as np
 import pandas as pd
 from collections import Counter
 import logging
 
+from funcoes.common.seca import analisar_seca
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -140,98 +141,12 @@ def calcular_seca_numeros(df_milionaria, qtd_concursos=None):
         logger.error(f"Colunas necessárias não encontradas: {colunas_faltantes}")
         return {}
     
-    # Filtrar por quantidade de concursos se especificado
+    # Seca de todos os números em uma passada (kernel vetorizado compartilhado)
     if qtd_concursos is not None and qtd_concursos > 0:
-        df = df_milionaria.tail(qtd_concursos).copy()
         logger.info(f"Analisando seca nos últimos {qtd_concursos} concursos")
-    else:
-        df = df_milionaria.copy()
-    
-    # Limpar e validar dados
-    df = df.dropna(subset=['Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6'])
-    
-    if df.empty:
-        logger.warning("Nenhum dado válido encontrado após limpeza")
-        return {}
-    
-    # Converter para numérico
-    colunas_bolas = ['Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6']
-    for col in colunas_bolas:
-        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
-    
-    # Filtrar apenas dados válidos
-    mask_bolas = df[colunas_bolas].notna().all(axis=1) & (df[colunas_bolas] >= 1).all(axis=1) & (df[colunas_bolas] <= 50).all(axis=1)
-    df_validos = df[mask_bolas]
-    
-    if df_validos.empty:
+    resultado = analisar_seca(df_milionaria, '+milionaria', [f'Bola{i}' for i in range(1, 7)], (1, 50), qtd_concursos)
+    if not resultado:
         logger.warning("Nenhum concurso válido encontrado para análise de seca")
-        return {}
-    
-    # Ordenar por concurso (mais recente primeiro)
-    df_validos = df_validos.sort_values('Concurso', ascending=False).reset_index(drop=True)
-    
-    # Inicializar dicionário para armazenar a seca de cada número
-    seca_numeros = {}
-    ultima_aparicao = {}
-    
-    # Para cada número de 1 a 50, calcular a seca atual
-    for numero in range(1, 51):
-        seca_atual = 0
-        encontrou = False
-        
-        # Procurar a última aparição do número
-        for idx, row in df_validos.iterrows():
-            bolas_concurso = [row[col] for col in colunas_bolas if pd.notna(row[col]) and 1 <= row[col] <= 50]
-            
-            if numero in bolas_concurso:
-                ultima_aparicao[numero] = row['Concurso']
-                encontrou = True
-                break
-            else:
-                seca_atual += 1
-        
-        # Se o número nunca apareceu no período analisado
-        if not encontrou:
-            seca_atual = len(df_validos)
-            ultima_aparicao[numero] = None
-        
-        seca_numeros[numero] = {
-            'seca_atual': seca_atual,
-            'ultima_aparicao': ultima_aparicao[numero],
-            'status': 'em_seca' if seca_atual > 0 else 'saiu_ultimo'
-        }
-    
-    # Calcular estatísticas da seca
-    secas_ordenadas = sorted(seca_numeros.items(), key=lambda x: x[1]['seca_atual'], reverse=True)
-    
-    # Números em maior seca
-    numeros_maior_seca = secas_ordenadas[:10]
-    
-    # Números que saíram recentemente
-    numeros_recentes = [num for num, info in seca_numeros.items() if info['seca_atual'] <= 3]
-    
-    # Estatísticas gerais
-    seca_media = np.mean([info['seca_atual'] for info in seca_numeros.values()])
-    seca_mediana = np.median([info['seca_atual'] for info in seca_numeros.values()])
-    seca_maxima = max([info['seca_atual'] for info in seca_numeros.values()])
-    
-    resultado = {
-        'seca_por_numero': seca_numeros,
-        'numeros_maior_seca': numeros_maior_seca,
-        'numeros_recentes': numeros_recentes,
-        'estatisticas': {
-            'seca_media': seca_media,
-            'seca_mediana': seca_mediana,
-            'seca_maxima': seca_maxima,
-            'total_concursos_analisados': len(df_validos)
-        },
-        'periodo_analisado': {
-            'total_concursos': len(df_milionaria),
-            'concursos_analisados': len(df_validos),
-            'qtd_concursos_especificada': qtd_concursos
-        }
-    }
-    
     return resultado
 
 def calcular_seca_trevos(df_milionaria, qtd_concursos=None):
@@ -258,98 +173,13 @@ def calcular_seca_trevos(df_milionaria, qtd_concursos=None):
         logger.error(f"Colunas necessárias não encontradas: {colunas_faltantes}")
         return {}
     
-    # Filtrar por quantidade de concursos se especificado
+    # Seca de todos os números em uma passada (kernel vetorizado compartilhado)
     if qtd_concursos is not None and qtd_concursos > 0:
-        df = df_milionaria.tail(qtd_concursos).copy()
         logger.info(f"Analisando seca dos trevos nos últimos {qtd_concursos} concursos")
-    else:
-        df = df_milionaria.copy()
-    
-    # Limpar e validar dados
-    df = df.dropna(subset=['Trevo1', 'Trevo2'])
-    
-    if df.empty:
-        logger.warning("Nenhum dado válido encontrado após limpeza")
-        return {}
-    
-    # Converter para numérico
-    colunas_trevos = ['Trevo1', 'Trevo2']
-    for col in colunas_trevos:
-        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
-    
-    # Filtrar apenas dados válidos
-    mask_trevos = df[colunas_trevos].notna().all(axis=1) & (df[colunas_trevos] >= 1).all(axis=1) & (df[colunas_trevos] <= 6).all(axis=1)
-    df_validos = df[mask_trevos]
-    
-    if df_validos.empty:
+    resultado = analisar_seca(df_milionaria, '+milionaria', ['Trevo1', 'Trevo2'], (1, 6), qtd_concursos,
+                              top=3, limite_recentes=2, singular='trevo', plural='trevos')
+    if not resultado:
         logger.warning("Nenhum concurso válido encontrado para análise de seca dos trevos")
-        return {}
-    
-    # Ordenar por concurso (mais recente primeiro)
-    df_validos = df_validos.sort_values('Concurso', ascending=False).reset_index(drop=True)
-    
-    # Inicializar dicionário para armazenar a seca de cada trevo
-    seca_trevos = {}
-    ultima_aparicao = {}
-    
-    # Para cada trevo de 1 a 6, calcular a seca atual
-    for trevo in range(1, 7):
-        seca_atual = 0
-        encontrou = False
-        
-        # Procurar a última aparição do trevo
-        for idx, row in df_validos.iterrows():
-            trevos_concurso = [row[col] for col in colunas_trevos if pd.notna(row[col]) and 1 <= row[col] <= 6]
-            
-            if trevo in trevos_concurso:
-                ultima_aparicao[trevo] = row['Concurso']
-                encontrou = True
-                break
-            else:
-                seca_atual += 1
-        
-        # Se o trevo nunca apareceu no período analisado
-        if not encontrou:
-            seca_atual = len(df_validos)
-            ultima_aparicao[trevo] = None
-        
-        seca_trevos[trevo] = {
-            'seca_atual': seca_atual,
-            'ultima_aparicao': ultima_aparicao[trevo],
-            'status': 'em_seca' if seca_atual > 0 else 'saiu_ultimo'
-        }
-    
-    # Calcular estatísticas da seca
-    secas_ordenadas = sorted(seca_trevos.items(), key=lambda x: x[1]['seca_atual'], reverse=True)
-    
-    # Trevos em maior seca
-    trevos_maior_seca = secas_ordenadas[:3]
-    
-    # Trevos que saíram recentemente
-    trevos_recentes = [trevo for trevo, info in seca_trevos.items() if info['seca_atual'] <= 2]
-    
-    # Estatísticas gerais
-    seca_media = np.mean([info['seca_atual'] for info in seca_trevos.values()])
-    seca_mediana = np.median([info['seca_atual'] for info in seca_trevos.values()])
-    seca_maxima = max([info['seca_atual'] for info in seca_trevos.values()])
-    
-    resultado = {
-        'seca_por_trevo': seca_trevos,
-        'trevos_maior_seca': trevos_maior_seca,
-        'trevos_recentes': trevos_recentes,
-        'estatisticas': {
-            'seca_media': seca_media,
-            'seca_mediana': seca_mediana,
-            'seca_maxima': seca_maxima,
-            'total_concursos_analisados': len(df_validos)
-        },
-        'periodo_analisado': {
-            'total_concursos': len(df_milionaria),
-            'concursos_analisados': len(df_validos),
-            'qtd_concursos_especificada': qtd_concursos
-        }
-    }
-    
     return resultado
 
 def exibir_analise_seca(resultado_seca, tipo='numeros'):
@@ -503,98 +333,12 @@ def calcular_seca_numeros_megasena(df_megasena, qtd_concursos=None):
         logger.error(f"Colunas necessárias não encontradas: {colunas_faltantes}")
         return {}
     
-    # Filtrar por quantidade de concursos se especificado
+    # Seca de todos os números em uma passada (kernel vetorizado compartilhado)
     if qtd_concursos is not None and qtd_concursos > 0:
-        df = df_megasena.tail(qtd_concursos).copy()
         logger.info(f"Analisando seca da Mega Sena nos últimos {qtd_concursos} concursos")
-    else:
-        df = df_megasena.copy()
-    
-    # Limpar e validar dados
-    df = df.dropna(subset=['Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6'])
-    
-    if df.empty:
-        logger.warning("Nenhum dado válido encontrado após limpeza")
-        return {}
-    
-    # Converter para numérico
-    colunas_bolas = ['Bola1', 'Bola2', 'Bola3', 'Bola4', 'Bola5', 'Bola6']
-    for col in colunas_bolas:
-        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
-    
-    # Filtrar apenas dados válidos (Mega Sena: 1-60)
-    mask_bolas = df[colunas_bolas].notna().all(axis=1) & (df[colunas_bolas] >= 1).all(axis=1) & (df[colunas_bolas] <= 60).all(axis=1)
-    df_validos = df[mask_bolas]
-    
-    if df_validos.empty:
+    resultado = analisar_seca(df_megasena, 'megasena', [f'Bola{i}' for i in range(1, 7)], (1, 60), qtd_concursos)
+    if not resultado:
         logger.warning("Nenhum concurso válido encontrado para análise de seca da Mega Sena")
-        return {}
-    
-    # Ordenar por concurso (mais recente primeiro)
-    df_validos = df_validos.sort_values('Concurso', ascending=False).reset_index(drop=True)
-    
-    # Inicializar dicionário para armazenar a seca de cada número
-    seca_numeros = {}
-    ultima_aparicao = {}
-    
-    # Para cada número de 1 a 60, calcular a seca atual (Mega Sena)
-    for numero in range(1, 61):
-        seca_atual = 0
-        encontrou = False
-        
-        # Procurar a última aparição do número
-        for idx, row in df_validos.iterrows():
-            bolas_concurso = [row[col] for col in colunas_bolas if pd.notna(row[col]) and 1 <= row[col] <= 60]
-            
-            if numero in bolas_concurso:
-                ultima_aparicao[numero] = row['Concurso']
-                encontrou = True
-                break
-            else:
-                seca_atual += 1
-        
-        # Se o número nunca apareceu no período analisado
-        if not encontrou:
-            seca_atual = len(df_validos)
-            ultima_aparicao[numero] = None
-        
-        seca_numeros[numero] = {
-            'seca_atual': seca_atual,
-            'ultima_aparicao': ultima_aparicao[numero],
-            'status': 'em_seca' if seca_atual > 0 else 'saiu_ultimo'
-        }
-    
-    # Calcular estatísticas da seca
-    secas_ordenadas = sorted(seca_numeros.items(), key=lambda x: x[1]['seca_atual'], reverse=True)
-    
-    # Números em maior seca
-    numeros_maior_seca = secas_ordenadas[:10]
-    
-    # Números que saíram recentemente
-    numeros_recentes = [num for num, info in seca_numeros.items() if info['seca_atual'] <= 3]
-    
-    # Estatísticas gerais
-    seca_media = np.mean([info['seca_atual'] for info in seca_numeros.values()])
-    seca_mediana = np.median([info['seca_atual'] for info in seca_numeros.values()])
-    seca_maxima = max([info['seca_atual'] for info in seca_numeros.values()])
-    
-    resultado = {
-        'seca_por_numero': seca_numeros,
-        'numeros_maior_seca': numeros_maior_seca,
-        'numeros_recentes': numeros_recentes,
-        'estatisticas': {
-            'seca_media': seca_media,
-            'seca_mediana': seca_mediana,
-            'seca_maxima': seca_maxima,
-            'total_concursos_analisados': len(df_validos)
-        },
-        'periodo_analisado': {
-            'total_concursos': len(df_megasena),
-            'concursos_analisados': len(df_validos),
-            'qtd_concursos_especificada': qtd_concursos
-        }
-    }
-    
     return resultado
 
 # Exemplo de uso
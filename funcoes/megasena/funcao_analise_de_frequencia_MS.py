@@ -3,6 +3,8 @@ import numpy as np
 from collections import Counter
 from datetime import datetime, timedelta
 
+from funcoes.common.agregados import frequencia_e_atraso, ordem_de_aparicao
+
 #
 # O que a função faz:
 # 
@@ -80,7 +82,15 @@ def analise_frequencia(dados_sorteios, qtd_concursos=None):
     total_sorteios = len(historico_por_concurso)
     
     # 1. FREQUÊNCIA ABSOLUTA
-    freq_absoluta_numeros = Counter(todos_numeros)
+    # Período na cauda do histórico: frequência e atraso saem dos agregados
+    # correntes; a ordem das chaves (desempate de quentes/frios) é a do Counter
+    agregados = frequencia_e_atraso('megasena', [s['concurso'] for s in historico_por_concurso])
+    if agregados is not None:
+        frequencia, atraso = agregados
+        ordem = ordem_de_aparicao((s['numeros'] for s in historico_por_concurso), 60)
+        freq_absoluta_numeros = Counter({num: frequencia[int(num)] for num in ordem})
+    else:
+        freq_absoluta_numeros = Counter(todos_numeros)
     
     # Garantir que todos os números apareçam (mesmo com freq 0)
     for i in range(1, 61):
@@ -111,6 +121,9 @@ def analise_frequencia(dados_sorteios, qtd_concursos=None):
     # Calcular há quantos concursos cada número não sai
     numeros_secos = {}
     for num in range(1, 61):
+        if agregados is not None:
+            numeros_secos[num] = atraso[num]
+            continue
         ultima_aparicao = 0
         for i, sorteio in enumerate(historico_por_concurso):
             if num in sorteio['numeros']:
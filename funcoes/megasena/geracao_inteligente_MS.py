@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
 from collections import Counter
 import logging
 
+from funcoes.common.gerador_restrito import sortear_aposta
+from funcoes.common.probabilidades import preco_aposta
+
 logger = logging.getLogger(__name__)
 
-def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
+def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict, rng=None) -> list:
     """
     Gera uma ou mais apostas inteligentes da Mega Sena com base nas preferências do usuário
     e nos dados de análise estatística.
@@ -15,6 +17,8 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
     Args:
         preferencias (dict): Dicionário com as preferências do usuário do frontend.
         analysis_cache (dict): Cache com todos os resultados das análises (frequência, dist, etc.).
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py);
+            com ele as apostas podem ser refeitas pela semente.
 
     Returns:
         list: Uma lista de dicionários, onde cada dicionário representa uma aposta
@@ -27,7 +31,6 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
     todas_apostas_geradas = []
 
     for _ in range(num_apostas_gerar):
-        numeros_selecionados = set()
 
         # --- Lógica para seleção dos Números Principais (1-60) ---
         pool_numeros = list(range(1, 61))
@@ -117,62 +120,35 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
             # A soma será verificada durante a geração da aposta
             pass  # Será aplicada na validação posterior
 
-        # Gerar a aposta principal usando os pesos
-        # Convertendo pesos para lista para uso com random.choices
-        numeros_ponderados = [num for num, peso in pesos_numeros.items()]
-        pesos_dos_numeros = [peso for num, peso in pesos_numeros.items()]
-
-        # Lógica de tentativa e erro para garantir as preferências de distribuição e padrões
-        max_tentativas = 100
-        for _ in range(max_tentativas):
-            temp_numeros_selecionados = set(random.choices(numeros_ponderados, weights=pesos_dos_numeros, k=qtde_numeros_aposta))
-            
-            # Verificar se a quantidade de números está correta (random.choices pode retornar menos se houver muitos pesos 0)
-            if len(temp_numeros_selecionados) != qtde_numeros_aposta:
-                continue
-
-            # Validação de Padrões
-            if padroes_pref.get('evitarConsecutivos'):
-                temp_list = sorted(list(temp_numeros_selecionados))
-                if any(temp_list[i+1] == temp_list[i] + 1 for i in range(len(temp_list) - 1)):
-                    continue # Contém consecutivos, tentar novamente
+        # Gerar a aposta principal direto do espaço que atende às preferências
+        # (sem tentativa e erro): paridade, soma, consecutivos e repetições
+        dist_pref = preferencias.get('distribuicao', {})
+        restricoes = {'evitar_consecutivos': bool(padroes_pref.get('evitarConsecutivos'))}
 
-            if padroes_pref.get('evitarRepeticoesSeguidas'):
-                padroes_cache = analysis_cache.get('padroes_completa', {})
-                ultimos_numeros_sorteados = padroes_cache.get('repeticoes_entre_concursos', {}).get('ultimos_numeros_sorteados', [])
-                if ultimos_numeros_sorteados and any(num in ultimos_numeros_sorteados for num in temp_numeros_selecionados):
-                    continue # Contém números repetidos do último, tentar novamente
-
-            # Validação de Distribuição (Pares/Ímpares)
-            dist_pref = preferencias.get('distribuicao', {})
-            if dist_pref.get('priorizarParesImpares'):
-                num_pares = sum(1 for n in temp_numeros_selecionados if n % 2 == 0)
-                num_impares = qtde_numeros_aposta - num_pares
-                paridade_desejada = dist_pref.get('paridadeDesejada', 'equilibrado')
-
-                if paridade_desejada == 'equilibrado' and not (2 <= num_pares <= 4 and 2 <= num_impares <= 4):
-                    continue # Não está equilibrado, tentar novamente
+        if padroes_pref.get('evitarRepeticoesSeguidas'):
+            padroes_cache = analysis_cache.get('padroes_completa', {})
+            ultimos_numeros_sorteados = padroes_cache.get('repeticoes_entre_concursos', {}).get('ultimos_numeros_sorteados', [])
+            if ultimos_numeros_sorteados:
+                restricoes['marcados'] = ultimos_numeros_sorteados
+                restricoes['max_marcados'] = 0 # Nenhum número do último concurso
+
+        if dist_pref.get('priorizarParesImpares'):
+            paridade_desejada = dist_pref.get('paridadeDesejada', 'equilibrado')
+            regras_paridade = {
+                'equilibrado': lambda pares, impares: 2 <= pares <= 4 and 2 <= impares <= 4,
+                'mais_pares': lambda pares, impares: pares > impares,
+                'mais_impares': lambda pares, impares: impares > pares,
+            }
+            if paridade_desejada in regras_paridade:
+                restricoes['pares_permitidos'] = [
+                    p for p in range(qtde_numeros_aposta + 1)
+                    if regras_paridade[paridade_desejada](p, qtde_numeros_aposta - p)
+                ]
 
-                if paridade_desejada == 'mais_pares' and num_pares <= num_impares:
-                    continue # Não tem mais pares, tentar novamente
-                
-                if paridade_desejada == 'mais_impares' and num_impares <= num_pares:
-                    continue # Não tem mais ímpares, tentar novamente
+        if dist_pref.get('priorizarSoma'):
+            restricoes['soma'] = (dist_pref.get('somaMin', 0), dist_pref.get('somaMax', 300))
 
-            # Validação de Distribuição (Soma)
-            if dist_pref.get('priorizarSoma'):
-                soma_aposta = sum(temp_numeros_selecionados)
-                if not (dist_pref.get('somaMin', 0) <= soma_aposta <= dist_pref.get('somaMax', 300)):
-                    continue # Soma fora da faixa, tentar novamente
-            
-            # Se todas as validações passarem, aceita a aposta
-            numeros_selecionados = temp_numeros_selecionados
-            break # Sai do loop de tentativas
-        
-        if not numeros_selecionados:
-            logger.warning("Não foi possível gerar números principais dentro das preferências após várias tentativas.")
-            # Fallback: gerar aleatoriamente se as preferências forem muito restritivas
-            numeros_selecionados = set(random.sample(pool_numeros, qtde_numeros_aposta))
+        numeros_selecionados = sortear_aposta(pesos_numeros, 1, 60, qtde_numeros_aposta, rng=rng, **restricoes)
 
         # Calcular valor estimado da aposta (Mega Sena: apenas números)
         valor_aposta_estimado = calcular_valor_aposta(qtde_numeros_aposta)
@@ -186,29 +162,10 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
 
 def calcular_valor_aposta(qtde_numeros: int) -> float:
     """
-    Calcula o valor estimado da aposta baseado na quantidade de números.
-    Valores baseados na tabela oficial da Mega Sena (atualizada 2024).
+    Calcula o valor estimado da aposta baseado na quantidade de números:
+    preço da aposta simples x apostas simples contidas (C(n, 6)).
     """
-    # Tabela de valores da Mega Sena (valores atualizados 2024)
-    tabela_valores = {
-        6: 6.00,      # 6 números
-        7: 42.00,     # 7 números
-        8: 168.00,    # 8 números
-        9: 504.00,    # 9 números
-        10: 1260.00,  # 10 números
-        11: 2772.00,  # 11 números
-        12: 5544.00,  # 12 números
-        13: 10296.00, # 13 números
-        14: 18018.00, # 14 números
-        15: 30030.00, # 15 números
-        16: 48048.00, # 16 números
-        17: 74256.00, # 17 números
-        18: 111384.00, # 18 números
-        19: 162792.00, # 19 números
-        20: 232560.00  # 20 números
-    }
-    
-    return tabela_valores.get(qtde_numeros, 0.0)
+    return preco_aposta("megasena", qtde_numeros)
 
 # Função auxiliar para limpar NaN de dicionários aninhados (útil para resultados de análise avançada)
 def limpar_nan_do_dict(d):
@@ -1,30 +1,14 @@
-import random
+from funcoes.common.probabilidades import apostas_simples, preco_aposta
+from funcoes.common.rng import criar_rng, sortear_numeros
 
-# Tabela de preços das apostas da Mega Sena (valores atualizados 2024)
-TABELA_PRECOS = {
-    6: {"apostas": 1, "valor": 6.00},
-    7: {"apostas": 7, "valor": 42.00},
-    8: {"apostas": 28, "valor": 168.00},
-    9: {"apostas": 84, "valor": 504.00},
-    10: {"apostas": 210, "valor": 1260.00},
-    11: {"apostas": 462, "valor": 2772.00},
-    12: {"apostas": 924, "valor": 5544.00},
-    13: {"apostas": 1716, "valor": 10296.00},
-    14: {"apostas": 3003, "valor": 18018.00},
-    15: {"apostas": 5005, "valor": 30030.00},
-    16: {"apostas": 8008, "valor": 48048.00},
-    17: {"apostas": 12376, "valor": 74256.00},
-    18: {"apostas": 18564, "valor": 111384.00},
-    19: {"apostas": 27132, "valor": 162792.00},
-    20: {"apostas": 38760, "valor": 232560.00}
-}
 
-def gerar_aposta_personalizada(qtde_num):
+def gerar_aposta_personalizada(qtde_num, rng=None):
     """
     Gera uma aposta personalizada da Mega Sena com base na quantidade de números escolhidos
     
     Args:
         qtde_num (int): Quantidade de números principais (6 a 20)
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
     
     Returns:
         tuple: (numeros, valor_aposta, qtde_apostas)
@@ -34,17 +18,16 @@ def gerar_aposta_personalizada(qtde_num):
     if qtde_num < 6 or qtde_num > 20:
         raise ValueError("Quantidade de números deve estar entre 6 e 20")
     
-    # Verificar se a quantidade existe na tabela
-    if qtde_num not in TABELA_PRECOS:
+    # Verificar se a quantidade tem preço (funcoes/common/config.py)
+    valor_aposta = preco_aposta("megasena", qtde_num)
+    if not valor_aposta:
         raise ValueError(f"Quantidade de {qtde_num} números não disponível")
     
     # Gerar números principais únicos entre 1 e 60 (Mega Sena)
-    numeros = sorted(random.sample(range(1, 61), qtde_num))
+    rng = rng if rng is not None else criar_rng()[0]
+    numeros = sortear_numeros(rng, 1, 60, qtde_num)
     
-    # Buscar informações da aposta
-    info_aposta = TABELA_PRECOS[qtde_num]
-    valor_aposta = info_aposta["valor"]
-    qtde_apostas = info_aposta["apostas"]
+    qtde_apostas = apostas_simples("megasena", qtde_num)
     
     return numeros, valor_aposta, qtde_apostas
 
@@ -58,9 +41,9 @@ def exibir_opcoes_disponiveis():
     # print(f"{'Números':<8} {'Apostas':<10} {'Valor':<15}")  # DEBUG - COMENTADO
     # print("-" * 50)  # DEBUG - COMENTADO
     # 
-    # for nums, info in sorted(TABELA_PRECOS.items()):
-    #     valor_formatado = f"R$ {info['valor']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    #     print(f"{nums:<8} {info['apostas']:<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
+    # for nums in range(6, 21):
+    #     valor_formatado = f"R$ {preco_aposta('megasena', nums):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    #     print(f"{nums:<8} {apostas_simples('megasena', nums):<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
     # 
     # print("=" * 50)  # DEBUG - COMENTADO
 
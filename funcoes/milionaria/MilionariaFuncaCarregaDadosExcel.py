@@ -77,24 +77,20 @@ def converter_para_matrizes_binarias_milionaria(df: pd.DataFrame) -> tuple[np.nd
                - concursos_numeros: Lista dos números dos concursos para a matriz de números.
                - concursos_trevos: Lista dos números dos concursos para a matriz de trevos.
     """
+    from funcoes.common.incidencia import MatrizIncidencia
+
     num_cols = [f'Bola{i}' for i in range(1, 7)]
     trevo_cols = [f'Trevo{i}' for i in range(1, 3)]
     
-    # Matriz para os números principais (1 a 50)
-    matriz_numeros = np.zeros((len(df), 50), dtype=int)
-    for idx, row in df.iterrows():
-        numeros = row[num_cols].values
-        for num in numeros:
-            if 1 <= num <= 50: # Garante que o número está no range
-                matriz_numeros[idx, num - 1] = 1
+    # Matriz para os números principais (1 a 50), na ordem do DataFrame
+    matriz_numeros = MatrizIncidencia.from_dataframe(
+        df, '+milionaria', colunas=num_cols, ordenar=False
+    ).matriz.astype(int)
     
     # Matriz para os trevos (1 a 6)
-    matriz_trevos = np.zeros((len(df), 6), dtype=int)
-    for idx, row in df.iterrows():
-        trevos = row[trevo_cols].values
-        for trevo in trevos:
-            if 1 <= trevo <= 6: # Garante que o trevo está no range
-                matriz_trevos[idx, trevo - 1] = 1
+    matriz_trevos = MatrizIncidencia.from_dataframe(
+        df, '+milionaria', colunas=trevo_cols, numero_range=(1, 6), ordenar=False
+    ).matriz.astype(int)
     
     concursos = df['Concurso'].tolist()
     
@@ -28,6 +28,10 @@ import seaborn as sns
 from collections import Counter, defaultdict
 import logging
 
+from funcoes.common.clusters import caracteristicas_avancadas
+from funcoes.common.coocorrencia import MatrizCoocorrencia
+from funcoes.common.incidencia import MatrizIncidencia
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -330,59 +334,13 @@ class AnaliseEstatisticaAvancada:
         if self.df_validos is None or self.df_validos.empty:
             return {}
         
-        # Criar matriz de características para cada número
-        caracteristicas = []
-        numeros_analisados = []
-        
-        for numero in range(1, 51):
-            # Características básicas do número
-            freq_total = 0
-            freq_recente = 0
-            ultima_aparicao = 0
-            media_aparicoes_concurso = 0
-            
-            # Novas métricas avançadas
-            intervalos_aparicoes = []
-            ultima_posicao = -1
-            
-            # Usar enumerate para ter controle sobre o índice
-            for pos, (idx, row) in enumerate(self.df_validos.iterrows()):
-                numeros_concurso = [row[col] for col in self.colunas_bolas if pd.notna(row[col])]
-                if numero in numeros_concurso:
-                    freq_total += 1
-                    if pos < len(self.df_validos) * 0.3:  # Últimos 30%
-                        freq_recente += 1
-                    ultima_aparicao = len(self.df_validos) - pos
-                    
-                    # Calcular intervalos entre aparições
-                    if ultima_posicao != -1:
-                        intervalo = pos - ultima_posicao
-                        intervalos_aparicoes.append(intervalo)
-                    ultima_posicao = pos
-            
-            # Calcular métricas avançadas
-            media_aparicoes_concurso = freq_total / len(self.df_validos) if len(self.df_validos) > 0 else 0
-            intervalo_medio = np.mean(intervalos_aparicoes) if intervalos_aparicoes else len(self.df_validos)
-            desvio_intervalo = np.std(intervalos_aparicoes) if len(intervalos_aparicoes) > 1 else 0
-            score_atraso = ultima_aparicao / intervalo_medio if intervalo_medio > 0 else 0
-            volatilidade = desvio_intervalo / intervalo_medio if intervalo_medio > 0 else 0
-            
-            # Tendência (comparar frequência recente vs total)
-            tendencia = (freq_recente / max(len(self.df_validos) * 0.3, 1)) - media_aparicoes_concurso
-            
-            caracteristicas.append([
-                freq_total,           # 0: Frequência total
-                freq_recente,         # 1: Frequência recente
-                ultima_aparicao,      # 2: Última aparição
-                media_aparicoes_concurso,  # 3: Média de aparições
-                intervalo_medio,      # 4: Intervalo médio (NOVA)
-                desvio_intervalo,     # 5: Desvio do intervalo (NOVA)
-                score_atraso,         # 6: Score de atraso (NOVA)
-                volatilidade,         # 7: Volatilidade (NOVA)
-                tendencia,            # 8: Tendência (NOVA)
-                numero                # 9: Número
-            ])
-            numeros_analisados.append(numero)
+        # Matriz de características (uma linha por número) calculada de uma
+        # vez a partir da matriz de incidência, na ordem de df_validos
+        incidencia = MatrizIncidencia.from_dataframe(
+            self.df_validos, '+milionaria', colunas=self.colunas_bolas, ordenar=False
+        )
+        caracteristicas = caracteristicas_avancadas(incidencia)
+        numeros_analisados = incidencia.numeros.tolist()
         
         # Verificar se há dados suficientes para clustering
         if len(self.df_validos) < n_clusters:
@@ -638,13 +596,9 @@ class AnaliseEstatisticaAvancada:
         else:
             df_amostra = self.df_validos
         
-        matriz_presenca = np.zeros((len(df_amostra), 50))
-        
-        for pos, (idx, row) in enumerate(df_amostra.iterrows()):
-            numeros_concurso = [row[col] for col in self.colunas_bolas if pd.notna(row[col])]
-            for numero in numeros_concurso:
-                if 1 <= numero <= 50:
-                    matriz_presenca[pos, numero - 1] = 1
+        matriz_presenca = MatrizIncidencia.from_dataframe(
+            df_amostra, '+milionaria', colunas=self.colunas_bolas, ordenar=False
+        ).presenca_float()
         
         # Verificar se há dados suficientes para correlação
         if len(self.df_validos) < 2:
@@ -866,107 +820,35 @@ class AnaliseEstatisticaAvancada:
                 'total_concursos': 0
             }
         
-        # Contar ocorrências de cada número
-        contagem_numeros = Counter()
-        contagem_pares = Counter()
-        
-        # Garantir que todos os números de 1 a 50 tenham uma contagem (mesmo que 0)
-        for numero in range(1, 51):
-            contagem_numeros[numero] = 0
-        
-        for _, row in self.df_validos.iterrows():
-            numeros_concurso = [row[col] for col in self.colunas_bolas if pd.notna(row[col])]
-            
-            # Contar números individuais
-            for numero in numeros_concurso:
-                contagem_numeros[numero] += 1
-            
-            # Contar pares
-            for i in range(len(numeros_concurso)):
-                for j in range(i + 1, len(numeros_concurso)):
-                    par = tuple(sorted([numeros_concurso[i], numeros_concurso[j]]))
-                    contagem_pares[par] += 1
-        
-        total_concursos = len(self.df_validos)
-        if total_concursos == 0:
-            return {
-                'probabilidades_completas': {},
-                'dependencias_fortes': [],
-                'total_concursos': 0
-            }
-        
+        # Pares contados de uma vez (agregados correntes ou M.T @ M) e probabilidades por arrays
+        coocorrencia = MatrizCoocorrencia.do_recorte(self.df_validos, '+milionaria', colunas=self.colunas_bolas)
+        numeros = coocorrencia.numeros.tolist()
+        marginais = coocorrencia.probabilidade_marginal().tolist()
+        conjuntas = coocorrencia.probabilidade_conjunta().tolist()
+        condicionais_matriz = coocorrencia.probabilidade_condicional().tolist()
+        dependencias_matriz = coocorrencia.lift().tolist()
+
         probabilidades = {}
-        
-        # Calcular probabilidades condicionais
-        for numero1 in range(1, 51):
-            prob_numero1 = contagem_numeros[numero1] / total_concursos
-            condicionais = {}
-            
-            for numero2 in range(1, 51):
-                if numero1 != numero2:
-                    # Probabilidade conjunta
-                    par = tuple(sorted([numero1, numero2]))
-                    prob_conjunta = contagem_pares[par] / total_concursos if total_concursos > 0 else 0
-                    
-                    # Probabilidade condicional P(numero2 | numero1)
-                    if contagem_numeros[numero1] > 0:
-                        prob_condicional = prob_conjunta / prob_numero1
-                    else:
-                        prob_condicional = 0
-                    
-                    # Medida de dependência
-                    if prob_numero1 > 0 and total_concursos > 0:
-                        prob_numero2 = contagem_numeros[numero2] / total_concursos
-                        dependencia = prob_condicional / prob_numero2 if prob_numero2 > 0 else 0
-                    else:
-                        dependencia = 0
-                    
-                    condicionais[numero2] = {
-                        'probabilidade_condicional': float(prob_condicional),
-                        'dependencia': float(dependencia),
-                        'probabilidade_conjunta': float(prob_conjunta)
-                    }
-            
+        for i, numero1 in enumerate(numeros):
             probabilidades[numero1] = {
-                'probabilidade_marginal': float(prob_numero1),
-                'condicionais': condicionais
+                'probabilidade_marginal': marginais[i],
+                'condicionais': {
+                    numero2: {
+                        'probabilidade_condicional': condicionais_matriz[i][j],
+                        'dependencia': dependencias_matriz[i][j],
+                        'probabilidade_conjunta': conjuntas[i][j]
+                    }
+                    for j, numero2 in enumerate(numeros) if j != i
+                }
             }
-        
-        # Encontrar as dependências mais fortes (evitando duplicatas)
-        dependencias = []
-        pares_ja_processados = set()  # Para evitar duplicatas
-        
-        for num1 in range(1, 51):
-            for num2 in range(1, 51):
-                if num1 != num2:
-                    # Criar chave única para o par (sempre menor primeiro)
-                    par_key = tuple(sorted([num1, num2]))
-                    
-                    # Verificar se já processamos este par
-                    if par_key not in pares_ja_processados:
-                        pares_ja_processados.add(par_key)
-                        
-                        # Pegar a dependência mais forte entre as duas direções
-                        dep1 = probabilidades[num1]['condicionais'][num2]['dependencia']
-                        dep2 = probabilidades[num2]['condicionais'][num1]['dependencia']
-                        
-                        # Usar a dependência mais forte
-                        if dep1 > dep2:
-                            dependencia = dep1
-                            num_origem, num_destino = num1, num2
-                        else:
-                            dependencia = dep2
-                            num_origem, num_destino = num2, num1
-                        
-                        if dependencia > 1.5:  # Dependência forte
-                            dependencias.append((int(num_origem), int(num_destino), float(dependencia)))
-        
-        dependencias.sort(key=lambda x: x[2], reverse=True)
-        
+
+        # Dependências mais fortes: para cada par, a direção de maior dependência
+        dependencias = coocorrencia.top_dependencias(k=20, limiar=1.5)
+
         return {
             'probabilidades_completas': probabilidades,
-            'dependencias_fortes': dependencias[:20],
-            'total_concursos': int(total_concursos)
+            'dependencias_fortes': dependencias,
+            'total_concursos': int(coocorrencia.total)
         }
 
     def calcular_distribuicao_frequencia_numeros(self, df_filtrado):
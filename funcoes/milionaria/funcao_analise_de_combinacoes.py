@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
 from collections import Counter, defaultdict
-from itertools import combinations
+
+from funcoes.common.subconjuntos import ContadorSubconjuntos
 
 def analise_de_combinacoes(dados_sorteios, qtd_concursos=None):
     """
@@ -81,32 +82,18 @@ def analise_de_combinacoes(dados_sorteios, qtd_concursos=None):
 
     # 1. Duplas, Ternas, Quadras: Combinações que mais se repetem
     def analisar_combinacoes_frequentes():
+        # Duplas, ternas e quadras contadas como ranks inteiros (bincount)
+        sorteios = df_sorteios_pd[num_cols].to_numpy(dtype=np.int64)
+        duplas, ternas, quadras = (ContadorSubconjuntos(sorteios, k, 1, 50) for k in (2, 3, 4))
+
         combinacoes_stats = {
-            'duplas': Counter(),
-            'ternas': Counter(),
-            'quadras': Counter(),
             'duplas_trevos': Counter(), # Duplas de trevos
             'duplas_num_trevo': Counter() # Combinação de 1 número e 1 trevo
         }
 
-        for _, row in df_sorteios_pd.iterrows():
-            numeros = tuple(row['numeros_principais_ordenados'])
-            trevos = tuple(row['trevos_ordenados'])
+        for numeros, trevos in zip(df_sorteios_pd['numeros_principais_ordenados'], df_sorteios_pd['trevos_ordenados']):
+            trevos = tuple(trevos)
 
-            # Duplas de números principais
-            for dupla in combinations(numeros, 2):
-                combinacoes_stats['duplas'][tuple(sorted(dupla))] += 1
-            
-            # Ternas de números principais
-            if len(numeros) >= 3:
-                for terna in combinations(numeros, 3):
-                    combinacoes_stats['ternas'][tuple(sorted(terna))] += 1
-
-            # Quadras de números principais
-            if len(numeros) >= 4:
-                for quadra in combinations(numeros, 4):
-                    combinacoes_stats['quadras'][tuple(sorted(quadra))] += 1
-            
             # Duplas de Trevos
             if len(trevos) >= 2:
                 combinacoes_stats['duplas_trevos'][tuple(sorted(trevos))] += 1
@@ -117,9 +104,9 @@ def analise_de_combinacoes(dados_sorteios, qtd_concursos=None):
                     combinacoes_stats['duplas_num_trevo'][tuple(sorted((num, trevo)))] += 1
 
         return {
-            'duplas_mais_frequentes': combinacoes_stats['duplas'].most_common(10),
-            'ternas_mais_frequentes': combinacoes_stats['ternas'].most_common(10),
-            'quadras_mais_frequentes': combinacoes_stats['quadras'].most_common(10),
+            'duplas_mais_frequentes': duplas.mais_frequentes(10),
+            'ternas_mais_frequentes': ternas.mais_frequentes(10),
+            'quadras_mais_frequentes': quadras.mais_frequentes(10),
             'duplas_trevos_mais_frequentes': combinacoes_stats['duplas_trevos'].most_common(10),
             'duplas_numero_trevo_mais_frequentes': combinacoes_stats['duplas_num_trevo'].most_common(10)
         }
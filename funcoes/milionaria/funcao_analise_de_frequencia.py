@@ -3,6 +3,8 @@ import numpy as np
 from collections import Counter
 from datetime import datetime, timedelta
 
+from funcoes.common.agregados import frequencia_e_atraso, ordem_de_aparicao
+
 #
 # O que a função faz:
 # 
@@ -85,7 +87,15 @@ def analise_frequencia(dados_sorteios, qtd_concursos=None):
     total_sorteios = len(historico_por_concurso)
     
     # 1. FREQUÊNCIA ABSOLUTA
-    freq_absoluta_numeros = Counter(todos_numeros)
+    # Período na cauda do histórico: a frequência dos números sai dos agregados
+    # correntes; a ordem das chaves (desempate de quentes/frios) é a do Counter
+    agregados = frequencia_e_atraso('+milionaria', [s['concurso'] for s in historico_por_concurso])
+    if agregados is not None:
+        frequencia, _ = agregados
+        ordem = ordem_de_aparicao((s['numeros'] for s in historico_por_concurso), 50)
+        freq_absoluta_numeros = Counter({num: frequencia[int(num)] for num in ordem})
+    else:
+        freq_absoluta_numeros = Counter(todos_numeros)
     freq_absoluta_trevos = Counter(todos_trevos)
     
     # Garantir que todos os números/trevos apareçam (mesmo com freq 0)
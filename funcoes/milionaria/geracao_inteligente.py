@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
 from collections import Counter
 import logging
 
+from funcoes.common.gerador_restrito import sortear_aposta
+from funcoes.common.probabilidades import preco_aposta
+
 logger = logging.getLogger(__name__)
 
-def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
+def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict, rng=None) -> list:
     """
     Gera uma ou mais apostas inteligentes da +Milionária com base nas preferências do usuário
     e nos dados de análise estatística.
@@ -15,6 +17,8 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
     Args:
         preferencias (dict): Dicionário com as preferências do usuário do frontend.
         analysis_cache (dict): Cache com todos os resultados das análises (frequência, dist, etc.).
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py);
+            com ele as apostas podem ser refeitas pela semente.
 
     Returns:
         list: Uma lista de dicionários, onde cada dicionário representa uma aposta
@@ -28,8 +32,6 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
     todas_apostas_geradas = []
 
     for _ in range(num_apostas_gerar):
-        numeros_selecionados = set()
-        trevos_selecionados = set()
 
         # --- Lógica para seleção dos Números Principais (1-50) ---
         pool_numeros = list(range(1, 51))
@@ -80,61 +82,34 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
                 if atraso >= padroes_pref['minAtraso']:
                     pesos_numeros[num] *= 2.5 # Aumenta o peso para números muito atrasados
 
-        # Gerar a aposta principal usando os pesos
-        # Convertendo pesos para lista para uso com random.choices
-        numeros_ponderados = [num for num, peso in pesos_numeros.items()]
-        pesos_dos_numeros = [peso for num, peso in pesos_numeros.items()]
-
-        # Lógica de tentativa e erro para garantir as preferências de distribuição e padrões
-        max_tentativas = 100
-        for _ in range(max_tentativas):
-            temp_numeros_selecionados = set(random.choices(numeros_ponderados, weights=pesos_dos_numeros, k=qtde_numeros_aposta))
-            
-            # Verificar se a quantidade de números está correta (random.choices pode retornar menos se houver muitos pesos 0)
-            if len(temp_numeros_selecionados) != qtde_numeros_aposta:
-                continue
-
-            # Validação de Padrões
-            if padroes_pref.get('evitarConsecutivos'):
-                temp_list = sorted(list(temp_numeros_selecionados))
-                if any(temp_list[i+1] == temp_list[i] + 1 for i in range(len(temp_list) - 1)):
-                    continue # Contém consecutivos, tentar novamente
-
-            if padroes_pref.get('evitarRepeticoesSeguidas'):
-                ultimos_numeros_sorteados = analysis_cache.get('padroes_completa', {}).get('ultimos_sorteados', [])
-                if any(num in ultimos_numeros_sorteados for num in temp_numeros_selecionados):
-                    continue # Contém números repetidos do último, tentar novamente
-
-            # Validação de Distribuição (Pares/Ímpares)
-            dist_pref = preferencias.get('distribuicao', {})
-            if dist_pref.get('priorizarParesImpares'):
-                num_pares = sum(1 for n in temp_numeros_selecionados if n % 2 == 0)
-                num_impares = qtde_numeros_aposta - num_pares
-                paridade_desejada = dist_pref.get('paridadeDesejada', 'equilibrado')
-
-                if paridade_desejada == 'equilibrado' and not (2 <= num_pares <= 4 and 2 <= num_impares <= 4):
-                    continue # Não está equilibrado, tentar novamente
+        # Gerar a aposta principal direto do espaço que atende às preferências
+        # (sem tentativa e erro): paridade, soma, consecutivos e repetições
+        dist_pref = preferencias.get('distribuicao', {})
+        restricoes = {'evitar_consecutivos': bool(padroes_pref.get('evitarConsecutivos'))}
+
+        if padroes_pref.get('evitarRepeticoesSeguidas'):
+            ultimos_numeros_sorteados = analysis_cache.get('padroes_completa', {}).get('ultimos_sorteados', [])
+            if ultimos_numeros_sorteados:
+                restricoes['marcados'] = ultimos_numeros_sorteados
+                restricoes['max_marcados'] = 0 # Nenhum número do último concurso
+
+        if dist_pref.get('priorizarParesImpares'):
+            paridade_desejada = dist_pref.get('paridadeDesejada', 'equilibrado')
+            regras_paridade = {
+                'equilibrado': lambda pares, impares: 2 <= pares <= 4 and 2 <= impares <= 4,
+                'mais_pares': lambda pares, impares: pares > impares,
+                'mais_impares': lambda pares, impares: impares > pares,
+            }
+            if paridade_desejada in regras_paridade:
+                restricoes['pares_permitidos'] = [
+                    p for p in range(qtde_numeros_aposta + 1)
+                    if regras_paridade[paridade_desejada](p, qtde_numeros_aposta - p)
+                ]
 
-                if paridade_desejada == 'mais_pares' and num_pares <= num_impares:
-                    continue # Não tem mais pares, tentar novamente
-                
-                if paridade_desejada == 'mais_impares' and num_impares <= num_pares:
-                    continue # Não tem mais ímpares, tentar novamente
+        if dist_pref.get('priorizarSoma'):
+            restricoes['soma'] = (dist_pref.get('somaMin', 0), dist_pref.get('somaMax', 300))
 
-            # Validação de Distribuição (Soma)
-            if dist_pref.get('priorizarSoma'):
-                soma_aposta = sum(temp_numeros_selecionados)
-                if not (dist_pref.get('somaMin', 0) <= soma_aposta <= dist_pref.get('somaMax', 300)):
-                    continue # Soma fora da faixa, tentar novamente
-            
-            # Se todas as validações passarem, aceita a aposta
-            numeros_selecionados = temp_numeros_selecionados
-            break # Sai do loop de tentativas
-        
-        if not numeros_selecionados:
-            logger.warning("Não foi possível gerar números principais dentro das preferências após várias tentativas.")
-            # Fallback: gerar aleatoriamente se as preferências forem muito restritivas
-            numeros_selecionados = set(random.sample(pool_numeros, qtde_numeros_aposta))
+        numeros_selecionados = sortear_aposta(pesos_numeros, 1, 50, qtde_numeros_aposta, rng=rng, **restricoes)
 
         # --- Lógica para seleção dos Trevos (1-6) ---
         pool_trevos = list(range(1, 7))
@@ -153,20 +128,8 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
             for trevo, _ in frios_trevos:
                 pesos_trevos[trevo] *= 2.0
 
-        # Gerar os trevos usando os pesos
-        trevos_ponderados = [trevo for trevo, peso in pesos_trevos.items()]
-        pesos_dos_trevos = [peso for trevo, peso in pesos_trevos.items()]
-        
-        # Loop de tentativas para trevos (menos complexo)
-        for _ in range(max_tentativas):
-            temp_trevos_selecionados = set(random.choices(trevos_ponderados, weights=pesos_dos_trevos, k=qtde_trevos_aposta))
-            if len(temp_trevos_selecionados) == qtde_trevos_aposta:
-                trevos_selecionados = temp_trevos_selecionados
-                break
-        
-        if not trevos_selecionados:
-            logger.warning("Não foi possível gerar trevos dentro das preferências. Gerando aleatoriamente.")
-            trevos_selecionados = set(random.sample(pool_trevos, qtde_trevos_aposta))
+        # Gerar os trevos usando os pesos (sem restrições)
+        trevos_selecionados = sortear_aposta(pesos_trevos, 1, 6, qtde_trevos_aposta, rng=rng)
 
         # Calcular valor estimado da aposta (opcional, pode ser uma função separada)
         # Exemplo simplificado de cálculo de valor:
@@ -183,49 +146,10 @@ def gerar_aposta_inteligente(preferencias: dict, analysis_cache: dict) -> list:
 
 def calcular_valor_aposta(qtde_numeros: int, qtde_trevos: int) -> float:
     """
-    Calcula o valor estimado da aposta baseado na quantidade de números e trevos.
-    Valores baseados na tabela oficial da Mais Milionária.
+    Calcula o valor estimado da aposta baseado na quantidade de números e trevos:
+    preço da aposta simples x apostas simples contidas (C(n, 6) x C(t, 2)).
     """
-    # Tabela de valores da +Milionária (valores oficiais atualizados)
-    tabela_valores = {
-        (6, 2): 6.00,      # 6 números + 2 trevos = 1 aposta simples
-        (6, 3): 18.00,     # 6 números + 3 trevos = 3 apostas simples
-        (6, 4): 36.00,     # 6 números + 4 trevos = 6 apostas simples
-        (6, 5): 60.00,     # 6 números + 5 trevos = 10 apostas simples
-        (6, 6): 90.00,     # 6 números + 6 trevos = 15 apostas simples
-        (7, 2): 42.00,     # 7 números + 2 trevos = 7 apostas simples
-        (7, 3): 126.00,    # 7 números + 3 trevos = 21 apostas simples
-        (7, 4): 252.00,    # 7 números + 4 trevos = 42 apostas simples
-        (7, 5): 420.00,    # 7 números + 5 trevos = 70 apostas simples
-        (7, 6): 630.00,    # 7 números + 6 trevos = 105 apostas simples
-        (8, 2): 168.00,    # 8 números + 2 trevos = 28 apostas simples
-        (8, 3): 504.00,    # 8 números + 3 trevos = 84 apostas simples
-        (8, 4): 1008.00,   # 8 números + 4 trevos = 168 apostas simples
-        (8, 5): 1680.00,   # 8 números + 5 trevos = 280 apostas simples
-        (8, 6): 2520.00,   # 8 números + 6 trevos = 420 apostas simples
-        (9, 2): 504.00,    # 9 números + 2 trevos = 84 apostas simples
-        (9, 3): 1512.00,   # 9 números + 3 trevos = 252 apostas simples
-        (9, 4): 3024.00,   # 9 números + 4 trevos = 504 apostas simples
-        (9, 5): 5040.00,   # 9 números + 5 trevos = 840 apostas simples
-        (9, 6): 7560.00,   # 9 números + 6 trevos = 1260 apostas simples
-        (10, 2): 1260.00,  # 10 números + 2 trevos = 210 apostas simples
-        (10, 3): 3780.00,  # 10 números + 3 trevos = 630 apostas simples
-        (10, 4): 7560.00,  # 10 números + 4 trevos = 1260 apostas simples
-        (10, 5): 12600.00, # 10 números + 5 trevos = 2100 apostas simples
-        (10, 6): 18900.00, # 10 números + 6 trevos = 3150 apostas simples
-        (11, 2): 2772.00,  # 11 números + 2 trevos = 462 apostas simples
-        (11, 3): 8316.00,  # 11 números + 3 trevos = 1386 apostas simples
-        (11, 4): 16632.00, # 11 números + 4 trevos = 2772 apostas simples
-        (11, 5): 27720.00, # 11 números + 5 trevos = 4620 apostas simples
-        (11, 6): 41580.00, # 11 números + 6 trevos = 6930 apostas simples
-        (12, 2): 5544.00,  # 12 números + 2 trevos = 924 apostas simples
-        (12, 3): 16632.00, # 12 números + 3 trevos = 2772 apostas simples
-        (12, 4): 33264.00, # 12 números + 4 trevos = 5544 apostas simples
-        (12, 5): 55440.00, # 12 números + 5 trevos = 9240 apostas simples
-        (12, 6): 83160.00, # 12 números + 6 trevos = 13860 apostas simples
-    }
-    
-    return tabela_valores.get((qtde_numeros, qtde_trevos), 0.0)
+    return preco_aposta("mais_milionaria", qtde_numeros, qtde_trevos)
 
 # Função auxiliar para limpar NaN de dicionários aninhados (útil para resultados de análise avançada)
 def limpar_nan_do_dict(d):
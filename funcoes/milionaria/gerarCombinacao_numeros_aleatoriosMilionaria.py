@@ -1,45 +1,8 @@
-import random
+from funcoes.common.probabilidades import apostas_simples, preco_aposta
+from funcoes.common.rng import criar_rng, sortear_numeros
 
-# Tabela de preços das apostas
-TABELA_PRECOS = {
-    (6, 2): {"apostas": 1, "valor": 6.00},
-    (6, 3): {"apostas": 3, "valor": 18.00},
-    (6, 4): {"apostas": 6, "valor": 36.00},
-    (7, 2): {"apostas": 7, "valor": 42.00},
-    (6, 5): {"apostas": 10, "valor": 60.00},
-    (6, 6): {"apostas": 15, "valor": 90.00},
-    (7, 3): {"apostas": 21, "valor": 126.00},
-    (8, 2): {"apostas": 28, "valor": 168.00},
-    (7, 4): {"apostas": 42, "valor": 252.00},
-    (7, 5): {"apostas": 70, "valor": 420.00},
-    (9, 2): {"apostas": 84, "valor": 504.00},
-    (8, 3): {"apostas": 84, "valor": 504.00},
-    (7, 6): {"apostas": 105, "valor": 630.00},
-    (8, 4): {"apostas": 168, "valor": 1008.00},
-    (10, 2): {"apostas": 210, "valor": 1260.00},
-    (9, 3): {"apostas": 252, "valor": 1512.00},
-    (8, 5): {"apostas": 280, "valor": 1680.00},
-    (8, 6): {"apostas": 420, "valor": 2520.00},
-    (11, 2): {"apostas": 462, "valor": 2772.00},
-    (9, 4): {"apostas": 504, "valor": 3024.00},
-    (10, 3): {"apostas": 630, "valor": 3780.00},
-    (9, 5): {"apostas": 840, "valor": 5040.00},
-    (12, 2): {"apostas": 924, "valor": 5544.00},
-    (9, 6): {"apostas": 1260, "valor": 7560.00},
-    (10, 4): {"apostas": 1260, "valor": 7560.00},
-    (11, 3): {"apostas": 1386, "valor": 8316.00},
-    (10, 5): {"apostas": 2100, "valor": 12600.00},
-    (12, 3): {"apostas": 2772, "valor": 16632.00},
-    (11, 4): {"apostas": 2772, "valor": 16632.00},
-    (10, 6): {"apostas": 3150, "valor": 18900.00},
-    (11, 5): {"apostas": 4620, "valor": 27720.00},
-    (12, 4): {"apostas": 5544, "valor": 33264.00},
-    (11, 6): {"apostas": 6930, "valor": 41580.00},
-    (12, 5): {"apostas": 9240, "valor": 55440.00},
-    (12, 6): {"apostas": 13860, "valor": 83160.00}
-}
 
-def gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2):
+def gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2, rng=None):
     """
     Gera uma aposta personalizada com base na quantidade de números e trevos escolhidos
     
@@ -47,6 +10,7 @@ def gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2):
         qtde_num (int): Quantidade de números principais (6 a 12)
         qtde_trevo1 (int): Quantidade de números para Trevo 1 (1 a 3)
         qtde_trevo2 (int): Quantidade de números para Trevo 2 (1 a 3)
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
     
     Returns:
         tuple: (N_milionaria, trevo1, trevo2, valor_aposta, qtde_apostas)
@@ -65,13 +29,14 @@ def gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2):
     # Calcular total de trevos para verificar na tabela
     qtde_trevo_total = qtde_trevo1 + qtde_trevo2
     
-    # Verificar se a combinação existe na tabela
-    chave = (qtde_num, qtde_trevo_total)
-    if chave not in TABELA_PRECOS:
+    # Verificar se a combinação tem preço (funcoes/common/config.py)
+    valor_aposta = preco_aposta("mais_milionaria", qtde_num, qtde_trevo_total)
+    if not valor_aposta:
         raise ValueError(f"Combinação ({qtde_num} números, {qtde_trevo_total} trevos) não disponível")
     
     # Gerar números principais únicos entre 1 e 50
-    N_milionaria = sorted(random.sample(range(1, 51), qtde_num))
+    rng = rng if rng is not None else criar_rng()[0]
+    N_milionaria = sortear_numeros(rng, 1, 50, qtde_num)
     
     # Lógica especial para quando total de trevos for 6 (todos os números disponíveis)
     if qtde_trevo_total == 6:
@@ -81,17 +46,14 @@ def gerar_aposta_personalizada(qtde_num, qtde_trevo1, qtde_trevo2):
         trevo2 = sorted(todos_trevos[qtde_trevo1:qtde_trevo1 + qtde_trevo2])
     else:
         # Gerar múltiplos números para Trevo 1 (1 a 6)
-        trevo1 = sorted(random.sample(range(1, 7), qtde_trevo1))
+        trevo1 = sortear_numeros(rng, 1, 6, qtde_trevo1)
         
         # Gerar múltiplos números para Trevo 2 (1 a 6)
         # Garantir que não haja números repetidos entre trevo1 e trevo2
         numeros_disponiveis = [n for n in range(1, 7) if n not in trevo1]
-        trevo2 = sorted(random.sample(numeros_disponiveis, qtde_trevo2))
+        trevo2 = sorted(rng.choice(numeros_disponiveis, size=qtde_trevo2, replace=False).tolist())
     
-    # Buscar informações da aposta
-    info_aposta = TABELA_PRECOS[chave]
-    valor_aposta = info_aposta["valor"]
-    qtde_apostas = info_aposta["apostas"]
+    qtde_apostas = apostas_simples("mais_milionaria", qtde_num, qtde_trevo_total)
     
     return N_milionaria, trevo1, trevo2, valor_aposta, qtde_apostas
 
@@ -105,9 +67,10 @@ def exibir_opcoes_disponiveis():
     # print(f"{'Números':<8} {'Trevos':<8} {'Apostas':<10} {'Valor':<15}")  # DEBUG - COMENTADO
     # print("-" * 60)  # DEBUG - COMENTADO
     # 
-    # for (nums, trevos), info in sorted(TABELA_PRECOS.items()):
-    #     valor_formatado = f"R$ {info['valor']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    #     print(f"{nums:<8} {trevos:<8} {info['apostas']:<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
+    # for nums in range(6, 13):
+    #     for trevos in range(2, 7):
+    #         valor_formatado = f"R$ {preco_aposta('mais_milionaria', nums, trevos):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    #         print(f"{nums:<8} {trevos:<8} {apostas_simples('mais_milionaria', nums, trevos):<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
     # 
     # print("=" * 60)  # DEBUG - COMENTADO
 
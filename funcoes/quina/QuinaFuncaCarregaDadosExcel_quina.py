@@ -22,6 +22,15 @@ def carregar_dados_quina(arquivo_excel: str = None, limite_concursos: int = 300)
                       principais (5 números de 1-80).
     """
     if arquivo_excel is None:
+        # Caminho padrão: lê do store binário (memory-mapped); a planilha só é
+        # lida quando o store está desatualizado
+        from services.draw_store import carregar_ou_compilar
+        df = carregar_ou_compilar('quina')
+        if df is not None:
+            if len(df) > limite_concursos:
+                df = df.tail(limite_concursos).reset_index(drop=True)
+            logger.info(f"Dados da Quina carregados do store. Total de concursos: {len(df)}")
+            return df
         # Usar caminho absoluto baseado no diretório atual
         arquivo_excel = os.path.join(os.getcwd(), 'LoteriasExcel', 'Quina_edt.xlsx')
     
@@ -74,15 +83,13 @@ def converter_para_matrizes_binarias_quina(df: pd.DataFrame) -> tuple[np.ndarray
                - matriz_numeros: NumPy array binário (concursos x 80) para os números.
                - concursos_numeros: Lista dos números dos concursos para a matriz de números.
     """
+    from funcoes.common.incidencia import MatrizIncidencia
+
     num_cols = [f'Bola{i}' for i in range(1, 6)]  # 5 números para Quina
     
-    # Matriz para os números principais (1 a 80)
-    matriz_numeros = np.zeros((len(df), 80), dtype=int)
-    for idx, row in df.iterrows():
-        numeros = row[num_cols].values
-        for num in numeros:
-            if 1 <= num <= 80: # Garante que o número está no range da Quina
-                matriz_numeros[idx, num - 1] = 1
+    # Matriz para os números principais (1 a 80), na ordem do DataFrame
+    incidencia = MatrizIncidencia.from_dataframe(df, 'quina', colunas=num_cols, ordenar=False)
+    matriz_numeros = incidencia.matriz.astype(int)
     
     concursos = df['Concurso'].tolist()
     
@@ -28,6 +28,10 @@ import seaborn as sns
 from collections import Counter, defaultdict
 import logging
 
+from funcoes.common.clusters import caracteristicas_simples
+from funcoes.common.coocorrencia import MatrizCoocorrencia
+from funcoes.common.incidencia import MatrizIncidencia
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -236,34 +240,17 @@ class AnaliseEstatisticaAvancadaQuina:
                 'labels_clusters': [0] * 80
             }
         
-        # Preparar dados para clustering (simplificado)
-        dados_cluster = []
-        for num in range(1, 81):
-            # Calcular características básicas do número
-            freq_total = 0
-            freq_recente = 0
-            ultima_aparicao = 0
-            
-            for i, (_, row) in enumerate(self.df_validos.iterrows()):
-                if num in row[self.colunas_bolas].values:
-                    freq_total += 1
-                    if i >= len(self.df_validos) - 5:  # Últimos 5 concursos
-                        freq_recente += 1
-                    ultima_aparicao = i
-            
-            # Score de atraso (quanto tempo não saiu)
-            score_atraso = len(self.df_validos) - ultima_aparicao
-            
-            # Tendência (frequência recente vs total)
-            tendencia = freq_recente / freq_total if freq_total > 0 else 0
-            
-            dados_cluster.append([
-                freq_total,
-                freq_recente,
-                ultima_aparicao,
-                score_atraso,
-                tendencia
-            ])
+        # Preparar dados para clustering (simplificado), todos os números de
+        # uma vez a partir da matriz de incidência
+        incidencia = MatrizIncidencia.from_dataframe(
+            self.df_validos, 'quina', colunas=self.colunas_bolas, ordenar=False
+        )
+        dados_cluster = [
+            [int(freq_total), int(freq_recente), int(ultima_aparicao), int(score_atraso),
+             float(tendencia) if freq_total > 0 else 0]
+            for freq_total, freq_recente, ultima_aparicao, score_atraso, tendencia
+            in caracteristicas_simples(incidencia)
+        ]
         
         # Normalizar dados
         scaler = StandardScaler()
@@ -376,13 +363,9 @@ class AnaliseEstatisticaAvancadaQuina:
             }
         
         # Criar matriz de presença (1 se saiu, 0 se não saiu)
-        matriz_presenca = np.zeros((len(self.df_validos), 80))
-        
-        for i, (_, row) in enumerate(self.df_validos.iterrows()):
-            numeros_sorteio = row[self.colunas_bolas].values
-            for num in numeros_sorteio:
-                if 1 <= num <= 80:
-                    matriz_presenca[i, num-1] = 1
+        matriz_presenca = MatrizIncidencia.from_dataframe(
+            self.df_validos, 'quina', colunas=self.colunas_bolas, ordenar=False
+        ).presenca_float()
         
         # Calcular matriz de correlação usando np.corrcoef
         try:
@@ -426,7 +409,7 @@ class AnaliseEstatisticaAvancadaQuina:
     
     def probabilidades_condicionais(self):
         """
-        Calcula probabilidades condicionais entre números (SIMPLIFICADA PARA PERFORMANCE)
+        Calcula probabilidades condicionais entre os 10 números mais frequentes
         
         Returns:
             dict: Resultados das probabilidades condicionais
@@ -442,45 +425,24 @@ class AnaliseEstatisticaAvancadaQuina:
                 'todas_dependencias': []
             }
         
-        # Calcular apenas para os 10 números mais frequentes
-        frequencias = {}
-        for _, row in self.df_validos.iterrows():
-            numeros = row[self.colunas_bolas].values
-            for num in numeros:
-                if 1 <= num <= 80:
-                    frequencias[num] = frequencias.get(num, 0) + 1
-        
-        # Pegar apenas os 10 mais frequentes
-        numeros_mais_frequentes = sorted(frequencias.items(), key=lambda x: x[1], reverse=True)[:10]
-        numeros_amostra = [num for num, _ in numeros_mais_frequentes]
-        
-        # Calcular coocorrências apenas entre esses números
-        coocorrencias = {}
-        for _, row in self.df_validos.iterrows():
-            numeros = row[self.colunas_bolas].values
-            for num1 in numeros_amostra:
-                if num1 in numeros:
-                    for num2 in numeros_amostra:
-                        if num1 != num2 and num2 in numeros:
-                            chave = (min(num1, num2), max(num1, num2))
-                            coocorrencias[chave] = coocorrencias.get(chave, 0) + 1
-        
-        # Calcular probabilidades condicionais
-        dependencias = []
-        total_concursos = len(self.df_validos)
-        
-        for (num1, num2), cooc in coocorrencias.items():
-            if frequencias.get(num1, 0) > 0:
-                p_condicional = cooc / frequencias[num1]
-                p_b_base = frequencias.get(num2, 0) / total_concursos
-                
-                if p_b_base > 0:
-                    razao = p_condicional / p_b_base
-                    dependencias.append((num1, num2, razao))
-        
-        # Ordenar por dependência
-        dependencias.sort(key=lambda x: x[2], reverse=True)
-        
+        coocorrencia = MatrizCoocorrencia.do_recorte(self.df_validos, 'quina', colunas=self.colunas_bolas)
+        frequencias = coocorrencia.frequencia
+
+        # Amostra: os 10 números mais frequentes (empate pela primeira aparição)
+        num_min, num_max = int(coocorrencia.numeros[0]), int(coocorrencia.numeros[-1])
+        valores = self.df_validos[self.colunas_bolas].to_numpy(dtype=np.int64).ravel()
+        posicoes = np.flatnonzero((valores >= num_min) & (valores <= num_max))
+        primeira_aparicao = np.full(len(frequencias), valores.size)
+        np.minimum.at(primeira_aparicao, valores[posicoes] - num_min, posicoes)
+        ordem = np.lexsort((primeira_aparicao, -frequencias))
+        numeros_amostra = coocorrencia.numeros[ordem[frequencias[ordem] > 0][:10]]
+
+        # Dependência P(maior | menor) / P(maior) dos pares da amostra que já
+        # saíram juntos (lift 0 = par nunca coocorreu)
+        dependencias = [
+            dep for dep in coocorrencia.dependencias(numeros_amostra, direcao="crescente") if dep[2] > 0
+        ]
+
         # Separar dependências fortes e fracas
         dependencias_fortes = [dep for dep in dependencias if dep[2] > 1.5][:5]
         dependencias_fracas = [dep for dep in dependencias if dep[2] < 0.7][:5]
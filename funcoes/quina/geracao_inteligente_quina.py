@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
 from collections import Counter
 import logging
 
+from funcoes.common.gerador_restrito import sortear_aposta
+from funcoes.common.probabilidades import preco_aposta
+
 logger = logging.getLogger(__name__)
 
-def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict) -> list:
+def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict, rng=None) -> list:
     """
     Gera uma ou mais apostas inteligentes da Quina com base nas preferências do usuário
     e nos dados de análise estatística.
@@ -15,6 +17,8 @@ def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict) ->
     Args:
         preferencias (dict): Dicionário com as preferências do usuário do frontend.
         analysis_cache (dict): Cache com todos os resultados das análises (frequência, dist, etc.).
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py);
+            com ele as apostas podem ser refeitas pela semente.
 
     Returns:
         list: Uma lista de dicionários, onde cada dicionário representa uma aposta
@@ -27,7 +31,6 @@ def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict) ->
     todas_apostas_geradas = []
 
     for _ in range(num_apostas_gerar):
-        numeros_selecionados = set()
 
         # --- Lógica para seleção dos Números Principais (1-80) ---
         pool_numeros = list(range(1, 81))
@@ -132,71 +135,32 @@ def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict) ->
             # A soma será verificada durante a geração da aposta
             pass  # Será aplicada na validação posterior
 
-        # Gerar a aposta principal usando os pesos
-        # Convertendo pesos para lista para uso com random.choices
-        numeros_ponderados = [num for num, peso in pesos_numeros.items()]
-        pesos_dos_numeros = [peso for num, peso in pesos_numeros.items()]
+        # Gerar a aposta principal direto do espaço que atende às preferências
+        # (sem tentativa e erro): paridade, soma, consecutivos e repetições
+        restricoes = {'evitar_consecutivos': bool(padroes_pref.get('evitarConsecutivos'))}
 
-        # Lógica de tentativa e erro para garantir as preferências de distribuição e padrões
-        max_tentativas = 100
-        for _ in range(max_tentativas):
-            temp_numeros_selecionados = set(random.choices(numeros_ponderados, weights=pesos_dos_numeros, k=qtde_numeros_aposta))
-            
-            # Verificar se atende às preferências de distribuição
-            distrib_pref = preferencias.get('distribuicao', {})
-            atende_distribuicao = True
-            
-            # Verificar paridade (pares vs ímpares)
-            if distrib_pref.get('priorizarParesImpares'):
-                paridade_desejada = distrib_pref.get('paridadeDesejada', 'equilibrado')
-                pares = sum(1 for num in temp_numeros_selecionados if num % 2 == 0)
-                impares = qtde_numeros_aposta - pares
-                
-                if paridade_desejada == 'equilibrado':
-                    if abs(pares - impares) > 1:
-                        atende_distribuicao = False
-                elif paridade_desejada == 'mais_pares':
-                    if pares < impares:
-                        atende_distribuicao = False
-                elif paridade_desejada == 'mais_impares':
-                    if impares < pares:
-                        atende_distribuicao = False
-            
-            # Verificar soma dos números
-            if distrib_pref.get('priorizarSoma'):
-                soma_min = distrib_pref.get('somaMin', 100)
-                soma_max = distrib_pref.get('somaMax', 300)
-                soma_atual = sum(temp_numeros_selecionados)
-                if not (soma_min <= soma_atual <= soma_max):
-                    atende_distribuicao = False
-            
-            # Verificar padrões
-            padroes_pref = preferencias.get('padroes', {})
-            atende_padroes = True
-            
-            # Evitar números consecutivos
-            if padroes_pref.get('evitarConsecutivos'):
-                numeros_ordenados = sorted(temp_numeros_selecionados)
-                for i in range(len(numeros_ordenados) - 1):
-                    if numeros_ordenados[i+1] - numeros_ordenados[i] == 1:
-                        atende_padroes = False
-                        break
-            
-            # Evitar repetições seguidas
-            if padroes_pref.get('evitarRepeticoesSeguidas'):
-                ultimos_sorteados = padroes_pref.get('ultimosSorteados', [])
-                if ultimos_sorteados:
-                    repetidos = len(set(temp_numeros_selecionados) & set(ultimos_sorteados))
-                    if repetidos > 2:  # Máximo 2 repetições
-                        atende_padroes = False
-            
-            # Se atende a todas as preferências, usar esta combinação
-            if atende_distribuicao and atende_padroes:
-                numeros_selecionados = temp_numeros_selecionados
-                break
-        else:
-            # Se não conseguiu atender às preferências, usar a última tentativa
-            numeros_selecionados = temp_numeros_selecionados
+        if distrib_pref.get('priorizarParesImpares'):
+            paridade_desejada = distrib_pref.get('paridadeDesejada', 'equilibrado')
+            regras_paridade = {
+                'equilibrado': lambda pares, impares: abs(pares - impares) <= 1,
+                'mais_pares': lambda pares, impares: pares >= impares,
+                'mais_impares': lambda pares, impares: impares >= pares,
+            }
+            if paridade_desejada in regras_paridade:
+                restricoes['pares_permitidos'] = [
+                    p for p in range(qtde_numeros_aposta + 1)
+                    if regras_paridade[paridade_desejada](p, qtde_numeros_aposta - p)
+                ]
+
+        if distrib_pref.get('priorizarSoma'):
+            restricoes['soma'] = (distrib_pref.get('somaMin', 100), distrib_pref.get('somaMax', 300))
+
+        # Evitar repetições seguidas: no máximo 2 números do último concurso
+        if padroes_pref.get('evitarRepeticoesSeguidas') and padroes_pref.get('ultimosSorteados'):
+            restricoes['marcados'] = padroes_pref['ultimosSorteados']
+            restricoes['max_marcados'] = 2
+
+        numeros_selecionados = sortear_aposta(pesos_numeros, 1, 80, qtde_numeros_aposta, rng=rng, **restricoes)
 
         # Calcular valor estimado da aposta
         valor_estimado = calcular_valor_aposta_quina(qtde_numeros_aposta)
@@ -211,25 +175,10 @@ def gerar_aposta_inteligente_quina(preferencias: dict, analysis_cache: dict) ->
 
 def calcular_valor_aposta_quina(qtde_numeros: int) -> float:
     """
-    Calcula o valor estimado da aposta baseado na quantidade de números.
-    Valores baseados na tabela oficial da Quina.
+    Calcula o valor estimado da aposta baseado na quantidade de números:
+    preço da aposta simples x apostas simples contidas (C(n, 5)).
     """
-    # Tabela de valores da Quina (valores atualizados)
-    tabela_valores = {
-        5: 3.00,     # 5 números
-        6: 18.00,    # 6 números
-        7: 63.00,    # 7 números
-        8: 168.00,   # 8 números
-        9: 378.00,   # 9 números
-        10: 756.00,  # 10 números
-        11: 1386.00, # 11 números
-        12: 2376.00, # 12 números
-        13: 3861.00, # 13 números
-        14: 6006.00, # 14 números
-        15: 9009.00, # 15 números
-    }
-    
-    return tabela_valores.get(qtde_numeros, 0.0)
+    return preco_aposta("quina", qtde_numeros)
 
 # Função auxiliar para limpar NaN de dicionários aninhados (útil para resultados de análise avançada)
 def limpar_nan_do_dict(d):
@@ -1,26 +1,14 @@
-import random
+from funcoes.common.probabilidades import apostas_simples, preco_aposta
+from funcoes.common.rng import criar_rng, sortear_numeros
 
-# Tabela de preços das apostas da Quina (valores atualizados)
-TABELA_PRECOS = {
-    5: {"apostas": 1, "valor": 3.00},
-    6: {"apostas": 6, "valor": 18.00},
-    7: {"apostas": 21, "valor": 63.00},
-    8: {"apostas": 56, "valor": 168.00},
-    9: {"apostas": 126, "valor": 378.00},
-    10: {"apostas": 252, "valor": 756.00},
-    11: {"apostas": 462, "valor": 1386.00},
-    12: {"apostas": 792, "valor": 2376.00},
-    13: {"apostas": 1287, "valor": 3861.00},
-    14: {"apostas": 2002, "valor": 6006.00},
-    15: {"apostas": 3003, "valor": 9009.00}
-}
 
-def gerar_aposta_personalizada_quina(qtde_num):
+def gerar_aposta_personalizada_quina(qtde_num, rng=None):
     """
     Gera uma aposta personalizada da Quina com base na quantidade de números escolhidos
     
     Args:
         qtde_num (int): Quantidade de números principais (5 a 15)
+        rng (np.random.Generator | None): fluxo do pedido (funcoes/common/rng.py)
     
     Returns:
         tuple: (numeros, valor_aposta, qtde_apostas)
@@ -30,17 +18,16 @@ def gerar_aposta_personalizada_quina(qtde_num):
     if qtde_num < 5 or qtde_num > 15:
         raise ValueError("Quantidade de números deve estar entre 5 e 15")
     
-    # Verificar se a quantidade existe na tabela
-    if qtde_num not in TABELA_PRECOS:
+    # Verificar se a quantidade tem preço (funcoes/common/config.py)
+    valor_aposta = preco_aposta("quina", qtde_num)
+    if not valor_aposta:
         raise ValueError(f"Quantidade de {qtde_num} números não disponível")
     
     # Gerar números principais únicos entre 1 e 80 (Quina)
-    numeros = sorted(random.sample(range(1, 81), qtde_num))
+    rng = rng if rng is not None else criar_rng()[0]
+    numeros = sortear_numeros(rng, 1, 80, qtde_num)
     
-    # Buscar informações da aposta
-    info_aposta = TABELA_PRECOS[qtde_num]
-    valor_aposta = info_aposta["valor"]
-    qtde_apostas = info_aposta["apostas"]
+    qtde_apostas = apostas_simples("quina", qtde_num)
     
     return numeros, valor_aposta, qtde_apostas
 
@@ -54,9 +41,9 @@ def exibir_opcoes_disponiveis_quina():
     # print(f"{'Números':<8} {'Apostas':<10} {'Valor':<15}")  # DEBUG - COMENTADO
     # print("-" * 50)  # DEBUG - COMENTADO
     # 
-    # for nums, info in sorted(TABELA_PRECOS.items()):
-    #     valor_formatado = f"R$ {info['valor']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-    #     print(f"{nums:<8} {info['apostas']:<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
+    # for nums in range(5, 16):
+    #     valor_formatado = f"R$ {preco_aposta('quina', nums):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    #     print(f"{nums:<8} {apostas_simples('quina', nums):<10} {valor_formatado:<15}")  # DEBUG - COMENTADO
     # 
     # print("=" * 50)  # DEBUG - COMENTADO
 
@@ -21,3 +21,31 @@ loglevel = 'info'
 # Configurações de segurança
 forwarded_allow_ips = '*'
 secure_scheme_headers = {'X-FORWARDED-PROTO': 'https'}
+
+# Hooks
+def on_starting(server):
+    """Compila o store binário de sorteios antes de subir os workers."""
+    try:
+        from services.draw_store import compilar_todas
+        compilar_todas()
+    except Exception as exc:
+        server.log.warning(f"Falha ao compilar store de sorteios: {exc}")
+
+    # Pré-cálculo das análises em segundo plano (não atrasa o start)
+    if os.environ.get("PRECOMPUTAR_ANALISES", "1") != "0":
+        try:
+            import subprocess
+            import sys
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "precomputar_analises.py")
+            subprocess.Popen([sys.executable, script, "--processos", os.environ.get("PRECOMPUTAR_PROCESSOS", "2")])
+        except Exception as exc:
+            server.log.warning(f"Falha ao iniciar pré-cálculo de análises: {exc}")
+
+
+def worker_exit(server, worker):
+    """Drena a fila do analytics antes de o worker sair."""
+    try:
+        from services.analytics_ingestao import ingestor
+        ingestor.parar()
+    except Exception as exc:
+        server.log.warning(f"Falha ao drenar a fila do analytics: {exc}")
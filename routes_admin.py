@@ -1,9 +1,14 @@
 # routes_admin.py
-from flask import Blueprint, jsonify, render_template_string, request
-from sqlalchemy import func, desc, inspect
+from flask import Blueprint, Response, jsonify, render_template_string, request
+from sqlalchemy import inspect
 from datetime import datetime, timedelta
-from analytics_models import db, Event
+from analytics_models import db
+from services import analytics_particoes, analytics_rollups
+from services.analytics_ingestao import ingestor
+from services.analytics_tempo_real import janela as janela_tempo_real
+import json
 import os
+import time
 
 bp_admin = Blueprint("admin", __name__, url_prefix="/admin/analytics")
 
@@ -22,37 +27,45 @@ def diag():
         insp = inspect(db.engine)
         out["db_url_ok"] = True
         out["has_table_li_events"] = insp.has_table("li_events")
-        out["events_count"] = (db.session.query(func.count(Event.id)).scalar()
-                               if out["has_table_li_events"] else None)
+        contagem = analytics_particoes.contar()
+        out["events_count"] = contagem["total"]
+        out["particoes"] = contagem["particoes"]
         return jsonify(out)
     except Exception as e:
         out["db_url_ok"] = False
         out["error"] = str(e)
         return jsonify(out), 500
 
+# 📥 INGESTÃO DO /api/track (fila e escritor em lote deste worker)
+@bp_admin.get("/_ingestao")
+def ingestao():
+    return jsonify(ingestor.estatisticas())
+
+def _exato():
+    """?exato=1: distintos contados nos eventos (auditoria do HyperLogLog)."""
+    return request.args.get("exato", "").lower() in ("1", "true", "sim")
+
 @bp_admin.get("/kpis")
 def kpis():
     try:
-        since = datetime.utcnow() - timedelta(days=1)
-        pv = db.session.query(func.count(Event.id)).filter(Event.ts>=since, Event.event=='pageview').scalar() or 0
-        vis = db.session.query(func.count(func.distinct(Event.visitor_id))).filter(Event.ts>=since).scalar() or 0
-        ses = db.session.query(func.count(func.distinct(Event.session_id))).filter(Event.ts>=since).scalar() or 0
-        total_ms = db.session.query(func.coalesce(func.sum(Event.duration_ms),0)).filter(Event.ts>=since, Event.event=='hb').scalar() or 0
-        avg = round((total_ms/1000)/max(pv,1), 1)
-        return jsonify({"pageviews_24h": pv, "visitors_24h": vis, "sessions_24h": ses, "avg_time_per_view_s": avg})
+        return jsonify(analytics_rollups.kpis(exato=_exato()))
     except Exception as e:
         from flask import current_app
         current_app.logger.exception("KPIS ERROR")
         return jsonify({"error":"kpis_failed","detail":str(e)}), 500
 
+# 👥 VISITANTES/SESSÕES DISTINTOS (?janela=24h|7d|30d, ?exato=1)
+@bp_admin.get("/unicos")
+def unicos():
+    try:
+        return jsonify(analytics_rollups.distintos(request.args.get("janela") or "24h", exato=_exato()))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
 @bp_admin.get("/top-pages")
 def top_pages():
     try:
-        since = datetime.utcnow() - timedelta(days=7)
-        rows = (db.session.query(Event.path, func.count(Event.id).label("pv"))
-                .filter(Event.ts>=since, Event.event=='pageview')
-                .group_by(Event.path).order_by(desc("pv")).limit(20).all())
-        return jsonify([{"path": p, "pageviews": int(pv)} for p, pv in rows])
+        return jsonify(analytics_rollups.top_paginas(dias=7, limite=20))
     except Exception as e:
         from flask import current_app
         current_app.logger.exception("TOP-PAGES ERROR")
@@ -62,14 +75,7 @@ def top_pages():
 def daily():
     try:
         days = int(request.args.get('days') or 14)
-        since = datetime.utcnow() - timedelta(days=days)
-        date_expr = func.date(Event.ts)
-        rows = (db.session.query(date_expr.label('d'), func.count(Event.id))
-                .filter(Event.ts>=since, Event.event=='pageview')
-                .group_by('d').order_by('d').all())
-        labels = [str(d) for d,_ in rows]
-        pv = [int(c) for _,c in rows]
-        return jsonify({"labels": labels, "pageviews": pv})
+        return jsonify(analytics_rollups.serie_diaria(dias=days))
     except Exception as e:
         from flask import current_app
         current_app.logger.exception("DAILY ERROR")
@@ -77,36 +83,42 @@ def daily():
 
 @bp_admin.get("/top-events")
 def top_events():
-    since = datetime.utcnow() - timedelta(days=7)
-    rows = (db.session.query(Event.label, func.count(Event.id).label("c"))
-            .filter(Event.ts>=since, Event.event=='click', Event.label.isnot(None), Event.label!='')
-            .group_by(Event.label).order_by(desc("c")).limit(30).all())
-    return jsonify([{"label": lbl, "count": int(c)} for lbl, c in rows])
+    return jsonify(analytics_rollups.top_eventos(dias=7, limite=30))
 
+# ⚡ AGORA: janela deslizante em memória (?exato=1 conta no banco)
 @bp_admin.get("/realtime")
 def realtime():
-    since = datetime.utcnow() - timedelta(seconds=60)
-    sessions = (db.session.query(func.count(func.distinct(Event.session_id)))
-                .filter(Event.ts>=since).scalar()) or 0
-    return jsonify({"online": int(sessions)})
+    if _exato():
+        since = datetime.utcnow() - timedelta(seconds=janela_tempo_real.segundos)
+        return jsonify({"online": int(analytics_particoes.contar_distintos("session_id", since))})
+    return jsonify(janela_tempo_real.resumo())
+
+# Cada conexão SSE ocupa um thread do worker: fecha depois de alguns minutos
+# e o EventSource do navegador reconecta sozinho.
+SSE_DURACAO_S = 300
+SSE_HEARTBEAT_S = 15
+
+@bp_admin.get("/realtime/stream")
+def realtime_stream():
+    def eventos():
+        yield "retry: 2000\n\n"
+        fim = time.monotonic() + SSE_DURACAO_S
+        anterior, ultimo_envio = None, time.monotonic()
+        while time.monotonic() < fim:
+            dados = json.dumps(janela_tempo_real.resumo(), ensure_ascii=False)
+            if dados != anterior:
+                yield f"data: {dados}\n\n"
+                anterior, ultimo_envio = dados, time.monotonic()
+            elif time.monotonic() - ultimo_envio >= SSE_HEARTBEAT_S:
+                yield ": ping\n\n"
+                ultimo_envio = time.monotonic()
+            time.sleep(1)
+    return Response(eventos(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @bp_admin.get("/funnel-premium")
 def funnel_premium():
-    since = datetime.utcnow() - timedelta(days=7)
-    pv = db.session.query(func.count(Event.id)).filter(Event.ts>=since, Event.event=='pageview').scalar() or 0
-    modais = db.session.query(func.count(Event.id)).filter(
-        Event.ts>=since, Event.event=='click',
-        Event.label.like('li:%:painel:abrir_modal_%')
-    ).scalar() or 0
-    palpites = db.session.query(func.count(Event.id)).filter(
-        Event.ts>=since, Event.event=='click',
-        Event.label=='li:quina:premium:gerar_palpite'
-    ).scalar() or 0
-    ctas = db.session.query(func.count(Event.id)).filter(
-        Event.ts>=since, Event.event=='click',
-        Event.label=='li:home:cta:assinar_premium'
-    ).scalar() or 0
-    return jsonify({"pageviews": pv, "modais": modais, "palpites": palpites, "cta_premium": ctas})
+    return jsonify(analytics_rollups.funil_premium(dias=7))
 
 @bp_admin.get("/")
 def dashboard():
@@ -147,6 +159,10 @@ def dashboard():
   </article>
   <article class="card" style="margin-top:16px">
     <h5>Usuários Online Agora</h5><p id="onlineNow">...</p>
+    <div class="cards" style="grid-template-columns:repeat(2,1fr)">
+      <div><h6>Páginas agora</h6><ol id="pagesNow"></ol></div>
+      <div><h6>Cliques ao vivo</h6><ul id="clicksNow"></ul></div>
+    </div>
   </article>
 </main>
 <script>
@@ -195,11 +211,20 @@ async function load(){
     options:{responsive:true,maintainAspectRatio:false,plugins:{legend:{display:false}}}
   });
 
-  // Online Agora
-  const online = await fetch('realtime' + location.search).then(r=>r.json());
-  onlineNow.textContent = online.online + ' usuários online';
 }
 load();
+
+// Online Agora: empurrado pelo servidor (SSE), sem polling
+function lista(el, itens){
+  el.replaceChildren(...itens.map(t=>{ const li=document.createElement('li'); li.textContent=t; return li; }));
+}
+const agora = new EventSource('realtime/stream' + location.search);
+agora.onmessage = (e)=>{
+  const rt = JSON.parse(e.data);
+  onlineNow.textContent = rt.online + ' usuários online';
+  lista(pagesNow, rt.top_paginas.map(p=>`${p.path} (${p.pageviews})`));
+  lista(clicksNow, rt.ultimos_cliques.map(c=>`${new Date(c.ts*1000).toLocaleTimeString()} ${c.label} — ${c.path}`));
+};
 </script>
 </body></html>
     """)
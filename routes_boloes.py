@@ -12,6 +12,9 @@ from boloes_models import (
     criar_bolao_milionaria, criar_bolao_lotofacil, 
     criar_bolao_megasena, criar_bolao_quina
 )
+from funcoes.common.config import obter_config
+from funcoes.common.fechamento import gerar_fechamento
+from services.geradores.lote import valor_aposta
 
 bp_boloes = Blueprint("boloes", __name__, url_prefix="/api/boloes")
 
@@ -398,6 +401,82 @@ def fechar_bolao(bolao_id):
         }), 500
 
 
+# Padrões do fechamento por loteria: dezenas por aposta, sorteadas, faixa e
+# máximo de dezenas escolhidas
+FECHAMENTO_LOTERIAS = {
+    'megasena': {'tamanho_aposta': 6, 'sorteadas': 6, 'faixa': (1, 60), 'max_dezenas': 30},
+    'quina': {'tamanho_aposta': 5, 'sorteadas': 5, 'faixa': (1, 80), 'max_dezenas': 30},
+    'lotofacil': {'tamanho_aposta': 15, 'sorteadas': 15, 'faixa': (1, 25), 'max_dezenas': 25},
+    'milionaria': {'tamanho_aposta': 6, 'sorteadas': 6, 'faixa': (1, 50), 'max_dezenas': 30},
+}
+FECHAMENTO_TEMPO_MAX = 3.0  # segundos de busca quando o caso não está na tabela
+FECHAMENTO_TEMPO_GULOSO = 15.0  # segundos do guloso antes de responder 400 (timeout do gunicorn: 120)
+
+
+@bp_boloes.route('/fechamento', methods=['POST'])
+def calcular_fechamento():
+    """Calcula as apostas do bolão que garantem `acertos` se `sorteadas` dezenas saírem entre as escolhidas"""
+    try:
+        data = request.get_json(silent=True) or {}
+
+        loteria = data.get('loteria')
+        if loteria not in FECHAMENTO_LOTERIAS:
+            return jsonify({
+                'success': False,
+                'error': 'Loteria inválida'
+            }), 400
+        padrao = FECHAMENTO_LOTERIAS[loteria]
+
+        numeros = sorted({int(n) for n in data.get('numeros') or []})
+        num_min, num_max = padrao['faixa']
+        if not numeros or any(n < num_min or n > num_max for n in numeros):
+            return jsonify({
+                'success': False,
+                'error': f'Informe as dezenas escolhidas entre {num_min} e {num_max}'
+            }), 400
+        if len(numeros) > padrao['max_dezenas']:
+            return jsonify({
+                'success': False,
+                'error': f"Escolha no máximo {padrao['max_dezenas']} dezenas para o fechamento"
+            }), 400
+
+        tamanho_aposta = int(data.get('tamanho_aposta', padrao['tamanho_aposta']))
+        minimo, maximo = obter_config(loteria)['qtd_aposta']
+        if not minimo <= tamanho_aposta <= maximo:
+            return jsonify({
+                'success': False,
+                'error': f'O tamanho da aposta deve ficar entre {minimo} e {maximo} dezenas'
+            }), 400
+        acertos = int(data.get('acertos', tamanho_aposta - 2))
+        sorteadas = int(data.get('sorteadas', min(padrao['sorteadas'], len(numeros))))
+        tempo_max = min(float(data.get('tempo_max', FECHAMENTO_TEMPO_MAX)), FECHAMENTO_TEMPO_MAX)
+
+        fechamento = gerar_fechamento(numeros, tamanho_aposta, acertos, sorteadas, tempo_max=tempo_max,
+                                      tempo_guloso=FECHAMENTO_TEMPO_GULOSO)
+
+        loteria_preco = 'mais_milionaria' if loteria == 'milionaria' else loteria
+        valor_unitario = valor_aposta(loteria_preco, tamanho_aposta, 2 if loteria == 'milionaria' else None)
+        fechamento['valor_unitario'] = valor_unitario
+        fechamento['valor_total'] = round(valor_unitario * fechamento['quantidade'], 2)
+
+        return jsonify({
+            'success': True,
+            'loteria': loteria,
+            'fechamento': fechamento
+        })
+
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @bp_boloes.route('/estatisticas', methods=['GET'])
 def estatisticas_boloes():
     """Retorna estatísticas gerais dos bolões"""
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Backtest de um perfil de preferências dos geradores inteligentes
+(services/backtest.py) sobre o histórico de concursos.
+
+As preferências vêm de um JSON no mesmo formato enviado pelo front nas
+gerações premium. O histórico é dividido entre processos (--processos).
+
+Uso:
+    python scripts/backtest.py megasena --preferencias prefs.json
+    python scripts/backtest.py quina --apostas 100 --de 6000 --processos 4
+    python scripts/backtest.py lotofacil --detalhar --saida resultado.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.backtest import GERADORES, backtest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest dos geradores inteligentes")
+    parser.add_argument("loteria", choices=sorted(GERADORES))
+    parser.add_argument("--preferencias", help="arquivo JSON com as preferências (padrão: nenhuma)")
+    parser.add_argument("--apostas", type=int, default=10, help="apostas geradas por concurso")
+    parser.add_argument("--de", type=int, default=None, help="primeiro concurso testado")
+    parser.add_argument("--ate", type=int, default=None, help="último concurso testado")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--detalhar", action="store_true", help="inclui o resumo de cada concurso")
+    parser.add_argument("--semente", default=None, help="refaz um backtest anterior (semente impressa no fim)")
+    parser.add_argument("--saida", help="grava o resultado completo em JSON")
+    args = parser.parse_args()
+
+    preferencias = {}
+    if args.preferencias:
+        with open(args.preferencias, "r", encoding="utf-8") as f:
+            preferencias = json.load(f)
+
+    resultado = backtest(
+        args.loteria, preferencias, apostas_por_concurso=args.apostas,
+        concurso_inicial=args.de, concurso_final=args.ate,
+        processos=args.processos, detalhar=args.detalhar, semente=args.semente,
+    )
+
+    print(f"🎯 {args.loteria}: concursos {resultado['concurso_inicial']}-{resultado['concurso_final']} "
+          f"({resultado['concursos']}), {resultado['apostas']} apostas")
+    print(f"   média de acertos {resultado['media_acertos']:.4f} x aleatória {resultado['media_aleatoria']:.4f}")
+    print(f"   {'faixa':<12} {'apostas':>8} {'aleatório':>10}")
+    for nome, faixa in resultado["faixas"].items():
+        print(f"   {nome:<12} {faixa['apostas']:>8} {faixa['esperado_aleatorio']:>10.2f}")
+    print(f"⏱️  {resultado['tempo_s']:.1f}s (semente {resultado['semente']})")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"📦 {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
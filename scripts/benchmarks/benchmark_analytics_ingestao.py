@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Teste de carga do /api/track: gravação por beacon (add + commit no pedido,
+o caminho antigo) x fila + escritor em lote (services/analytics_ingestao.py).
+
+Sobe um app Flask mínimo com o mesmo modelo ``Event`` num SQLite temporário,
+dispara os beacons pelo test client em várias threads (como os threads do
+gunicorn) e mede:
+    - eventos/s aceitos pelo endpoint;
+    - eventos/s até estarem todos gravados em li_events;
+    - latência média por pedido.
+Por fim, uma rajada contra uma fila pequena mostra os contadores de descarte.
+
+Uso:
+    python scripts/benchmarks/benchmark_analytics_ingestao.py
+    python scripts/benchmarks/benchmark_analytics_ingestao.py --eventos 20000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask, request
+
+from analytics_models import Event, db
+from services.analytics_ingestao import IngestorEventos, evento_da_requisicao
+
+BEACON = json.dumps({
+    "event": "hb", "path": "/megasena", "ref": "", "session_id": "7d1c4c2e-sessao",
+    "visitor_id": "0b9e8f0a-visitante", "duration_ms": 15000, "device": "desktop",
+})
+HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)", "Content-Type": "text/plain"}
+
+
+def _app(capacidade, lote, intervalo_ms):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'li.db')}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    ingestor = IngestorEventos(app, capacidade=capacidade, lote=lote, intervalo_ms=intervalo_ms)
+
+    @app.post("/antes")
+    def antes():
+        evento = evento_da_requisicao(request)
+        if evento is not None:
+            db.session.add(Event(**evento))
+            db.session.commit()
+        return "", 204
+
+    @app.post("/api/track")
+    def track():
+        evento = evento_da_requisicao(request)
+        if evento is not None:
+            ingestor.enfileirar(evento)
+        return "", 204
+
+    return app, ingestor
+
+
+def _disparar(app, rota, eventos, threads):
+    por_thread = max(1, eventos // threads)
+
+    def trabalho(_):
+        cliente = app.test_client()
+        for _ in range(por_thread):
+            cliente.post(rota, data=BEACON, headers=HEADERS)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(trabalho, range(threads)))
+    return por_thread * threads, time.perf_counter() - t0
+
+
+def _gravados(app):
+    with app.app_context():
+        return db.session.query(db.func.count(Event.id)).scalar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga da ingestão do analytics")
+    parser.add_argument("--eventos", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--intervalo-ms", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"⏱️  {args.eventos} beacons em {args.threads} threads")
+
+    app, _ = _app(10 * args.eventos, args.lote, args.intervalo_ms)
+    total, tempo = _disparar(app, "/antes", args.eventos, args.threads)
+    print(f"   antes  (commit por beacon): {total / tempo:>9,.0f} eventos/s aceitos e gravados, "
+          f"{1000 * tempo * args.threads / total:.2f} ms/pedido ({_gravados(app)} gravados)")
+
+    app, ingestor = _app(10 * args.eventos, args.lote, args.intervalo_ms)
+    total, tempo = _disparar(app, "/api/track", args.eventos, args.threads)
+    t0 = time.perf_counter()
+    ingestor.aguardar(60)
+    tempo_gravado = tempo + (time.perf_counter() - t0)
+    estatisticas = ingestor.estatisticas()
+    print(f"   depois (fila + lote):        {total / tempo:>9,.0f} eventos/s aceitos, "
+          f"{1000 * tempo * args.threads / total:.2f} ms/pedido; "
+          f"{total / tempo_gravado:,.0f} eventos/s gravados em {estatisticas['lotes']} lotes ({_gravados(app)} gravados)")
+    ingestor.parar()
+
+    # Rajada contra fila pequena e escritor lento (intervalo longo, lote grande)
+    app, ingestor = _app(1000, 10 * args.eventos, 60000)
+    _disparar(app, "/api/track", args.eventos, args.threads)
+    estatisticas = ingestor.estatisticas()
+    print(f"\n🚧 Fila de 1000: {estatisticas['aceitos']} aceitos, {estatisticas['descartados']} descartados, "
+          f"pico {estatisticas['pico_fila']}")
+    ingestor.parar()
+    print(f"   Drenado no encerramento: {_gravados(app)} gravados")
+
+
+if __name__ == "__main__":
+    main()
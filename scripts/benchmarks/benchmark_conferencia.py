@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: conferência de apostas contra o histórico (services/conferencia.py).
+
+Para cada loteria gera apostas e concursos sintéticos (10 mil x 3 mil por
+padrão) e mede a matriz de acertos por bitmask + popcount e a agregação por
+faixa, contra a conferência legada por interseção de conjuntos (medida numa
+amostra de apostas e extrapolada). As duas precisam dar os mesmos acertos.
+
+Uso:
+    python scripts/benchmarks/benchmark_conferencia.py
+    python scripts/benchmarks/benchmark_conferencia.py --apostas 2000 --concursos 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from funcoes.common.config import obter_config
+from services.conferencia import Conferencia
+from services.draw_store import LOTERIAS
+
+# loteria -> números por aposta
+TAMANHOS = {"megasena": 6, "quina": 5, "lotofacil": 15, "mais_milionaria": 6, "lotomania": 50}
+AMOSTRA_LEGADO = 100
+
+
+def _sortear(rng, quantidade, num_min, num_max, k):
+    chaves = rng.random((quantidade, num_max - num_min + 1))
+    return np.sort(chaves.argpartition(k, axis=1)[:, :k] + num_min, axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da conferência de apostas")
+    parser.add_argument("--apostas", type=int, default=10_000)
+    parser.add_argument("--concursos", type=int, default=3_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+
+    print(f"⏱️  Conferência: {args.apostas} apostas x {args.concursos} concursos")
+    print(f"{'loteria':<16} {'bitmask (s)':>12} {'conjuntos (s, extrap.)':>24} {'ganho':>8}")
+    for loteria, k in TAMANHOS.items():
+        config = obter_config(loteria)
+        num_min, num_max = config["range"]
+        colunas = LOTERIAS[loteria]["colunas"]
+        sorteios = _sortear(rng, args.concursos, num_min, num_max, config["drawn"])
+        apostas = _sortear(rng, args.apostas, num_min, num_max, k).tolist()
+        trevos = None
+        if "trevos_range" in config:
+            t_min, t_max = config["trevos_range"]
+            sorteios = np.hstack([sorteios, _sortear(rng, args.concursos, t_min, t_max, config["trevos_drawn"])])
+            trevos = _sortear(rng, args.apostas, t_min, t_max, 2).tolist()
+        historico = (sorteios, np.arange(1, args.concursos + 1), colunas)
+
+        inicio = time.perf_counter()
+        conferencia = Conferencia(loteria, apostas, trevos, historico=historico)
+        for _ in conferencia.iterar():
+            pass
+        tempo_bitmask = time.perf_counter() - inicio
+
+        # Legado: interseção de conjuntos aposta a aposta, concurso a concurso
+        bolas = [set(s) for s in sorteios[:, :config["drawn"]].tolist()]
+        inicio = time.perf_counter()
+        legado = [[len(set(a) & s) for s in bolas] for a in apostas[:AMOSTRA_LEGADO]]
+        tempo_legado = (time.perf_counter() - inicio) * args.apostas / AMOSTRA_LEGADO
+
+        _, _, maximos, _ = next(conferencia.blocos(AMOSTRA_LEGADO))
+        assert (maximos == np.array(legado).max(axis=1)).all()
+        print(f"{loteria:<16} {tempo_bitmask:>12.3f} {tempo_legado:>24.2f} {tempo_legado / tempo_bitmask:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: fechamentos de bolão (funcoes/common/fechamento.py).
+
+Para desdobramentos típicos da Mega Sena, Quina e Lotofácil mede o tamanho
+e o tempo do guloso e o tempo que a busca local leva para chegar ao tamanho
+alvo (o da tabela pré-calculada), com algumas sementes. Também mostra o
+limite inferior de Schönheim quando a garantia é de cobertura pura (t = m).
+
+Uso:
+    python scripts/benchmarks/benchmark_fechamento.py
+    python scripts/benchmarks/benchmark_fechamento.py --tempo 20 --sementes 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from funcoes.common.fechamento import Fechamento, fechamento_tabelado, limite_schonheim
+
+# (rótulo, n, k, t, m)
+CASOS = [
+    ("Mega 12 dez. quadra se 6", 12, 6, 4, 6),
+    ("Mega 15 dez. quadra se 4", 15, 6, 4, 4),
+    ("Mega 15 dez. quina se 6", 15, 6, 5, 6),
+    ("Quina 10 dez. terno se 5", 10, 5, 3, 5),
+    ("Quina 12 dez. quadra se 4", 12, 5, 4, 4),
+    ("Lotofácil 18 dez. 14 pts", 18, 15, 14, 15),
+    ("Lotofácil 20 dez. 13 pts", 20, 15, 13, 15),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos fechamentos")
+    parser.add_argument("--tempo", type=float, default=10.0, help="limite por tentativa (s)")
+    parser.add_argument("--sementes", type=int, default=3)
+    args = parser.parse_args()
+
+    print("⏱️  Fechamentos: guloso x tempo até o tamanho alvo (tabela)")
+    print(f"{'caso':<28} {'alvos':>7} {'limite':>7} {'guloso':>7} {'(ms)':>8} {'alvo':>6} {'atingiu':>8} {'tempo (s)':>10}")
+    for rotulo, n, k, t, m in CASOS:
+        motor = Fechamento(n, k, t, m)
+        tabelado = fechamento_tabelado(n, k, t, m)
+        alvo = len(tabelado) if tabelado else None
+
+        tamanhos, tempos_guloso, tempos_alvo, atingiu = [], [], [], 0
+        for seed in range(args.sementes):
+            inicio = time.perf_counter()
+            tamanhos.append(len(motor.guloso(np.random.default_rng(seed))))
+            tempos_guloso.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            apostas = motor.calcular(tempo_max=args.tempo, tamanho_alvo=alvo, seed=seed)
+            tempos_alvo.append(time.perf_counter() - inicio)
+            assert motor.descobertos(apostas) == 0
+            atingiu += alvo is not None and len(apostas) <= alvo
+
+        limite = limite_schonheim(n, k, t) if t == m else "-"
+        print(f"{rotulo:<28} {len(motor.alvos):>7} {limite:>7} {min(tamanhos):>7} "
+              f"{statistics.median(tempos_guloso) * 1000:>8.1f} {alvo or '-':>6} "
+              f"{atingiu:>4}/{args.sementes:<3} {statistics.median(tempos_alvo):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Partições mensais dos eventos do analytics (services/analytics_particoes.py)
+x a li_events única de antes.
+
+Gera um histórico de ``--meses`` meses num SQLite temporário, grava o mesmo
+histórico nos dois formatos e mede:
+    - inserção em lote do mês corrente com o histórico inteiro no banco;
+    - contagem de sessões distintas nas últimas 24h e nos últimos 7 dias;
+    - a mesma contagem depois de arquivar em Parquet os meses frios.
+
+Uso:
+    python scripts/benchmarks/benchmark_particoes.py
+    python scripts/benchmarks/benchmark_particoes.py --meses 12 --por-mes 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask
+from sqlalchemy import func, insert, select
+
+from analytics_models import Event, db
+from services import analytics_particoes
+
+AGORA = datetime(2026, 6, 20, 12, 0, 0)
+
+
+def _app():
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _eventos(n, inicio, segundos, rng):
+    return [{
+        "ts": inicio + timedelta(seconds=rng.randrange(segundos)),
+        "event": rng.choice(["pageview", "click", "hb"]),
+        "path": "/megasena",
+        "session_id": f"s{rng.randrange(50000)}",
+        "visitor_id": f"v{rng.randrange(20000)}",
+        "duration_ms": rng.randrange(30000),
+    } for _ in range(n)]
+
+
+def _cronometrar(funcao, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="li_events única x partições mensais")
+    parser.add_argument("--meses", type=int, default=12)
+    parser.add_argument("--por-mes", type=int, default=50000)
+    parser.add_argument("--lote", type=int, default=500, help="eventos por lote na medição de inserção")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    historico = _eventos(args.meses * args.por_mes, AGORA - timedelta(days=30 * args.meses),
+                         30 * args.meses * 86400, rng)
+    novos = _eventos(args.lote * 20, AGORA - timedelta(hours=1), 3600, rng)
+    print(f"🔍 {len(historico)} eventos em {args.meses} meses; inserção em lotes de {args.lote}")
+
+    unica, particionada = _app(), _app()
+    with unica.app_context():
+        db.session.execute(insert(Event), historico)
+        db.session.commit()
+    with particionada.app_context():
+        analytics_particoes.inserir(db.session, historico)
+        db.session.commit()
+
+    def sessoes_unica(desde):
+        return db.session.execute(
+            select(func.count(func.distinct(Event.session_id))).where(Event.ts >= desde)).scalar()
+
+    for nome, app in (("li_events única", unica), ("partições", particionada)):
+        with app.app_context():
+            t0 = time.perf_counter()
+            for i in range(0, len(novos), args.lote):
+                if app is unica:
+                    db.session.execute(insert(Event), novos[i:i + args.lote])
+                else:
+                    analytics_particoes.inserir(db.session, novos[i:i + args.lote])
+                db.session.commit()
+            taxa = len(novos) / (time.perf_counter() - t0)
+            print(f"\n{nome}: inserção {taxa:,.0f} eventos/s")
+            for janela in (timedelta(days=1), timedelta(days=7)):
+                desde = AGORA - janela
+                if app is unica:
+                    ms, n = _cronometrar(lambda: sessoes_unica(desde))
+                else:
+                    ms, n = _cronometrar(lambda: analytics_particoes.contar_distintos("session_id", desde))
+                print(f"   sessões distintas em {janela.days}d: {n} em {ms:.1f} ms")
+
+    with particionada.app_context():
+        t0 = time.perf_counter()
+        arquivados = analytics_particoes.arquivar(AGORA)
+        print(f"\n🗄️ {len(arquivados)} meses arquivados em Parquet em {time.perf_counter() - t0:.1f}s")
+        ms, n = _cronometrar(lambda: analytics_particoes.contar_distintos("session_id", AGORA - timedelta(days=7)))
+        print(f"   sessões distintas em 7d após arquivar: {n} em {ms:.1f} ms")
+        ms, n = _cronometrar(lambda: analytics_particoes.contar_distintos("session_id"), repeticoes=1)
+        print(f"   sessões distintas no histórico (banco + Parquet): {n} em {ms:.1f} ms")
+    print("\n✅ Benchmark concluído")
+
+
+if __name__ == "__main__":
+    main()
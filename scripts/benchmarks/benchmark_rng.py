@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: sorteio de apostas com ``random.sample`` (módulo global) x fluxos
+``numpy.random.Generator`` por pedido (funcoes/common/rng.py).
+
+Mede, por loteria, apostas por segundo em quatro caminhos:
+    - random.sample: o caminho legado, estado global compartilhado;
+    - pedido: cria o fluxo da semente (criar_rng) e sorteia uma aposta, o
+      custo real de uma requisição com semente devolvida;
+    - fluxo: várias apostas seguidas do mesmo fluxo (sortear_numeros,
+      argpartition sobre chaves uniformes);
+    - lote: N apostas de uma vez (a mesma argpartition, em matriz).
+Em seguida roda os caminhos "random.sample" e "pedido" em threads, como sob
+o gunicorn, e confere que a mesma semente refaz a mesma aposta.
+
+Uso:
+    python scripts/benchmarks/benchmark_rng.py
+    python scripts/benchmarks/benchmark_rng.py --apostas 20000 --threads 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+
+from funcoes.common.rng import criar_rng, sortear_numeros
+
+# loteria -> (maior número, números por aposta)
+LOTERIAS = {"megasena": (60, 6), "quina": (80, 5), "lotofacil": (25, 15), "mais_milionaria": (50, 6), "lotomania": (100, 50)}
+
+
+def _legado(n, num_max, k):
+    for _ in range(n):
+        sorted(random.sample(range(1, num_max + 1), k))
+
+
+def _pedido(n, num_max, k):
+    for _ in range(n):
+        rng, _semente = criar_rng()
+        sortear_numeros(rng, 1, num_max, k)
+
+
+def _fluxo(n, num_max, k):
+    rng, _ = criar_rng()
+    for _ in range(n):
+        sortear_numeros(rng, 1, num_max, k)
+
+
+def _lote(n, num_max, k):
+    rng, _ = criar_rng()
+    chaves = rng.random((n, num_max))
+    np.sort(chaves.argpartition(k, axis=1)[:, :k] + 1, axis=1)
+
+
+def _medir(funcao, n, *args):
+    t0 = time.perf_counter()
+    funcao(n, *args)
+    return n / (time.perf_counter() - t0)
+
+
+def _medir_threads(funcao, n, threads, *args):
+    por_thread = max(1, n // threads)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: funcao(por_thread, *args), range(threads)))
+    return por_thread * threads / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos fluxos aleatórios dos geradores")
+    parser.add_argument("--apostas", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"⏱️  Apostas por segundo ({args.apostas} apostas por caminho)")
+    print(f"{'loteria':<16} {'random.sample':>14} {'pedido':>10} {'fluxo':>10} {'lote':>12}")
+    for loteria, (num_max, k) in LOTERIAS.items():
+        taxas = [_medir(f, args.apostas, num_max, k) for f in (_legado, _pedido, _fluxo, _lote)]
+        print(f"{loteria:<16} {taxas[0]:>14,.0f} {taxas[1]:>10,.0f} {taxas[2]:>10,.0f} {taxas[3]:>12,.0f}")
+
+    num_max, k = LOTERIAS["megasena"]
+    legado = _medir_threads(_legado, args.apostas, args.threads, num_max, k)
+    pedido = _medir_threads(_pedido, args.apostas, args.threads, num_max, k)
+    print(f"\n🧵 {args.threads} threads (Mega Sena): random.sample {legado:,.0f}/s x pedido {pedido:,.0f}/s")
+
+    rng, semente = criar_rng()
+    aposta = sortear_numeros(rng, 1, num_max, k)
+    refeita = sortear_numeros(criar_rng(semente)[0], 1, num_max, k)
+    print(f"🔁 Semente {semente}: {aposta} -> {'refeita' if refeita == aposta else 'DIFERENTE'}")
+
+
+if __name__ == "__main__":
+    main()
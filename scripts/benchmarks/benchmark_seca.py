@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: análise de seca (loop iterrows legado x kernel vetorizado).
+
+Gera sorteios sintéticos da Mega Sena (6 de 60) com 350 e 3000 concursos e
+mede a latência de `calcular_seca_numeros_megasena` contra a implementação
+anterior (uma varredura `iterrows` por número), conferindo que ambas dão o
+mesmo resultado.
+
+Uso:
+    python scripts/benchmarks/benchmark_seca.py
+"""
+
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import numpy as np
+import pandas as pd
+
+from funcoes.megasena.calculos_MS import calcular_seca_numeros_megasena
+
+logging.disable(logging.INFO)
+
+COLUNAS = [f'Bola{i}' for i in range(1, 7)]
+
+
+def gerar_sorteios(qtd, seed=42):
+    rng = np.random.default_rng(seed)
+    bolas = np.sort(rng.random((qtd, 60)).argsort(axis=1)[:, :6] + 1, axis=1)
+    df = pd.DataFrame(bolas, columns=COLUNAS).astype('Int64')
+    df.insert(0, 'Concurso', np.arange(1, qtd + 1))
+    return df
+
+
+def seca_legado(df):
+    """Implementação anterior: uma varredura iterrows por número."""
+    df_validos = df.sort_values('Concurso', ascending=False).reset_index(drop=True)
+    seca = {}
+    for numero in range(1, 61):
+        seca_atual = 0
+        encontrou = False
+        for _, row in df_validos.iterrows():
+            bolas_concurso = [row[col] for col in COLUNAS if pd.notna(row[col]) and 1 <= row[col] <= 60]
+            if numero in bolas_concurso:
+                encontrou = True
+                break
+            seca_atual += 1
+        seca[numero] = seca_atual if encontrou else len(df_validos)
+    return seca
+
+
+def medir(func, *args, repeticoes=3):
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main() -> None:
+    print("⏱️  Benchmark de seca (Mega Sena, 60 números)")
+    print(f"{'concursos':>10} {'legado (ms)':>14} {'kernel (ms)':>14} {'ganho':>8}")
+    for qtd in (350, 3000):
+        df = gerar_sorteios(qtd)
+        t_legado, legado = medir(seca_legado, df, repeticoes=1)
+        t_kernel, novo = medir(calcular_seca_numeros_megasena, df)
+        assert all(novo['seca_por_numero'][n]['seca_atual'] == legado[n] for n in range(1, 61))
+        print(f"{qtd:>10} {t_legado * 1000:>14.1f} {t_kernel * 1000:>14.2f} {t_legado / t_kernel:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Painel "agora" do analytics: COUNT(DISTINCT session_id) dos últimos 60s no
+banco a cada poll (o caminho antigo) x janela deslizante em memória
+(services/analytics_tempo_real.py).
+
+Gera ``--dias`` de histórico nas partições de um SQLite temporário e mede:
+    - a consulta no banco por poll;
+    - o custo de registrar os eventos na janela (por evento);
+    - a leitura do resumo da janela (online, top páginas, cliques), só com a
+      memória e juntando retratos de ``--workers`` workers.
+
+Uso:
+    python scripts/benchmarks/benchmark_tempo_real.py
+    python scripts/benchmarks/benchmark_tempo_real.py --dias 30 --online 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from flask import Flask
+
+from analytics_models import db
+from services import analytics_particoes
+from services.analytics_tempo_real import JanelaDeslizante
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _eventos(n, inicio, segundos, sessoes, rng):
+    return [{
+        "ts": inicio + timedelta(seconds=rng.random() * segundos),
+        "event": rng.choice(["pageview", "hb", "hb", "click"]),
+        "label": rng.choice(["gerar", "premium", "conferir"]),
+        "path": rng.choice(["/", "/megasena", "/quina", "/lotofacil"]),
+        "session_id": f"s{rng.randrange(sessoes)}",
+    } for _ in range(n)]
+
+
+def _ms(funcao, repeticoes):
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - t0) * 1000 / repeticoes, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Online agora: banco x janela em memória")
+    parser.add_argument("--dias", type=int, default=14, help="histórico no banco")
+    parser.add_argument("--por-dia", type=int, default=20000)
+    parser.add_argument("--online", type=int, default=500, help="sessões ativas no último minuto")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    agora = datetime.utcnow()
+    ultimo_minuto = _eventos(args.online * 4, agora - timedelta(seconds=60), 60, args.online, rng)
+    historico = _eventos(args.dias * args.por_dia, agora - timedelta(days=args.dias), args.dias * 86400, 50000, rng)
+
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        analytics_particoes.inserir(db.session, historico + ultimo_minuto)
+        db.session.commit()
+        desde = agora - timedelta(seconds=60)
+        ms, online = _ms(lambda: analytics_particoes.contar_distintos("session_id", desde), 20)
+        print(f"🔍 {len(historico) + len(ultimo_minuto)} eventos no banco")
+        print(f"   banco: {online} online em {ms:.2f} ms por poll")
+
+    segundo = (agora - _EPOCA).total_seconds()
+    ultimo_minuto.sort(key=lambda e: e["ts"])
+    janela = JanelaDeslizante(segundos=60)
+    t0 = time.perf_counter()
+    for i in range(0, len(ultimo_minuto), 50):
+        janela.registrar(ultimo_minuto[i:i + 50], agora=segundo)
+    por_evento = (time.perf_counter() - t0) * 1e6 / len(ultimo_minuto)
+    ms, resumo = _ms(lambda: janela.resumo(agora=segundo), 1)
+    print(f"   janela: registrar {por_evento:.1f} µs/evento; resumo {resumo['online']} online em {ms:.3f} ms")
+
+    # Vários workers: cada um vê parte dos beacons e publica o retrato
+    diretorio = os.path.join(pasta, "tempo_real")
+    janelas = [JanelaDeslizante(segundos=60, diretorio=diretorio) for _ in range(args.workers)]
+    for i, evento in enumerate(ultimo_minuto):
+        janelas[i % args.workers].registrar([evento], agora=segundo)
+    for i, outra in enumerate(janelas[1:], start=1):
+        outra.publicar(agora=segundo, forcar=True)
+        os.replace(outra._caminho(), os.path.join(diretorio, f"worker{i}.json"))
+    ms, resumo = _ms(lambda: janelas[0].resumo(agora=segundo), 1)
+    print(f"   janela com {args.workers} workers: {resumo['online']} online em {ms:.2f} ms "
+          f"(calculado no máximo 1x/s; as conexões SSE reusam)")
+    print("\n✅ Benchmark concluído")
+
+
+if __name__ == "__main__":
+    main()
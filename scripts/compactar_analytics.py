@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compactador do analytics: rollups (services/analytics_rollups.py) e
+retenção das partições de eventos (services/analytics_particoes.py).
+
+Recompõe os rollups de dias fechados a partir dos eventos (corrige lotes
+perdidos e eventos gravados antes dos rollups), poda os minutos e os
+sketches por hora fora da retenção, arquiva em Parquet as partições mensais
+mais antigas que ``--meses-quentes`` e cria a partição do próximo mês.
+Pensado para rodar uma vez por dia.
+
+Uso:
+    python scripts/compactar_analytics.py                    # ontem + poda + retenção
+    python scripts/compactar_analytics.py --dias 7           # os 7 dias antes de hoje
+    python scripts/compactar_analytics.py --tudo             # histórico inteiro
+    python scripts/compactar_analytics.py --meses-quentes 6  # 6 meses no banco
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from flask import Flask
+
+from analytics_models import RollupDia, RollupMinuto, SketchDistintos, db
+from services import analytics_particoes, analytics_rollups
+
+
+def _app():
+    """App mínimo com o mesmo banco do app.py (config.env / DATABASE_URL)."""
+    config = os.path.join(RAIZ, "config.env")
+    if os.path.exists(config):
+        with open(config, "r") as f:
+            for line in f:
+                if line.strip() and not line.startswith("#"):
+                    key, value = line.strip().split("=", 1)
+                    os.environ[key] = value
+    app = Flask("app", root_path=RAIZ, instance_path=os.path.join(RAIZ, "instance"))
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///li.db")
+    db.init_app(app)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rollups e retenção das partições do analytics")
+    parser.add_argument("--dias", type=int, default=1, help="dias fechados antes de hoje a recompor")
+    parser.add_argument("--tudo", action="store_true", help="recompõe todo o histórico de eventos")
+    parser.add_argument("--meses-quentes", type=int, default=analytics_particoes.MESES_QUENTES,
+                        help="meses (contando o corrente) que ficam no banco; os anteriores vão para Parquet")
+    args = parser.parse_args()
+
+    with _app().app_context():
+        analytics_particoes.migrar()
+        db.metadata.create_all(db.engine, tables=[RollupMinuto.__table__, RollupDia.__table__, SketchDistintos.__table__])
+        t0 = time.perf_counter()
+        if args.tudo:
+            total = analytics_rollups.recompor_historico()
+        else:
+            hoje = datetime.utcnow().date()
+            total = analytics_rollups.recompor_dias([hoje - timedelta(days=i) for i in range(1, args.dias + 1)])
+        analytics_rollups.podar()
+        print(f"✅ {total} eventos reagregados em {time.perf_counter() - t0:.1f}s; minutos antigos podados")
+        arquivados = analytics_particoes.arquivar(meses_quentes=args.meses_quentes)
+        if arquivados:
+            print(f"🗄️ Partições arquivadas em Parquet: {', '.join(map(str, arquivados))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compila as planilhas de LoteriasExcel/*.xlsx no store binário de sorteios
+(services/draw_store.py). Rode após substituir qualquer `*_edt.xlsx`; o
+gunicorn também executa esta etapa no `on_starting`.
+
+Uso:
+    python scripts/compilar_draw_store.py           # só o que estiver desatualizado
+    python scripts/compilar_draw_store.py --forcar  # recompila tudo
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.draw_store import compilar_todas, STORE_DIR
+
+
+def main() -> None:
+    forcar = "--forcar" in sys.argv[1:]
+    resultado = compilar_todas(forcar=forcar)
+    print(f"📦 Store: {STORE_DIR}")
+    for loteria, regravado in resultado.items():
+        print(f"   {'✅ compilado' if regravado else '⏭️  atualizado'}: {loteria}")
+
+
+if __name__ == "__main__":
+    main()
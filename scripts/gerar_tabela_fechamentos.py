@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gera a tabela de fechamentos pré-calculados (funcoes/common/fechamentos_tabela.json)
+para os desdobramentos mais pedidos da Mega Sena, Quina e Lotofácil.
+
+Cada caso roda o motor (guloso + busca local) com um orçamento de tempo;
+um caso só é substituído se o novo fechamento for válido e menor que o da
+tabela atual, então rodar de novo (ou com mais tempo) só melhora a tabela.
+
+Uso:
+    python scripts/gerar_tabela_fechamentos.py                  # todos os casos
+    python scripts/gerar_tabela_fechamentos.py --loteria quina --tempo 30
+    python scripts/gerar_tabela_fechamentos.py --processos 4
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from funcoes.common.fechamento import CAMINHO_TABELA, Fechamento, chave_tabela
+
+# loteria -> (tamanho da aposta, dezenas escolhidas, garantias (acertos, sorteadas))
+CASOS = {
+    "megasena": (6, range(7, 16), [(4, 4), (4, 5), (4, 6), (5, 5), (5, 6)]),
+    "quina": (5, range(6, 13), [(3, 3), (3, 4), (3, 5), (4, 4), (4, 5)]),
+    "lotofacil": (15, range(16, 21), [(11, 15), (12, 15), (13, 15), (14, 15)]),
+}
+
+
+def _calcular(caso):
+    n, k, t, m, tempo, seed = caso
+    motor = Fechamento(n, k, t, m)
+    inicio = time.perf_counter()
+    apostas = motor.calcular(tempo_max=tempo, seed=seed, tempo_guloso=None)
+    if motor.descobertos(apostas):
+        return caso, None, time.perf_counter() - inicio
+    return caso, [list(a) for a in apostas], time.perf_counter() - inicio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tabela de fechamentos pré-calculados")
+    parser.add_argument("--loteria", action="append", choices=sorted(CASOS), help="loteria a processar (pode repetir)")
+    parser.add_argument("--tempo", type=float, default=6.0, help="segundos de busca por caso")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    tabela = {}
+    if os.path.exists(CAMINHO_TABELA):
+        with open(CAMINHO_TABELA, "r", encoding="utf-8") as f:
+            tabela = json.load(f).get("fechamentos", {})
+
+    casos = [
+        (n, k, t, m, args.tempo, args.seed)
+        for loteria in (args.loteria or sorted(CASOS))
+        for k, dezenas, garantias in [CASOS[loteria]]
+        for n in dezenas
+        for t, m in garantias
+        if m <= n
+    ]
+    print(f"🎯 {len(casos)} casos, {args.tempo:.0f}s cada")
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processos) as pool:
+        for (n, k, t, m, _, _), apostas, duracao in pool.map(_calcular, casos):
+            chave = chave_tabela(n, k, t, m)
+            anterior = tabela.get(chave)
+            if apostas is None:
+                print(f"   ⚠️  {chave}: fechamento incompleto, mantido o anterior")
+            elif anterior is None or len(apostas) < len(anterior):
+                tabela[chave] = apostas
+                print(f"   ✅ {chave}: {len(apostas)} apostas ({duracao:.1f}s)"
+                      + (f", antes {len(anterior)}" if anterior else ""))
+            else:
+                print(f"   ⏭️  {chave}: {len(apostas)} apostas, mantidas as {len(anterior)} da tabela")
+
+    ordenadas = sorted(tabela.items(), key=lambda item: tuple(int(x) for x in item[0].split("-")))
+    with open(CAMINHO_TABELA, "w", encoding="utf-8") as f:
+        f.write('{"formato": "n-k-t-m -> apostas (índices das dezenas escolhidas, em ordem)",\n "fechamentos": {\n')
+        f.write(",\n".join(f"  {json.dumps(chave)}: {json.dumps(apostas, separators=(',', ':'))}"
+                           for chave, apostas in ordenadas))
+        f.write("\n }\n}\n")
+    print(f"📦 {CAMINHO_TABELA}: {len(tabela)} fechamentos")
+    print(f"⏱️  {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pré-calcula as respostas das APIs de análise para a versão atual de cada
+planilha (services/precomputo_analises.py) e publica os artefatos.
+
+Uso:
+    python scripts/precomputar_analises.py                       # só loterias com versão nova
+    python scripts/precomputar_analises.py --loteria quina       # uma loteria
+    python scripts/precomputar_analises.py --forcar --processos 4
+    python scripts/precomputar_analises.py --janelas 50 100
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.precomputo_analises import ARTEFATOS_DIR, JANELAS_PADRAO, precomputar
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pré-cálculo das análises por versão dos dados")
+    parser.add_argument("--loteria", action="append", help="loteria a processar (pode repetir)")
+    parser.add_argument("--janelas", type=int, nargs="+", default=list(JANELAS_PADRAO))
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--forcar", action="store_true", help="recalcula mesmo sem versão nova")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    inicio = time.perf_counter()
+    resultado = precomputar(args.loteria, janelas=args.janelas, processos=args.processos, forcar=args.forcar)
+
+    print(f"📦 Artefatos: {ARTEFATOS_DIR}")
+    if not resultado:
+        print("   ⏭️  nada a fazer: todas as versões já publicadas")
+    for loteria, info in resultado.items():
+        print(f"   ✅ {loteria}: {info['artefatos']} artefatos (versão {info['versao']})")
+        for falha in info["falhas"]:
+            print(f"      ⚠️  {falha}")
+    print(f"⏱️  {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agregados incrementais por loteria (funcoes/common/agregados.py).
+
+Mantém, por processo, os agregados correntes de cada loteria (histórico
+inteiro e janelas pedidas) a partir do draw store. Quando a planilha ganha
+concursos novos no fim, só esses concursos são aplicados como delta (e as
+janelas descartam os que saem); o recálculo completo fica restrito aos casos
+em que o histórico já existente foi editado. Cada estado guarda a versão
+dos dados (``versao_dados``) de onde saiu; as consultas ressincronizam
+quando a planilha mudou, mesmo que ninguém tenha chamado ``sincronizar``.
+
+As análises de frequência, seca e pares consultam estes agregados por
+``consultar_recorte`` quando o recorte pedido é a cauda do histórico do
+store; as janelas ficam num LRU de ``JANELAS_MAX`` por loteria.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from funcoes.common.agregados import AgregadosIncrementais
+from funcoes.common.config import obter_config
+from services.draw_store import LOTERIAS, carregar_matriz_sorteios, compilar_loteria, versao_dados
+
+logger = logging.getLogger(__name__)
+
+_estado = {}  # loteria -> {"versao", "sorteios", "concursos", "agregados": OrderedDict {janela: AgregadosIncrementais}}
+_lock = threading.Lock()
+JANELAS_MAX = 16  # janelas mantidas por loteria, além do histórico inteiro
+_CHAVES_STORE = {"+milionaria": "mais_milionaria", "milionaria": "mais_milionaria"}
+
+
+def _ler_store(loteria):
+    """Retorna (sorteios int64 só com os números, concursos) ou None."""
+    aberto = carregar_matriz_sorteios(loteria)
+    if aberto is None and compilar_loteria(loteria):
+        aberto = carregar_matriz_sorteios(loteria)
+    if aberto is None:
+        return None
+    sorteios, concursos, _ = aberto
+    bolas = obter_config(loteria)["drawn"]  # +Milionária: trevos ficam de fora
+    return np.array(sorteios[:, :bolas], dtype=np.int64), np.array(concursos, dtype=np.int64)
+
+
+def _novo_agregado(loteria, sorteios, janela):
+    num_min, num_max = obter_config(loteria)["range"]
+    agregados = AgregadosIncrementais(num_min, num_max, sorteios.shape[1], janela)
+    agregados.reconstruir(sorteios)
+    return agregados
+
+
+def sincronizar(loteria):
+    """
+    Alinha os agregados da loteria com o store atual.
+
+    Returns:
+        str: "inalterado", "incremental" (só concursos novos aplicados),
+        "completo" (histórico editado ou primeira carga) ou "indisponivel".
+    """
+    if loteria not in LOTERIAS:
+        return "indisponivel"
+    # Lida antes do store: se a planilha mudar no meio, a próxima consulta ressincroniza
+    versao = versao_dados(loteria)
+    lido = _ler_store(loteria)
+    if lido is None:
+        return "indisponivel"
+    sorteios, concursos = lido
+
+    with _lock:
+        estado = _estado.get(loteria)
+        if estado is None:
+            _estado[loteria] = {
+                "versao": versao,
+                "sorteios": sorteios,
+                "concursos": concursos,
+                "agregados": OrderedDict({None: _novo_agregado(loteria, sorteios, None)}),
+            }
+            return "completo"
+
+        antigos = len(estado["sorteios"])
+        prefixo_igual = (
+            len(sorteios) >= antigos
+            and np.array_equal(concursos[:antigos], estado["concursos"])
+            and np.array_equal(sorteios[:antigos], estado["sorteios"])
+        )
+        estado["versao"] = versao
+        if prefixo_igual and len(sorteios) == antigos:
+            return "inalterado"
+
+        if prefixo_igual:
+            novos = sorteios[antigos:]
+            for agregados in estado["agregados"].values():
+                agregados.estender(novos)
+            modo = "incremental"
+        else:
+            for agregados in estado["agregados"].values():
+                agregados.reconstruir(sorteios)
+            modo = "completo"
+        estado["sorteios"], estado["concursos"] = sorteios, concursos
+
+    logger.info(f"Agregados de {loteria} atualizados ({modo}): {len(sorteios)} concursos")
+    return modo
+
+
+def obter_agregados(loteria, janela=None):
+    """
+    Agregados correntes da loteria (últimos ``janela`` concursos, se
+    informado). Janelas novas são montadas na primeira consulta e passam a
+    ser mantidas por delta junto com as demais.
+
+    Returns:
+        AgregadosIncrementais | None
+    """
+    if janela is not None and janela <= 0:
+        janela = None
+    if not _atualizado(loteria):
+        return None
+
+    with _lock:
+        estado = _estado[loteria]
+        return _janela(estado, loteria, janela)
+
+
+def _atualizado(loteria):
+    """
+    Garante agregados da versão atual dos dados (concurso passado corrigido
+    ou planilha trocada sem passar por ``carregar_dados_da_loteria``).
+
+    Returns:
+        bool: False se a loteria não está disponível no store.
+    """
+    with _lock:
+        estado = _estado.get(loteria)
+    if estado is not None and estado["versao"] == versao_dados(loteria):
+        return True
+    return sincronizar(loteria) != "indisponivel"
+
+
+def _janela(estado, loteria, janela):
+    """Agregados da janela (chamado com o lock); a menos usada sai do LRU."""
+    agregados = estado["agregados"].get(janela)
+    if agregados is None:
+        agregados = _novo_agregado(loteria, estado["sorteios"], janela)
+        estado["agregados"][janela] = agregados
+        janelas = [j for j in estado["agregados"] if j is not None]
+        if len(janelas) > JANELAS_MAX:
+            del estado["agregados"][janelas[0]]
+    estado["agregados"].move_to_end(janela)
+    return agregados
+
+
+def consultar_recorte(loteria, concursos, consulta):
+    """
+    Responde uma análise pelos agregados, se ``concursos`` (em ordem
+    crescente) forem os últimos concursos do store.
+
+    Args:
+        loteria: chave do store ou apelido (``+milionaria``).
+        concursos: números dos concursos do recorte analisado.
+        consulta: ``consulta(agregados, concursos_do_store)``, executada com o
+            lock (os agregados não mudam no meio da leitura); deve devolver
+            cópias.
+
+    Returns:
+        O retorno de ``consulta``, ou None se o recorte não bate com o store
+        (quem chama recalcula a partir dos dados).
+    """
+    loteria = _CHAVES_STORE.get(loteria, loteria)
+    try:
+        concursos = np.asarray(concursos, dtype=np.int64)
+    except (TypeError, ValueError):
+        return None
+    if concursos.ndim != 1 or len(concursos) == 0:
+        return None
+    if not _atualizado(loteria):
+        return None
+
+    with _lock:
+        estado = _estado[loteria]
+        historico = estado["concursos"]
+        n = len(concursos)
+        if n > len(historico) or not np.array_equal(historico[-n:], concursos):
+            return None
+        agregados = _janela(estado, loteria, None if n == len(historico) else n)
+        return consulta(agregados, historico)
+
+
+def limpar():
+    """Descarta todos os agregados (próxima consulta recalcula do zero)."""
+    with _lock:
+        _estado.clear()
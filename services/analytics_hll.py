@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HyperLogLog para contagem aproximada de visitantes e sessões distintos.
+
+Cada sketch tem ``2^p`` registradores de 1 byte (p = 14: 16 KB, erro padrão
+de 1,04 / sqrt(2^14) ~ 0,8%); o registrador guarda o maior "número de zeros
+à esquerda + 1" visto entre os hashes que caem nele. Sketches de períodos
+diferentes se juntam com o máximo registrador a registrador, então a união
+de 24 horas ou 30 dias custa o mesmo que um sketch, seja qual for o número
+de eventos. A estimativa usa o estimador de Ertl, que cobre de poucos
+elementos (onde é quase exato) a bilhões sem correção de viés empírica.
+
+Os registradores são guardados comprimidos com zlib (sketches com poucos
+visitantes ocupam poucas dezenas de bytes).
+"""
+
+import hashlib
+import zlib
+
+import numpy as np
+
+PRECISAO = 14
+
+
+def _hash64(valor):
+    return int.from_bytes(hashlib.blake2b(str(valor).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _sigma(x):
+    if x == 1:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        anterior = z
+        z += x * y
+        y += y
+        if z == anterior:
+            return z
+
+
+def _tau(x):
+    if x in (0, 1):
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        anterior = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == anterior:
+            return z / 3
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog com ``2^precisao`` registradores."""
+
+    def __init__(self, precisao=PRECISAO, registradores=None):
+        if not 4 <= precisao <= 18:
+            raise ValueError("Precisão do HyperLogLog deve estar entre 4 e 18")
+        self.precisao = precisao
+        self.m = 1 << precisao
+        if registradores is None:
+            registradores = np.zeros(self.m, dtype=np.uint8)
+        self.registradores = registradores
+
+    def adicionar(self, valores):
+        """Adiciona os valores (qualquer iterável de strings/ids)."""
+        bits = 64 - self.precisao
+        resto = (1 << bits) - 1
+        indices, postos = [], []
+        for valor in valores:
+            h = _hash64(valor)
+            indices.append(h >> bits)
+            postos.append(bits - (h & resto).bit_length() + 1)
+        if indices:
+            np.maximum.at(self.registradores, np.array(indices, dtype=np.int64), np.array(postos, dtype=np.uint8))
+        return self
+
+    def unir(self, outro):
+        """União (in place) com outro sketch da mesma precisão."""
+        if outro.precisao != self.precisao:
+            raise ValueError("Sketches com precisões diferentes")
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+
+    def contar(self):
+        """
+        Estimativa do número de elementos distintos, pelo estimador de Ertl
+        (2017): sem viés na transição entre poucos e muitos elementos, sem as
+        tabelas empíricas do HLL++.
+        """
+        m = self.m
+        q = 64 - self.precisao
+        histograma = np.bincount(self.registradores, minlength=q + 2).astype(np.float64)
+        z = m * _tau(1 - histograma[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histograma[k])
+        z += m * _sigma(histograma[0] / m)
+        return int(round(m * m / (2 * np.log(2) * z)))
+
+    def erro_padrao(self):
+        """Erro relativo padrão do estimador (1,04 / sqrt(m))."""
+        return 1.04 / np.sqrt(self.m)
+
+    def para_bytes(self):
+        return bytes([self.precisao]) + zlib.compress(self.registradores.tobytes())
+
+    @classmethod
+    def de_bytes(cls, dados):
+        precisao = dados[0]
+        registradores = np.frombuffer(zlib.decompress(dados[1:]), dtype=np.uint8).copy()
+        return cls(precisao, registradores)
+
+    def __len__(self):
+        return self.contar()
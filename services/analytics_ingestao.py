@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ingestão assíncrona dos eventos do analytics (/api/track).
+
+O beacon só valida o payload e põe o evento numa fila limitada em memória;
+um escritor em segundo plano grava os eventos na partição do mês
+(services/analytics_particoes.py) em lotes, um INSERT executemany por lote,
+a cada ``ANALYTICS_LOTE`` eventos ou ``ANALYTICS_INTERVALO_MS``
+milissegundos, o que vier primeiro. Assim o
+pedido não espera commit nem disputa o lock de escrita do SQLite, e os
+heartbeats viram uma escrita por lote em vez de uma por interação. Na mesma
+transação o lote é somado nos rollups do painel (services/analytics_rollups.py;
+``ANALYTICS_ROLLUPS=0`` desliga). Antes de gravar, o lote alimenta a janela
+em memória do painel "agora" (services/analytics_tempo_real.py).
+
+Com a fila cheia (banco lento ou fora) o evento novo é descartado e contado
+em ``descartados``; falhas de gravação contam o lote em ``perdidos``. No fim
+do processo (atexit / ``worker_exit`` do gunicorn) a fila é drenada.
+
+O escritor é iniciado no primeiro evento de cada processo: com
+``preload_app`` o app é importado no master e as threads não sobrevivem ao
+fork dos workers.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from analytics_models import db
+from services import analytics_particoes, analytics_rollups, analytics_tempo_real
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_MAXIMO_PAYLOAD = 50000
+CAPACIDADE_FILA = int(os.getenv("ANALYTICS_FILA", 10000))
+TAMANHO_LOTE = int(os.getenv("ANALYTICS_LOTE", 500))
+INTERVALO_MS = int(os.getenv("ANALYTICS_INTERVALO_MS", 1000))
+ROLLUPS = os.getenv("ANALYTICS_ROLLUPS", "1") != "0"
+INTERVALO_PODA_S = 3600
+BOTS = ("bot", "spider", "crawler", "monitor", "uptime")
+
+
+def ler_payload(bruto, content_type=""):
+    """
+    Payload do beacon como dict. O ``sendBeacon`` envia texto puro, então o
+    corpo é lido como JSON independentemente do Content-Type.
+
+    Returns:
+        dict: payload, ou {} se não for um objeto JSON.
+    """
+    try:
+        data = json.loads(bruto.decode("utf-8") if isinstance(bruto, bytes) else bruto)
+    except (ValueError, UnicodeDecodeError):
+        logger.debug(f"Analytics: payload ilegível ({content_type})")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _texto(data, chave, tamanho):
+    valor = data.get(chave)
+    return str(valor)[:tamanho] if valor else ""
+
+
+def montar_evento(data, ua="", country="", ts=None):
+    """Linha de ``li_events`` (dict de colunas) a partir do payload, com os campos truncados."""
+    try:
+        duration_ms = int(data.get("duration_ms") or 0)
+    except (ValueError, TypeError):
+        duration_ms = 0
+    props = data.get("props")
+    return {
+        "ts": ts or datetime.utcnow(),
+        "event": _texto(data, "event", 32),
+        "label": _texto(data, "label", 128),
+        "path": _texto(data, "path", 255),
+        "referrer": _texto(data, "ref", 255),
+        "utm_source": _texto(data, "utm_source", 80),
+        "utm_medium": _texto(data, "utm_medium", 80),
+        "utm_campaign": _texto(data, "utm_campaign", 80),
+        "session_id": _texto(data, "session_id", 64),
+        "visitor_id": _texto(data, "visitor_id", 64),
+        "duration_ms": duration_ms,
+        "ua": (ua or "")[:200],
+        "country": (country or "")[:2],
+        "device": _texto(data, "device", 32),
+        "props": props if isinstance(props, dict) and props else None,
+    }
+
+
+def evento_da_requisicao(req):
+    """
+    Valida o beacon da requisição Flask.
+
+    Returns:
+        dict | None: evento pronto para a fila, ou None se rejeitado
+        (payload grande demais, bot ou corpo sem ``event``).
+    """
+    if req.content_length and req.content_length > TAMANHO_MAXIMO_PAYLOAD:
+        logger.warning("Analytics: Payload muito grande rejeitado")
+        return None
+    ua = req.headers.get("User-Agent", "")
+    if any(b in ua.lower() for b in BOTS):
+        return None
+    data = ler_payload(req.get_data(), req.headers.get("content-type", ""))
+    if not data.get("event"):
+        return None
+    return montar_evento(data, ua, req.headers.get("CF-IPCountry"))
+
+
+class IngestorEventos:
+    """
+    Fila limitada + escritor em lote dos eventos do analytics.
+
+    ``enfileirar`` nunca bloqueia nem toca no banco; ``estatisticas`` expõe
+    os contadores (aceitos, gravados, descartados, perdidos, lotes, pico da
+    fila) para ``/admin/analytics/_ingestao``.
+    """
+
+    def __init__(self, app=None, capacidade=CAPACIDADE_FILA, lote=TAMANHO_LOTE, intervalo_ms=INTERVALO_MS,
+                 rollups=ROLLUPS, tempo_real=None):
+        self.app = None
+        self.rollups = rollups
+        self.tempo_real = tempo_real or analytics_tempo_real.janela
+        self.capacidade = max(1, int(capacidade))
+        self.lote = max(1, int(lote))
+        self.intervalo = max(1, int(intervalo_ms)) / 1000
+        self._fila = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._parando = False
+        self._gravando = 0
+        self._esperando = 0
+        self._proxima_poda = 0.0
+        self._zerar_contadores()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.parar)
+
+    def _zerar_contadores(self):
+        self.contadores = {"aceitos": 0, "gravados": 0, "descartados": 0, "perdidos": 0, "lotes": 0, "pico_fila": 0}
+
+    def enfileirar(self, evento):
+        """
+        Põe o evento na fila.
+
+        Returns:
+            bool: False se a fila estava cheia e o evento foi descartado.
+        """
+        with self._cond:
+            self._garantir_escritor()
+            if len(self._fila) >= self.capacidade:
+                self.contadores["descartados"] += 1
+                descartados = self.contadores["descartados"]
+                if descartados & (descartados - 1) == 0:  # 1, 2, 4, 8... sem inundar o log
+                    logger.warning(f"Analytics: fila cheia ({self.capacidade}), {descartados} eventos descartados")
+                return False
+            self._fila.append(evento)
+            self.contadores["aceitos"] += 1
+            if len(self._fila) > self.contadores["pico_fila"]:
+                self.contadores["pico_fila"] = len(self._fila)
+            if len(self._fila) >= self.lote:
+                self._cond.notify_all()
+        return True
+
+    def _garantir_escritor(self):
+        """Inicia o escritor deste processo (chamado com o lock)."""
+        pid = os.getpid()
+        if self._pid != pid:
+            # Processo filho (fork): a fila e os contadores herdados são do pai
+            if self._pid is not None:
+                self._fila.clear()
+                self._zerar_contadores()
+                self._gravando = 0
+            self._pid = pid
+            self._thread = None
+            self._parando = False
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, name="analytics-ingestao", daemon=True)
+            self._thread.start()
+
+    def _proximo_lote(self):
+        """Espera lote cheio, o intervalo ou a parada; devolve os eventos a gravar."""
+        with self._cond:
+            prazo = time.monotonic() + self.intervalo
+            while len(self._fila) < self.lote and not (self._parando or (self._esperando and self._fila)):
+                resta = prazo - time.monotonic()
+                if resta <= 0:
+                    break
+                self._cond.wait(resta)
+            lote = [self._fila.popleft() for _ in range(min(self.lote, len(self._fila)))]
+            self._gravando = len(lote)
+            return lote
+
+    def _executar(self):
+        while True:
+            lote = self._proximo_lote()
+            if lote:
+                self.tempo_real.registrar(lote)
+                self._gravar(lote)
+            self.tempo_real.publicar()
+            with self._cond:
+                self._gravando = 0
+                self._cond.notify_all()
+                if self._parando and not self._fila:
+                    return
+
+    def _gravar(self, lote):
+        try:
+            with self.app.app_context():
+                try:
+                    analytics_particoes.inserir(db.session, lote)
+                    if self.rollups:
+                        analytics_rollups.acumular(db.session, lote)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Analytics: Erro ao gravar lote de {len(lote)} eventos - {e}")
+            with self._cond:
+                self.contadores["perdidos"] += len(lote)
+            return
+        with self._cond:
+            self.contadores["gravados"] += len(lote)
+            self.contadores["lotes"] += 1
+        if time.monotonic() >= self._proxima_poda:
+            self._proxima_poda = time.monotonic() + INTERVALO_PODA_S
+            try:
+                with self.app.app_context():
+                    analytics_particoes.garantir_particoes_correntes()
+                    if self.rollups:
+                        analytics_rollups.podar()
+            except Exception as e:
+                logger.warning(f"Analytics: Erro na manutenção horária (partições/rollups) - {e}")
+
+    def aguardar(self, timeout=5.0):
+        """Grava já o que está na fila e espera terminar; True se conseguiu no prazo."""
+        prazo = time.monotonic() + timeout
+        with self._cond:
+            self._esperando += 1
+            self._cond.notify_all()
+            try:
+                while self._fila or self._gravando:
+                    resta = prazo - time.monotonic()
+                    if resta <= 0:
+                        return False
+                    self._cond.wait(resta)
+            finally:
+                self._esperando -= 1
+        return True
+
+    def parar(self, timeout=5.0):
+        """Drena a fila e encerra o escritor (fim do processo)."""
+        with self._cond:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._parando = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            self._parando = False
+            pendentes = len(self._fila)
+        if pendentes:
+            logger.warning(f"Analytics: {pendentes} eventos não gravados no encerramento")
+
+    def estatisticas(self):
+        """Contadores da ingestão deste processo."""
+        with self._cond:
+            return {
+                **self.contadores,
+                "na_fila": len(self._fila),
+                "capacidade": self.capacidade,
+                "lote": self.lote,
+                "intervalo_ms": int(self.intervalo * 1000),
+                "escritor_ativo": bool(self._thread and self._thread.is_alive()),
+                "pid": os.getpid(),
+            }
+
+
+ingestor = IngestorEventos()
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Armazenamento particionado por mês dos eventos do analytics.
+
+``li_events`` deixa de ser uma tabela única crescendo para sempre:
+
+    - SQLite (e demais bancos): uma tabela por mês, ``li_events_pAAAAMM``,
+      só com o índice de ``ts``; a ``li_events`` original fica vazia depois
+      da migração e serve de molde do esquema;
+    - Postgres: ``li_events`` vira tabela particionada nativa
+      (``PARTITION BY RANGE (ts)``) com as mesmas partições mensais.
+
+Retenção: partições com mais de ``ANALYTICS_MESES_QUENTES`` meses (contando
+o corrente) são compactadas em Parquet (pyarrow, zstd) em
+``instance/analytics_arquivo/li_events_pAAAAMM.parquet`` e removidas do
+banco. Os rollups do painel (services/analytics_rollups.py) ficam no banco,
+então o painel não depende do arquivo.
+
+A camada de consulta (``selecionar``, ``contar_distintos``...) recebe o
+intervalo de tempo e só toca as partições e arquivos dos meses que o cortam:
+gravar no mês corrente e consultar janelas recentes custa o mesmo com um mês
+ou dez anos de histórico.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, func, insert, inspect, select, text
+
+from analytics_models import Event, db
+
+logger = logging.getLogger(__name__)
+
+MESES_QUENTES = max(1, int(os.getenv("ANALYTICS_MESES_QUENTES", 3)))
+PREFIXO = "li_events_p"
+LINHAS_POR_GRUPO = 100_000
+COLUNAS = [c.name for c in Event.__table__.columns]
+
+_PADRAO_PARTICAO = re.compile(rf"^{PREFIXO}(\d{{6}})$")
+_PADRAO_ARQUIVO = re.compile(rf"^{PREFIXO}(\d{{6}})\.parquet$")
+_metadata = MetaData()
+_tabelas = {}
+_garantidas = set()
+_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Meses e tabelas
+# ---------------------------------------------------------------------------
+
+def mes_de(ts):
+    """Mês (AAAAMM, int) de um datetime/date."""
+    return ts.year * 100 + ts.month
+
+
+def limites_mes(mes):
+    """(início, início do mês seguinte) de um mês AAAAMM."""
+    ano, m = divmod(int(mes), 100)
+    inicio = datetime(ano, m, 1)
+    return inicio, datetime(ano + m // 12, m % 12 + 1, 1)
+
+
+def _meses_entre(inicio, fim):
+    mes, ultimo = mes_de(inicio), mes_de(fim)
+    while mes <= ultimo:
+        yield mes
+        mes = mes_de(limites_mes(mes)[1])
+
+
+def _nativo():
+    return db.engine.dialect.name == "postgresql"
+
+
+def tabela_particao(mes):
+    """``Table`` da partição do mês (mesmas colunas de li_events, índice só em ts)."""
+    nome = f"{PREFIXO}{int(mes)}"
+    with _lock:
+        if nome not in _tabelas:
+            colunas = [Column(c.name, c.type, primary_key=c.primary_key) for c in Event.__table__.columns]
+            _tabelas[nome] = Table(nome, _metadata, *colunas, Index(f"ix_{nome}_ts", "ts"), sqlite_autoincrement=True)
+        return _tabelas[nome]
+
+
+def diretorio_arquivo():
+    """Pasta dos Parquet (``ANALYTICS_ARQUIVO_DIR`` no config do app ou instance/analytics_arquivo)."""
+    return current_app.config.get("ANALYTICS_ARQUIVO_DIR") or os.path.join(current_app.instance_path, "analytics_arquivo")
+
+
+def _caminho_arquivo(mes):
+    return os.path.join(diretorio_arquivo(), f"{PREFIXO}{int(mes)}.parquet")
+
+
+def particoes():
+    """
+    Partições existentes, em ordem de mês.
+
+    Returns:
+        list: dicts {"mes", "tabela": bool, "arquivo": caminho ou None}.
+    """
+    meses = {}
+    for nome in inspect(db.engine).get_table_names():
+        casamento = _PADRAO_PARTICAO.match(nome)
+        if casamento:
+            meses.setdefault(int(casamento.group(1)), {})["tabela"] = True
+    pasta = diretorio_arquivo()
+    if os.path.isdir(pasta):
+        for nome in os.listdir(pasta):
+            casamento = _PADRAO_ARQUIVO.match(nome)
+            if casamento:
+                meses.setdefault(int(casamento.group(1)), {})["arquivo"] = os.path.join(pasta, nome)
+    return [{"mes": mes, "tabela": info.get("tabela", False), "arquivo": info.get("arquivo")}
+            for mes, info in sorted(meses.items())]
+
+
+def garantir_particao(mes):
+    """Cria a partição do mês se ainda não existir (DDL em transação própria)."""
+    nome = f"{PREFIXO}{int(mes)}"
+    chave = (str(db.engine.url), nome)
+    if chave in _garantidas:
+        return tabela_particao(mes)
+    tabela = tabela_particao(mes)
+    with db.engine.begin() as conexao:
+        if _nativo():
+            inicio, fim = limites_mes(mes)
+            conexao.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {nome} PARTITION OF li_events "
+                f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+            ))
+        elif not inspect(conexao).has_table(nome):
+            tabela.create(bind=conexao)
+            # Mês já arquivado (evento atrasado): ids continuam depois dos do arquivo
+            caminho = _caminho_arquivo(mes)
+            if conexao.dialect.name == "sqlite" and os.path.exists(caminho):
+                maior = pc.max(pq.read_table(caminho, columns=["id"]).column("id")).as_py() or 0
+                conexao.execute(text("DELETE FROM sqlite_sequence WHERE name = :nome"), {"nome": nome})
+                conexao.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:nome, :seq)"),
+                                {"nome": nome, "seq": maior})
+    _garantidas.add(chave)
+    return tabela
+
+
+def garantir_particoes_correntes(agora=None):
+    """Partições do mês corrente e do próximo (criadas antes da virada)."""
+    agora = agora or datetime.utcnow()
+    mes = mes_de(agora)
+    garantir_particao(mes)
+    garantir_particao(mes_de(limites_mes(mes)[1]))
+
+
+# ---------------------------------------------------------------------------
+# Escrita e migração
+# ---------------------------------------------------------------------------
+
+def inserir(sessao, eventos):
+    """
+    Grava um lote de eventos (dicts de colunas) na partição do mês de cada
+    um, na transação da sessão. No Postgres o INSERT vai para li_events e o
+    banco roteia para a partição.
+
+    As partições que faltam são criadas antes do primeiro INSERT: no SQLite
+    a DDL em outra conexão esperaria o lock de escrita desta transação.
+    """
+    por_mes = {}
+    for evento in eventos:
+        evento.setdefault("ts", datetime.utcnow())
+        por_mes.setdefault(mes_de(evento["ts"]), []).append(evento)
+    tabelas = {mes: garantir_particao(mes) for mes in por_mes}
+    for mes, linhas in sorted(por_mes.items()):
+        sessao.execute(insert(Event if _nativo() else tabelas[mes]), linhas)
+
+
+def _ja_particionada_pg():
+    return db.session.execute(text(
+        "SELECT relkind FROM pg_class WHERE relname = 'li_events' AND relkind = 'p'"
+    )).first() is not None
+
+
+def _migrar_postgres(meses):
+    """Converte li_events em tabela particionada; a antiga fica como li_events_legado."""
+    colunas = ", ".join(COLUNAS)
+    with db.engine.begin() as conexao:
+        conexao.execute(text("ALTER TABLE li_events RENAME TO li_events_legado"))
+        conexao.execute(text("ALTER INDEX IF EXISTS li_events_pkey RENAME TO li_events_legado_pkey"))
+        conexao.execute(text("""
+            CREATE TABLE li_events (
+                id BIGSERIAL, ts TIMESTAMP NOT NULL, event VARCHAR(32), label VARCHAR(128),
+                path VARCHAR(255), referrer VARCHAR(255), utm_source VARCHAR(80), utm_medium VARCHAR(80),
+                utm_campaign VARCHAR(80), session_id VARCHAR(64), visitor_id VARCHAR(64), duration_ms INTEGER,
+                ua VARCHAR(200), country VARCHAR(2), device VARCHAR(32), props JSONB,
+                PRIMARY KEY (id, ts)
+            ) PARTITION BY RANGE (ts)
+        """))
+        conexao.execute(text("CREATE INDEX ix_li_events_part_ts ON li_events (ts)"))
+        for mes in meses:
+            inicio, fim = limites_mes(mes)
+            conexao.execute(text(
+                f"CREATE TABLE {PREFIXO}{mes} PARTITION OF li_events "
+                f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fim.isoformat()}')"
+            ))
+            _garantidas.add((str(db.engine.url), f"{PREFIXO}{mes}"))
+        conexao.execute(text(
+            f"INSERT INTO li_events ({colunas}) SELECT {colunas} FROM li_events_legado WHERE ts IS NOT NULL"
+        ))
+        conexao.execute(text(
+            "SELECT setval(pg_get_serial_sequence('li_events', 'id'), COALESCE((SELECT MAX(id) FROM li_events), 0) + 1, false)"
+        ))
+
+
+def migrar(agora=None):
+    """
+    Leva os eventos da li_events original para as partições (uma vez) e
+    garante as partições do mês corrente e do próximo.
+
+    Returns:
+        int: eventos migrados.
+    """
+    agora = agora or datetime.utcnow()
+    tabela = Event.__table__
+    if not inspect(db.engine).has_table("li_events"):
+        tabela.create(bind=db.engine)
+    if _nativo() and _ja_particionada_pg():
+        garantir_particoes_correntes(agora)
+        return 0
+    primeiro, ultimo, total = db.session.query(func.min(Event.ts), func.max(Event.ts), func.count(Event.id)).one()
+    db.session.commit()
+    meses = sorted(set(_meses_entre(primeiro, ultimo)) | {mes_de(agora)}) if primeiro else [mes_de(agora)]
+    if _nativo():
+        _migrar_postgres(meses)
+    elif total:
+        particoes_novas = {mes: garantir_particao(mes) for mes in meses}
+        for mes, particao in particoes_novas.items():
+            inicio, fim = limites_mes(mes)
+            origem = select(*[tabela.c[c] for c in COLUNAS]).where(tabela.c.ts >= inicio, tabela.c.ts < fim)
+            db.session.execute(insert(particao).from_select(COLUNAS, origem))
+        db.session.execute(tabela.delete().where(tabela.c.ts.isnot(None)))
+        db.session.commit()
+    garantir_particoes_correntes(agora)
+    if total:
+        logger.info(f"📦 {total} eventos de li_events migrados para {len(meses)} partições mensais")
+    return int(total or 0)
+
+
+# ---------------------------------------------------------------------------
+# Arquivo Parquet
+# ---------------------------------------------------------------------------
+
+def _esquema():
+    tipos = {"id": pa.int64(), "ts": pa.timestamp("us"), "duration_ms": pa.int64()}
+    return pa.schema([(c, tipos.get(c, pa.string())) for c in COLUNAS])
+
+
+def _para_lote(linhas, esquema):
+    colunas = {c: [linha[i] for linha in linhas] for i, c in enumerate(COLUNAS)}
+    colunas["props"] = [json.dumps(p) if p is not None else None for p in colunas["props"]]
+    return pa.RecordBatch.from_pydict(colunas, schema=esquema)
+
+
+def _de_tabela_arrow(tabela):
+    linhas = tabela.to_pylist()
+    if "props" in tabela.column_names:
+        for linha in linhas:
+            if linha["props"] is not None:
+                linha["props"] = json.loads(linha["props"])
+    return linhas
+
+
+def arquivar_mes(mes):
+    """
+    Compacta a partição do mês num Parquet e a remove do banco. Se já houver
+    arquivo do mês (eventos atrasados), junta os dois; os ids não se repetem
+    porque a partição recriada continua a numeração do arquivo, e uma
+    partição que já tinha sido copiada (queda entre publicar o arquivo e
+    remover a tabela) não é duplicada.
+
+    Returns:
+        int: eventos no arquivo final.
+    """
+    particao = tabela_particao(mes)
+    caminho = _caminho_arquivo(mes)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + ".tmp"
+    esquema = _esquema()
+    existente = pq.read_table(caminho) if os.path.exists(caminho) else None
+    ids_existentes = set(existente.column("id").to_pylist()) if existente is not None else set()
+
+    total = lidos = 0
+    with pq.ParquetWriter(temporario, esquema, compression="zstd") as escritor:
+        if existente is not None:
+            escritor.write_table(existente.cast(esquema), row_group_size=LINHAS_POR_GRUPO)
+            total += existente.num_rows
+        consulta = select(*[particao.c[c] for c in COLUNAS]).order_by(particao.c.ts)
+        resultado = db.session.execute(consulta.execution_options(yield_per=LINHAS_POR_GRUPO))
+        for linhas in resultado.partitions():
+            lidos += len(linhas)
+            linhas = [linha for linha in linhas if linha[0] not in ids_existentes]
+            if linhas:
+                escritor.write_batch(_para_lote(linhas, esquema))
+                total += len(linhas)
+    no_banco = db.session.execute(select(func.count()).select_from(particao)).scalar()
+    if pq.ParquetFile(temporario).metadata.num_rows != total or lidos != no_banco:
+        os.remove(temporario)
+        raise RuntimeError(f"Arquivo de {mes} inconsistente com a partição; nada removido")
+    db.session.commit()
+    os.replace(temporario, caminho)
+
+    nome = f"{PREFIXO}{int(mes)}"
+    with db.engine.begin() as conexao:
+        if _nativo():
+            conexao.execute(text(f"ALTER TABLE li_events DETACH PARTITION {nome}"))
+        conexao.execute(text(f"DROP TABLE IF EXISTS {nome}"))
+    _garantidas.discard((str(db.engine.url), nome))
+    logger.info(f"🗄️ Partição {nome} arquivada em {caminho} ({total} eventos)")
+    return total
+
+
+def arquivar(agora=None, meses_quentes=MESES_QUENTES):
+    """
+    Aplica a retenção: arquiva as partições anteriores aos ``meses_quentes``
+    mais recentes (o mês corrente conta como um).
+
+    Returns:
+        list: meses arquivados.
+    """
+    mes = mes_de(agora or datetime.utcnow())
+    for _ in range(max(1, int(meses_quentes)) - 1):
+        ano, m = divmod(mes, 100)
+        mes = mes - 1 if m > 1 else (ano - 1) * 100 + 12
+    arquivados = []
+    for particao in particoes():
+        if particao["tabela"] and particao["mes"] < mes:
+            arquivar_mes(particao["mes"])
+            arquivados.append(particao["mes"])
+    return arquivados
+
+
+# ---------------------------------------------------------------------------
+# Consulta com poda de partições
+# ---------------------------------------------------------------------------
+
+def particoes_no_intervalo(inicio, fim):
+    """Partições (e arquivos) dos meses que cortam [inicio, fim)."""
+    mes_ini = mes_de(inicio) if inicio else 0
+    mes_fim = mes_de(fim) if fim else 999999
+    return [p for p in particoes() if mes_ini <= p["mes"] <= mes_fim]
+
+
+def _filtro_arrow(inicio, fim):
+    filtros = []
+    if inicio:
+        filtros.append(("ts", ">=", pa.scalar(inicio, type=pa.timestamp("us"))))
+    if fim:
+        filtros.append(("ts", "<", pa.scalar(fim, type=pa.timestamp("us"))))
+    return filtros or None
+
+
+def _filtro_sql(tabela, inicio, fim):
+    filtros = []
+    if inicio:
+        filtros.append(tabela.c.ts >= inicio)
+    if fim:
+        filtros.append(tabela.c.ts < fim)
+    return filtros
+
+
+def selecionar(inicio=None, fim=None, colunas=None, lote=5000):
+    """
+    Eventos com ``inicio <= ts < fim`` (extremos opcionais), mês a mês, só
+    das partições e arquivos do intervalo.
+
+    Yields:
+        list: lotes de dicts {coluna: valor}.
+    """
+    colunas = list(colunas or COLUNAS)
+    for particao in particoes_no_intervalo(inicio, fim):
+        if particao["arquivo"]:
+            tabela = pq.read_table(particao["arquivo"], columns=colunas, filters=_filtro_arrow(inicio, fim))
+            for inicio_lote in range(0, tabela.num_rows, lote):
+                yield _de_tabela_arrow(tabela.slice(inicio_lote, lote))
+        if particao["tabela"]:
+            tabela = tabela_particao(particao["mes"])
+            consulta = select(*[tabela.c[c] for c in colunas]).where(*_filtro_sql(tabela, inicio, fim))
+            for linhas in db.session.execute(consulta.execution_options(yield_per=lote)).partitions():
+                yield [dict(zip(colunas, linha)) for linha in linhas]
+
+
+def contar_distintos(coluna, inicio=None, fim=None):
+    """
+    Valores distintos (não vazios) de ``coluna`` no intervalo. Com uma só
+    partição no banco é um COUNT(DISTINCT) direto; com várias, une os
+    conjuntos de cada partição/arquivo.
+    """
+    cortadas = particoes_no_intervalo(inicio, fim)
+    if len(cortadas) == 1 and cortadas[0]["tabela"] and not cortadas[0]["arquivo"]:
+        tabela = tabela_particao(cortadas[0]["mes"])
+        return int(db.session.execute(
+            select(func.count(func.distinct(tabela.c[coluna])))
+            .where(tabela.c[coluna] != "", *_filtro_sql(tabela, inicio, fim))
+        ).scalar() or 0)
+    valores = set()
+    for particao in cortadas:
+        if particao["arquivo"]:
+            tabela = pq.read_table(particao["arquivo"], columns=[coluna], filters=_filtro_arrow(inicio, fim))
+            valores.update(pc.unique(tabela.column(coluna)).to_pylist())
+        if particao["tabela"]:
+            tabela = tabela_particao(particao["mes"])
+            valores.update(db.session.execute(
+                select(tabela.c[coluna]).where(*_filtro_sql(tabela, inicio, fim)).distinct()
+            ).scalars())
+    valores.discard(None)
+    valores.discard("")
+    return len(valores)
+
+
+def intervalo():
+    """(primeiro ts, último ts) de todos os eventos, ou (None, None)."""
+    extremos = []
+    for particao in particoes():
+        if particao["arquivo"]:
+            minimo_maximo = pc.min_max(pq.read_table(particao["arquivo"], columns=["ts"]).column("ts")).as_py()
+            extremos.extend(v for v in (minimo_maximo["min"], minimo_maximo["max"]) if v is not None)
+        if particao["tabela"]:
+            tabela = tabela_particao(particao["mes"])
+            extremos.extend(v for v in db.session.execute(
+                select(func.min(tabela.c.ts), func.max(tabela.c.ts))).one() if v is not None)
+    return (min(extremos), max(extremos)) if extremos else (None, None)
+
+
+def contar():
+    """Total de eventos (banco + arquivo) e por mês, para o diagnóstico."""
+    por_mes = {}
+    for particao in particoes():
+        total = 0
+        if particao["arquivo"]:
+            total += pq.ParquetFile(particao["arquivo"]).metadata.num_rows
+        if particao["tabela"]:
+            total += db.session.execute(select(func.count()).select_from(tabela_particao(particao["mes"]))).scalar()
+        por_mes[str(particao["mes"])] = {"eventos": int(total), "arquivado": bool(particao["arquivo"]),
+                                         "no_banco": particao["tabela"]}
+    return {"total": sum(p["eventos"] for p in por_mes.values()), "particoes": por_mes}
+
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rollups do painel de analytics (/admin/analytics/*).
+
+Em vez de ``COUNT``/``COUNT DISTINCT`` sobre ``li_events`` a cada acesso, o
+painel lê tabelas pequenas mantidas de forma incremental:
+
+    - ``li_rollup_minuto`` e ``li_rollup_dia``: (período, métrica, chave) ->
+      valor, com as métricas ``pageview`` (por path), ``click`` (por label),
+      ``hb_ms`` (soma da duração dos heartbeats) e ``eventos`` (por tipo);
+    - ``li_rollup_hll``: sketches HyperLogLog (services/analytics_hll.py) de
+      visitantes e sessões por hora e por dia; a união dos sketches da
+      janela dá os distintos de 24h, 7d ou 30d em tempo constante, com erro
+      padrão de ~0,8%. ``exato=True`` conta direto nos eventos (auditoria).
+
+O escritor em lote do /api/track (services/analytics_ingestao.py) chama
+``acumular`` na mesma transação do INSERT dos eventos. ``recompor_dias``
+refaz dias inteiros a partir dos eventos (carga inicial e correções) e
+``podar`` descarta minutos e horas antigos; os dias ficam.
+
+As janelas de 24h usam os minutos (sketches por hora); as de vários dias são
+alinhadas ao dia UTC, como a série diária que o painel já mostrava.
+"""
+
+import logging
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from analytics_models import RollupDia, RollupMinuto, SketchDistintos, db
+from services import analytics_particoes
+from services.analytics_hll import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+RETENCAO_MINUTOS = timedelta(hours=48)
+TIPOS_DISTINTOS = {"v": "visitor_id", "s": "session_id"}
+LABEL_MODAIS = 'li:%:painel:abrir_modal_%'
+LABEL_PALPITE = 'li:quina:premium:gerar_palpite'
+LABEL_CTA_PREMIUM = 'li:home:cta:assinar_premium'
+
+_INSERT_POR_DIALETO = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _metricas(evento):
+    """(métrica, chave, valor) que o evento soma nos rollups."""
+    tipo = evento.get("event") or ""
+    yield "eventos", tipo, 1
+    if tipo == "pageview":
+        yield "pageview", evento.get("path") or "", 1
+    elif tipo == "click" and evento.get("label"):
+        yield "click", evento["label"], 1
+    elif tipo == "hb":
+        yield "hb_ms", "", int(evento.get("duration_ms") or 0)
+
+
+def _somar(sessao, modelo, periodo, contagens):
+    """UPSERT ``valor = valor + delta``; linhas em ordem de chave (evita deadlock entre workers)."""
+    if not contagens:
+        return
+    coluna = getattr(modelo, periodo)
+    linhas = [{periodo: p, "metrica": m, "chave": c, "valor": v} for (p, m, c), v in sorted(contagens.items())]
+    inserir = _INSERT_POR_DIALETO.get(sessao.get_bind().dialect.name)
+    if inserir is not None:
+        stmt = inserir(modelo)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[periodo, "metrica", "chave"],
+            set_={"valor": modelo.valor + stmt.excluded.valor},
+        )
+        sessao.execute(stmt, linhas)
+        return
+    for linha in linhas:
+        resultado = sessao.execute(
+            update(modelo)
+            .where(coluna == linha[periodo], modelo.metrica == linha["metrica"], modelo.chave == linha["chave"])
+            .values(valor=modelo.valor + linha["valor"])
+        )
+        if resultado.rowcount == 0:
+            sessao.add(modelo(**linha))
+    sessao.flush()
+
+
+def _somar_sketches(sessao, grupos):
+    """
+    Junta os ids de cada (período, granularidade, tipo) ao sketch gravado.
+
+    Garante a linha (INSERT ... DO NOTHING), relê com ``FOR UPDATE`` no
+    Postgres (no SQLite a transação já tem o lock de escrita do INSERT dos
+    eventos) e grava a união, para workers concorrentes não perderem ids.
+    """
+    if not grupos:
+        return
+    chaves = sorted(grupos)
+    vazio = HyperLogLog().para_bytes()
+    inserir = _INSERT_POR_DIALETO.get(sessao.get_bind().dialect.name)
+    linhas = [{"periodo": p, "granularidade": g, "tipo": t, "registros": vazio} for p, g, t in chaves]
+    if inserir is not None:
+        sessao.execute(inserir(SketchDistintos).on_conflict_do_nothing(), linhas)
+    else:
+        for linha in linhas:
+            if sessao.get(SketchDistintos, (linha["periodo"], linha["granularidade"], linha["tipo"])) is None:
+                sessao.add(SketchDistintos(**linha))
+        sessao.flush()
+    for periodo, granularidade, tipo in chaves:
+        chave = (SketchDistintos.periodo == periodo, SketchDistintos.granularidade == granularidade,
+                 SketchDistintos.tipo == tipo)
+        atual = sessao.execute(select(SketchDistintos.registros).where(*chave).with_for_update()).scalar_one()
+        sketch = HyperLogLog.de_bytes(atual).adicionar(grupos[(periodo, granularidade, tipo)])
+        sessao.execute(update(SketchDistintos).where(*chave).values(registros=sketch.para_bytes()))
+
+
+def acumular(sessao, eventos):
+    """
+    Soma um lote de eventos (dicts de colunas de li_events) nos rollups,
+    na transação da sessão; o commit fica com quem chamou.
+    """
+    minutos, dias, distintos = Counter(), Counter(), defaultdict(set)
+    for evento in eventos:
+        ts = evento.get("ts") or datetime.utcnow()
+        minuto = ts.replace(second=0, microsecond=0)
+        dia = ts.date()
+        for metrica, chave, valor in _metricas(evento):
+            minutos[(minuto, metrica, chave)] += valor
+            dias[(dia, metrica, chave)] += valor
+        for tipo, coluna in TIPOS_DISTINTOS.items():
+            identificador = evento.get(coluna)
+            if identificador:
+                distintos[(minuto.replace(minute=0), "h", tipo)].add(identificador)
+                distintos[(datetime.combine(dia, time.min), "d", tipo)].add(identificador)
+    _somar(sessao, RollupMinuto, "minuto", minutos)
+    _somar(sessao, RollupDia, "dia", dias)
+    _somar_sketches(sessao, distintos)
+
+
+def recompor_dias(dias, lote=5000):
+    """
+    Refaz os rollups dos dias (UTC) a partir dos eventos (partições no banco
+    ou arquivo Parquet, services/analytics_particoes.py): apaga o que havia
+    desses dias e reacumula. Use em dias fechados ou fora do horário de
+    pico; eventos gravados durante a recomposição do dia corrente podem ser
+    contados duas vezes.
+
+    Returns:
+        int: eventos reacumulados.
+    """
+    total = 0
+    for dia in sorted(set(dias)):
+        inicio = datetime.combine(dia, time.min)
+        fim = inicio + timedelta(days=1)
+        db.session.execute(delete(RollupMinuto).where(RollupMinuto.minuto >= inicio, RollupMinuto.minuto < fim))
+        db.session.execute(delete(RollupDia).where(RollupDia.dia == dia))
+        db.session.execute(delete(SketchDistintos).where(SketchDistintos.periodo >= inicio, SketchDistintos.periodo < fim))
+        for eventos in analytics_particoes.selecionar(inicio, fim, lote=lote):
+            acumular(db.session, eventos)
+            total += len(eventos)
+        db.session.commit()
+    return total
+
+
+def recompor_historico():
+    """Recompõe todos os dias que têm eventos (carga inicial dos rollups)."""
+    primeiro, ultimo = analytics_particoes.intervalo()
+    if primeiro is None:
+        return 0
+    dias = [primeiro.date() + timedelta(days=i) for i in range((ultimo.date() - primeiro.date()).days + 1)]
+    return recompor_dias(dias)
+
+
+def podar(agora=None):
+    """Apaga minutos e sketches por hora fora da retenção (os dias ficam)."""
+    limite = (agora or datetime.utcnow()) - RETENCAO_MINUTOS
+    db.session.execute(delete(RollupMinuto).where(RollupMinuto.minuto < limite))
+    db.session.execute(delete(SketchDistintos).where(SketchDistintos.granularidade == "h",
+                                                     SketchDistintos.periodo < limite))
+    db.session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Consultas do painel
+# ---------------------------------------------------------------------------
+
+def _soma_minutos(metrica, desde):
+    return db.session.query(func.coalesce(func.sum(RollupMinuto.valor), 0)).filter(
+        RollupMinuto.minuto >= desde, RollupMinuto.metrica == metrica).scalar() or 0
+
+
+def _inicio_janela(janela, agora):
+    """(início alinhado, granularidade) de uma janela '24h', '7d', '30d'..."""
+    casamento = re.fullmatch(r"(\d+)([hd])", str(janela).strip().lower())
+    if not casamento or int(casamento.group(1)) <= 0:
+        raise ValueError(f"Janela inválida: {janela} (use, por exemplo, 24h, 7d ou 30d)")
+    quantidade, unidade = int(casamento.group(1)), casamento.group(2)
+    agora = agora or datetime.utcnow()
+    if unidade == "h":
+        if timedelta(hours=quantidade) > RETENCAO_MINUTOS:
+            raise ValueError(f"Janelas em horas vão até {int(RETENCAO_MINUTOS.total_seconds() // 3600)}h; use dias")
+        return (agora - timedelta(hours=quantidade)).replace(minute=0, second=0, microsecond=0), "h"
+    return datetime.combine((agora - timedelta(days=quantidade)).date(), time.min), "d"
+
+
+def distintos(janela="24h", agora=None, exato=False):
+    """
+    Visitantes e sessões distintos na janela: união dos sketches por hora
+    (janelas em horas) ou por dia (em dias). Com ``exato`` conta em li_events,
+    na mesma janela alinhada (partições e arquivo do período).
+
+    Returns:
+        dict: {"visitors", "sessions", "janela", "desde", "exato", "erro_padrao"}.
+    """
+    desde, granularidade = _inicio_janela(janela, agora)
+    resultado = {"janela": janela, "desde": desde.isoformat(), "exato": bool(exato)}
+    if exato:
+        for tipo, nome in (("v", "visitors"), ("s", "sessions")):
+            resultado[nome] = analytics_particoes.contar_distintos(TIPOS_DISTINTOS[tipo], desde)
+        resultado["erro_padrao"] = 0.0
+        return resultado
+    unioes = {tipo: HyperLogLog() for tipo in TIPOS_DISTINTOS}
+    linhas = db.session.query(SketchDistintos.tipo, SketchDistintos.registros).filter(
+        SketchDistintos.granularidade == granularidade, SketchDistintos.periodo >= desde)
+    for tipo, registros in linhas:
+        unioes[tipo].unir(HyperLogLog.de_bytes(registros))
+    resultado["visitors"] = unioes["v"].contar()
+    resultado["sessions"] = unioes["s"].contar()
+    resultado["erro_padrao"] = round(float(unioes["v"].erro_padrao()), 4)
+    return resultado
+
+
+def _primeiro_dia(dias, agora):
+    return ((agora or datetime.utcnow()) - timedelta(days=dias)).date()
+
+
+def kpis(agora=None, exato=False):
+    """KPIs das últimas 24h (distintos aproximados, ou exatos com ``exato``)."""
+    desde = ((agora or datetime.utcnow()) - timedelta(days=1)).replace(second=0, microsecond=0)
+    pv = int(_soma_minutos("pageview", desde))
+    total_ms = int(_soma_minutos("hb_ms", desde))
+    unicos = distintos("24h", agora, exato)
+    return {
+        "pageviews_24h": pv,
+        "visitors_24h": unicos["visitors"],
+        "sessions_24h": unicos["sessions"],
+        "avg_time_per_view_s": round((total_ms / 1000) / max(pv, 1), 1),
+    }
+
+
+def _por_chave(metrica, dias, agora, limite):
+    total = func.sum(RollupDia.valor).label("total")
+    return (db.session.query(RollupDia.chave, total)
+            .filter(RollupDia.dia >= _primeiro_dia(dias, agora), RollupDia.metrica == metrica)
+            .group_by(RollupDia.chave).order_by(total.desc()).limit(limite).all())
+
+
+def top_paginas(dias=7, limite=20, agora=None):
+    return [{"path": p, "pageviews": int(pv)} for p, pv in _por_chave("pageview", dias, agora, limite)]
+
+
+def top_eventos(dias=7, limite=30, agora=None):
+    return [{"label": lbl, "count": int(c)} for lbl, c in _por_chave("click", dias, agora, limite)]
+
+
+def serie_diaria(dias=14, agora=None):
+    rows = (db.session.query(RollupDia.dia, func.sum(RollupDia.valor))
+            .filter(RollupDia.dia >= _primeiro_dia(dias, agora), RollupDia.metrica == "pageview")
+            .group_by(RollupDia.dia).order_by(RollupDia.dia).all())
+    return {"labels": [str(d) for d, _ in rows], "pageviews": [int(c) for _, c in rows]}
+
+
+def funil_premium(dias=7, agora=None):
+    desde = _primeiro_dia(dias, agora)
+
+    def soma(metrica, *filtros):
+        return int(db.session.query(func.coalesce(func.sum(RollupDia.valor), 0)).filter(
+            RollupDia.dia >= desde, RollupDia.metrica == metrica, *filtros).scalar() or 0)
+
+    return {
+        "pageviews": soma("pageview"),
+        "modais": soma("click", RollupDia.chave.like(LABEL_MODAIS)),
+        "palpites": soma("click", RollupDia.chave == LABEL_PALPITE),
+        "cta_premium": soma("click", RollupDia.chave == LABEL_CTA_PREMIUM),
+    }
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Painel "agora" do analytics em memória: janela deslizante dos últimos
+``ANALYTICS_JANELA_S`` segundos (padrão 60) alimentada pelo escritor do
+/api/track (services/analytics_ingestao.py), sem consultar o banco.
+
+A janela é um anel de baldes por segundo. Cada balde guarda as sessões
+vistas, as pageviews por página e os cliques por label daquele segundo; os
+totais da janela são mantidos incrementalmente (entra o balde novo, sai o
+que expirou), então sessões online, top páginas e cliques saem em O(1) por
+evento e sem varrer eventos na leitura. Uma sessão conta como online
+enquanto o último evento dela estiver dentro da janela.
+
+Com vários workers do gunicorn cada processo só vê os beacons que recebeu.
+Por isso cada janela publica, no máximo uma vez por segundo, um retrato
+pequeno (último segundo de cada sessão e contagens por segundo) em
+``instance/analytics_tempo_real/<pid>.json``; a leitura junta os retratos
+dos outros workers com a própria memória. Retratos de workers mortos
+expiram sozinhos com a janela e são apagados.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+JANELA_S = int(os.getenv("ANALYTICS_JANELA_S", 60))
+ULTIMOS_CLIQUES = 20
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _segundo(evento, padrao):
+    """Segundo (epoch, UTC) do evento; ``ts`` é datetime UTC ingênuo como em li_events."""
+    ts = evento.get("ts")
+    return int((ts - _EPOCA).total_seconds()) if isinstance(ts, datetime) else padrao
+
+
+class _Balde:
+    __slots__ = ("segundo", "sessoes", "paginas", "cliques")
+
+    def __init__(self, segundo):
+        self.segundo = segundo
+        self.sessoes = set()
+        self.paginas = Counter()
+        self.cliques = Counter()
+
+
+class JanelaDeslizante:
+    """
+    Sessões online, top páginas e cliques dos últimos ``segundos``.
+
+    Args:
+        segundos: tamanho da janela.
+        diretorio: pasta dos retratos compartilhados entre workers (None:
+            só a memória deste processo).
+    """
+
+    def __init__(self, segundos=JANELA_S, diretorio=None):
+        self.segundos = segundos
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        self._baldes = deque()
+        self._ultimo_visto = {}
+        self._paginas = Counter()
+        self._cliques = Counter()
+        self._recentes = deque(maxlen=ULTIMOS_CLIQUES)
+        self._alterada = False
+        self._proxima_publicacao = 0.0
+        self._cache = (None, None)
+
+    def init_app(self, app):
+        if self.diretorio is None:
+            self.diretorio = app.config.get("ANALYTICS_TEMPO_REAL_DIR") or os.path.join(
+                app.instance_path, "analytics_tempo_real")
+
+    # ---------------------------------------------------------------- escrita
+    def registrar(self, eventos, agora=None):
+        """Soma os eventos à janela e publica o retrato se já passou 1s do último."""
+        agora = time.time() if agora is None else agora
+        segundo_agora = int(agora)
+        with self._lock:
+            self._expirar(segundo_agora)
+            for evento in eventos:
+                segundo = _segundo(evento, segundo_agora)
+                if segundo <= segundo_agora - self.segundos:
+                    continue
+                balde = self._balde(segundo)
+                sessao = evento.get("session_id")
+                if sessao:
+                    balde.sessoes.add(sessao)
+                    if self._ultimo_visto.get(sessao, -1) < balde.segundo:
+                        self._ultimo_visto[sessao] = balde.segundo
+                tipo = evento.get("event")
+                if tipo == "pageview":
+                    chave = evento.get("path") or ""
+                    balde.paginas[chave] += 1
+                    self._paginas[chave] += 1
+                elif tipo == "click" and evento.get("label"):
+                    balde.cliques[evento["label"]] += 1
+                    self._cliques[evento["label"]] += 1
+                    self._recentes.append((segundo, evento["label"], evento.get("path") or ""))
+                self._alterada = True
+        self.publicar(agora)
+
+    def _balde(self, segundo):
+        """Balde do segundo; eventos fora de ordem vão para o balde mais novo."""
+        if self._baldes and segundo <= self._baldes[-1].segundo:
+            return self._baldes[-1]
+        balde = _Balde(segundo)
+        self._baldes.append(balde)
+        return balde
+
+    def _expirar(self, segundo_agora):
+        corte = segundo_agora - self.segundos
+        while self._baldes and self._baldes[0].segundo <= corte:
+            balde = self._baldes.popleft()
+            for sessao in balde.sessoes:
+                if self._ultimo_visto.get(sessao) == balde.segundo:
+                    del self._ultimo_visto[sessao]
+            for totais, contagens in ((self._paginas, balde.paginas), (self._cliques, balde.cliques)):
+                for chave, n in contagens.items():
+                    totais[chave] -= n
+                    if totais[chave] <= 0:
+                        del totais[chave]
+            self._alterada = True
+
+    # --------------------------------------------------------------- retratos
+    def _retrato(self):
+        """Estado da janela serializável (chamado com o lock)."""
+        return {
+            "sessoes": self._ultimo_visto.copy(),
+            "paginas": {str(b.segundo): dict(b.paginas) for b in self._baldes if b.paginas},
+            "cliques": {str(b.segundo): dict(b.cliques) for b in self._baldes if b.cliques},
+            "recentes": list(self._recentes),
+        }
+
+    def _caminho(self, pid=None):
+        return os.path.join(self.diretorio, f"{pid or os.getpid()}.json")
+
+    def publicar(self, agora=None, forcar=False):
+        """Grava o retrato deste worker (no máximo uma vez por segundo)."""
+        agora = time.time() if agora is None else agora
+        if not self.diretorio or not (forcar or (self._alterada and agora >= self._proxima_publicacao)):
+            return
+        with self._lock:
+            self._expirar(int(agora))
+            retrato = self._retrato()
+            self._alterada = False
+            self._proxima_publicacao = agora + 1.0
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            temporario = self._caminho() + ".tmp"
+            with open(temporario, "w") as f:
+                json.dump(retrato, f, separators=(",", ":"))
+            os.replace(temporario, self._caminho())
+        except OSError as e:
+            logger.warning(f"Analytics: Erro ao publicar a janela em tempo real - {e}")
+
+    def _retratos_dos_outros(self, agora):
+        """Retratos dos outros workers; apaga os que já saíram da janela."""
+        if not self.diretorio or not os.path.isdir(self.diretorio):
+            return []
+        meu = os.path.basename(self._caminho())
+        retratos = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json") or nome == meu:
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                if os.path.getmtime(caminho) < agora - self.segundos:
+                    os.remove(caminho)
+                    continue
+                with open(caminho) as f:
+                    retratos.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # worker trocando o arquivo ou saindo
+        return retratos
+
+    # ---------------------------------------------------------------- leitura
+    def resumo(self, agora=None, limite=10):
+        """
+        Painel "agora" somando todos os workers.
+
+        Returns:
+            dict: online, top_paginas [{path, pageviews}], cliques
+            [{label, count}], ultimos_cliques [{ts, label, path}] e janela_s.
+        """
+        agora = time.time() if agora is None else agora
+        segundo_agora = int(agora)
+        cache_segundo, cache = self._cache
+        if cache_segundo == (segundo_agora, limite):
+            return cache
+        outros = self._retratos_dos_outros(agora)
+        with self._lock:
+            self._expirar(segundo_agora)
+            if not outros:
+                online = len(self._ultimo_visto)
+                corte = segundo_agora - self.segundos
+                paginas, cliques = self._paginas, self._cliques
+                recentes = [r for r in self._recentes if r[0] > corte]
+                resultado = self._formatar(online, paginas, cliques, recentes, limite)
+            else:
+                retratos = [self._retrato()] + outros
+        if outros:
+            resultado = self._formatar(*self._combinar(retratos, segundo_agora - self.segundos), limite)
+        self._cache = ((segundo_agora, limite), resultado)
+        return resultado
+
+    @staticmethod
+    def _combinar(retratos, corte):
+        ultimo_visto = {}
+        paginas, cliques, recentes = Counter(), Counter(), []
+        for retrato in retratos:
+            for sessao, segundo in retrato["sessoes"].items():
+                if segundo > corte and ultimo_visto.get(sessao, -1) < segundo:
+                    ultimo_visto[sessao] = segundo
+            for totais, por_segundo in ((paginas, retrato["paginas"]), (cliques, retrato["cliques"])):
+                for segundo, contagens in por_segundo.items():
+                    if int(segundo) > corte:
+                        totais.update(contagens)
+            recentes.extend(tuple(r) for r in retrato["recentes"] if r[0] > corte)
+        recentes.sort(key=lambda r: r[0])
+        return len(ultimo_visto), paginas, cliques, recentes[-ULTIMOS_CLIQUES:]
+
+    def _formatar(self, online, paginas, cliques, recentes, limite):
+        return {
+            "online": online,
+            "top_paginas": [{"path": p, "pageviews": n} for p, n in paginas.most_common(limite)],
+            "cliques": [{"label": l, "count": n} for l, n in cliques.most_common(limite)],
+            "ultimos_cliques": [{"ts": s, "label": l, "path": p} for s, l, p in reversed(recentes)],
+            "janela_s": self.segundos,
+        }
+
+
+janela = JanelaDeslizante()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Backtest dos geradores inteligentes sobre o histórico de concursos.
+
+Para cada concurso do período o gerador da loteria recebe as mesmas
+preferências do usuário e um analysis_cache montado só com os concursos
+anteriores (``MatrizIncidencia.ate``), gera as apostas e elas são conferidas
+contra o resultado daquele concurso. Nenhum dado do próprio concurso ou de
+concursos posteriores entra na geração.
+
+A conferência usa bitmasks (funcoes/common/bitmask.py): apostas e sorteios
+viram palavras uint64 e os acertos são o popcount da interseção. O período é
+dividido em blocos contíguos entre processos; cada processo remonta as
+matrizes a partir dos sorteios e devolve contagens parciais, somadas no fim.
+Cada concurso sorteia com o fluxo filho da semente na sua posição
+(funcoes/common/rng.py), então a mesma semente reproduz o backtest qualquer
+que seja a divisão em blocos e processos.
+
+Além das faixas obtidas, o resultado traz o esperado de apostas aleatórias
+do mesmo tamanho (hipergeométrica), que é a referência para dizer se uma
+estratégia fez algo melhor do que o acaso.
+"""
+
+import copy
+import importlib
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from funcoes.common.bitmask import contar_acertos, empacotar
+from funcoes.common.config import obter_config
+from funcoes.common.incidencia import MatrizIncidencia
+from funcoes.common.rng import fluxo, nova_semente, normalizar_semente
+from services.contexto_geracao import ContextoGeracao, calcular_clusters
+from services.draw_store import carregar_historico
+
+logger = logging.getLogger(__name__)
+
+# loteria -> (módulo, função) do gerador inteligente
+GERADORES = {
+    "megasena": ("funcoes.megasena.geracao_inteligente_MS", "gerar_aposta_inteligente"),
+    "mais_milionaria": ("funcoes.milionaria.geracao_inteligente", "gerar_aposta_inteligente"),
+    "quina": ("funcoes.quina.geracao_inteligente_quina", "gerar_aposta_inteligente_quina"),
+    "lotofacil": ("funcoes.lotofacil.geracao_inteligente_lotofacil", "gerar_aposta_inteligente_lotofacil"),
+}
+
+HISTORICO_MINIMO = 30        # concursos anteriores exigidos antes do primeiro concurso testado
+RECALCULAR_CLUSTERS = 100    # clusters (KMeans) refeitos a cada N concursos, só se usados
+BLOCOS_POR_PROCESSO = 4
+
+
+def _colunas_bolas(colunas):
+    return [i for i, c in enumerate(colunas) if c.startswith("Bola")]
+
+
+def _colunas_trevos(colunas):
+    return [i for i, c in enumerate(colunas) if c.startswith("Trevo")]
+
+
+def _obter_gerador(loteria):
+    modulo, funcao = GERADORES[loteria]
+    return getattr(importlib.import_module(modulo), funcao)
+
+
+def _usa_clusters(preferencias):
+    return bool(preferencias.get("clusters"))
+
+
+def _rodar_bloco(tarefa):
+    """
+    Roda o backtest num intervalo [inicio, fim) de posições do histórico.
+
+    Função de módulo para poder ser enviada ao ProcessPoolExecutor. Devolve a
+    matriz de contagens (acertos nos números x acertos nos trevos) e, se
+    pedido, o resumo por concurso.
+    """
+    (loteria, preferencias, apostas_por_concurso, sorteios, concursos, colunas,
+     inicio, fim, recalcular_clusters, detalhar, semente) = tarefa
+    config = obter_config(loteria)
+    num_min, num_max = config["range"]
+    gerar = _obter_gerador(loteria)
+
+    bolas = sorteios[:, _colunas_bolas(colunas)]
+    incidencia = MatrizIncidencia(bolas, concursos, num_min, num_max)
+    mascaras_sorteios = empacotar(bolas, num_max)
+
+    cols_trevos = _colunas_trevos(colunas)
+    trevos = None
+    if cols_trevos:
+        trevo_min, trevo_max = config["trevos_range"]
+        trevos = MatrizIncidencia(sorteios[:, cols_trevos], concursos, trevo_min, trevo_max)
+        mascaras_trevos = empacotar(sorteios[:, cols_trevos], trevo_max)
+
+    contagens = np.zeros((config["drawn"] + 1, config.get("trevos_drawn", 0) + 1), dtype=np.int64)
+    por_concurso = []
+
+    preferencias = copy.deepcopy(preferencias)
+    preferencias["numApostasGerar"] = apostas_por_concurso
+    usa_clusters = _usa_clusters(preferencias)
+    clusters, ancora_clusters = None, None
+
+    for pos in range(inicio, fim):
+        if usa_clusters:
+            # Âncora fixa (múltiplo do período a partir do histórico mínimo) para
+            # que o resultado não dependa de como o período foi dividido em blocos
+            ancora = HISTORICO_MINIMO + ((pos - HISTORICO_MINIMO) // recalcular_clusters) * recalcular_clusters
+            if ancora != ancora_clusters:
+                df = pd.DataFrame(sorteios[:ancora], columns=colunas)
+                df.insert(0, "Concurso", concursos[:ancora])
+                clusters, ancora_clusters = calcular_clusters(loteria, df), ancora
+
+        anteriores = incidencia.ate(pos)
+        frequencia_trevos = None
+        if trevos is not None:
+            t = trevos.ate(pos)
+            frequencia_trevos = dict(zip(t.numeros.tolist(), t.frequencia().tolist()))
+        contexto = ContextoGeracao.de_incidencia(loteria, anteriores, frequencia_trevos, clusters)
+
+        if loteria == "quina" and isinstance(preferencias.get("padroes"), dict):
+            preferencias["padroes"]["ultimosSorteados"] = contexto.ultimo_sorteio
+
+        apostas = gerar(preferencias, contexto.analysis_cache(preferencias), rng=fluxo(semente, pos))
+        acertos = contar_acertos(empacotar([a["numeros"] for a in apostas], num_max), mascaras_sorteios[pos])
+        if trevos is not None:
+            acertos_trevos = contar_acertos(
+                empacotar([a.get("trevos", []) for a in apostas], config["trevos_range"][1]), mascaras_trevos[pos]
+            )
+        else:
+            acertos_trevos = np.zeros_like(acertos)
+        np.add.at(contagens, (np.minimum(acertos, config["drawn"]), acertos_trevos), 1)
+
+        if detalhar:
+            por_concurso.append({
+                "concurso": int(concursos[pos]),
+                "maximo_acertos": int(acertos.max()) if len(acertos) else 0,
+                "media_acertos": round(float(acertos.mean()), 4) if len(acertos) else 0.0,
+            })
+
+    return contagens, por_concurso
+
+
+def _probabilidades_aleatorias(universo, sorteadas, tamanho):
+    """P(acertos = h) de uma aposta aleatória de ``tamanho`` números (hipergeométrica)."""
+    total = math.comb(universo, tamanho)
+    return np.array([
+        math.comb(sorteadas, h) * math.comb(universo - sorteadas, tamanho - h) / total if h <= tamanho else 0.0
+        for h in range(sorteadas + 1)
+    ])
+
+
+def _tamanhos_aposta(loteria, preferencias):
+    qtd = int(preferencias.get("qtdeNumerosAposta") or obter_config(loteria)["drawn"])
+    qtd_trevos = int(preferencias.get("qtdeTrevosAposta", 2)) if loteria == "mais_milionaria" else 0
+    return qtd, qtd_trevos
+
+
+def _resumir(loteria, preferencias, contagens):
+    """Faixas, distribuição de acertos e comparação com apostas aleatórias."""
+    config = obter_config(loteria)
+    num_min, num_max = config["range"]
+    qtd, qtd_trevos = _tamanhos_aposta(loteria, preferencias)
+    total = int(contagens.sum())
+
+    esperado = _probabilidades_aleatorias(num_max - num_min + 1, config["drawn"], qtd)[:, None]
+    if loteria == "mais_milionaria":
+        trevo_min, trevo_max = config["trevos_range"]
+        esperado = esperado * _probabilidades_aleatorias(trevo_max - trevo_min + 1, config["trevos_drawn"], qtd_trevos)[None, :]
+    esperado = esperado * total
+
+    faixas = {}
+    for chave, nome in config["faixas"].items():
+        acertos, acertos_trevos = chave if isinstance(chave, tuple) else (chave, 0)
+        if acertos >= contagens.shape[0] or acertos_trevos >= contagens.shape[1]:
+            continue
+        faixa = faixas.setdefault(nome, {"apostas": 0, "esperado_aleatorio": 0.0})
+        faixa["apostas"] += int(contagens[acertos, acertos_trevos])
+        faixa["esperado_aleatorio"] += float(esperado[acertos, acertos_trevos])
+    for faixa in faixas.values():
+        faixa["esperado_aleatorio"] = round(faixa["esperado_aleatorio"], 4)
+
+    por_acertos = contagens.sum(axis=1)
+    distribuicao = {str(h): int(c) for h, c in enumerate(por_acertos) if c}
+    if loteria == "mais_milionaria":
+        distribuicao_trevos = {str(t): int(c) for t, c in enumerate(contagens.sum(axis=0)) if c}
+    else:
+        distribuicao_trevos = None
+
+    media = float((np.arange(len(por_acertos)) * por_acertos).sum() / total) if total else 0.0
+    resumo = {
+        "apostas": total,
+        "tamanho_aposta": qtd,
+        "media_acertos": round(media, 4),
+        "media_aleatoria": round(qtd * config["drawn"] / (num_max - num_min + 1), 4),
+        "distribuicao_acertos": distribuicao,
+        "faixas": faixas,
+    }
+    if distribuicao_trevos is not None:
+        resumo["distribuicao_trevos"] = distribuicao_trevos
+    return resumo
+
+
+def backtest(loteria, preferencias, apostas_por_concurso=10, concurso_inicial=None, concurso_final=None,
+             processos=None, recalcular_clusters=RECALCULAR_CLUSTERS, detalhar=False, historico=None,
+             semente=None):
+    """
+    Reexecuta um gerador inteligente sobre o histórico e confere as apostas.
+
+    Args:
+        loteria (str): "megasena", "mais_milionaria", "quina" ou "lotofacil".
+        preferencias (dict): preferências no formato do front (as mesmas do
+            POST de geração premium).
+        apostas_por_concurso (int): apostas geradas para cada concurso.
+        concurso_inicial, concurso_final (int | None): período testado
+            (inclusivo). Por padrão, do primeiro concurso com pelo menos
+            HISTORICO_MINIMO anteriores até o último.
+        processos (int | None): processos do pool; 1 roda no processo atual.
+        recalcular_clusters (int): período de recálculo dos clusters.
+        detalhar (bool): inclui o resumo de cada concurso.
+        historico (tuple | None): (sorteios, concursos, colunas) já
+            carregados; por padrão, lidos do store.
+        semente (int | str | None): refaz um backtest anterior; sem ela uma
+            nova é sorteada (e devolvida no resultado).
+
+    Returns:
+        dict: resumo do backtest (faixas, distribuição, média x aleatório).
+
+    Raises:
+        ValueError: loteria sem gerador inteligente ou período vazio.
+    """
+    if loteria not in GERADORES:
+        raise ValueError(f"Loteria sem gerador inteligente: {loteria}")
+    if apostas_por_concurso < 1:
+        raise ValueError("apostas_por_concurso deve ser ao menos 1")
+    semente = normalizar_semente(semente)
+    if semente is None:
+        semente = nova_semente()
+    historico = historico or carregar_historico(loteria)
+    if historico is None:
+        raise ValueError(f"Dados da {loteria} não disponíveis")
+    sorteios, concursos, colunas = historico
+
+    posicoes = np.arange(len(concursos))
+    selecionadas = posicoes[posicoes >= HISTORICO_MINIMO]
+    if concurso_inicial is not None:
+        selecionadas = selecionadas[concursos[selecionadas] >= concurso_inicial]
+    if concurso_final is not None:
+        selecionadas = selecionadas[concursos[selecionadas] <= concurso_final]
+    if not len(selecionadas):
+        raise ValueError("Nenhum concurso no período pedido")
+    inicio, fim = int(selecionadas[0]), int(selecionadas[-1]) + 1
+
+    processos = processos or os.cpu_count() or 1
+    qtd_blocos = 1 if processos == 1 else min(fim - inicio, processos * BLOCOS_POR_PROCESSO)
+    limites = np.linspace(inicio, fim, qtd_blocos + 1).astype(int)
+    tarefas = [
+        (loteria, preferencias, apostas_por_concurso, sorteios, concursos, colunas,
+         int(a), int(b), recalcular_clusters, detalhar, semente)
+        for a, b in zip(limites[:-1], limites[1:]) if b > a
+    ]
+
+    t0 = time.perf_counter()
+    if processos == 1:
+        parciais = [_rodar_bloco(tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            parciais = list(pool.map(_rodar_bloco, tarefas))
+    contagens = sum(p[0] for p in parciais)
+
+    resultado = {
+        "loteria": loteria,
+        "concursos": fim - inicio,
+        "concurso_inicial": int(concursos[inicio]),
+        "concurso_final": int(concursos[fim - 1]),
+        "apostas_por_concurso": apostas_por_concurso,
+        "semente": str(semente),
+        **_resumir(loteria, preferencias, contagens),
+        "tempo_s": round(time.perf_counter() - t0, 3),
+    }
+    if detalhar:
+        resultado["por_concurso"] = [linha for p in parciais for linha in p[1]]
+    logger.info(f"Backtest da {loteria}: {resultado['concursos']} concursos, "
+                f"{resultado['apostas']} apostas em {resultado['tempo_s']}s")
+    return resultado
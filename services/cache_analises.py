@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache de respostas das APIs de análise.
+
+As análises só mudam quando a planilha da loteria é substituída, então a
+resposta JSON já serializada é guardada sob a chave
+(loteria, endpoint, parâmetros normalizados, versão dos dados). Um acerto
+devolve os bytes direto, sem rodar pandas nem `limpar_valores_problematicos`.
+
+Há dois backends, escolhidos por `ANALISE_CACHE_BACKEND`:
+
+- `sqlite` (padrão): arquivo SQLite local compartilhado por todos os workers
+  do gunicorn no host (`ANALISE_CACHE_PATH`, por padrão junto ao draw store),
+  também LRU pelo último acesso de cada entrada;
+- `memoria`: LRU em memória, um por processo.
+
+Toda entrada tem TTL (`ANALISE_CACHE_TTL`) e as entradas de versões antigas
+de uma loteria são descartadas assim que a nova versão é gravada. Para evitar
+estouro de recomputação (cache stampede), só quem obtém o lock da chave
+recalcula uma entrada expirada; os demais servem o valor vencido enquanto
+isso ou, se não houver nenhum, aguardam o resultado.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from services.draw_store import STORE_DIR, versao_dados
+from services.precomputo_analises import obter_artefato
+
+logger = logging.getLogger(__name__)
+
+# Desligado nos workers do pré-cálculo, que precisam sempre calcular
+CACHE_ATIVO = True
+CACHE_TTL = int(os.environ.get("ANALISE_CACHE_TTL", 6 * 3600))
+# Tempo máximo que um worker espera outro terminar o cálculo da mesma chave
+CACHE_ESPERA = float(os.environ.get("ANALISE_CACHE_ESPERA", 30))
+# Validade do lock de cálculo (protege contra worker que morreu calculando)
+CACHE_LOCK_TTL = float(os.environ.get("ANALISE_CACHE_LOCK_TTL", os.environ.get("WEB_TIMEOUT", 120)))
+
+
+class CacheLRU:
+    """Backend em memória: LRU thread-safe de respostas serializadas (bytes)."""
+
+    def __init__(self, max_itens=256):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.vencidos = 0
+
+    def obter(self, chave):
+        """Retorna (corpo, expira_em) da chave, marcando como recente, ou None."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[2], item[3]
+
+    def guardar(self, chave, loteria, versao, corpo, ttl=CACHE_TTL):
+        """Grava o valor, removendo os itens menos usados acima do limite."""
+        with self._lock:
+            self._itens[chave] = (loteria, versao, corpo, time.time() + ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def descartar_versoes_antigas(self, loteria, versao_atual):
+        """Remove entradas da loteria que não são da versão atual dos dados."""
+        with self._lock:
+            antigas = [c for c, item in self._itens.items() if item[0] == loteria and item[1] != versao_atual]
+            for chave in antigas:
+                del self._itens[chave]
+        if antigas:
+            logger.info(f"Cache de análises: {len(antigas)} entradas antigas de {loteria} descartadas")
+
+    def adquirir_lock(self, chave, ttl=CACHE_LOCK_TTL):
+        """Tenta reservar o cálculo da chave; True se este chamador é o dono."""
+        agora = time.time()
+        with self._lock:
+            expira = self._locks.get(chave)
+            if expira is not None and expira > agora:
+                return False
+            self._locks[chave] = agora + ttl
+            return True
+
+    def liberar_lock(self, chave):
+        with self._lock:
+            self._locks.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._locks.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "vencidos": self.vencidos,
+            }
+
+
+class CacheSQLite:
+    """
+    Backend compartilhado entre processos em um arquivo SQLite local.
+
+    Usa WAL para leituras concorrentes com uma escrita, e uma tabela de locks
+    com validade para coordenar qual worker recalcula cada chave. Cada thread
+    de cada processo abre sua própria conexão.
+    """
+
+    def __init__(self, caminho, max_itens=256):
+        self.caminho = caminho
+        self.max_itens = max_itens
+        self._local = threading.local()
+        self.acertos = 0
+        self.falhas = 0
+        self.vencidos = 0
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with self._conexao() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_analises ("
+                " chave TEXT PRIMARY KEY, loteria TEXT NOT NULL, versao TEXT NOT NULL,"
+                " corpo BLOB NOT NULL, criado_em REAL NOT NULL, expira_em REAL NOT NULL,"
+                " acessado_em REAL NOT NULL DEFAULT 0)"
+            )
+            self._migrar_acessado_em(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_analises_loteria ON cache_analises (loteria, versao)")
+            conn.execute("DROP INDEX IF EXISTS ix_cache_analises_criado")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_analises_acessado ON cache_analises (acessado_em)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_analises_locks ("
+                " chave TEXT PRIMARY KEY, dono TEXT NOT NULL, expira_em REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def _migrar_acessado_em(conn):
+        """Acrescenta o último acesso (base do LRU) em arquivos criados antes dele."""
+        colunas = {linha[1] for linha in conn.execute("PRAGMA table_info(cache_analises)")}
+        if "acessado_em" in colunas:
+            return
+        try:
+            conn.execute("ALTER TABLE cache_analises ADD COLUMN acessado_em REAL NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError as e:
+            # Outro worker migrou o mesmo arquivo primeiro
+            if "duplicate column" not in str(e):
+                raise
+            return
+        conn.execute("UPDATE cache_analises SET acessado_em = criado_em")
+
+    def _conexao(self):
+        # Conexões SQLite não podem atravessar fork nem threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _dono():
+        """Identifica o dono do lock (processo + thread)."""
+        return f"{os.getpid()}-{threading.get_ident()}"
+
+    def obter(self, chave):
+        """Retorna (corpo, expira_em) da chave, marcando como recente, ou None."""
+        conn = self._conexao()
+        linha = conn.execute(
+            "SELECT corpo, expira_em FROM cache_analises WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            self.falhas += 1
+            return None
+        conn.execute("UPDATE cache_analises SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+        self.acertos += 1
+        return bytes(linha[0]), linha[1]
+
+    def guardar(self, chave, loteria, versao, corpo, ttl=CACHE_TTL):
+        """Grava o valor, removendo as entradas menos usadas acima do limite."""
+        agora = time.time()
+        conn = self._conexao()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_analises (chave, loteria, versao, corpo, criado_em, expira_em, acessado_em)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (chave, loteria, versao, sqlite3.Binary(corpo), agora, agora + ttl, agora),
+        )
+        conn.execute(
+            "DELETE FROM cache_analises WHERE chave IN ("
+            " SELECT chave FROM cache_analises ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+            (self.max_itens,),
+        )
+
+    def descartar_versoes_antigas(self, loteria, versao_atual):
+        """Remove entradas da loteria que não são da versão atual dos dados."""
+        cursor = self._conexao().execute(
+            "DELETE FROM cache_analises WHERE loteria = ? AND versao != ?", (loteria, versao_atual)
+        )
+        if cursor.rowcount:
+            logger.info(f"Cache de análises: {cursor.rowcount} entradas antigas de {loteria} descartadas")
+
+    def adquirir_lock(self, chave, ttl=CACHE_LOCK_TTL):
+        """Tenta reservar o cálculo da chave entre todos os workers."""
+        agora = time.time()
+        conn = self._conexao()
+        conn.execute("DELETE FROM cache_analises_locks WHERE chave = ? AND expira_em <= ?", (chave, agora))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO cache_analises_locks (chave, dono, expira_em) VALUES (?, ?, ?)",
+            (chave, self._dono(), agora + ttl),
+        )
+        return cursor.rowcount == 1
+
+    def liberar_lock(self, chave):
+        self._conexao().execute(
+            "DELETE FROM cache_analises_locks WHERE chave = ? AND dono = ?", (chave, self._dono())
+        )
+
+    def limpar(self):
+        conn = self._conexao()
+        conn.execute("DELETE FROM cache_analises")
+        conn.execute("DELETE FROM cache_analises_locks")
+
+    def estatisticas(self):
+        itens = self._conexao().execute("SELECT COUNT(*) FROM cache_analises").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "caminho": self.caminho,
+            "itens": itens,
+            "max_itens": self.max_itens,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "vencidos": self.vencidos,
+        }
+
+
+def criar_backend():
+    """Instancia o backend configurado; cai para memória se o SQLite falhar."""
+    max_itens = int(os.environ.get("ANALISE_CACHE_MAX_ITENS", 256))
+    backend = os.environ.get("ANALISE_CACHE_BACKEND", "sqlite").lower()
+    if backend == "sqlite":
+        caminho = os.environ.get("ANALISE_CACHE_PATH", os.path.join(STORE_DIR, "cache_analises.sqlite"))
+        try:
+            return CacheSQLite(caminho, max_itens=max_itens)
+        except Exception as exc:
+            logger.warning(f"Cache SQLite indisponível ({exc}); usando cache em memória")
+    return CacheLRU(max_itens=max_itens)
+
+
+cache_analises = criar_backend()
+
+
+def normalizar_parametros(args):
+    """
+    Normaliza a query string para compor a chave do cache.
+
+    Parâmetros são ordenados, valores inteiros canonizados ("050" -> "50") e
+    parâmetros iniciados por "_" (cache-busters como `_=timestamp`) ignorados.
+    """
+    itens = []
+    for nome in sorted(args.keys()):
+        if nome.startswith("_"):
+            continue
+        valores = []
+        for valor in args.getlist(nome):
+            valor = valor.strip()
+            try:
+                valor = str(int(valor))
+            except ValueError:
+                pass
+            valores.append(valor)
+        itens.append((nome, tuple(valores)))
+    return tuple(itens)
+
+
+def _resposta_cache(corpo, status):
+    resposta = current_app.response_class(corpo, mimetype="application/json")
+    resposta.headers["X-Cache"] = status
+    return resposta
+
+
+def _aguardar_calculo(chave):
+    """Espera outro worker gravar a chave; retorna o corpo ou None no timeout
+    (ou se o cache falhar, e então quem chamou calcula)."""
+    limite = time.monotonic() + CACHE_ESPERA
+    intervalo = 0.05
+    while time.monotonic() < limite:
+        time.sleep(intervalo)
+        intervalo = min(intervalo * 2, 0.5)
+        try:
+            item = cache_analises.obter(chave)
+        except Exception as exc:
+            logger.warning(f"Falha ao ler cache de análises: {exc}")
+            return None
+        if item is not None and item[1] > time.time():
+            return item[0]
+    return None
+
+
+def cache_analise(loteria):
+    """
+    Decorador de rota: serve a resposta JSON do cache enquanto a planilha da
+    loteria não mudar e a entrada estiver no TTL. Só respostas 200 em JSON
+    são guardadas. Artefatos publicados pelo pré-cálculo da versão atual têm
+    precedência. O header `X-Cache` indica PRECOMPUTED, HIT, STALE ou MISS.
+    """
+    def decorador(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ATIVO:
+                return view(*args, **kwargs)
+            versao = versao_dados(loteria)
+            if versao is None:
+                return view(*args, **kwargs)
+
+            parametros = normalizar_parametros(request.args)
+            corpo = obter_artefato(loteria, versao, request.path, parametros)
+            if corpo is not None:
+                return _resposta_cache(corpo, "PRECOMPUTED")
+
+            chave = json.dumps([loteria, request.path, parametros, versao])
+            try:
+                item = cache_analises.obter(chave)
+            except Exception as exc:
+                logger.warning(f"Falha ao ler cache de análises: {exc}")
+                return view(*args, **kwargs)
+            if item is not None and item[1] > time.time():
+                return _resposta_cache(item[0], "HIT")
+
+            try:
+                dono = cache_analises.adquirir_lock(chave)
+            except Exception as exc:
+                # Sem coordenação: calcula sem o lock em vez de falhar a requisição
+                logger.warning(f"Falha ao reservar cálculo no cache de análises: {exc}")
+                dono = None
+            if dono is False:
+                # Outro worker já está recalculando esta chave
+                if item is not None:
+                    cache_analises.vencidos += 1
+                    return _resposta_cache(item[0], "STALE")
+                corpo = _aguardar_calculo(chave)
+                if corpo is not None:
+                    return _resposta_cache(corpo, "HIT")
+
+            try:
+                resposta = make_response(view(*args, **kwargs))
+                if resposta.status_code == 200 and resposta.mimetype == "application/json":
+                    try:
+                        cache_analises.descartar_versoes_antigas(loteria, versao)
+                        cache_analises.guardar(chave, loteria, versao, resposta.get_data())
+                    except Exception as exc:
+                        logger.warning(f"Falha ao gravar cache de análises: {exc}")
+            finally:
+                if dono:
+                    try:
+                        cache_analises.liberar_lock(chave)
+                    except Exception as exc:
+                        # O lock expira sozinho em CACHE_LOCK_TTL
+                        logger.warning(f"Falha ao liberar lock do cache de análises: {exc}")
+            resposta.headers["X-Cache"] = "MISS"
+            return resposta
+        # Usado pelo pré-cálculo para descobrir as rotas da loteria
+        wrapper.cache_loteria = loteria
+        return wrapper
+    return decorador
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Conferência de apostas contra todo o histórico de concursos.
+
+Responde perguntas como "quantas quadras e quinas estas 200 apostas da Mega
+Sena teriam feito desde o concurso 1200?". Apostas e sorteios viram bitmasks
+(funcoes/common/bitmask.py: uma palavra uint64 até o número 63, duas até o
+127) e a matriz completa apostas x concursos de acertos sai do popcount das
+interseções. As apostas são processadas em blocos para limitar a memória, e
+cada bloco já é agregado por faixa de premiação (LOTERIA_CONFIG["faixas"])
+com um único ``bincount``, o que permite devolver o resultado em streaming.
+
+Na +Milionária os acertos nos números e nos trevos são contados separadamente
+e combinados na faixa. As faixas consideram os acertos de cada aposta (uma
+aposta de 8 números com 5 acertos conta como uma quina).
+"""
+
+import json
+import os
+
+import numpy as np
+
+from funcoes.common.bitmask import empacotar, matriz_acertos
+from funcoes.common.config import obter_config
+from services.draw_store import carregar_historico
+from services.geradores.lote import LOTERIAS_LOTE
+
+CONFERENCIA_MAX_APOSTAS = int(os.environ.get("CONFERENCIA_MAX_APOSTAS", "10000"))
+BLOCO_APOSTAS = 128    # apostas por bloco: 128 x 3000 concursos de acertos cabem no cache
+
+
+def _normalizar_apostas(loteria, apostas, trevos=None):
+    """Valida as apostas; aceita listas de números ou dicts {"numeros", "trevos"}."""
+    config = LOTERIAS_LOTE.get(loteria)
+    if config is None:
+        raise ValueError(f"Loteria inválida: {loteria}")
+    if not apostas:
+        raise ValueError("Nenhuma aposta para conferir")
+    if len(apostas) > CONFERENCIA_MAX_APOSTAS:
+        raise ValueError(f"Máximo de {CONFERENCIA_MAX_APOSTAS} apostas por conferência")
+
+    if isinstance(apostas[0], dict):
+        trevos = [a.get("trevos") or [] for a in apostas]
+        apostas = [a.get("numeros") or [] for a in apostas]
+
+    def validar(conjuntos, faixa, qtd, rotulo):
+        normalizados = []
+        for i, numeros in enumerate(conjuntos):
+            numeros = sorted(int(n) for n in numeros)
+            if len(set(numeros)) != len(numeros):
+                raise ValueError(f"Aposta {i + 1}: {rotulo} repetidos")
+            if not qtd[0] <= len(numeros) <= qtd[1]:
+                raise ValueError(f"Aposta {i + 1}: deve ter de {qtd[0]} a {qtd[1]} {rotulo}")
+            if numeros[0] < faixa[0] or numeros[-1] > faixa[1]:
+                raise ValueError(f"Aposta {i + 1}: {rotulo} devem estar entre {faixa[0]} e {faixa[1]}")
+            normalizados.append(numeros)
+        return normalizados
+
+    apostas = validar(apostas, config["faixa"], config["qtd"], "números")
+    if "trevos" in config:
+        if trevos is None or len(trevos) != len(apostas):
+            raise ValueError("Informe os trevos de cada aposta")
+        trevos = validar(trevos, config["trevos"]["faixa"], config["trevos"]["qtd"], "trevos")
+    else:
+        trevos = None
+    return apostas, trevos
+
+
+class Conferencia:
+    """
+    Conferência de um conjunto de apostas contra os concursos de um período.
+
+    Args:
+        loteria (str): chave de LOTERIAS_LOTE.
+        apostas (list): listas de números ou dicts {"numeros", "trevos"}.
+        trevos (list | None): trevos de cada aposta (+Milionária), quando
+            ``apostas`` são listas.
+        concurso_inicial, concurso_final (int | None): período (inclusivo).
+        historico (tuple | None): (sorteios, concursos, colunas) já
+            carregados; por padrão, lidos do store.
+
+    Raises:
+        ValueError: apostas inválidas, dados indisponíveis ou período vazio.
+    """
+
+    def __init__(self, loteria, apostas, trevos=None, concurso_inicial=None, concurso_final=None, historico=None):
+        self.loteria = loteria
+        self.apostas, self.trevos = _normalizar_apostas(loteria, apostas, trevos)
+        config = obter_config(loteria)
+
+        historico = historico or carregar_historico(loteria)
+        if historico is None:
+            raise ValueError(f"Dados da {loteria} não disponíveis")
+        sorteios, concursos, colunas = historico
+        selecao = np.ones(len(concursos), dtype=bool)
+        if concurso_inicial is not None:
+            selecao &= concursos >= int(concurso_inicial)
+        if concurso_final is not None:
+            selecao &= concursos <= int(concurso_final)
+        if not selecao.any():
+            raise ValueError("Nenhum concurso no período pedido")
+        self.concursos = concursos[selecao]
+
+        num_max = config["range"][1]
+        bolas = [i for i, c in enumerate(colunas) if c.startswith("Bola")]
+        self._sorteios = empacotar(sorteios[selecao][:, bolas], num_max)
+        self._apostas = empacotar(self.apostas, num_max)
+
+        # Índice combinado de acertos: números * (trevos_drawn + 1) + trevos
+        self._drawn = config["drawn"]
+        self._largura_trevos = config.get("trevos_drawn", 0) + 1
+        if self.trevos is not None:
+            trevo_max = config["trevos_range"][1]
+            cols_trevos = [i for i, c in enumerate(colunas) if c.startswith("Trevo")]
+            self._sorteios_trevos = empacotar(sorteios[selecao][:, cols_trevos], trevo_max)
+            self._apostas_trevos = empacotar(self.trevos, trevo_max)
+
+        # Faixas na ordem da configuração (mais alta primeiro); cada combinação
+        # de acertos aponta para sua faixa numa matriz (combinações x faixas)
+        self.faixas = list(dict.fromkeys(config["faixas"].values()))
+        self._para_faixas = np.zeros(((self._drawn + 1) * self._largura_trevos, len(self.faixas)), dtype=np.int64)
+        for chave, nome in config["faixas"].items():
+            acertos, acertos_trevos = chave if isinstance(chave, tuple) else (chave, 0)
+            self._para_faixas[acertos * self._largura_trevos + acertos_trevos, self.faixas.index(nome)] = 1
+
+    def __len__(self):
+        return len(self.apostas)
+
+    def _indices(self, inicio, fim):
+        """Matriz (apostas do bloco x concursos) do índice combinado de acertos."""
+        acertos = matriz_acertos(self._apostas[inicio:fim], self._sorteios)
+        np.minimum(acertos, self._drawn, out=acertos)
+        if self.trevos is None:
+            return acertos, acertos
+        acertos_trevos = matriz_acertos(self._apostas_trevos[inicio:fim], self._sorteios_trevos)
+        indices = acertos * np.uint8(self._largura_trevos) + acertos_trevos   # cabe em uint8 (máx. 20)
+        return indices, acertos
+
+    def blocos(self, tamanho=BLOCO_APOSTAS):
+        """
+        Gera, por bloco de apostas, (início, contagens, acertos máximos,
+        posição do concurso do máximo). ``contagens`` é (apostas x índices
+        de acertos): quantos concursos caíram em cada combinação.
+        """
+        combinacoes = len(self._para_faixas)
+        for inicio in range(0, len(self), tamanho):
+            fim = min(inicio + tamanho, len(self))
+            indices, acertos = self._indices(inicio, fim)
+            n = fim - inicio
+            deslocados = indices + (np.arange(n, dtype=np.int64) * combinacoes)[:, None]
+            contagens = np.bincount(deslocados.ravel(), minlength=n * combinacoes).reshape(n, combinacoes)
+            # Último concurso com o máximo de acertos (o mais recente)
+            reverso = acertos[:, ::-1]
+            posicao_max = acertos.shape[1] - 1 - reverso.argmax(axis=1)
+            yield inicio, contagens, acertos.max(axis=1), posicao_max
+
+    def iterar(self):
+        """Resultado de cada aposta, na ordem, seguido dos totais (último item, chave "totais")."""
+        total_faixas = np.zeros(len(self.faixas), dtype=np.int64)
+        total_acertos = np.zeros(self._drawn + 1, dtype=np.int64)
+        for inicio, contagens, maximos, posicoes in self.blocos():
+            por_faixa = contagens @ self._para_faixas
+            total_faixas += por_faixa.sum(axis=0)
+            total_acertos += contagens.reshape(len(contagens), self._drawn + 1, self._largura_trevos).sum(axis=(0, 2))
+            for j in range(len(contagens)):
+                i = inicio + j
+                linha = {
+                    "indice": i,
+                    "numeros": self.apostas[i],
+                    "faixas": {nome: int(c) for nome, c in zip(self.faixas, por_faixa[j]) if c},
+                    "maximo_acertos": int(maximos[j]),
+                    "concurso_maximo": int(self.concursos[posicoes[j]]),
+                }
+                if self.trevos is not None:
+                    linha["trevos"] = self.trevos[i]
+                yield linha
+        yield {"totais": {
+            "faixas": {nome: int(c) for nome, c in zip(self.faixas, total_faixas)},
+            "distribuicao_acertos": {str(h): int(c) for h, c in enumerate(total_acertos) if c},
+        }}
+
+    def cabecalho(self):
+        """Dados do período conferido (primeira parte da resposta)."""
+        return {
+            "loteria": self.loteria,
+            "apostas": len(self),
+            "concursos": len(self.concursos),
+            "concurso_inicial": int(self.concursos[0]),
+            "concurso_final": int(self.concursos[-1]),
+            "faixas": self.faixas,
+        }
+
+    def resumo(self):
+        """Resultado completo como um dict (cabeçalho, apostas e totais)."""
+        linhas = list(self.iterar())
+        return dict(self.cabecalho(), resultados=linhas[:-1], **linhas[-1])
+
+
+def iterar_ndjson(conferencia, bloco=500):
+    """NDJSON: cabeçalho, uma linha por aposta e os totais na última linha."""
+    yield json.dumps(conferencia.cabecalho(), ensure_ascii=False) + "\n"
+    linhas = []
+    for item in conferencia.iterar():
+        linhas.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        if len(linhas) >= bloco:
+            yield "\n".join(linhas) + "\n"
+            linhas = []
+    if linhas:
+        yield "\n".join(linhas) + "\n"
+
+
+def iterar_json(conferencia, bloco=500):
+    """Documento JSON único (cabeçalho + "resultados" + "totais"), emitido em pedaços."""
+    cabecalho = json.dumps(dict(conferencia.cabecalho(), success=True), ensure_ascii=False)
+    yield cabecalho[:-1] + ', "resultados": ['
+    linhas, primeiro = [], True
+    for item in conferencia.iterar():
+        if "totais" in item:
+            if linhas:
+                yield ("" if primeiro else ",") + ",".join(linhas)
+            yield '], "totais": ' + json.dumps(item["totais"], ensure_ascii=False) + "}"
+            return
+        linhas.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        if len(linhas) >= bloco:
+            yield ("" if primeiro else ",") + ",".join(linhas)
+            primeiro, linhas = False, []
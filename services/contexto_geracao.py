@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Contexto de geração das apostas premium.
+
+Os geradores inteligentes só consomem poucos dados de análise: frequência
+por número (histórico inteiro ou janela), atraso atual, último concurso,
+pares mais fortes, membros de cada cluster e, na +Milionária, a frequência
+dos trevos. Antes cada POST recarregava a planilha e rodava as análises
+completas (até ~17s na Quina, por causa da estatística avançada) só para
+ler esses campos.
+
+Aqui esses insumos ficam prontos por (loteria, versão dos dados): a matriz
+de incidência dá frequência, atraso, último sorteio e pares; os clusters
+usam o mesmo KMeans das telas de estatística avançada, calculado uma vez
+por versão e só quando algum pedido usa clusters. `analysis_cache` monta o
+dicionário no formato que cada gerador lê, então o custo do POST fica
+restrito ao sorteio.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+from funcoes.common.incidencia import MatrizIncidencia, obter_matriz_incidencia
+from services.draw_store import versao_dados
+
+logger = logging.getLogger(__name__)
+
+JANELA_PARES = 50   # pares fortes: últimos 50 concursos, como nas análises de combinações
+QTD_PARES = 20
+JANELA_RECENTE = 25
+
+_contextos = {}  # loteria -> ContextoGeracao da versão atual
+_lock = threading.Lock()
+
+
+def _classe_avancada(loteria):
+    """Classe de estatística avançada cujo KMeans define os clusters da loteria."""
+    if loteria == "megasena":
+        from funcoes.megasena.analise_estatistica_avancada_MS import AnaliseEstatisticaAvancada
+        return AnaliseEstatisticaAvancada
+    if loteria == "mais_milionaria":
+        from funcoes.milionaria.analise_estatistica_avancada import AnaliseEstatisticaAvancada
+        return AnaliseEstatisticaAvancada
+    if loteria == "quina":
+        from funcoes.quina.analise_estatistica_avancada_quina import AnaliseEstatisticaAvancadaQuina
+        return AnaliseEstatisticaAvancadaQuina
+    if loteria == "lotofacil":
+        from funcoes.lotofacil.analise_estatistica_avancada_lotofacil import AnaliseEstatisticaAvancadaLotofacil
+        return AnaliseEstatisticaAvancadaLotofacil
+    return None
+
+
+def calcular_clusters(loteria, df):
+    """Membros de cada cluster {cluster_id: [números]} do KMeans da estatística avançada."""
+    classe = _classe_avancada(loteria)
+    if classe is None:
+        return {}
+    try:
+        analise = classe(df)
+        n_clusters = min(5, max(2, len(analise.df_validos) // 5))
+        estatisticas = analise.analise_clusters(n_clusters=n_clusters).get('estatisticas_clusters', {})
+        return {
+            cid: [int(n) for n in info.get('numeros', [])]
+            for cid, info in estatisticas.items()
+        }
+    except Exception as e:
+        logger.warning(f"Falha ao calcular clusters da {loteria}: {e}")
+        return {}
+
+
+class ContextoGeracao:
+    """Insumos dos geradores de uma loteria numa versão dos dados."""
+
+    def __init__(self, loteria, versao, df):
+        frequencia_trevos = None
+        if loteria == "mais_milionaria" and {"Trevo1", "Trevo2"} <= set(df.columns):
+            trevos = MatrizIncidencia.from_dataframe(
+                df, loteria, colunas=["Trevo1", "Trevo2"], numero_range=(1, 6)
+            )
+            frequencia_trevos = dict(zip(trevos.numeros.tolist(), trevos.frequencia().tolist()))
+        self._inicializar(loteria, versao, obter_matriz_incidencia(loteria, df, versao), frequencia_trevos)
+        self._df = df
+
+    @classmethod
+    def de_incidencia(cls, loteria, incidencia, frequencia_trevos=None, clusters=None):
+        """
+        Contexto montado direto de uma matriz de incidência, sem DataFrame
+        (ex.: o histórico até um concurso, no backtest). Os clusters, se
+        usados, vêm prontos; sem eles ficam vazios.
+        """
+        contexto = cls.__new__(cls)
+        contexto._inicializar(loteria, None, incidencia, frequencia_trevos)
+        contexto._df = None
+        contexto._clusters = clusters if clusters is not None else {}
+        return contexto
+
+    def _inicializar(self, loteria, versao, incidencia, frequencia_trevos):
+        self.loteria = loteria
+        self.versao = versao
+        self._lock = threading.Lock()
+
+        self.incidencia = incidencia
+        numeros = incidencia.numeros.tolist()
+        self.frequencia_total = dict(zip(numeros, incidencia.frequencia().tolist()))
+        self.atraso = dict(zip(numeros, incidencia.atraso_atual().tolist()))
+        self.ultimo_sorteio = incidencia.linha(-1) if len(incidencia) else []
+        self.frequencia_trevos = frequencia_trevos or {}
+
+        self._frequencias = {None: self.frequencia_total}
+        self._pares = {}
+        self._clusters = None
+
+    def frequencia(self, janela=None):
+        """Frequência {número: aparições} nos últimos ``janela`` concursos."""
+        if janela is not None and (janela <= 0 or janela >= len(self.incidencia)):
+            janela = None
+        with self._lock:
+            freq = self._frequencias.get(janela)
+            if freq is None:
+                freq = dict(zip(self.incidencia.numeros.tolist(), self.incidencia.frequencia(janela).tolist()))
+                self._frequencias[janela] = freq
+        return freq
+
+    def pares_fortes(self, janela=JANELA_PARES, top=QTD_PARES):
+        """Pares que mais saíram juntos na janela: [((a, b), vezes), ...]."""
+        chave = (janela, top)
+        with self._lock:
+            pares = self._pares.get(chave)
+            if pares is None:
+                co = self.incidencia.coocorrencia(janela)
+                i, j = np.triu_indices(co.shape[0], k=1)
+                contagens = co[i, j]
+                # Mais frequentes primeiro; empates pelo par em ordem crescente
+                ordem = np.lexsort((j, i, -contagens))[:top]
+                base = self.incidencia.num_min
+                pares = [
+                    ((int(i[k]) + base, int(j[k]) + base), int(contagens[k]))
+                    for k in ordem if contagens[k] > 0
+                ]
+                self._pares[chave] = pares
+        return pares
+
+    def clusters(self):
+        """Membros de cada cluster {cluster_id: [números]} (KMeans da estatística avançada)."""
+        with self._lock:
+            if self._clusters is None:
+                self._clusters = calcular_clusters(self.loteria, self._df) if self._df is not None else {}
+                # A análise já foi feita; o DataFrame não é mais necessário
+                self._df = None
+        return self._clusters
+
+    # ------------------------------------------------------------------
+    # analysis_cache no formato de cada gerador
+    # ------------------------------------------------------------------
+    def analysis_cache(self, preferencias):
+        """Dicionário de análises no formato lido pelo gerador da loteria."""
+        preferencias = preferencias or {}
+        montar = {
+            "megasena": self._cache_megasena_quina,
+            "quina": self._cache_megasena_quina,
+            "mais_milionaria": self._cache_milionaria,
+            "lotofacil": self._cache_lotofacil,
+        }.get(self.loteria)
+        return montar(preferencias) if montar else {}
+
+    def _clusters_estatisticas(self):
+        return {cid: {'numeros': numeros} for cid, numeros in self.clusters().items()}
+
+    def _cache_megasena_quina(self, preferencias):
+        cache = {}
+        if 'frequencia' in preferencias:
+            cache['frequencia_completa'] = {
+                'analise_frequencia': {'frequencia_absoluta': {'numeros': self.frequencia_total}}
+            }
+        if 'padroes' in preferencias or 'sequencias' in preferencias:
+            cache['padroes_completa'] = {
+                'intervalos_de_ausencia': {'numeros_intervalos': self.atraso},
+                'repeticoes_entre_concursos': {'ultimos_numeros_sorteados': self.ultimo_sorteio},
+            }
+        if 'afinidades' in preferencias:
+            cache['afinidades_completa'] = {
+                'afinidade_entre_numeros': {'pares_com_maior_afinidade': self.pares_fortes()}
+            }
+        if preferencias.get('clusters'):
+            cache['avancada'] = {'analise_clusters': {'estatisticas_clusters': self._clusters_estatisticas()}}
+        return cache
+
+    def _cache_milionaria(self, preferencias):
+        cache = {}
+        freq_pref = preferencias.get('frequencia') or {}
+        if freq_pref:
+            periodo = str(freq_pref.get('considerarPeriodo', 'completa'))
+            janela = int(periodo) if periodo.isdigit() else None
+            cache[f'frequencia_{periodo}'] = {'frequencia_numeros': self.frequencia(janela)}
+        if 'padroes' in preferencias:
+            cache['padroes_completa'] = {'seca_atual': self.atraso, 'ultimos_sorteados': self.ultimo_sorteio}
+        if preferencias.get('clusters'):
+            cache['avancada'] = {'clusters': {'detalhes_clusters': self._clusters_estatisticas()}}
+        if 'trevos' in preferencias:
+            cache['trevos_completa'] = {'frequencia_trevos': self.frequencia_trevos}
+        return cache
+
+    def _cache_lotofacil(self, preferencias):
+        qtd_concursos = preferencias.get('qtd_concursos')
+        qtd_concursos = qtd_concursos if isinstance(qtd_concursos, int) and qtd_concursos > 0 else None
+        frequencia = self.frequencia(qtd_concursos or JANELA_RECENTE)
+        return {
+            'ultimo_sorteio': self.ultimo_sorteio,
+            'frequencia': {
+                'frequencia_absoluta_numeros': [
+                    {'numero': n, 'frequencia': f} for n, f in frequencia.items()
+                ]
+            },
+            'afinidades_completa': {
+                'afinidade_entre_numeros': {
+                    'pares_com_maior_afinidade': self.pares_fortes(min(200, qtd_concursos or JANELA_PARES), 50)
+                }
+            },
+        }
+
+
+def obter_contexto(loteria, carregar_dados):
+    """
+    Contexto de geração da versão atual dos dados da loteria.
+
+    Args:
+        loteria (str): "megasena", "mais_milionaria", "quina" ou "lotofacil".
+        carregar_dados (callable): carrega o DataFrame da loteria (só é
+            chamado quando a versão muda).
+
+    Returns:
+        ContextoGeracao | None: None se não houver dados.
+    """
+    versao = versao_dados(loteria)
+    with _lock:
+        contexto = _contextos.get(loteria)
+        if contexto is not None and contexto.versao == versao:
+            return contexto
+
+    df = carregar_dados(loteria)
+    if df is None or df.empty:
+        return None
+    contexto = ContextoGeracao(loteria, versao, df)
+    with _lock:
+        _contextos[loteria] = contexto
+    logger.info(f"Contexto de geração da {loteria} montado (versão {versao}, {len(contexto.incidencia)} concursos)")
+    return contexto
+
+
+def limpar():
+    """Descarta todos os contextos (próxima geração remonta)."""
+    with _lock:
+        _contextos.clear()
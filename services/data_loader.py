@@ -4,10 +4,19 @@
 import pandas as pd
 import os
 
+from services.draw_store import carregar_ou_compilar
+
 def carregar_dados_milionaria():
     """Carrega os dados da +Milionária do arquivo Excel."""
     # Usar caminho absoluto baseado no diretório atual
     excel_file = os.path.join(os.getcwd(), 'LoteriasExcel', 'Milionária_edt.xlsx')
+    # Store binário (memory-mapped); a planilha só é lida se estiver desatualizado
+    try:
+        df = carregar_ou_compilar('mais_milionaria', dtype_concurso='Int64')
+        if df is not None:
+            return df
+    except Exception as e:
+        print(f"Erro ao carregar o store da +Milionária: {e}")
     if os.path.exists(excel_file):
         try:
             df = pd.read_excel(excel_file)
@@ -47,3 +56,14 @@ def carregar_dados_quina_app():
     except Exception as e:
         print(f"Erro ao carregar dados da Quina: {e}")
         return pd.DataFrame() # Retorna DataFrame vazio em caso de erro
+
+def carregar_dados_lotomania():
+    """Carrega os dados da Lotomania (store binário ou, se desatualizado, Excel)."""
+    try:
+        df = carregar_ou_compilar('lotomania', dtype_bolas='int64')
+        if df is None:
+            print("Arquivo Excel da Lotomania não encontrado")
+        return df
+    except Exception as e:
+        print(f"Erro ao carregar dados da Lotomania: {e}")
+        return None
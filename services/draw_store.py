@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Store binário de sorteios (draw store).
+
+Compila cada planilha de `LoteriasExcel/*.xlsx` em arquivos `.npy` compactos:
+uma matriz de sorteios `uint8` (concursos x bolas) e um índice de concursos
+`int32`, mais um `meta.json` com a versão da planilha de origem. Os loaders
+leem o store memory-mapped (`np.load(mmap_mode='r')`), de forma que todos os
+workers do gunicorn compartilham as mesmas páginas pelo cache do sistema
+operacional. A planilha Excel só é lida quando o store está desatualizado.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXCEL_DIR = os.path.join(BASE_DIR, "LoteriasExcel")
+STORE_DIR = os.environ.get("DRAW_STORE_DIR", os.path.join(EXCEL_DIR, ".store"))
+
+# Arquivo de origem e colunas de bolas por loteria (chaves iguais às do app)
+LOTERIAS = {
+    "mais_milionaria": {
+        "arquivo": "Milionária_edt.xlsx",
+        "colunas": [f"Bola{i}" for i in range(1, 7)] + ["Trevo1", "Trevo2"],
+    },
+    "megasena": {
+        "arquivo": "MegaSena_edt.xlsx",
+        "colunas": [f"Bola{i}" for i in range(1, 7)],
+    },
+    "quina": {
+        "arquivo": "Quina_edt.xlsx",
+        "colunas": [f"Bola{i}" for i in range(1, 6)],
+    },
+    "lotofacil": {
+        "arquivo": "Lotofacil_edt2.xlsx",
+        "colunas": [f"Bola{i}" for i in range(1, 16)],
+    },
+    "lotomania": {
+        "arquivo": "Lotomania_edt.xlsx",
+        "colunas": [f"Bola{i}" for i in range(1, 21)],
+    },
+}
+
+
+def caminho_excel(loteria):
+    """Retorna o caminho da planilha de origem da loteria (ou None)."""
+    info = LOTERIAS.get(loteria)
+    if not info:
+        return None
+    return os.path.join(EXCEL_DIR, info["arquivo"])
+
+
+def _caminhos_store(loteria):
+    """Retorna (sorteios.npy, concursos.npy, meta.json) da loteria."""
+    base = os.path.join(STORE_DIR, loteria)
+    return f"{base}.sorteios.npy", f"{base}.concursos.npy", f"{base}.meta.json"
+
+
+def versao_dados(loteria):
+    """
+    Versão dos dados de uma loteria, derivada de mtime e tamanho da planilha.
+
+    Returns:
+        str | None: Ex.: "1718900000000000000-48213", ou None se a planilha
+        não existir.
+    """
+    path = caminho_excel(loteria)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        st = os.stat(path)
+    except OSError as exc:
+        logger.warning(f"Não foi possível obter stat de {path}: {exc}")
+        return None
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def _ler_meta(loteria):
+    meta_path = _caminhos_store(loteria)[2]
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as exc:
+        logger.warning(f"Meta do store inválido para {loteria}: {exc}")
+        return None
+
+
+def store_atualizado(loteria, meta=None):
+    """Indica se o store da loteria existe e corresponde à planilha atual."""
+    if meta is None:
+        meta = _ler_meta(loteria)
+    if meta is None:
+        return False
+    versao = versao_dados(loteria)
+    # Sem planilha (ex.: deploy só com o store) o store compilado é a fonte
+    if versao is None:
+        return True
+    return meta.get("versao") == versao
+
+
+def _salvar_npy_atomico(path, array):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def salvar_store(loteria, df, versao=None):
+    """
+    Grava o store a partir de um DataFrame já normalizado (Concurso + bolas).
+
+    A escrita é atômica (arquivo temporário + `os.replace`) e o `meta.json` é
+    gravado por último, de modo que um leitor nunca enxerga um store parcial
+    marcado como atualizado.
+    """
+    info = LOTERIAS[loteria]
+    colunas = info["colunas"]
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    sorteios = df[colunas].to_numpy(dtype=np.int64)
+    if sorteios.size and (sorteios.min() < 0 or sorteios.max() > 255):
+        raise ValueError(f"Valores fora da faixa uint8 em {loteria}")
+    concursos = df["Concurso"].to_numpy(dtype=np.int64)
+
+    sorteios_path, concursos_path, meta_path = _caminhos_store(loteria)
+    _salvar_npy_atomico(sorteios_path, np.ascontiguousarray(sorteios, dtype=np.uint8))
+    _salvar_npy_atomico(concursos_path, concursos.astype(np.int32))
+
+    meta = {
+        "loteria": loteria,
+        "arquivo": info["arquivo"],
+        "versao": versao if versao is not None else versao_dados(loteria),
+        "colunas": colunas,
+        "linhas": int(len(df)),
+    }
+    tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, meta_path)
+    logger.info(f"Store de {loteria} gravado: {len(df)} concursos")
+
+
+def ler_excel_normalizado(loteria):
+    """
+    Lê a planilha da loteria e retorna apenas Concurso + bolas, sem linhas
+    incompletas. É o único ponto que passa pelo openpyxl.
+    """
+    info = LOTERIAS[loteria]
+    path = caminho_excel(loteria)
+    df = pd.read_excel(path)
+    df.columns = [str(col).replace(" ", "") for col in df.columns]
+    colunas = ["Concurso"] + info["colunas"]
+    df = df[colunas].copy()
+    for col in colunas:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.dropna().reset_index(drop=True)
+
+
+def compilar_loteria(loteria, forcar=False):
+    """
+    Compila a planilha da loteria no store, se necessário.
+
+    Returns:
+        bool: True se o store foi (re)gravado.
+    """
+    if not forcar and store_atualizado(loteria):
+        return False
+    path = caminho_excel(loteria)
+    if not path or not os.path.exists(path):
+        logger.error(f"Planilha não encontrada para {loteria}: {path}")
+        return False
+    versao = versao_dados(loteria)
+    salvar_store(loteria, ler_excel_normalizado(loteria), versao=versao)
+    return True
+
+
+def compilar_todas(forcar=False):
+    """Compila o store de todas as loterias; retorna {loteria: regravado}."""
+    resultado = {}
+    for loteria in LOTERIAS:
+        try:
+            resultado[loteria] = compilar_loteria(loteria, forcar=forcar)
+        except Exception as exc:
+            logger.error(f"Erro ao compilar store de {loteria}: {exc}")
+            resultado[loteria] = False
+    return resultado
+
+
+def carregar_matriz_sorteios(loteria):
+    """
+    Abre o store memory-mapped.
+
+    Returns:
+        tuple | None: (sorteios uint8 [concursos x bolas], concursos int32,
+        colunas) ou None se o store estiver ausente ou desatualizado.
+    """
+    if loteria not in LOTERIAS:
+        return None
+    meta = _ler_meta(loteria)
+    if meta is None or not store_atualizado(loteria, meta):
+        return None
+    sorteios_path, concursos_path, _ = _caminhos_store(loteria)
+    try:
+        sorteios = np.load(sorteios_path, mmap_mode="r")
+        concursos = np.load(concursos_path, mmap_mode="r")
+    except Exception as exc:
+        logger.warning(f"Falha ao abrir store de {loteria}: {exc}")
+        return None
+    if len(sorteios) != len(concursos) or sorteios.shape[1] != len(meta["colunas"]):
+        logger.warning(f"Store de {loteria} inconsistente; ignorando")
+        return None
+    return sorteios, concursos, meta["colunas"]
+
+
+def carregar_dataframe_store(loteria, dtype_bolas="Int64", dtype_concurso="int64"):
+    """
+    Monta o DataFrame (Concurso + bolas) a partir do store memory-mapped.
+
+    Returns:
+        pd.DataFrame | None: None quando o store não pode ser usado; o
+        chamador deve então cair para a planilha Excel.
+    """
+    aberto = carregar_matriz_sorteios(loteria)
+    if aberto is None:
+        return None
+    sorteios, concursos, colunas = aberto
+    df = pd.DataFrame(np.asarray(sorteios, dtype=np.int64), columns=colunas)
+    df.insert(0, "Concurso", np.asarray(concursos, dtype=np.int64))
+    df["Concurso"] = df["Concurso"].astype(dtype_concurso)
+    for col in colunas:
+        df[col] = df[col].astype(dtype_bolas)
+    return df
+
+
+def carregar_ou_compilar(loteria, dtype_bolas="Int64", dtype_concurso="int64"):
+    """
+    Retorna o DataFrame da loteria pelo store; se estiver desatualizado, lê a
+    planilha uma única vez, regrava o store e devolve o resultado.
+    """
+    df = carregar_dataframe_store(loteria, dtype_bolas, dtype_concurso)
+    if df is not None:
+        return df
+    path = caminho_excel(loteria)
+    if not path or not os.path.exists(path):
+        return None
+    versao = versao_dados(loteria)
+    df = ler_excel_normalizado(loteria)
+    try:
+        salvar_store(loteria, df, versao=versao)
+    except Exception as exc:
+        # Store é só otimização: falha de escrita (ex.: FS somente leitura)
+        # não deve impedir o carregamento
+        logger.warning(f"Não foi possível gravar o store de {loteria}: {exc}")
+    df = df.astype({"Concurso": dtype_concurso})
+    for col in LOTERIAS[loteria]["colunas"]:
+        df[col] = df[col].astype(dtype_bolas)
+    return df
+
+
+def carregar_historico(loteria):
+    """
+    Sorteios da loteria como arrays, em ordem crescente de concurso.
+
+    Returns:
+        tuple | None: (sorteios int64 [concursos x colunas], concursos int64,
+        colunas); valores ausentes ficam 0. None se não houver dados.
+    """
+    aberto = carregar_matriz_sorteios(loteria)
+    if aberto is not None:
+        sorteios, concursos, colunas = aberto
+        sorteios = np.asarray(sorteios, dtype=np.int64)
+        concursos = np.asarray(concursos, dtype=np.int64)
+    else:
+        if loteria not in LOTERIAS:
+            return None
+        df = carregar_ou_compilar(loteria)
+        if df is None or df.empty:
+            return None
+        colunas = LOTERIAS[loteria]["colunas"]
+        sorteios = df[colunas].fillna(0).to_numpy(dtype=np.int64)
+        concursos = df["Concurso"].fillna(-1).to_numpy(dtype=np.int64)
+    ordem = np.argsort(concursos, kind="stable")
+    return sorteios[ordem], concursos[ordem], list(colunas)
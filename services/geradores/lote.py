@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Geração de apostas em lote (bolões).
+
+Produz N apostas de uma vez como uma matriz (N x k) de inteiros: as chaves
+``log(peso) + Gumbel`` de todos os números são sorteadas numa única matriz e
+as k maiores de cada linha formam a aposta (Gumbel-top-k, sorteio ponderado
+sem reposição). As restrições (paridade, soma, consecutivos, números
+marcados) são filtradas de forma vetorizada sobre o lote inteiro; quando a
+taxa de aceitação é baixa demais, o restante vem do gerador restrito exato
+(funcoes/common/gerador_restrito.py), que não depende de tentativa e erro.
+As apostas de um lote são distintas: repetidas são descartadas e sorteadas
+de novo.
+
+O resultado pode ser serializado como JSON ou NDJSON em pedaços, para
+respostas em streaming.
+"""
+
+import json
+import logging
+import math
+import os
+
+import numpy as np
+
+from funcoes.common.gerador_restrito import GeradorRestrito
+from funcoes.common.probabilidades import preco_aposta
+from funcoes.common.rng import criar_rng
+
+logger = logging.getLogger(__name__)
+
+LOTE_MAX = int(os.environ.get("GERACAO_LOTE_MAX", "10000"))
+
+# Faixa de números e tamanhos de aposta aceitos por loteria
+LOTERIAS_LOTE = {
+    "mais_milionaria": {"faixa": (1, 50), "qtd": (6, 12), "trevos": {"faixa": (1, 6), "qtd": (2, 6)}},
+    "megasena": {"faixa": (1, 60), "qtd": (6, 20)},
+    "quina": {"faixa": (1, 80), "qtd": (5, 15)},
+    "lotofacil": {"faixa": (1, 25), "qtd": (15, 20)},
+    "lotomania": {"faixa": (0, 99), "qtd": (50, 50)},
+}
+
+_CELULAS_POR_RODADA = 4_000_000   # limite de chaves Gumbel por rodada
+_CELULAS_DP = 20_000_000          # limite do estado do gerador restrito
+_TAXA_MINIMA = 0.02               # abaixo disso o filtro não compensa
+_RODADAS = 6
+
+
+def valor_aposta(loteria, qtd_numeros, qtd_trevos=None):
+    """Preço unitário da aposta (``preco_aposta``, a partir do preço em config; 0.0 se não aceita)."""
+    return preco_aposta(loteria, qtd_numeros, qtd_trevos)
+
+
+def vetor_pesos(pesos, num_min, num_max):
+    """Vetor de pesos alinhado a ``num_min..num_max`` (1.0 para os ausentes).
+
+    Aceita chaves inteiras ou strings numéricas (JSON)."""
+    vetor = np.ones(num_max - num_min + 1)
+    for numero, peso in (pesos or {}).items():
+        try:
+            numero, peso = int(numero), float(peso)
+        except (TypeError, ValueError):
+            raise ValueError(f"peso inválido para {numero!r}")
+        if not num_min <= numero <= num_max:
+            raise ValueError(f"número {numero} fora da faixa {num_min}-{num_max}")
+        if peso < 0 or not math.isfinite(peso):
+            raise ValueError("pesos devem ser finitos e não negativos")
+        vetor[numero - num_min] = peso
+    return vetor
+
+
+def gumbel_top_k(pesos, k, quantidade, rng):
+    """Índices (quantidade x k, crescentes) de um sorteio ponderado sem
+    reposição por linha."""
+    with np.errstate(divide="ignore"):
+        log_pesos = np.log(pesos)
+    chaves = log_pesos + rng.gumbel(size=(quantidade, len(pesos)))
+    if k == len(pesos):
+        return np.broadcast_to(np.arange(k), (quantidade, k)).copy()
+    indices = np.argpartition(-chaves, k - 1, axis=1)[:, :k]
+    return np.sort(indices, axis=1)
+
+
+def mascara_restricoes(apostas, pares_permitidos=None, soma=None, evitar_consecutivos=False,
+                       marcados=None, max_marcados=None):
+    """Linhas de ``apostas`` (números, crescentes por linha) que atendem às restrições."""
+    ok = np.ones(len(apostas), dtype=bool)
+    if pares_permitidos is not None:
+        permitidos = np.zeros(apostas.shape[1] + 1, dtype=bool)
+        permitidos[[p for p in pares_permitidos if 0 <= p <= apostas.shape[1]]] = True
+        ok &= permitidos[np.count_nonzero(apostas % 2 == 0, axis=1)]
+    if soma is not None:
+        somas = apostas.sum(axis=1)
+        ok &= (somas >= soma[0]) & (somas <= soma[1])
+    if evitar_consecutivos:
+        ok &= ~(np.diff(apostas, axis=1) == 1).any(axis=1)
+    if marcados and max_marcados is not None:
+        ok &= np.isin(apostas, list(marcados)).sum(axis=1) <= max_marcados
+    return ok
+
+
+def _celulas_dp(num_min, num_max, k, restricoes):
+    """Tamanho aproximado das tabelas do gerador restrito."""
+    celulas = (num_max - num_min + 2) * (k + 1)
+    if restricoes.get("pares_permitidos") is not None:
+        celulas *= k + 1
+    if restricoes.get("soma") is not None:
+        celulas *= restricoes["soma"][1] + 1
+    if restricoes.get("max_marcados") is not None:
+        celulas *= restricoes["max_marcados"] + 1
+    if restricoes.get("evitar_consecutivos"):
+        celulas *= 2
+    return celulas
+
+
+def _juntar(aceitas, novas, distintas):
+    """Acrescenta ``novas`` às ``aceitas``; com ``distintas``, descarta as
+    repetidas mantendo a ordem da primeira ocorrência."""
+    juntas = np.concatenate([aceitas, novas])
+    if not distintas or len(juntas) < 2:
+        return juntas
+    _, primeiras = np.unique(juntas, axis=0, return_index=True)
+    return juntas[np.sort(primeiras)]
+
+
+def sortear_lote(pesos, num_min, num_max, k, quantidade, restricoes=None, rng=None, distintas=True):
+    """
+    Sorteia ``quantidade`` apostas de ``k`` números (distintas entre si, a
+    menos que ``distintas=False``).
+
+    Returns:
+        tuple: (matriz quantidade x k de números, método usado:
+        "gumbel", "gumbel+restrito" ou "restrito").
+
+    Levanta ValueError se as restrições forem impossíveis ou não admitirem
+    ``quantidade`` apostas distintas.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    # Checagens explícitas: ``max_marcados=0`` é restrição (0 == False)
+    restricoes = {chave: valor for chave, valor in (restricoes or {}).items()
+                  if valor is not None and valor is not False and valor != []}
+    numeros = np.arange(num_min, num_max + 1)
+    if np.count_nonzero(pesos) < k:
+        raise ValueError("números com peso positivo insuficientes para a aposta")
+    if distintas and math.comb(int(np.count_nonzero(pesos)), k) < quantidade:
+        raise ValueError("não há apostas distintas suficientes para a quantidade pedida")
+    if "soma" in restricoes:
+        # Teto aberto vira a maior soma possível (mantém o estado do DP pequeno)
+        maior_soma = int(numeros[-k:].sum())
+        restricoes["soma"] = (int(restricoes["soma"][0]), min(int(restricoes["soma"][1]), maior_soma))
+
+    aceitas, faltam, taxa, metodo = np.empty((0, k), dtype=numeros.dtype), quantidade, 1.0, "gumbel"
+    por_rodada = max(_CELULAS_POR_RODADA // len(numeros), 1)
+    for _ in range(_RODADAS):
+        if faltam <= 0 or taxa < _TAXA_MINIMA:
+            break
+        lote = min(por_rodada, math.ceil(faltam / taxa * 1.2) + 16)
+        candidatas = numeros[gumbel_top_k(pesos, k, lote, rng)]
+        ok = mascara_restricoes(candidatas, **restricoes) if restricoes else np.ones(lote, dtype=bool)
+        taxa = max(np.count_nonzero(ok) / lote, 1e-9)
+        aceitas = _juntar(aceitas, candidatas[ok], distintas)[:quantidade]
+        faltam = quantidade - len(aceitas)
+
+    if faltam > 0:
+        if _celulas_dp(num_min, num_max, k, restricoes) > _CELULAS_DP:
+            raise ValueError("restrições apertadas demais para o tamanho da aposta")
+        gerador = GeradorRestrito(pesos, num_min, num_max, k, **restricoes)
+        if not gerador.viavel:
+            raise ValueError("nenhuma aposta atende às restrições")
+        metodo = "restrito" if faltam == quantidade else "gumbel+restrito"
+        for rodada in range(_RODADAS):
+            # Depois da primeira rodada, sorteia a mais para compensar as repetidas
+            tamanho = faltam if rodada == 0 else faltam * 4 + 64
+            aceitas = _juntar(aceitas, gerador.sortear(tamanho, rng), distintas)[:quantidade]
+            faltam = quantidade - len(aceitas)
+            if faltam <= 0:
+                break
+        else:
+            raise ValueError("não foi possível sortear tantas apostas distintas com essas restrições")
+    return aceitas, metodo
+
+
+def gerar_lote(loteria, quantidade, qtd_numeros, pesos=None, restricoes=None, qtd_trevos=None,
+               pesos_trevos=None, rng=None, semente=None):
+    """
+    Gera um lote de apostas de uma loteria.
+
+    Args:
+        loteria: chave de LOTERIAS_LOTE.
+        quantidade: número de apostas (1..GERACAO_LOTE_MAX).
+        qtd_numeros: números por aposta, dentro da faixa da loteria.
+        pesos: dict número -> peso (ausentes = 1.0).
+        restricoes: kwargs de restrição (pares_permitidos, soma,
+            evitar_consecutivos, marcados, max_marcados).
+        qtd_trevos, pesos_trevos: trevos da +Milionária.
+        rng: gerador já pronto; sem ele, um fluxo novo da ``semente``
+            (funcoes/common/rng.py), que volta no resultado e refaz o lote.
+
+    Returns:
+        dict: loteria, quantidade, qtd_numeros, valor_unitario, valor_total,
+        metodo, semente, numeros (matriz N x k) e, na +Milionária, trevos (N x t).
+
+    Levanta ValueError para parâmetros inválidos.
+    """
+    config = LOTERIAS_LOTE.get(loteria)
+    if config is None:
+        raise ValueError(f"Loteria inválida: {loteria}")
+    quantidade, qtd_numeros = int(quantidade), int(qtd_numeros)
+    if not 1 <= quantidade <= LOTE_MAX:
+        raise ValueError(f"quantidade deve estar entre 1 e {LOTE_MAX}")
+    qtd_min, qtd_max = config["qtd"]
+    if not qtd_min <= qtd_numeros <= qtd_max:
+        raise ValueError(f"Quantidade de números deve estar entre {qtd_min} e {qtd_max}")
+
+    if rng is None:
+        rng, semente = criar_rng(semente)
+    num_min, num_max = config["faixa"]
+    matriz, metodo = sortear_lote(vetor_pesos(pesos, num_min, num_max), num_min, num_max,
+                                  qtd_numeros, quantidade, restricoes, rng)
+    resultado = {
+        "loteria": loteria,
+        "quantidade": quantidade,
+        "qtd_numeros": qtd_numeros,
+        "metodo": metodo,
+        "numeros": matriz,
+    }
+    if semente is not None:
+        resultado["semente"] = str(semente)
+
+    if "trevos" in config:
+        qtd_trevos = int(qtd_trevos if qtd_trevos is not None else config["trevos"]["qtd"][0])
+        t_min, t_max = config["trevos"]["qtd"]
+        if not t_min <= qtd_trevos <= t_max:
+            raise ValueError(f"Quantidade de trevos deve estar entre {t_min} e {t_max}")
+        f_min, f_max = config["trevos"]["faixa"]
+        resultado["qtd_trevos"] = qtd_trevos
+        # Trevos podem repetir: a aposta já é distinta pelos números
+        resultado["trevos"], _ = sortear_lote(vetor_pesos(pesos_trevos, f_min, f_max), f_min, f_max,
+                                              qtd_trevos, quantidade, None, rng, distintas=False)
+
+    valor = valor_aposta(loteria, qtd_numeros, qtd_trevos if "trevos" in config else None)
+    resultado["valor_unitario"] = valor
+    resultado["valor_total"] = round(valor * quantidade, 2)
+    return resultado
+
+
+def _apostas(resultado):
+    numeros = resultado["numeros"].tolist()
+    if "trevos" in resultado:
+        return ({"numeros": n, "trevos": t} for n, t in zip(numeros, resultado["trevos"].tolist()))
+    return ({"numeros": n} for n in numeros)
+
+
+def _cabecalho(resultado):
+    return {chave: valor for chave, valor in resultado.items() if chave not in ("numeros", "trevos")}
+
+
+def iterar_ndjson(resultado, bloco=500):
+    """NDJSON: uma linha de cabeçalho e depois uma linha por aposta."""
+    yield json.dumps(_cabecalho(resultado)) + "\n"
+    linhas = []
+    for aposta in _apostas(resultado):
+        linhas.append(json.dumps(aposta, separators=(",", ":")))
+        if len(linhas) >= bloco:
+            yield "\n".join(linhas) + "\n"
+            linhas = []
+    if linhas:
+        yield "\n".join(linhas) + "\n"
+
+
+def iterar_json(resultado, bloco=500):
+    """Documento JSON único (cabeçalho + "apostas"), emitido em pedaços."""
+    cabecalho = json.dumps(dict(_cabecalho(resultado), success=True))
+    yield cabecalho[:-1] + ', "apostas": ['
+    linhas = []
+    primeiro = True
+    for aposta in _apostas(resultado):
+        linhas.append(json.dumps(aposta, separators=(",", ":")))
+        if len(linhas) >= bloco:
+            yield ("" if primeiro else ",") + ",".join(linhas)
+            primeiro, linhas = False, []
+    if linhas:
+        yield ("" if primeiro else ",") + ",".join(linhas)
+    yield "]}"
@@ -1,30 +1,35 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random
 import pandas as pd
 import logging
 
+from funcoes.common.rng import criar_rng, sortear_numeros
+
 # Configuração do logger
 logger = logging.getLogger(__name__)
 
-def gerar_numeros_aleatorios():
-    """Gera números aleatórios para +Milionária (6 números + 2 trevos)."""
+def gerar_numeros_aleatorios(semente=None):
+    """
+    Gera números aleatórios para +Milionária (6 números + 2 trevos).
+
+    Todas as funções deste módulo aceitam ``semente`` (refaz o sorteio; sem
+    ela uma nova é sorteada) e devolvem a semente usada, como string.
+    """
     try:
+        rng, semente = criar_rng(semente)
         # Gerar 6 números únicos entre 1 e 50
-        numeros = sorted(random.sample(range(1, 51), 6))
+        numeros = sortear_numeros(rng, 1, 50, 6)
         
         # Gerar 2 trevos únicos entre 1 e 6
-        trevo1 = random.randint(1, 6)
-        trevo2 = random.randint(1, 6)
-        while trevo2 == trevo1:  # Garantir que sejam diferentes
-            trevo2 = random.randint(1, 6)
+        trevo1, trevo2 = (int(t) for t in rng.choice(6, size=2, replace=False) + 1)
         
         return {
             "success": True,
             "numeros": numeros,
             "trevo1": trevo1,
             "trevo2": trevo2,
+            "semente": str(semente),
             "mensagem": "Números gerados com sucesso!"
         }
         
@@ -35,15 +40,17 @@ def gerar_numeros_aleatorios():
             "error": "Erro interno do servidor"
         }
 
-def gerar_numeros_aleatorios_megasena():
+def gerar_numeros_aleatorios_megasena(semente=None):
     """Gera números aleatórios para Mega Sena (6 números de 1-60)."""
     try:
+        rng, semente = criar_rng(semente)
         # Gerar 6 números únicos entre 1 e 60 (Mega Sena)
-        numeros = sorted(random.sample(range(1, 61), 6))
+        numeros = sortear_numeros(rng, 1, 60, 6)
         
         return {
             "success": True,
             "numeros": numeros,
+            "semente": str(semente),
             "mensagem": "Números da Mega Sena gerados com sucesso!"
         }
         
@@ -54,15 +61,17 @@ def gerar_numeros_aleatorios_megasena():
             "error": "Erro interno do servidor"
         }
 
-def gerar_numeros_aleatorios_quina():
+def gerar_numeros_aleatorios_quina(semente=None):
     """Gera números aleatórios para Quina (5 números de 1-80)."""
     try:
+        rng, semente = criar_rng(semente)
         # Gerar 5 números únicos entre 1 e 80 (Quina)
-        numeros = sorted(random.sample(range(1, 81), 5))
+        numeros = sortear_numeros(rng, 1, 80, 5)
         
         return {
             "success": True,
             "numeros": numeros,
+            "semente": str(semente),
             "mensagem": "Números da Quina gerados com sucesso!"
         }
         
@@ -73,9 +82,10 @@ def gerar_numeros_aleatorios_quina():
             "error": "Erro interno do servidor"
         }
 
-def gerar_numeros_aleatorios_lotomania():
+def gerar_numeros_aleatorios_lotomania(semente=None):
     """Gera números aleatórios para Lotomania com controle de qualidade de distribuição par/ímpar e repetição do último concurso."""
     try:
+        rng, semente = criar_rng(semente)
         # Carregar dados da Lotomania
         try:
             df_lotomania = pd.read_excel('LoteriasExcel/Lotomania_edt.xlsx')
@@ -105,7 +115,7 @@ def gerar_numeros_aleatorios_lotomania():
         
         for tentativa in range(max_tentativas):
             # Gerar 20 números únicos entre 1 e 100
-            numeros = sorted(random.sample(range(1, 101), qtde_numeros))
+            numeros = sortear_numeros(rng, 1, 100, qtde_numeros)
             
             # Contar pares e ímpares
             pares = len([n for n in numeros if n % 2 == 0])
@@ -123,6 +133,7 @@ def gerar_numeros_aleatorios_lotomania():
                         "success": True,
                         "numeros": numeros,
                         "qtde_numeros": qtde_numeros,
+                        "semente": str(semente),
                         "distribuicao": {
                             "pares": pares,
                             "impares": impares,
@@ -142,7 +153,7 @@ def gerar_numeros_aleatorios_lotomania():
         melhor_score = float('inf')
         
         for _ in range(100):  # Última tentativa com mais amostras
-            numeros = sorted(random.sample(range(1, 101), qtde_numeros))
+            numeros = sortear_numeros(rng, 1, 100, qtde_numeros)
             pares = len([n for n in numeros if n % 2 == 0])
             
             # Calcular score baseado no balanceamento par/ímpar e repetição
@@ -168,6 +179,7 @@ def gerar_numeros_aleatorios_lotomania():
                 "success": True,
                 "numeros": melhor_resultado['numeros'],
                 "qtde_numeros": qtde_numeros,
+                "semente": str(semente),
                 "distribuicao": {
                     "pares": melhor_resultado['pares'],
                     "impares": melhor_resultado['impares'],
@@ -183,7 +195,7 @@ def gerar_numeros_aleatorios_lotomania():
             }
         
         # Fallback final
-        numeros_fallback = sorted(random.sample(range(1, 101), qtde_numeros))
+        numeros_fallback = sortear_numeros(rng, 1, 100, qtde_numeros)
         pares_fallback = len([n for n in numeros_fallback if n % 2 == 0])
         impares_fallback = qtde_numeros - pares_fallback
         numeros_repetidos_fallback = [n for n in numeros_fallback if n in numeros_ultimo_concurso]
@@ -193,6 +205,7 @@ def gerar_numeros_aleatorios_lotomania():
             "success": True,
             "numeros": numeros_fallback,
             "qtde_numeros": qtde_numeros,
+            "semente": str(semente),
             "distribuicao": {
                 "pares": pares_fallback,
                 "impares": impares_fallback,
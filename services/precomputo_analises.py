@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pré-cálculo das análises a cada nova versão dos dados.
+
+Quando uma planilha `*_edt.xlsx` muda, o pipeline calcula todas as respostas
+das rotas de análise cacheadas (`@cache_analise`) para a janela padrão da rota
+e para as janelas 25/50/100/200/350 concursos, em um pool de processos. Cada
+resposta vira um artefato JSON versionado em
+`<ARTEFATOS_DIR>/<loteria>/<versão>-<timestamp>/`. Só depois que todos os
+artefatos estão gravados o `atual.json` da loteria é trocado (escrita
+atômica), e a partir daí as rotas servem o arquivo em vez de calcular.
+
+Rode `python scripts/precomputar_analises.py` após trocar uma planilha (o
+gunicorn também dispara o pipeline em segundo plano no start).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from services.draw_store import LOTERIAS, STORE_DIR, compilar_loteria, versao_dados
+
+logger = logging.getLogger(__name__)
+
+ARTEFATOS_DIR = os.environ.get("ANALISE_ARTEFATOS_DIR", os.path.join(STORE_DIR, "analises"))
+JANELAS_PADRAO = (25, 50, 100, 200, 350)
+
+# Manifesto lido por processo, revalidado pelo mtime do arquivo
+_manifestos = {}
+
+
+def _caminho_manifesto(loteria):
+    return os.path.join(ARTEFATOS_DIR, loteria, "atual.json")
+
+
+def nome_artefato(path, parametros):
+    """Nome do arquivo do artefato para (rota, parâmetros normalizados)."""
+    chave = json.dumps([path, parametros], separators=(",", ":"))
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:20] + ".json"
+
+
+def ler_manifesto(loteria):
+    """Retorna o manifesto publicado da loteria (ou None)."""
+    caminho = _caminho_manifesto(loteria)
+    try:
+        mtime = os.stat(caminho).st_mtime_ns
+    except OSError:
+        _manifestos.pop(loteria, None)
+        return None
+    em_cache = _manifestos.get(loteria)
+    if em_cache is not None and em_cache[0] == mtime:
+        return em_cache[1]
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            manifesto = json.load(f)
+    except Exception as exc:
+        logger.warning(f"Manifesto de análises inválido para {loteria}: {exc}")
+        return None
+    _manifestos[loteria] = (mtime, manifesto)
+    return manifesto
+
+
+def obter_artefato(loteria, versao, path, parametros):
+    """
+    Corpo JSON pré-calculado para a rota, se publicado para esta versão.
+
+    Returns:
+        bytes | None: None quando não há artefato da versão atual dos dados.
+    """
+    manifesto = ler_manifesto(loteria)
+    if manifesto is None or manifesto.get("versao") != versao:
+        return None
+    caminho = os.path.join(ARTEFATOS_DIR, loteria, manifesto["diretorio"], nome_artefato(path, parametros))
+    try:
+        with open(caminho, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def rotas_cacheadas(app):
+    """Lista (loteria, path) de todas as rotas GET decoradas com `@cache_analise`."""
+    rotas = []
+    for regra in app.url_map.iter_rules():
+        view = app.view_functions.get(regra.endpoint)
+        loteria = getattr(view, "cache_loteria", None)
+        if loteria and "GET" in regra.methods and not regra.arguments:
+            rotas.append((loteria, regra.rule))
+    return sorted(rotas)
+
+
+def precisa_precomputar(loteria):
+    """True se a versão publicada não corresponde à planilha atual."""
+    versao = versao_dados(loteria)
+    if versao is None:
+        return False
+    manifesto = ler_manifesto(loteria)
+    return manifesto is None or manifesto.get("versao") != versao
+
+
+# ----------------------------------------------------------------------
+# Workers do pool
+# ----------------------------------------------------------------------
+_app = None
+
+
+def _inicializar_worker():
+    global _app
+    from services import cache_analises
+    # O worker calcula sempre do zero, sem ler nem gravar o cache
+    cache_analises.CACHE_ATIVO = False
+    from app import app as flask_app
+    _app = flask_app
+
+
+def _calcular_artefato(tarefa):
+    """Executa a rota pelo test client e grava o corpo no diretório temporário."""
+    from werkzeug.datastructures import MultiDict
+    from services.cache_analises import normalizar_parametros
+
+    destino, path, query = tarefa
+    inicio = time.perf_counter()
+    try:
+        with _app.test_client() as cliente:
+            resposta = cliente.get(path, query_string=query)
+        if resposta.status_code != 200 or resposta.mimetype != "application/json":
+            return path, query, f"HTTP {resposta.status_code}", time.perf_counter() - inicio
+        parametros = normalizar_parametros(MultiDict(query))
+        with open(os.path.join(destino, nome_artefato(path, parametros)), "wb") as f:
+            f.write(resposta.get_data())
+        return path, query, "ok", time.perf_counter() - inicio
+    except Exception as exc:
+        return path, query, f"erro: {exc}", time.perf_counter() - inicio
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+def _publicar(loteria, versao, diretorio_tmp, artefatos):
+    """Move os artefatos para o diretório final e troca o manifesto atomicamente."""
+    base = os.path.join(ARTEFATOS_DIR, loteria)
+    diretorio = f"{versao}-{int(time.time())}"
+    os.replace(diretorio_tmp, os.path.join(base, diretorio))
+
+    manifesto = {
+        "loteria": loteria,
+        "versao": versao,
+        "diretorio": diretorio,
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "artefatos": artefatos,
+    }
+    caminho = _caminho_manifesto(loteria)
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False)
+    os.replace(tmp, caminho)
+
+    # Mantém o diretório anterior para leituras em andamento; remove os demais
+    anteriores = sorted(
+        (d for d in os.listdir(base) if d != diretorio and os.path.isdir(os.path.join(base, d)) and ".tmp-" not in d),
+        key=lambda d: os.path.getmtime(os.path.join(base, d)),
+    )
+    for antigo in anteriores[:-1]:
+        shutil.rmtree(os.path.join(base, antigo), ignore_errors=True)
+
+
+def precomputar(loterias=None, janelas=JANELAS_PADRAO, processos=None, forcar=False):
+    """
+    Calcula e publica os artefatos das loterias com versão nova.
+
+    Args:
+        loterias: chaves das loterias (None = todas).
+        janelas: quantidades de concursos pré-calculadas, além da padrão da rota.
+        processos: tamanho do pool (None = nº de CPUs).
+        forcar: recalcula mesmo se a versão publicada for a atual.
+
+    Returns:
+        dict: {loteria: {"versao", "artefatos", "falhas"}} das loterias processadas.
+    """
+    from app import app as flask_app
+
+    loterias = list(loterias or LOTERIAS)
+    pendentes = [l for l in loterias if forcar or precisa_precomputar(l)]
+    if not pendentes:
+        logger.info("Pré-cálculo de análises: todas as loterias estão atualizadas")
+        return {}
+
+    rotas = rotas_cacheadas(flask_app)
+    consultas = [{}] + [{"qtd_concursos": str(j)} for j in janelas]
+
+    versoes, diretorios, tarefas = {}, {}, []
+    for loteria in pendentes:
+        compilar_loteria(loteria)
+        versoes[loteria] = versao_dados(loteria)
+        diretorio = os.path.join(ARTEFATOS_DIR, loteria, f"{versoes[loteria]}.tmp-{os.getpid()}")
+        shutil.rmtree(diretorio, ignore_errors=True)
+        os.makedirs(diretorio)
+        diretorios[loteria] = diretorio
+        tarefas += [
+            (diretorio, path, consulta)
+            for rota_loteria, path in rotas if rota_loteria == loteria
+            for consulta in consultas
+        ]
+
+    logger.info(f"Pré-cálculo de análises: {len(tarefas)} respostas de {', '.join(pendentes)}")
+    resultados = {l: {"versao": versoes[l], "artefatos": 0, "falhas": []} for l in pendentes}
+    loteria_por_diretorio = {d: l for l, d in diretorios.items()}
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_worker) as pool:
+        for tarefa, (path, consulta, status, segundos) in zip(tarefas, pool.map(_calcular_artefato, tarefas)):
+            resultado = resultados[loteria_por_diretorio[tarefa[0]]]
+            if status == "ok":
+                resultado["artefatos"] += 1
+            else:
+                resultado["falhas"].append(f"{path}?{consulta}: {status}")
+                logger.warning(f"Pré-cálculo falhou em {path} {consulta}: {status}")
+            logger.debug(f"{path} {consulta}: {status} em {segundos:.2f}s")
+
+    for loteria in pendentes:
+        # Planilha trocada durante o cálculo: descarta, a próxima rodada refaz
+        if versao_dados(loteria) != versoes[loteria]:
+            logger.warning(f"Dados de {loteria} mudaram durante o pré-cálculo; artefatos descartados")
+            shutil.rmtree(diretorios[loteria], ignore_errors=True)
+            continue
+        _publicar(loteria, versoes[loteria], diretorios[loteria], resultados[loteria]["artefatos"])
+        logger.info(f"Análises de {loteria} publicadas: {resultados[loteria]['artefatos']} artefatos")
+    return resultados
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão da análise de clusters: compara, nos dados de LoteriasExcel, as
+características extraídas pela matriz de incidência (funcoes/common/clusters.py)
+com os loops `iterrows` originais e a saída completa de `analise_clusters`
+usando cada uma das versões. Tudo precisa ser idêntico, bit a bit.
+
+Uso:
+    python test_analise_clusters.py
+"""
+
+import logging
+import sys
+import warnings
+
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from funcoes.common.clusters import caracteristicas_avancadas, caracteristicas_simples
+from funcoes.common.incidencia import MatrizIncidencia
+
+warnings.filterwarnings('ignore')
+logging.disable(logging.CRITICAL)
+
+
+# ----------------------------------------------------------------------
+# Implementações originais (referência)
+# ----------------------------------------------------------------------
+def legado_avancadas(df_validos, colunas_bolas, maior_numero):
+    caracteristicas = []
+    for numero in range(1, maior_numero + 1):
+        freq_total = 0
+        freq_recente = 0
+        ultima_aparicao = 0
+        intervalos_aparicoes = []
+        ultima_posicao = -1
+        for pos, (idx, row) in enumerate(df_validos.iterrows()):
+            numeros_concurso = [row[col] for col in colunas_bolas if pd.notna(row[col])]
+            if numero in numeros_concurso:
+                freq_total += 1
+                if pos < len(df_validos) * 0.3:
+                    freq_recente += 1
+                ultima_aparicao = len(df_validos) - pos
+                if ultima_posicao != -1:
+                    intervalos_aparicoes.append(pos - ultima_posicao)
+                ultima_posicao = pos
+        media_aparicoes_concurso = freq_total / len(df_validos) if len(df_validos) > 0 else 0
+        intervalo_medio = np.mean(intervalos_aparicoes) if intervalos_aparicoes else len(df_validos)
+        desvio_intervalo = np.std(intervalos_aparicoes) if len(intervalos_aparicoes) > 1 else 0
+        score_atraso = ultima_aparicao / intervalo_medio if intervalo_medio > 0 else 0
+        volatilidade = desvio_intervalo / intervalo_medio if intervalo_medio > 0 else 0
+        tendencia = (freq_recente / max(len(df_validos) * 0.3, 1)) - media_aparicoes_concurso
+        caracteristicas.append([
+            freq_total, freq_recente, ultima_aparicao, media_aparicoes_concurso, intervalo_medio,
+            desvio_intervalo, score_atraso, volatilidade, tendencia, numero
+        ])
+    return caracteristicas
+
+
+def legado_simples(df_validos, colunas_bolas, maior_numero):
+    dados_cluster = []
+    for num in range(1, maior_numero + 1):
+        freq_total = 0
+        freq_recente = 0
+        ultima_aparicao = 0
+        for i, (_, row) in enumerate(df_validos.iterrows()):
+            if num in row[colunas_bolas].values:
+                freq_total += 1
+                if i >= len(df_validos) - 5:
+                    freq_recente += 1
+                ultima_aparicao = i
+        score_atraso = len(df_validos) - ultima_aparicao
+        tendencia = freq_recente / freq_total if freq_total > 0 else 0
+        dados_cluster.append([freq_total, freq_recente, ultima_aparicao, score_atraso, tendencia])
+    return dados_cluster
+
+
+# ----------------------------------------------------------------------
+# Casos: loteria, chave de config, classe, extrator, maior número
+# ----------------------------------------------------------------------
+def _casos():
+    from services.data_loader import carregar_dados_milionaria, carregar_dados_megasena_app, carregar_dados_quina_app
+    from funcoes.lotofacil.LotofacilFuncaCarregaDadosExcel import carregar_dados_lotofacil
+    from funcoes.milionaria import analise_estatistica_avancada as mod_mil
+    from funcoes.megasena import analise_estatistica_avancada_MS as mod_ms
+    from funcoes.quina import analise_estatistica_avancada_quina as mod_q
+    from funcoes.lotofacil import analise_estatistica_avancada_lotofacil as mod_lf
+
+    return [
+        ("+milionaria", carregar_dados_milionaria(), mod_mil, mod_mil.AnaliseEstatisticaAvancada, "avancadas", 50),
+        ("megasena", carregar_dados_megasena_app(), mod_ms, mod_ms.AnaliseEstatisticaAvancada, "avancadas", 60),
+        ("quina", carregar_dados_quina_app(), mod_q, mod_q.AnaliseEstatisticaAvancadaQuina, "simples", 80),
+        ("lotofacil", carregar_dados_lotofacil(), mod_lf, mod_lf.AnaliseEstatisticaAvancadaLotofacil, "simples", 25),
+    ]
+
+
+def _janelas(df):
+    return [df, df.tail(50), df.tail(25)]
+
+
+def test_caracteristicas_identicas():
+    for loteria, df, _, classe, tipo, maior in _casos():
+        for df_janela in _janelas(df):
+            analise = classe(df_janela)
+            incidencia = MatrizIncidencia.from_dataframe(
+                analise.df_validos, loteria, colunas=analise.colunas_bolas, ordenar=False
+            )
+            if tipo == "avancadas":
+                nova = caracteristicas_avancadas(incidencia)
+                antiga = np.array(legado_avancadas(analise.df_validos, analise.colunas_bolas, maior), dtype=np.float64)
+            else:
+                nova = caracteristicas_simples(incidencia)
+                antiga = np.array(legado_simples(analise.df_validos, analise.colunas_bolas, maior), dtype=np.float64)
+            assert nova.shape == antiga.shape, (loteria, nova.shape, antiga.shape)
+            assert np.array_equal(nova, antiga), f"{loteria} ({len(df_janela)} concursos): características diferentes"
+
+
+def test_analise_clusters_identica():
+    for loteria, df, modulo, classe, tipo, maior in _casos():
+        for df_janela in _janelas(df):
+            analise = classe(df_janela)
+            nova = analise.analise_clusters()
+
+            # Mesma análise com o extrator original no lugar do vetorizado
+            if tipo == "avancadas":
+                original = modulo.caracteristicas_avancadas
+                modulo.caracteristicas_avancadas = lambda inc: legado_avancadas(
+                    analise.df_validos, analise.colunas_bolas, maior)
+            else:
+                original = modulo.caracteristicas_simples
+                modulo.caracteristicas_simples = lambda inc: legado_simples(
+                    analise.df_validos, analise.colunas_bolas, maior)
+            try:
+                antiga = analise.analise_clusters()
+            finally:
+                setattr(modulo, f"caracteristicas_{tipo}", original)
+
+            assert repr(nova) == repr(antiga), f"{loteria} ({len(df_janela)} concursos): saída diferente"
+
+
+if __name__ == "__main__":
+    print("🔍 Comparando características (vetorizado x iterrows)...")
+    test_caracteristicas_identicas()
+    print("✅ Características idênticas")
+    print("🔍 Comparando saída completa de analise_clusters...")
+    test_analise_clusters_identica()
+    print("✅ analise_clusters idêntica em todas as loterias")
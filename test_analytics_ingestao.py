@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão da ingestão em lote do analytics (services/analytics_ingestao.py):
+o beacon é validado, os eventos chegam a li_events em lotes, a fila cheia
+descarta e conta, e ``parar`` drena o que ficou.
+
+Uso:
+    python test_analytics_ingestao.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from flask import Flask
+
+sys.path.append('.')
+
+from analytics_models import db
+from services import analytics_particoes
+from services.analytics_ingestao import IngestorEventos, evento_da_requisicao
+from services.analytics_tempo_real import JanelaDeslizante
+
+BEACON = {"event": "pageview", "path": "/megasena", "session_id": "s1", "visitor_id": "v1", "duration_ms": "1500"}
+
+
+def _app():
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _total(app):
+    with app.app_context():
+        return analytics_particoes.contar()["total"]
+
+
+def test_beacon_validado():
+    app = _app()
+    ua = {"User-Agent": "Mozilla/5.0"}
+    with app.test_request_context("/api/track", method="POST", data=json.dumps(BEACON), headers=ua, content_type="text/plain"):
+        from flask import request
+        evento = evento_da_requisicao(request)
+    assert evento["event"] == "pageview" and evento["duration_ms"] == 1500 and evento["ua"] == "Mozilla/5.0"
+
+    for corpo, headers in (("nao-json", ua), (json.dumps([1]), ua), (json.dumps({"path": "/"}), ua),
+                           (json.dumps(BEACON), {"User-Agent": "Googlebot/2.1"})):
+        with app.test_request_context("/api/track", method="POST", data=corpo, headers=headers):
+            from flask import request
+            assert evento_da_requisicao(request) is None
+
+
+def test_lotes_gravados_e_drenados():
+    app = _app()
+    ingestor = IngestorEventos(app, capacidade=1000, lote=100, intervalo_ms=60000, tempo_real=JanelaDeslizante())
+    with app.test_request_context("/api/track", method="POST", data=json.dumps(BEACON)):
+        from flask import request
+        evento = evento_da_requisicao(request)
+    for _ in range(250):
+        assert ingestor.enfileirar(dict(evento))
+    assert ingestor.aguardar(10)
+    assert _total(app) == 250
+    estatisticas = ingestor.estatisticas()
+    assert estatisticas["gravados"] == 250 and estatisticas["lotes"] == 3 and estatisticas["na_fila"] == 0
+
+    # Restos abaixo do lote saem no encerramento
+    for _ in range(7):
+        ingestor.enfileirar(dict(evento))
+    ingestor.parar()
+    assert _total(app) == 257
+
+
+def test_fila_cheia_descarta():
+    app = _app()
+    ingestor = IngestorEventos(app, capacidade=10, lote=1000, intervalo_ms=60000, tempo_real=JanelaDeslizante())
+    aceitos = [ingestor.enfileirar({"event": "hb", "path": "/"}) for _ in range(25)]
+    assert aceitos.count(True) == 10
+    estatisticas = ingestor.estatisticas()
+    assert estatisticas["descartados"] == 15 and estatisticas["pico_fila"] == 10
+    ingestor.parar()
+    assert _total(app) == 10
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo a ingestão do analytics...")
+    test_beacon_validado()
+    test_lotes_gravados_e_drenados()
+    test_fila_cheia_descarta()
+    print("✅ Ingestão do analytics ok")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão das partições mensais dos eventos do analytics
+(services/analytics_particoes.py): a li_events original migra para as
+partições, as consultas só tocam os meses do intervalo e a retenção arquiva
+em Parquet sem perder nem repetir eventos.
+
+Uso:
+    python test_analytics_particoes.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import func, insert, inspect
+
+sys.path.append('.')
+
+from analytics_models import Event, db
+from services import analytics_particoes
+
+AGORA = datetime(2026, 5, 20, 12, 0, 0)
+
+
+def _app():
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _eventos(n, semente=1):
+    """Eventos espalhados pelos ~4 meses antes de AGORA."""
+    rng = random.Random(semente)
+    return [{
+        "ts": AGORA - timedelta(seconds=rng.randrange(120 * 86400)),
+        "event": rng.choice(["pageview", "click", "hb"]),
+        "path": "/megasena",
+        "session_id": f"s{rng.randrange(500)}",
+        "visitor_id": f"v{rng.randrange(200)}",
+        "duration_ms": rng.randrange(1000),
+        "props": {"k": rng.randrange(3)} if rng.random() < 0.1 else None,
+    } for _ in range(n)]
+
+
+def _selecionados(inicio=None, fim=None):
+    return [e for lote in analytics_particoes.selecionar(inicio, fim) for e in lote]
+
+
+def test_migracao_e_poda_por_intervalo():
+    app = _app()
+    eventos = _eventos(2000)
+    with app.app_context():
+        db.session.execute(insert(Event), [dict(e) for e in eventos])
+        db.session.commit()
+        assert analytics_particoes.migrar(AGORA) == 2000
+        assert db.session.query(func.count(Event.id)).scalar() == 0
+        meses = [p["mes"] for p in analytics_particoes.particoes()]
+        assert meses == [202601, 202602, 202603, 202604, 202605, 202606]
+        assert analytics_particoes.contar()["total"] == 2000
+        assert analytics_particoes.intervalo() == (min(e["ts"] for e in eventos), max(e["ts"] for e in eventos))
+
+        # Janela recente: só a partição do mês corrente
+        desde = AGORA - timedelta(days=3)
+        assert [p["mes"] for p in analytics_particoes.particoes_no_intervalo(desde, None)] == [202605, 202606]
+        recentes = _selecionados(desde)
+        assert len(recentes) == sum(e["ts"] >= desde for e in eventos)
+        assert analytics_particoes.contar_distintos("visitor_id", desde) == len(
+            {e["visitor_id"] for e in eventos if e["ts"] >= desde})
+
+        # Novos eventos caem na partição do seu mês
+        analytics_particoes.inserir(db.session, [{"ts": AGORA, "event": "pageview", "visitor_id": "novo"}])
+        db.session.commit()
+        assert analytics_particoes.contar()["particoes"]["202605"]["eventos"] == 1 + sum(
+            analytics_particoes.mes_de(e["ts"]) == 202605 for e in eventos)
+
+
+def test_retencao_arquiva_em_parquet():
+    app = _app()
+    eventos = _eventos(3000, semente=2)
+    with app.app_context():
+        analytics_particoes.migrar(AGORA)
+        analytics_particoes.inserir(db.session, [dict(e) for e in eventos])
+        db.session.commit()
+        antes = sorted((e["ts"], e["session_id"], e["duration_ms"]) for e in _selecionados())
+
+        assert analytics_particoes.arquivar(AGORA, meses_quentes=2) == [202601, 202602, 202603]
+        tabelas = inspect(db.engine).get_table_names()
+        assert "li_events_p202603" not in tabelas and "li_events_p202604" in tabelas
+        depois = _selecionados()
+        assert sorted((e["ts"], e["session_id"], e["duration_ms"]) for e in depois) == antes
+        assert {e["props"]["k"] for e in depois if e["props"]} <= {0, 1, 2}
+
+        # Distintos atravessando arquivo + banco
+        desde = datetime(2026, 2, 10)
+        assert analytics_particoes.contar_distintos("session_id", desde) == len(
+            {e["session_id"] for e in eventos if e["ts"] >= desde})
+
+        # Evento atrasado num mês arquivado: junta ao arquivo sem repetir
+        analytics_particoes.inserir(db.session, [{"ts": datetime(2026, 2, 1, 8), "event": "hb", "session_id": "tarde"}])
+        db.session.commit()
+        fevereiro = sum(analytics_particoes.mes_de(e["ts"]) == 202602 for e in eventos)
+        assert analytics_particoes.arquivar(AGORA, meses_quentes=2) == [202602]
+        assert analytics_particoes.contar()["particoes"]["202602"]["eventos"] == fevereiro + 1
+        assert analytics_particoes.contar()["total"] == 3001
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo as partições do analytics...")
+    test_migracao_e_poda_por_intervalo()
+    test_retencao_arquiva_em_parquet()
+    print("✅ Partições do analytics ok")
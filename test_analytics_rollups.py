@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão dos rollups do painel de analytics (services/analytics_rollups.py):
+as consultas sobre os rollups batem com as contagens sobre li_events, tanto
+acumulando lote a lote (escritor do /api/track) quanto recompondo do zero, e
+os distintos do HyperLogLog (services/analytics_hll.py) ficam dentro do erro.
+
+Uso:
+    python test_analytics_rollups.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import func
+
+sys.path.append('.')
+
+from analytics_models import RollupMinuto, db
+from services import analytics_particoes, analytics_rollups
+from services.analytics_hll import HyperLogLog
+from services.analytics_ingestao import IngestorEventos
+from services.analytics_tempo_real import JanelaDeslizante
+
+AGORA = datetime.utcnow().replace(microsecond=0)  # o escritor poda pela hora atual
+PATHS = ["/", "/megasena", "/quina", "/lotofacil", "/boloes"]
+LABELS = ["li:megasena:painel:abrir_modal_x", "li:quina:premium:gerar_palpite", "li:home:cta:assinar_premium", "outro"]
+
+
+def _app():
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _eventos(n, semente=1):
+    rng = random.Random(semente)
+    eventos = []
+    for _ in range(n):
+        tipo = rng.choice(["pageview", "pageview", "click", "hb"])
+        eventos.append({
+            "ts": AGORA - timedelta(seconds=rng.randrange(9 * 86400)),
+            "event": tipo,
+            "path": rng.choice(PATHS),
+            "label": rng.choice(LABELS) if tipo == "click" else "",
+            "session_id": f"s{rng.randrange(300)}",
+            "visitor_id": f"v{rng.randrange(120)}",
+            "duration_ms": rng.randrange(20000) if tipo == "hb" else 0,
+        })
+    return eventos
+
+
+def _referencia(eventos):
+    """As contagens do painel direto dos eventos, nas mesmas janelas dos rollups."""
+    desde = AGORA - timedelta(days=1)
+    minuto = desde.replace(second=0, microsecond=0)
+    hora = desde.replace(minute=0, second=0, microsecond=0)
+    sete = datetime.combine((AGORA - timedelta(days=7)).date(), time.min)
+    ultimas = [e for e in eventos if e["ts"] >= minuto]
+    pv = sum(e["event"] == "pageview" for e in ultimas)
+    total_ms = sum(e["duration_ms"] for e in ultimas if e["event"] == "hb")
+    semana = [e for e in eventos if e["ts"] >= sete]
+    paginas = Counter(e["path"] for e in semana if e["event"] == "pageview")
+    cliques = Counter(e["label"] for e in semana if e["event"] == "click")
+    return {
+        "kpis": {
+            "pageviews_24h": pv,
+            "visitors_24h": len({e["visitor_id"] for e in eventos if e["ts"] >= hora}),
+            "sessions_24h": len({e["session_id"] for e in eventos if e["ts"] >= hora}),
+            "avg_time_per_view_s": round((total_ms / 1000) / max(pv, 1), 1),
+        },
+        "paginas": dict(paginas),
+        "cliques": dict(cliques),
+        "funil": {
+            "pageviews": sum(paginas.values()),
+            "modais": cliques.get(LABELS[0], 0),
+            "palpites": cliques.get(LABELS[1], 0),
+            "cta_premium": cliques.get(LABELS[2], 0),
+        },
+        "diaria": sum(e["event"] == "pageview" for e in eventos),
+    }
+
+
+def _perto(estimado, exato, erro=0.03):
+    return abs(estimado - exato) <= max(2, erro * exato)
+
+
+def _conferir(eventos):
+    esperado = _referencia(eventos)
+    assert analytics_rollups.kpis(AGORA, exato=True) == esperado["kpis"]
+    aproximado = analytics_rollups.kpis(AGORA)
+    for chave in ("visitors_24h", "sessions_24h"):
+        assert _perto(aproximado[chave], esperado["kpis"][chave])
+    assert {p["path"]: p["pageviews"] for p in analytics_rollups.top_paginas(agora=AGORA)} == esperado["paginas"]
+    assert {e["label"]: e["count"] for e in analytics_rollups.top_eventos(agora=AGORA)} == esperado["cliques"]
+    assert analytics_rollups.funil_premium(agora=AGORA) == esperado["funil"]
+    serie = analytics_rollups.serie_diaria(dias=14, agora=AGORA)
+    assert len(serie["labels"]) == 10 and sum(serie["pageviews"]) == esperado["diaria"]
+
+
+def test_rollups_batem_com_eventos():
+    app = _app()
+    eventos = _eventos(3000)
+    with app.app_context():
+        for inicio in range(0, len(eventos), 700):
+            lote = eventos[inicio:inicio + 700]
+            analytics_particoes.inserir(db.session, lote)
+            analytics_rollups.acumular(db.session, lote)
+            db.session.commit()
+        _conferir(eventos)
+
+        # Recompor do zero dá o mesmo resultado
+        assert analytics_rollups.recompor_historico() == 3000
+        _conferir(eventos)
+
+        # A poda tira os minutos antigos; os dias continuam inteiros
+        analytics_rollups.podar(AGORA)
+        assert db.session.query(func.min(RollupMinuto.minuto)).scalar() >= AGORA - analytics_rollups.RETENCAO_MINUTOS
+        _conferir(eventos)
+
+
+def test_hyperloglog():
+    a = HyperLogLog().adicionar(f"v{i}" for i in range(60000))
+    b = HyperLogLog().adicionar(f"v{i}" for i in range(40000, 100000))
+    assert _perto(a.contar(), 60000) and _perto(b.contar(), 60000)
+    assert HyperLogLog.de_bytes(a.para_bytes()).contar() == a.contar()
+    assert _perto(a.unir(b).contar(), 100000)
+    assert HyperLogLog().contar() == 0 and HyperLogLog().adicionar(["x", "x", "y"]).contar() == 2
+
+
+def test_distintos_por_janela():
+    app = _app()
+    eventos = _eventos(4000, semente=3)
+    with app.app_context():
+        analytics_particoes.inserir(db.session, eventos)
+        analytics_rollups.acumular(db.session, eventos)
+        db.session.commit()
+        for janela in ("6h", "24h", "7d", "30d"):
+            exato = analytics_rollups.distintos(janela, AGORA, exato=True)
+            aproximado = analytics_rollups.distintos(janela, AGORA)
+            assert exato["desde"] == aproximado["desde"]
+            assert _perto(aproximado["visitors"], exato["visitors"]) and _perto(aproximado["sessions"], exato["sessions"])
+        for invalida in ("", "7", "0d", "72h", "1w"):
+            with pytest.raises(ValueError):
+                analytics_rollups.distintos(invalida, AGORA)
+
+
+def test_escritor_acumula_rollups():
+    app = _app()
+    ingestor = IngestorEventos(app, capacidade=5000, lote=250, intervalo_ms=60000, tempo_real=JanelaDeslizante())
+    eventos = _eventos(1000, semente=2)
+    for evento in eventos:
+        ingestor.enfileirar(dict(evento))
+    assert ingestor.aguardar(10)
+    ingestor.parar()
+    with app.app_context():
+        _conferir(eventos)
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo os rollups do analytics...")
+    test_rollups_batem_com_eventos()
+    test_hyperloglog()
+    test_distintos_por_janela()
+    test_escritor_acumula_rollups()
+    print("✅ Rollups do analytics ok")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do painel "agora" do analytics (services/analytics_tempo_real.py):
+a janela deslizante conta sessões, páginas e cliques só dos últimos segundos,
+junta os retratos de outros workers e chega ao admin por SSE.
+
+Uso:
+    python test_analytics_tempo_real.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+sys.path.append('.')
+
+from analytics_models import db
+from services.analytics_ingestao import IngestorEventos
+from services.analytics_tempo_real import JanelaDeslizante
+
+AGORA = datetime(2026, 5, 20, 12, 0, 0)
+T0 = (AGORA - datetime(1970, 1, 1)).total_seconds()
+
+
+def _evento(segundos, tipo="pageview", sessao="s1", path="/megasena", label=None):
+    return {"ts": AGORA + timedelta(seconds=segundos), "event": tipo, "session_id": sessao,
+            "path": path, "label": label}
+
+
+def test_janela_expira_por_segundo():
+    janela = JanelaDeslizante(segundos=60)
+    janela.registrar([_evento(0, sessao="a"), _evento(0, sessao="b", path="/quina"),
+                      _evento(1, "click", sessao="a", label="gerar")], agora=T0 + 1)
+    janela.registrar([_evento(30, "hb", sessao="c"), _evento(30, sessao="a")], agora=T0 + 30)
+    # Fora da janela: ignorado
+    janela.registrar([_evento(-120, sessao="velha")], agora=T0 + 30)
+
+    resumo = janela.resumo(agora=T0 + 30)
+    assert resumo["online"] == 3
+    assert resumo["top_paginas"] == [{"path": "/megasena", "pageviews": 2}, {"path": "/quina", "pageviews": 1}]
+    assert resumo["cliques"] == [{"label": "gerar", "count": 1}]
+    assert resumo["ultimos_cliques"][0]["label"] == "gerar"
+
+    # 61s depois do começo: "b" saiu, "a" continua pelo evento do segundo 30
+    resumo = janela.resumo(agora=T0 + 61)
+    assert resumo["online"] == 2
+    assert resumo["top_paginas"] == [{"path": "/megasena", "pageviews": 1}]
+    assert resumo["cliques"] == [] and resumo["ultimos_cliques"] == []
+    assert janela.resumo(agora=T0 + 95)["online"] == 0
+
+
+def test_retratos_de_varios_workers():
+    pasta = tempfile.mkdtemp()
+    outro = JanelaDeslizante(segundos=60, diretorio=pasta)
+    outro.registrar([_evento(0, sessao="a"), _evento(0, "click", sessao="x", label="premium")], agora=T0)
+    outro.publicar(agora=T0, forcar=True)
+    os.replace(outro._caminho(), os.path.join(pasta, "99999.json"))  # como se fosse outro pid
+
+    janela = JanelaDeslizante(segundos=60, diretorio=pasta)
+    janela.registrar([_evento(5, sessao="a"), _evento(5, sessao="b")], agora=T0 + 5)
+    resumo = janela.resumo(agora=T0 + 5)
+    assert resumo["online"] == 3
+    assert resumo["top_paginas"] == [{"path": "/megasena", "pageviews": 3}]
+    assert resumo["cliques"] == [{"label": "premium", "count": 1}]
+
+
+def test_ingestor_alimenta_janela_e_sse():
+    app = Flask(__name__)
+    pasta = tempfile.mkdtemp()
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(pasta, 'li.db')}"
+    app.config["ANALYTICS_ARQUIVO_DIR"] = os.path.join(pasta, "arquivo")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    janela = JanelaDeslizante(segundos=60)
+    ingestor = IngestorEventos(app, capacidade=100, lote=10, intervalo_ms=50, tempo_real=janela)
+    for i in range(5):
+        ingestor.enfileirar({"ts": datetime.utcnow(), "event": "pageview", "path": "/", "session_id": f"s{i}"})
+    ingestor.parar()
+    assert janela.resumo()["online"] == 5
+
+    import routes_admin
+    original, routes_admin.janela_tempo_real = routes_admin.janela_tempo_real, janela
+    try:
+        app.register_blueprint(routes_admin.bp_admin)
+        resposta = app.test_client().get("/admin/analytics/realtime/stream",
+                                         query_string={"key": os.getenv("ADMIN_KEY", "")})
+        assert resposta.mimetype == "text/event-stream"
+        partes = (parte.decode() for parte in resposta.response)
+        assert next(partes).startswith("retry:")
+        dados = next(partes)
+        assert dados.startswith("data: ") and json.loads(dados[6:])["online"] == 5
+        resposta.close()
+    finally:
+        routes_admin.janela_tempo_real = original
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo o painel em tempo real do analytics...")
+    test_janela_expira_por_segundo()
+    test_retratos_de_varios_workers()
+    test_ingestor_alimenta_janela_e_sse()
+    print("✅ Painel em tempo real ok")
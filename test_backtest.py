@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do backtest (services/backtest.py): a conferência por bitmask bate
+com a interseção de conjuntos, cada concurso é gerado só com os concursos
+anteriores, o resultado não depende de como o histórico foi dividido e a
+rota da API exige login e respeita os limites.
+
+Uso:
+    python test_backtest.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+import numpy as np
+
+from funcoes.common.bitmask import contar_acertos, empacotar, matriz_acertos
+from services import backtest as bt
+
+
+def _historico(qtd=80, bolas=6, num_max=60, seed=5):
+    rng = np.random.default_rng(seed)
+    sorteios = np.array([np.sort(rng.choice(np.arange(1, num_max + 1), bolas, replace=False)) for _ in range(qtd)])
+    return sorteios, np.arange(1000, 1000 + qtd), [f"Bola{i}" for i in range(1, bolas + 1)]
+
+
+def test_acertos_por_bitmask_batem_com_conjuntos():
+    rng = np.random.default_rng(1)
+    apostas = [sorted(rng.choice(np.arange(0, 100), rng.integers(5, 51), replace=False)) for _ in range(200)]
+    sorteios = [sorted(rng.choice(np.arange(0, 100), 20, replace=False)) for _ in range(30)]
+    mascaras_apostas, mascaras_sorteios = empacotar(apostas, 99), empacotar(sorteios, 99)
+
+    esperado = np.array([[len(set(a) & set(s)) for s in sorteios] for a in apostas])
+    assert (matriz_acertos(mascaras_apostas, mascaras_sorteios) == esperado).all()
+    assert (contar_acertos(mascaras_apostas, mascaras_sorteios[7]) == esperado[:, 7]).all()
+
+
+def test_sem_dados_do_proprio_concurso(monkeypatch):
+    sorteios, concursos, colunas = _historico()
+    vistos = []
+
+    def gerador(preferencias, analysis_cache, rng=None):
+        # Aposta = último sorteio que o gerador conseguiu ver
+        ultimo = analysis_cache['padroes_completa']['repeticoes_entre_concursos']['ultimos_numeros_sorteados']
+        vistos.append(tuple(ultimo))
+        return [{'numeros': ultimo}] * preferencias['numApostasGerar']
+
+    monkeypatch.setattr(bt, "_obter_gerador", lambda loteria: gerador)
+    resultado = bt.backtest("megasena", {'padroes': {}}, apostas_por_concurso=2, processos=1,
+                            detalhar=True, historico=(sorteios, concursos, colunas))
+
+    inicio = bt.HISTORICO_MINIMO
+    assert vistos == [tuple(s) for s in sorteios[inicio - 1:-1].tolist()]
+    assert resultado["concursos"] == len(sorteios) - inicio
+    assert resultado["apostas"] == 2 * resultado["concursos"]
+    for linha, pos in zip(resultado["por_concurso"], range(inicio, len(sorteios))):
+        assert linha["concurso"] == concursos[pos]
+        assert linha["maximo_acertos"] == len(set(sorteios[pos - 1]) & set(sorteios[pos]))
+
+
+def test_resultado_independe_da_divisao_em_blocos(monkeypatch):
+    sorteios, concursos, colunas = _historico()
+
+    def gerador(preferencias, analysis_cache, rng=None):
+        # Determinístico: os 6 números mais frequentes até o concurso anterior
+        freq = analysis_cache['frequencia_completa']['analise_frequencia']['frequencia_absoluta']['numeros']
+        quentes = sorted(freq, key=lambda n: (-freq[n], n))[:6]
+        return [{'numeros': sorted(quentes)}] * preferencias['numApostasGerar']
+
+    monkeypatch.setattr(bt, "_obter_gerador", lambda loteria: gerador)
+    monkeypatch.setattr(bt.os, "cpu_count", lambda: 3)
+    historico = (sorteios, concursos, colunas)
+    prefs = {'frequencia': {'priorizarQuentes': True}}
+    um = bt.backtest("megasena", prefs, apostas_por_concurso=3, processos=1, historico=historico)
+    # processos > 1 com o pool trocado por execução local (mesmos blocos)
+    monkeypatch.setattr(bt, "ProcessPoolExecutor", _PoolLocal)
+    varios = bt.backtest("megasena", prefs, apostas_por_concurso=3, processos=3, historico=historico)
+
+    assert um["distribuicao_acertos"] == varios["distribuicao_acertos"]
+    assert um["faixas"] == varios["faixas"]
+    assert sum(um["distribuicao_acertos"].values()) == um["apostas"]
+
+
+def test_semente_reproduz_o_backtest(monkeypatch):
+    # Gerador real (sorteio com pesos): mesma semente, mesmo resultado, com ou sem blocos
+    sorteios, concursos, colunas = _historico(qtd=60)
+    historico = (sorteios, concursos, colunas)
+    prefs = {'frequencia': {'priorizarQuentes': True, 'qtdeQuentes': 10}}
+    um = bt.backtest("megasena", prefs, apostas_por_concurso=4, processos=1, historico=historico, semente=42)
+    monkeypatch.setattr(bt, "ProcessPoolExecutor", _PoolLocal)
+    varios = bt.backtest("megasena", prefs, apostas_por_concurso=4, processos=3, historico=historico, semente="42")
+    outra = bt.backtest("megasena", prefs, apostas_por_concurso=4, processos=1, historico=historico, detalhar=True)
+
+    assert um["semente"] == varios["semente"] == "42"
+    assert um["distribuicao_acertos"] == varios["distribuicao_acertos"]
+    refeito = bt.backtest("megasena", prefs, apostas_por_concurso=4, processos=1, historico=historico,
+                          semente=outra["semente"], detalhar=True)
+    assert refeito["por_concurso"] == outra["por_concurso"]
+
+
+def test_rota_exige_login_e_limita(monkeypatch):
+    import app as aplicacao
+
+    cliente = aplicacao.app.test_client()
+    monkeypatch.setattr(aplicacao, "verificar_usuario_logado", lambda: False)
+    assert cliente.post("/api/backtest/megasena", json={}).status_code == 401
+
+    sorteios, concursos, colunas = _historico(qtd=400)
+    pedidos = []
+    monkeypatch.setattr(aplicacao, "verificar_usuario_logado", lambda: True)
+    monkeypatch.setattr(aplicacao, "carregar_historico", lambda loteria: (sorteios, concursos, colunas))
+    monkeypatch.setattr(aplicacao.backtest_service, "backtest",
+                        lambda loteria, preferencias, **kwargs: pedidos.append(kwargs) or {})
+    assert cliente.post("/api/backtest/megasena", json={}).status_code == 200
+    assert cliente.post("/api/backtest/megasena", json={"concursos": 5000, "apostas_por_concurso": 500}).status_code == 200
+    padrao, teto = pedidos
+    assert (padrao["apostas_por_concurso"], padrao["concurso_inicial"]) == (10, concursos[-100])
+    assert (teto["apostas_por_concurso"], teto["concurso_inicial"]) == (10, concursos[-200])
+    assert padrao["processos"] == teto["processos"] == 1
+
+
+class _PoolLocal:
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, funcao, itens):
+        return map(funcao, itens)
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo o backtest...")
+    test_acertos_por_bitmask_batem_com_conjuntos()
+    print("✅ Backtest ok (os demais testes usam monkeypatch: rode com pytest)")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do cache das APIs de análise (services/cache_analises.py): o
+decorador responde MISS, HIT e STALE conforme a entrada e o lock da chave,
+o lock no SQLite tem um dono só entre instâncias que dividem o arquivo, o
+SQLite descarta a entrada menos usada (LRU) e falhas do SQLite viram cálculo
+direto em vez de erro 500.
+
+Uso:
+    python test_cache_analises.py
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+sys.path.append('.')
+
+from flask import Flask, jsonify
+
+from services import cache_analises as modulo
+from services.cache_analises import CacheSQLite, cache_analise
+
+
+def _em_outra_thread(funcao):
+    resultado = []
+    thread = threading.Thread(target=lambda: resultado.append(funcao()))
+    thread.start()
+    thread.join()
+    return resultado[0]
+
+
+def _app(monkeypatch, cache):
+    monkeypatch.setattr(modulo, "cache_analises", cache)
+    monkeypatch.setattr(modulo, "versao_dados", lambda loteria: "v1")
+    monkeypatch.setattr(modulo, "obter_artefato", lambda *args: None)
+    monkeypatch.setattr(modulo, "CACHE_ESPERA", 0.2)
+    chamadas = []
+    app = Flask(__name__)
+
+    @app.route("/api/analise")
+    @cache_analise("megasena")
+    def analise():
+        chamadas.append(1)
+        return jsonify({"calculos": len(chamadas)})
+
+    return app.test_client(), chamadas
+
+
+def test_lock_com_um_dono_entre_instancias():
+    caminho = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    a, b = CacheSQLite(caminho), CacheSQLite(caminho)
+
+    assert a.adquirir_lock("k")
+    assert not b.adquirir_lock("k")
+    assert not _em_outra_thread(lambda: b.adquirir_lock("k"))
+    # Só o dono libera
+    _em_outra_thread(lambda: b.liberar_lock("k"))
+    assert not _em_outra_thread(lambda: b.adquirir_lock("k"))
+    a.liberar_lock("k")
+    assert _em_outra_thread(lambda: b.adquirir_lock("k"))
+
+    # Lock vencido (dono morreu calculando) pode ser tomado
+    assert a.adquirir_lock("vencido", ttl=-1)
+    assert _em_outra_thread(lambda: b.adquirir_lock("vencido"))
+
+
+def test_sqlite_descarta_o_menos_usado():
+    caminho = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    cache = CacheSQLite(caminho, max_itens=2)
+    cache.guardar("a", "megasena", "v1", b"1")
+    cache.guardar("b", "megasena", "v1", b"2")
+    assert cache.obter("a") is not None  # "a" passa a ser o mais recente
+    cache.guardar("c", "megasena", "v1", b"3")
+    assert cache.obter("b") is None
+    assert cache.obter("a")[0] == b"1" and cache.obter("c")[0] == b"3"
+
+    # Arquivo de antes da coluna de último acesso: migra e segue LRU
+    antigo = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    with sqlite3.connect(antigo) as conn:
+        conn.execute("CREATE TABLE cache_analises (chave TEXT PRIMARY KEY, loteria TEXT NOT NULL,"
+                     " versao TEXT NOT NULL, corpo BLOB NOT NULL, criado_em REAL NOT NULL, expira_em REAL NOT NULL)")
+        conn.execute("INSERT INTO cache_analises VALUES ('x', 'megasena', 'v1', x'31', 1, 9e9)")
+    cache = CacheSQLite(antigo, max_itens=1)
+    assert cache.obter("x")[0] == b"1"
+    cache.guardar("y", "megasena", "v1", b"2")
+    assert cache.obter("x") is None and cache.obter("y")[0] == b"2"
+
+
+def _chave(qtd):
+    return json.dumps(["megasena", "/api/analise", [["qtd", [str(qtd)]]], "v1"])
+
+
+def test_hit_stale_miss(monkeypatch):
+    caminho = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    cache = CacheSQLite(caminho)
+    cliente, chamadas = _app(monkeypatch, cache)
+    outro = CacheSQLite(caminho)  # outro worker no mesmo arquivo
+    outro._dono = lambda: "outro-worker"
+
+    resposta = cliente.get("/api/analise?qtd=050")
+    assert resposta.headers["X-Cache"] == "MISS" and resposta.get_json() == {"calculos": 1}
+    resposta = cliente.get("/api/analise?qtd=50&_=123")
+    assert resposta.headers["X-Cache"] == "HIT" and resposta.get_json() == {"calculos": 1}
+
+    # Entrada vencida e outro worker recalculando: serve a vencida
+    cache.guardar(_chave(50), "megasena", "v1", b'{"calculos": 1}', ttl=-1)
+    assert outro.adquirir_lock(_chave(50))
+    resposta = cliente.get("/api/analise?qtd=50")
+    assert resposta.headers["X-Cache"] == "STALE" and len(chamadas) == 1
+
+    # Lock liberado pelo dono: a vencida é recalculada
+    cache.liberar_lock(_chave(50))  # não é o dono: nada muda
+    assert cliente.get("/api/analise?qtd=50").headers["X-Cache"] == "STALE"
+    outro.liberar_lock(_chave(50))
+    resposta = cliente.get("/api/analise?qtd=50")
+    assert resposta.headers["X-Cache"] == "MISS" and resposta.get_json() == {"calculos": 2}
+
+    # Sem entrada e com o lock ocupado: espera CACHE_ESPERA e calcula
+    assert outro.adquirir_lock(_chave(7))
+    resposta = cliente.get("/api/analise?qtd=7")
+    assert resposta.headers["X-Cache"] == "MISS" and len(chamadas) == 3
+
+
+def test_falha_do_sqlite_calcula_sem_lock(monkeypatch):
+    cache = CacheSQLite(os.path.join(tempfile.mkdtemp(), "cache.sqlite"))
+    cliente, chamadas = _app(monkeypatch, cache)
+
+    def travado(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "adquirir_lock", travado)
+    resposta = cliente.get("/api/analise?qtd=1")
+    assert resposta.status_code == 200 and resposta.headers["X-Cache"] == "MISS"
+
+    monkeypatch.setattr(cache, "adquirir_lock", lambda chave: True)
+    monkeypatch.setattr(cache, "liberar_lock", travado)
+    assert cliente.get("/api/analise?qtd=2").status_code == 200
+
+    # Esperando outro worker, o SQLite falha no meio da espera: calcula
+    leituras = []
+
+    def obter(chave):
+        leituras.append(chave)
+        if len(leituras) > 1:
+            travado()
+        return None
+
+    monkeypatch.setattr(cache, "adquirir_lock", lambda chave: False)
+    monkeypatch.setattr(cache, "obter", obter)
+    resposta = cliente.get("/api/analise?qtd=3")
+    assert resposta.status_code == 200 and len(leituras) == 2 and len(chamadas) == 3
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo o lock do cache de análises...")
+    test_lock_com_um_dono_entre_instancias()
+    test_sqlite_descarta_o_menos_usado()
+    print("✅ Cache de análises ok (os demais testes usam monkeypatch: rode com pytest)")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão da conferência de apostas (services/conferencia.py): faixas e
+acertos por bitmask batem com a interseção de conjuntos (inclusive trevos da
++Milionária) e as respostas em streaming equivalem ao resumo completo.
+
+Uso:
+    python test_conferencia.py
+"""
+
+import json
+import sys
+
+sys.path.append('.')
+
+import numpy as np
+
+from funcoes.common.config import obter_config
+from services.conferencia import Conferencia, iterar_json, iterar_ndjson
+
+
+def _historico(rng, qtd, num_max, drawn, trevos=False):
+    sorteios = np.array([np.sort(rng.choice(np.arange(1, num_max + 1), drawn, replace=False)) for _ in range(qtd)])
+    colunas = [f"Bola{i}" for i in range(1, drawn + 1)]
+    if trevos:
+        sorteios = np.hstack([sorteios, [np.sort(rng.choice(np.arange(1, 7), 2, replace=False)) for _ in range(qtd)]])
+        colunas += ["Trevo1", "Trevo2"]
+    return sorteios, np.arange(500, 500 + qtd), colunas
+
+
+def _faixas_por_conjuntos(loteria, apostas, trevos, sorteios, drawn):
+    faixas = obter_config(loteria)["faixas"]
+    contagens = []
+    for i, aposta in enumerate(apostas):
+        contagem = {}
+        for sorteio in sorteios:
+            acertos = len(set(aposta) & set(sorteio[:drawn].tolist()))
+            chave = (acertos, len(set(trevos[i]) & set(sorteio[drawn:].tolist()))) if trevos else acertos
+            if chave in faixas:
+                contagem[faixas[chave]] = contagem.get(faixas[chave], 0) + 1
+        contagens.append(contagem)
+    return contagens
+
+
+def test_faixas_batem_com_conjuntos():
+    rng = np.random.default_rng(7)
+    # Quina: apostas de 5 a 8 números para ter faixas altas com poucos concursos
+    historico = _historico(rng, 300, 80, 5)
+    apostas = [sorted(rng.choice(np.arange(1, 81), rng.integers(5, 9), replace=False).tolist()) for _ in range(300)]
+    apostas[0] = historico[0][10].tolist()   # garante uma quina
+    resumo = Conferencia("quina", apostas, historico=historico).resumo()
+
+    esperado = _faixas_por_conjuntos("quina", apostas, None, historico[0], 5)
+    assert [r["faixas"] for r in resumo["resultados"]] == esperado
+    assert resumo["resultados"][0]["maximo_acertos"] == 5
+    assert resumo["resultados"][0]["concurso_maximo"] == 510
+    assert resumo["totais"]["faixas"]["quina"] >= 1
+    assert sum(resumo["totais"]["distribuicao_acertos"].values()) == 300 * 300
+
+
+def test_milionaria_combina_numeros_e_trevos():
+    rng = np.random.default_rng(3)
+    historico = _historico(rng, 200, 50, 6, trevos=True)
+    apostas = [sorted(rng.choice(np.arange(1, 51), 8, replace=False).tolist()) for _ in range(150)]
+    trevos = [sorted(rng.choice(np.arange(1, 7), 2, replace=False).tolist()) for _ in range(150)]
+    resumo = Conferencia("mais_milionaria", apostas, trevos, historico=historico).resumo()
+    assert [r["faixas"] for r in resumo["resultados"]] == _faixas_por_conjuntos(
+        "mais_milionaria", apostas, trevos, historico[0], 6)
+
+
+def test_streaming_equivale_ao_resumo():
+    rng = np.random.default_rng(11)
+    historico = _historico(rng, 100, 60, 6)
+    apostas = [{"numeros": sorted(rng.choice(np.arange(1, 61), 6, replace=False).tolist())} for _ in range(700)]
+    resumo = Conferencia("megasena", apostas, historico=historico, concurso_inicial=550).resumo()
+    assert resumo["concursos"] == 50 and resumo["concurso_inicial"] == 550
+
+    documento = json.loads("".join(iterar_json(Conferencia("megasena", apostas, historico=historico,
+                                                           concurso_inicial=550))))
+    assert documento["resultados"] == resumo["resultados"]
+    assert documento["totais"] == resumo["totais"]
+
+    linhas = [json.loads(l) for l in "".join(iterar_ndjson(Conferencia(
+        "megasena", apostas, historico=historico, concurso_inicial=550))).splitlines()]
+    assert linhas[0]["apostas"] == 700
+    assert linhas[1:-1] == resumo["resultados"]
+    assert linhas[-1]["totais"] == resumo["totais"]
+
+
+def test_apostas_invalidas():
+    rng = np.random.default_rng(1)
+    historico = _historico(rng, 10, 60, 6)
+    for apostas in ([[1, 2, 3]], [[1, 1, 2, 3, 4, 5]], [[0, 1, 2, 3, 4, 5]], []):
+        try:
+            Conferencia("megasena", apostas, historico=historico)
+        except ValueError:
+            continue
+        raise AssertionError(f"aposta inválida aceita: {apostas}")
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo a conferência de apostas...")
+    test_faixas_batem_com_conjuntos()
+    test_milionaria_combina_numeros_e_trevos()
+    test_streaming_equivale_ao_resumo()
+    test_apostas_invalidas()
+    print("✅ Conferência ok")
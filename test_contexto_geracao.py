@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do contexto de geração (services/contexto_geracao.py): os insumos
+batem com a contagem direta, o contexto só é remontado quando a versão dos
+dados muda e o analysis_cache montado alimenta os geradores premium.
+
+Uso:
+    python test_contexto_geracao.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from services import contexto_geracao
+
+
+def _df(qtd=120, bolas=6, num_max=60, seed=3):
+    rng = np.random.default_rng(seed)
+    sorteios = np.array([np.sort(rng.choice(np.arange(1, num_max + 1), bolas, replace=False)) for _ in range(qtd)])
+    df = pd.DataFrame(sorteios, columns=[f"Bola{i}" for i in range(1, bolas + 1)])
+    df.insert(0, "Concurso", np.arange(1, qtd + 1))
+    return df, sorteios
+
+
+def test_insumos_batem_com_contagem_direta():
+    df, sorteios = _df()
+    contexto = contexto_geracao.ContextoGeracao("megasena", "v1", df)
+
+    assert contexto.ultimo_sorteio == sorteios[-1].tolist()
+    for n in (1, 30, 60):
+        assert contexto.frequencia_total[n] == int((sorteios == n).sum())
+        assert contexto.frequencia(25)[n] == int((sorteios[-25:] == n).sum())
+        linhas = np.flatnonzero((sorteios == n).any(axis=1))
+        assert contexto.atraso[n] == (len(sorteios) - 1 - linhas[-1] if len(linhas) else len(sorteios))
+
+    (a, b), vezes = contexto.pares_fortes()[0]
+    janela = sorteios[-contexto_geracao.JANELA_PARES:]
+    assert vezes == int(((janela == a).any(axis=1) & (janela == b).any(axis=1)).sum())
+
+
+def test_contexto_reaproveitado_por_versao(monkeypatch):
+    df, _ = _df()
+    versao = {"atual": "v1"}
+    cargas = []
+    monkeypatch.setattr(contexto_geracao, "versao_dados", lambda loteria: versao["atual"])
+    contexto_geracao.limpar()
+    try:
+        carregar = lambda loteria: cargas.append(loteria) or df
+        primeiro = contexto_geracao.obter_contexto("megasena", carregar)
+        assert contexto_geracao.obter_contexto("megasena", carregar) is primeiro
+        versao["atual"] = "v2"
+        assert contexto_geracao.obter_contexto("megasena", carregar) is not primeiro
+        assert cargas == ["megasena", "megasena"]
+    finally:
+        contexto_geracao.limpar()
+
+
+def test_analysis_cache_alimenta_gerador():
+    from funcoes.megasena.geracao_inteligente_MS import gerar_aposta_inteligente
+
+    df, sorteios = _df()
+    contexto = contexto_geracao.ContextoGeracao("megasena", "v1", df)
+    preferencias = {
+        'qtdeNumerosAposta': 6,
+        'frequencia': {'priorizarQuentes': True, 'qtdeQuentes': 10},
+        'padroes': {'priorizarAtrasados': True, 'minAtraso': 5, 'evitarRepeticoesSeguidas': True},
+        'afinidades': {'priorizarParesFortes': True, 'qtdePares': 5},
+    }
+    cache = contexto.analysis_cache(preferencias)
+    assert set(cache) == {'frequencia_completa', 'padroes_completa', 'afinidades_completa'}
+
+    resultado = gerar_aposta_inteligente(preferencias, cache)
+    apostas = resultado['apostas'] if isinstance(resultado, dict) else resultado
+    for aposta in apostas:
+        assert len(aposta['numeros']) == 6
+        assert not set(aposta['numeros']) & set(sorteios[-1].tolist())
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo o contexto de geração...")
+    test_insumos_batem_com_contagem_direta()
+    test_analysis_cache_alimenta_gerador()
+    print("✅ Contexto de geração ok")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do motor de coocorrência (funcoes/common/coocorrencia.py): pares,
+marginais e lift batem com a contagem por força bruta (Counter de pares por
+sorteio) num histórico sintético pequeno, e as dependências da Quina e da
+Lotofácil (amostra dos 10 mais frequentes) saem da contagem única de cada
+par, não da contagem dobrada de antes.
+
+Uso:
+    python test_coocorrencia.py
+"""
+
+import sys
+from collections import Counter
+from itertools import combinations
+
+sys.path.append('.')
+
+import numpy as np
+import pandas as pd
+
+from funcoes.common.coocorrencia import MatrizCoocorrencia
+from funcoes.common.incidencia import MatrizIncidencia
+from funcoes.lotofacil.analise_estatistica_avancada_lotofacil import AnaliseEstatisticaAvancadaLotofacil
+from funcoes.quina.analise_estatistica_avancada_quina import AnaliseEstatisticaAvancadaQuina
+
+
+def _sorteios(qtd, bolas, num_max, seed):
+    rng = np.random.default_rng(seed)
+    return [rng.choice(np.arange(1, num_max + 1), bolas, replace=False).tolist() for _ in range(qtd)]
+
+
+def _forca_bruta(sorteios):
+    frequencia = Counter(n for sorteio in sorteios for n in sorteio)
+    pares = Counter(par for sorteio in sorteios for par in combinations(sorted(sorteio), 2))
+    return frequencia, pares
+
+
+def _lift(frequencia, pares, total, a, b):
+    juntos = pares[(min(a, b), max(a, b))]
+    if not frequencia[a] or not frequencia[b]:
+        return 0.0
+    # Mesma ordem de operações do motor: P(a, b) / P(a) / P(b)
+    return ((juntos / total) / (frequencia[a] / total)) / (frequencia[b] / total)
+
+
+def test_pares_e_lift_por_forca_bruta():
+    for bolas, num_max in ((5, 80), (15, 25), (6, 60)):
+        sorteios = _sorteios(40, bolas, num_max, seed=bolas)
+        frequencia, pares = _forca_bruta(sorteios)
+        motor = MatrizCoocorrencia(MatrizIncidencia(np.array(sorteios), np.arange(40), 1, num_max))
+
+        assert motor.total == 40
+        assert motor.frequencia.tolist() == [frequencia[n] for n in range(1, num_max + 1)]
+        for a in range(1, num_max + 1):
+            for b in range(1, num_max + 1):
+                esperado = 0 if a == b else pares[(min(a, b), max(a, b))]
+                assert motor.pares[a - 1, b - 1] == esperado, (a, b)
+        lift = motor.lift()
+        for a, b in combinations(range(1, num_max + 1), 2):
+            assert np.isclose(lift[a - 1, b - 1], _lift(frequencia, pares, 40, a, b))
+            assert np.isclose(lift[b - 1, a - 1], _lift(frequencia, pares, 40, b, a))
+
+
+def _dependencias_forca_bruta(sorteios):
+    total = len(sorteios)
+    frequencia, pares = _forca_bruta(sorteios)
+    # Amostra: 10 mais frequentes, empate pela primeira aparição (ordem do Counter)
+    amostra = [n for n, _ in sorted(frequencia.items(), key=lambda x: x[1], reverse=True)[:10]]
+    dependencias = [
+        (a, b, _lift(frequencia, pares, total, a, b))
+        for a, b in combinations(sorted(amostra), 2) if pares[(a, b)] > 0
+    ]
+    return sorted(dependencias, key=lambda d: (-d[2], d[0], d[1]))
+
+
+def test_dependencias_quina_e_lotofacil():
+    for classe, bolas, num_max in ((AnaliseEstatisticaAvancadaQuina, 5, 80),
+                                   (AnaliseEstatisticaAvancadaLotofacil, 15, 25)):
+        sorteios = _sorteios(60, bolas, num_max, seed=num_max)
+        df = pd.DataFrame(sorteios, columns=[f"Bola{i}" for i in range(1, bolas + 1)])
+        df.insert(0, "Concurso", np.arange(900001, 900061))  # fora do draw store
+        resultado = classe(df).probabilidades_condicionais()
+
+        esperado = _dependencias_forca_bruta(sorteios)
+        obtido = resultado["todas_dependencias"]
+        assert [(a, b) for a, b, _ in obtido] == [(a, b) for a, b, _ in esperado[:10]], classe.__name__
+        assert np.allclose([l for _, _, l in obtido], [l for _, _, l in esperado[:10]])
+        assert [(a, b) for a, b, _ in resultado["dependencias_fortes"]] == [
+            (a, b) for a, b, l in esperado if l > 1.5][:5]
+        assert [(a, b) for a, b, _ in resultado["dependencias_fracas"]] == [
+            (a, b) for a, b, l in esperado if l < 0.7][:5]
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo coocorrência contra força bruta...")
+    test_pares_e_lift_por_forca_bruta()
+    test_dependencias_quina_e_lotofacil()
+    print("✅ Coocorrência ok")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do índice do espaço da Lotofácil (funcoes/lotofacil/espaco_lotofacil.py):
+as colunas batem com ``analisar_padroes_concurso``, as contagens com a
+contagem exata de funcoes/common/probabilidades.py e as amostras respeitam
+os filtros.
+
+Uso:
+    python test_espaco_lotofacil.py
+"""
+
+import math
+import sys
+
+import numpy as np
+
+sys.path.append('.')
+
+from funcoes.common.probabilidades import contar_apostas
+from funcoes.lotofacil.espaco_lotofacil import TOTAL_APOSTAS, obter_espaco_lotofacil
+from funcoes.lotofacil.geracao_inteligente_lotofacil import gerar_aposta_inteligente_lotofacil
+from funcoes.lotofacil.laboratorio_funcoes import analisar_padroes_concurso
+
+ULTIMO = [1, 2, 3, 5, 8, 9, 11, 13, 14, 16, 17, 19, 21, 23, 24]
+
+
+def test_colunas_batem_com_laboratorio():
+    espaco = obter_espaco_lotofacil()
+    assert len(espaco) == TOTAL_APOSTAS == math.comb(25, 15)
+    assert len(np.unique(espaco.mascaras)) == TOTAL_APOSTAS
+
+    repetidos = espaco.repetidos(ULTIMO)
+    for i in np.random.default_rng(7).integers(0, len(espaco), 300):
+        numeros = espaco.numeros(espaco.mascaras[i])
+        analise = analisar_padroes_concurso(numeros, ULTIMO)
+        for coluna in ("pares", "primos", "fibonacci", "moldura"):
+            assert espaco.colunas[coluna][i] == analise[coluna]
+        assert repetidos[i] == analise['repetidos']
+        assert espaco.colunas["soma"][i] == sum(numeros)
+
+
+def test_contagens_batem_com_probabilidades():
+    espaco = obter_espaco_lotofacil()
+    filtros = {"pares": (7, 8), "primos": {"min": 4, "max": 6}, "soma": (180, 210)}
+    assert espaco.contar(**filtros) == contar_apostas("lotofacil", 15, **filtros)
+    # 13 dos 22 números restantes, com 1 e 2 fixos e 3 excluído
+    assert espaco.contar(fixos=[1, 2], excluidos=[3]) == math.comb(22, 13)
+    # Repetidos seguem a hipergeométrica: k dos 15 sorteados e 15 - k dos 10 restantes
+    assert espaco.contar(repetidos=(9, 9), ultimo_concurso=ULTIMO) == math.comb(15, 9) * math.comb(10, 6)
+
+
+def test_amostras_respeitam_filtros():
+    espaco = obter_espaco_lotofacil()
+    rng = np.random.default_rng(3)
+    filtros = {"fibonacci": (4, 4), "moldura": (9, 10), "repetidos": (8, 9)}
+    apostas = espaco.amostrar(50, rng=rng, ultimo_concurso=ULTIMO, **filtros)
+    assert len(apostas) == 50 and len({tuple(a) for a in apostas}) == 50
+    for aposta in apostas:
+        analise = analisar_padroes_concurso(aposta, ULTIMO)
+        assert analise['fibonacci'] == 4 and 9 <= analise['moldura'] <= 10 and 8 <= analise['repetidos'] <= 9
+
+    # Peso 0 exclui o número; conjunto pequeno devolve só o que existe
+    pesos = {n: 1.0 for n in range(1, 26)}
+    pesos[25] = 0.0
+    for aposta in espaco.amostrar(20, pesos=pesos, rng=rng, primos=(6, 6)):
+        assert 25 not in aposta
+    assert len(espaco.amostrar(10, rng=rng, fixos=list(range(1, 15)), excluidos=list(range(16, 26)))) == 1
+
+
+def test_gerador_premium_usa_filtros():
+    preferencias = {
+        'numApostasGerar': 5,
+        'qtdeNumerosAposta': 15,
+        'filtros': {'primos': [5, 5], 'repetidos': [9, 9]},
+        'distribuicao': {'priorizarParesImpares': True, 'paridadeDesejada': 'equilibrado'},
+    }
+    apostas = gerar_aposta_inteligente_lotofacil(preferencias, {'ultimo_sorteio': ULTIMO})
+    assert len(apostas) == 5
+    for aposta in apostas:
+        analise = analisar_padroes_concurso(aposta['numeros'], ULTIMO)
+        assert analise['primos'] == 5 and analise['repetidos'] == 9 and 7 <= analise['pares'] <= 8
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo o índice do espaço da Lotofácil...")
+    test_colunas_batem_com_laboratorio()
+    test_contagens_batem_com_probabilidades()
+    test_amostras_respeitam_filtros()
+    test_gerador_premium_usa_filtros()
+    print("✅ Índice do espaço da Lotofácil ok")
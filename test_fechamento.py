@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão dos fechamentos (funcoes/common/fechamento.py): a cobertura por
+bitset confere com a verificação por conjuntos, todo fechamento calculado ou
+tabelado cumpre a garantia e as apostas saem nas dezenas escolhidas.
+
+Uso:
+    python test_fechamento.py
+"""
+
+import json
+import sys
+from itertools import combinations
+
+sys.path.append('.')
+
+import numpy as np
+
+from funcoes.common.fechamento import (CAMINHO_TABELA, Fechamento, TempoEsgotado, gerar_fechamento,
+                                       limite_inferior, limite_schonheim)
+
+
+def _descobertos_por_conjuntos(apostas, n, t, m):
+    apostas = [set(a) for a in apostas]
+    return sum(
+        not any(len(a & set(alvo)) >= t for a in apostas)
+        for alvo in combinations(range(n), m)
+    )
+
+
+def test_fechamentos_calculados_cumprem_a_garantia():
+    for n, k, t, m in [(8, 6, 4, 4), (10, 6, 4, 6), (9, 5, 3, 4), (17, 15, 13, 15)]:
+        motor = Fechamento(n, k, t, m)
+        apostas = motor.calcular(tempo_max=0.5, seed=1)
+        assert all(len(a) == k and len(set(a)) == k for a in apostas)
+        assert _descobertos_por_conjuntos(apostas, n, t, m) == 0
+        # Contagem por bitset x por conjuntos num fechamento incompleto
+        parcial = apostas[:-1]
+        assert motor.descobertos(parcial) == _descobertos_por_conjuntos(parcial, n, t, m)
+        if t == m:
+            assert len(apostas) >= limite_schonheim(n, k, t)
+
+
+def test_tabela_valida():
+    with open(CAMINHO_TABELA, "r", encoding="utf-8") as f:
+        tabela = json.load(f)["fechamentos"]
+    assert tabela
+    for chave, apostas in tabela.items():
+        n, k, t, m = map(int, chave.split("-"))
+        assert all(len(set(a)) == k and 0 <= min(a) and max(a) < n for a in apostas), chave
+        assert Fechamento(n, k, t, m).descobertos(apostas) == 0, chave
+
+
+def test_gerar_fechamento_usa_as_dezenas_escolhidas():
+    numeros = [3, 8, 15, 21, 27, 33, 40, 44, 52, 59]
+    resultado = gerar_fechamento(numeros, 6, 4, 6)
+    assert resultado["origem"] == "tabela"
+    assert resultado["quantidade"] == len(resultado["apostas"])
+    assert all(set(a) <= set(numeros) and len(a) == 6 for a in resultado["apostas"])
+
+
+def test_fechamentos_caros_recusados():
+    # Mega Sena, 40 dezenas, quadra com 4 sorteadas: milhares de apostas
+    assert limite_inferior(40, 6, 4, 4) == 6093
+    try:
+        Fechamento(40, 6, 4, 4)
+        assert False, "esperava ValueError"
+    except ValueError:
+        pass
+
+    # O guloso respeita o prazo (e o erro vira 400 na rota, como ValueError)
+    motor = Fechamento(25, 6, 4, 4)
+    try:
+        motor.guloso(np.random.default_rng(1), prazo=0.0)
+        assert False, "esperava TempoEsgotado"
+    except TempoEsgotado as e:
+        assert isinstance(e, ValueError)
+    try:
+        gerar_fechamento(range(1, 26), 6, 4, 4, tempo_guloso=0.0)
+        assert False, "esperava TempoEsgotado"
+    except TempoEsgotado:
+        pass
+
+
+def test_rota_limita_dezenas():
+    from flask import Flask
+    from routes_boloes import bp_boloes
+
+    app = Flask(__name__)
+    app.register_blueprint(bp_boloes)
+    resposta = app.test_client().post("/api/boloes/fechamento", json={
+        "loteria": "megasena", "numeros": list(range(1, 41)), "tamanho_aposta": 6, "acertos": 4, "sorteadas": 4})
+    assert resposta.status_code == 400 and "no máximo 30" in resposta.get_json()["error"]
+    # Aposta fora dos tamanhos aceitos pela loteria (Mega Sena: 6 a 20)
+    for tamanho in (3, 25):
+        resposta = app.test_client().post("/api/boloes/fechamento", json={
+            "loteria": "megasena", "numeros": list(range(1, 21)), "tamanho_aposta": tamanho})
+        assert resposta.status_code == 400 and "entre 6 e 20" in resposta.get_json()["error"]
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo fechamentos...")
+    test_fechamentos_calculados_cumprem_a_garantia()
+    test_tabela_valida()
+    test_gerar_fechamento_usa_as_dezenas_escolhidas()
+    test_fechamentos_caros_recusados()
+    test_rota_limita_dezenas()
+    print("✅ Fechamentos ok")
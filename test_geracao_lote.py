@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão da geração em lote (services/geradores/lote.py): toda aposta
+atende às restrições, as apostas de um lote são distintas, o gerador
+restrito assume quando o filtro não basta (e o teto ``_CELULAS_DP`` recusa o
+que não cabe) e as respostas em streaming equivalem ao lote gerado.
+
+Uso:
+    python test_geracao_lote.py
+"""
+
+import json
+import sys
+
+sys.path.append('.')
+
+import numpy as np
+
+from services.geradores import lote
+from services.geradores.lote import LOTERIAS_LOTE, gerar_lote, iterar_json, iterar_ndjson, mascara_restricoes
+
+
+def _conferir(resultado, restricoes):
+    numeros = resultado["numeros"]
+    num_min, num_max = LOTERIAS_LOTE[resultado["loteria"]]["faixa"]
+    assert numeros.shape == (resultado["quantidade"], resultado["qtd_numeros"])
+    assert (np.diff(numeros, axis=1) > 0).all()
+    assert numeros.min() >= num_min and numeros.max() <= num_max
+    assert mascara_restricoes(numeros, **restricoes).all()
+    assert len(np.unique(numeros, axis=0)) == len(numeros)
+
+
+def test_restricoes_e_apostas_distintas():
+    casos = [
+        ("megasena", 6, 2000, {"pares_permitidos": [3], "soma": (150, 220), "evitar_consecutivos": True}),
+        ("quina", 7, 1500, {"marcados": [1, 2, 3, 4, 5, 6], "max_marcados": 1}),
+        # C(25, 15) ≈ 3,3 milhões: 10 mil apostas sem descarte teriam ~15 repetidas
+        ("lotofacil", 15, 10000, {}),
+        # Soma estreita: aceitação baixa, o gerador restrito completa o lote
+        ("megasena", 6, 500, {"soma": (21, 40)}),
+    ]
+    for loteria, qtd, quantidade, restricoes in casos:
+        resultado = gerar_lote(loteria, quantidade, qtd, restricoes=restricoes, semente=1)
+        _conferir(resultado, restricoes)
+    assert resultado["metodo"] in ("restrito", "gumbel+restrito")
+
+    # max_marcados=0: nenhum marcado em nenhuma aposta (0 não é "sem restrição")
+    restricoes = {"marcados": list(range(1, 11)), "max_marcados": 0}
+    resultado = gerar_lote("megasena", 200, 6, restricoes=restricoes, semente=4)
+    _conferir(resultado, restricoes)
+    assert not np.isin(resultado["numeros"], restricoes["marcados"]).any()
+
+    # Só 7 números com peso: existem exatamente 7 apostas de 6
+    pesos = {n: (1.0 if n <= 7 else 0.0) for n in range(1, 61)}
+    resultado = gerar_lote("megasena", 7, 6, pesos=pesos, semente=2)
+    assert sorted(map(tuple, resultado["numeros"].tolist())) == sorted(
+        tuple(n for n in range(1, 8) if n != fora) for fora in range(1, 8))
+    try:
+        gerar_lote("megasena", 8, 6, pesos=pesos)
+        raise AssertionError("esperava ValueError")
+    except ValueError:
+        pass
+
+
+def test_gerador_restrito_e_teto_de_celulas(monkeypatch):
+    restricoes = {"pares_permitidos": [2, 3], "soma": (100, 200), "evitar_consecutivos": True}
+    # Filtro desligado: o lote inteiro sai do gerador restrito
+    monkeypatch.setattr(lote, "_TAXA_MINIMA", 1.1)
+    resultado = gerar_lote("quina", 800, 5, restricoes=restricoes, semente=3)
+    assert resultado["metodo"] == "restrito"
+    _conferir(resultado, restricoes)
+
+    monkeypatch.setattr(lote, "_CELULAS_DP", lote._celulas_dp(1, 80, 5, restricoes) - 1)
+    try:
+        gerar_lote("quina", 800, 5, restricoes=restricoes, semente=3)
+        raise AssertionError("esperava ValueError")
+    except ValueError as e:
+        assert "apertadas demais" in str(e)
+    # Sem restrições pesadas o teto não atrapalha
+    monkeypatch.setattr(lote, "_CELULAS_DP", 1)
+    monkeypatch.setattr(lote, "_TAXA_MINIMA", 0.02)
+    assert gerar_lote("quina", 50, 5, semente=3)["metodo"] == "gumbel"
+
+
+def test_streaming_equivale_ao_lote():
+    for loteria, qtd in (("megasena", 8), ("mais_milionaria", 7)):
+        resultado = gerar_lote(loteria, 1234, qtd, restricoes={"evitar_consecutivos": True}, semente=9)
+        apostas = [{"numeros": n} for n in resultado["numeros"].tolist()]
+        if "trevos" in resultado:
+            for aposta, trevos in zip(apostas, resultado["trevos"].tolist()):
+                aposta["trevos"] = trevos
+
+        documento = json.loads("".join(iterar_json(resultado, bloco=100)))
+        assert documento["apostas"] == apostas
+        assert documento["semente"] == "9" and documento["quantidade"] == 1234 and documento["success"]
+
+        linhas = [json.loads(l) for l in "".join(iterar_ndjson(resultado, bloco=100)).splitlines()]
+        assert linhas[0]["valor_total"] == resultado["valor_total"]
+        assert linhas[1:] == apostas
+
+
+def test_rota_repete_o_lote_pela_semente():
+    import app as aplicacao
+
+    cliente = aplicacao.app.test_client()
+    corpo = {"loteria": "quina", "quantidade": 300, "qtde_numeros": 6, "semente": 77,
+             "restricoes": {"soma_min": 150, "soma_max": 250, "pares_permitidos": [3]}}
+    esperado = gerar_lote("quina", 300, 6, restricoes={"soma": (150, 250), "pares_permitidos": [3]}, semente=77)
+    apostas = [{"numeros": n} for n in esperado["numeros"].tolist()]
+
+    documento = cliente.post("/api/gerar-apostas-lote", json=corpo).get_json()
+    assert documento["apostas"] == apostas and documento["metodo"] == esperado["metodo"]
+    resposta = cliente.post("/api/gerar-apostas-lote", json=dict(corpo, formato="ndjson"))
+    assert resposta.mimetype == "application/x-ndjson"
+    assert [json.loads(l) for l in resposta.get_data(as_text=True).splitlines()][1:] == apostas
+
+    resposta = cliente.post("/api/gerar-apostas-lote", json=dict(corpo, quantidade=10 ** 6))
+    assert resposta.status_code == 400
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo a geração em lote...")
+    test_restricoes_e_apostas_distintas()
+    test_streaming_equivale_ao_lote()
+    test_rota_repete_o_lote_pela_semente()
+    print("✅ Geração em lote ok (os demais testes usam monkeypatch: rode com pytest)")
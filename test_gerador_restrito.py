@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do gerador restrito (funcoes/common/gerador_restrito.py): num
+universo pequeno, enumera todas as apostas válidas e confere que o sorteio
+só devolve apostas válidas, com frequências proporcionais ao produto dos
+pesos.
+
+Uso:
+    python test_gerador_restrito.py
+"""
+
+import sys
+from collections import Counter
+from itertools import combinations
+
+sys.path.append('.')
+
+import numpy as np
+
+from funcoes.common.gerador_restrito import GeradorRestrito, sortear_aposta
+
+CASOS = [
+    {},
+    {"pares_permitidos": [2]},
+    {"soma": (18, 24)},
+    {"evitar_consecutivos": True},
+    {"marcados": [1, 2, 3, 4, 5], "max_marcados": 1},
+    {"pares_permitidos": [1, 2], "soma": (15, 25), "evitar_consecutivos": True,
+     "marcados": [2, 5, 7], "max_marcados": 1},
+    {"marcados": [1, 3, 5, 7, 9], "min_marcados": 2, "max_marcados": 2},
+    {"pares_permitidos": [2], "marcados": [2, 4, 6, 7], "min_marcados": 3},
+]
+
+
+def _valida(aposta, restricoes):
+    if "pares_permitidos" in restricoes and sum(n % 2 == 0 for n in aposta) not in restricoes["pares_permitidos"]:
+        return False
+    if "soma" in restricoes and not (restricoes["soma"][0] <= sum(aposta) <= restricoes["soma"][1]):
+        return False
+    if restricoes.get("evitar_consecutivos") and any(b - a == 1 for a, b in zip(aposta, aposta[1:])):
+        return False
+    if "marcados" in restricoes:
+        marcados = sum(n in restricoes["marcados"] for n in aposta)
+        if not restricoes.get("min_marcados", 0) <= marcados <= restricoes.get("max_marcados", len(aposta)):
+            return False
+    return True
+
+
+def test_distribuicao_exata():
+    rng = np.random.default_rng(1)
+    pesos = rng.uniform(0.1, 3.0, 10)
+    amostras = 100_000
+    for restricoes in CASOS:
+        esperado = {
+            aposta: float(np.prod(pesos[np.array(aposta) - 1]))
+            for aposta in combinations(range(1, 11), 4) if _valida(aposta, restricoes)
+        }
+        total = sum(esperado.values())
+        gerador = GeradorRestrito(list(pesos), 1, 10, 4, **restricoes)
+        contagem = Counter(map(tuple, gerador.sortear(amostras, rng).tolist()))
+
+        assert set(contagem) <= set(esperado), restricoes
+        distancia = 0.5 * sum(abs(contagem[a] / amostras - p / total) for a, p in esperado.items())
+        assert distancia < 0.03, (restricoes, distancia)
+
+
+def test_restricoes_impossiveis_caem_para_os_pesos():
+    # 15 dezenas da Lotofácil sem consecutivos não existem
+    gerador = GeradorRestrito({}, 1, 25, 15, evitar_consecutivos=True)
+    assert not gerador.viavel
+    aposta = sortear_aposta({}, 1, 25, 15, evitar_consecutivos=True)
+    assert len(set(aposta)) == 15 and aposta == sorted(aposta)
+
+
+def test_soma_do_pedido_recortada_e_tabelas_limitadas():
+    # somaMax absurdo do pedido: a faixa é recortada à maior soma de 6 dezenas
+    gerador = GeradorRestrito({}, 1, 60, 6, soma=(150, 2_000_000))
+    assert gerador.soma == (150, 345) and gerador.celulas < 1_000_000
+    assert all(150 <= sum(a) <= 345 for a in gerador.sortear(200).tolist())
+    assert not GeradorRestrito({}, 1, 60, 6, soma=(5000, 2_000_000)).viavel
+
+    # Estado grande demais é recusado; a geração cai para só os pesos
+    try:
+        GeradorRestrito({}, 1, 60, 20, pares_permitidos=range(21), soma=(0, 10**6),
+                        evitar_consecutivos=True, marcados=range(1, 21), max_marcados=20)
+        assert False, "esperava ValueError"
+    except ValueError:
+        pass
+    aposta = sortear_aposta({}, 1, 60, 20, pares_permitidos=list(range(21)), soma=(0, 10**6),
+                            evitar_consecutivos=True, marcados=list(range(1, 21)), max_marcados=20)
+    assert len(set(aposta)) == 20
+
+
+def test_reserva_e_cache_entre_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def gerar(i):
+        return [sortear_aposta({1: 1.0 + i % 3}, 1, 60, 6, soma=(100, 250)) for _ in range(300)]
+
+    with ThreadPoolExecutor(8) as executor:
+        apostas = [a for lote in executor.map(gerar, range(16)) for a in lote]
+    assert len(apostas) == 16 * 300
+    assert all(len(set(a)) == 6 and 100 <= sum(a) <= 250 for a in apostas)
+
+
+def test_repetidos_lotofacil_direto_na_faixa(monkeypatch):
+    from funcoes.lotofacil import gerarCombinacao_numeros_aleatoriosL_lotofacil as gerador_lf
+
+    sorteios = np.array([list(range(1, 16)), list(range(11, 26))])
+    snapshot = gerador_lf.SnapshotLotofacil("v1", sorteios)
+    assert snapshot.ultimo_concurso == list(range(11, 26))
+    monkeypatch.setattr(gerador_lf, "obter_snapshot_lotofacil", lambda: snapshot)
+
+    preferencias = {'repetidos_min': 9, 'repetidos_max': 9}
+    for quantidade in (15, 18):
+        for _ in range(50):
+            aposta = gerador_lf.gerar_aposta_personalizada_lotofacil(quantidade, preferencias)
+            assert len(set(aposta)) == quantidade
+            assert len(set(aposta) & set(snapshot.ultimo_concurso)) == 9
+            assert abs(2 * sum(n % 2 == 0 for n in aposta) - quantidade) <= 1
+
+    # Fora das faixas ideal e conservadora, a aposta é trocada por uma na faixa ideal
+    ajustada = gerador_lf.controlar_qualidade_repetidos_lotofacil(list(range(11, 26)), 15)
+    assert 7 <= len(set(ajustada) & set(snapshot.ultimo_concurso)) <= 11
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo a distribuição do gerador restrito...")
+    test_distribuicao_exata()
+    test_restricoes_impossiveis_caem_para_os_pesos()
+    test_soma_do_pedido_recortada_e_tabelas_limitadas()
+    test_reserva_e_cache_entre_threads()
+    print("✅ Gerador restrito ok")
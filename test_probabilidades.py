@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão das contagens exatas (funcoes/common/probabilidades.py): a
+programação dinâmica bate com a enumeração das apostas, o caminho módulo
+primos (totais acima de 64 bits) é exato e os preços reproduzem as tabelas
+oficiais que antes ficavam fixas no código.
+
+Uso:
+    python test_probabilidades.py
+"""
+
+import math
+import sys
+from collections import Counter
+from itertools import combinations
+
+sys.path.append('.')
+
+from funcoes.common.probabilidades import (
+    caracteristicas_aposta, contar_apostas, numeros_moldura, preco_aposta, probabilidade, tabela_contagens,
+)
+
+
+def test_contagens_batem_com_enumeracao():
+    # Quina com apostas de 3 números: 82 mil apostas, enumeráveis
+    contagem = Counter()
+    for aposta in combinations(range(1, 81), 3):
+        c = caracteristicas_aposta("quina", aposta)
+        contagem[(c["pares"], c["primos"], c["moldura"], c["soma"])] += 1
+    tabela = tabela_contagens("quina", 3)
+    assert int(tabela.sum()) == math.comb(80, 3)
+    assert all(int(tabela[chave]) == n for chave, n in contagem.items())
+
+    esperado = sum(n for (p, _, _, s), n in contagem.items() if p == 2 and 100 <= s <= 140)
+    assert contar_apostas("quina", 3, pares=(2, 2), soma=(100, 140)) == esperado
+
+
+def test_mega_sena_tres_pares_e_soma():
+    resultado = probabilidade("megasena", 6, pares=(3, 3), soma={"min": 150, "max": 210})
+    assert resultado["total"] == 50_063_860
+    assert resultado["combinacoes"] == 8_668_320
+    assert probabilidade("megasena", 6)["probabilidade"] == 1.0
+    assert probabilidade("megasena", 6, soma=(400, 500))["um_em"] is None
+
+
+def test_lotomania_exata_acima_de_64_bits():
+    # Metade pares: C(50, 25)^2 apostas de 50 números entre 0 e 99
+    assert contar_apostas("lotomania", 50, pares=(25, 25)) == math.comb(50, 25) ** 2
+    por_soma = tabela_contagens("lotomania", 50, ("soma",))
+    assert sum(por_soma) == math.comb(100, 50)
+    assert por_soma[sum(range(50))] == 1
+
+
+def test_moldura_da_lotofacil():
+    assert numeros_moldura("lotofacil") == {1, 2, 3, 4, 5, 6, 10, 11, 15, 16, 20, 21, 22, 23, 24, 25}
+
+
+def test_precos_reproduzem_tabelas():
+    mega = {6: 6.00, 7: 42.00, 10: 1260.00, 15: 30030.00, 20: 232560.00}
+    assert all(preco_aposta("megasena", q) == v for q, v in mega.items())
+    assert preco_aposta("quina", 15) == 9009.00
+    assert preco_aposta("lotofacil", 19) == 13566.00
+    assert preco_aposta("mais_milionaria", 9, 4) == 3024.00
+    assert preco_aposta("lotomania", 50) == 3.00
+    assert preco_aposta("megasena", 21) == 0.0 and preco_aposta("mais_milionaria", 6, 7) == 0.0
+
+    # Geradores e lote leem o mesmo preço (uma alteração em config vale para todos)
+    from funcoes.megasena.gerarCombinacao_numeros_aleatoriosMegasena_MS import gerar_aposta_personalizada
+    from funcoes.milionaria.gerarCombinacao_numeros_aleatoriosMilionaria import (
+        gerar_aposta_personalizada as gerar_milionaria,
+    )
+    from services.geradores.lote import valor_aposta
+
+    assert gerar_aposta_personalizada(10)[1:] == (1260.00, 210)
+    assert gerar_milionaria(9, 2, 2)[3:] == (3024.00, 504)
+    assert valor_aposta("mais_milionaria", 9, 4) == 3024.00 and valor_aposta("quina", 15) == 9009.00
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo as contagens exatas...")
+    test_contagens_batem_com_enumeracao()
+    test_mega_sena_tres_pares_e_soma()
+    test_lotomania_exata_acima_de_64_bits()
+    test_moldura_da_lotofacil()
+    test_precos_reproduzem_tabelas()
+    print("✅ Probabilidades ok")
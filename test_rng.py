@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão dos fluxos aleatórios por pedido (funcoes/common/rng.py): a mesma
+semente refaz as mesmas apostas, os fluxos filhos batem com
+``SeedSequence.spawn`` e sementes inválidas são recusadas (400 nas rotas).
+
+Uso:
+    python test_rng.py
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append('.')
+
+from funcoes.common.rng import criar_rng, fluxo, fluxos, normalizar_semente, sortear_numeros
+from services.geradores.numeros_aleatorios import gerar_numeros_aleatorios_megasena
+
+
+def test_semente_refaz_as_apostas():
+    primeiro = gerar_numeros_aleatorios_megasena(semente=None)
+    assert primeiro["success"]
+    refeito = gerar_numeros_aleatorios_megasena(semente=primeiro["semente"])
+    assert refeito["numeros"] == primeiro["numeros"]
+
+    rng, semente = criar_rng(12345)
+    assert semente == 12345
+    aposta = sortear_numeros(rng, 1, 25, 15)
+    assert aposta == sorted(set(aposta)) and len(aposta) == 15 and 1 <= aposta[0] and aposta[-1] <= 25
+    assert sortear_numeros(criar_rng("12345")[0], 1, 25, 15) == aposta
+
+
+def test_fluxos_filhos_batem_com_spawn():
+    filhos = np.random.SeedSequence(99).spawn(3)
+    for i, gerador in enumerate(fluxos(99, 3)):
+        esperado = np.random.Generator(np.random.PCG64(filhos[i]))
+        assert gerador.integers(0, 2 ** 32, 4).tolist() == esperado.integers(0, 2 ** 32, 4).tolist()
+    # O fluxo i não depende de quantos foram criados
+    assert fluxo(99, 2).random() == fluxos(99, 5)[2].random()
+
+
+def test_semente_invalida():
+    assert normalizar_semente(None) is None and normalizar_semente("") is None
+    assert normalizar_semente("18446744073709551615") == 2 ** 64 - 1
+    for invalida in ("abc", -1, 2 ** 64, 1.5, True):
+        with pytest.raises(ValueError):
+            normalizar_semente(invalida)
+
+
+def test_rotas_recusam_semente_invalida():
+    import app as aplicacao
+
+    cliente = aplicacao.app.test_client()
+    rotas = ("/api/gerar_aposta_premium_quina", "/api/gerar-aposta-aleatoria-lotofacil", "/api/gerar_aposta_premium",
+             "/api/gerar_aposta_premium_lotofacil", "/api/gerar_aposta_premium_MS",
+             "/api/gerar_aposta_premium_milionaria")
+    for rota in rotas:
+        resposta = cliente.post(rota, json={"semente": "abc"})
+        assert resposta.status_code == 400 and resposta.get_json()["error"] == "Semente inválida", rota
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo os fluxos aleatórios...")
+    test_semente_refaz_as_apostas()
+    test_fluxos_filhos_batem_com_spawn()
+    test_semente_invalida()
+    test_rotas_recusam_semente_invalida()
+    print("✅ Fluxos aleatórios ok")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regressão do contador de duplas/ternas/quadras (funcoes/common/subconjuntos.py):
+em sorteios aleatórios (bolas fora de ordem, ramos denso e esparso) o top-k e
+o dicionário completo são exatamente os de
+``Counter(combinations(...)).most_common``, inclusive a ordem dos empates.
+
+Uso:
+    python test_subconjuntos.py
+"""
+
+import sys
+from collections import Counter
+from itertools import combinations
+
+sys.path.append('.')
+
+import numpy as np
+
+from funcoes.common.subconjuntos import ContadorSubconjuntos
+
+
+def _sorteios(qtd, bolas, num_min, num_max, seed):
+    rng = np.random.default_rng(seed)
+    return np.array([rng.choice(np.arange(num_min, num_max + 1), bolas, replace=False) for _ in range(qtd)])
+
+
+def _counter(sorteios, k):
+    return Counter(s for sorteio in sorteios.tolist() for s in combinations(sorted(sorteio), k))
+
+
+def test_igual_a_counter_most_common():
+    casos = [
+        (300, 6, 1, 60),    # Mega Sena: duplas densas, quadras esparsas
+        (300, 5, 1, 80),    # Quina
+        (200, 15, 1, 25),   # Lotofácil: tudo denso
+        (150, 6, 1, 50),    # +Milionária
+        (60, 20, 0, 99),    # Lotomania (começa em 0)
+        (80, 4, 1, 9),      # universo pequeno: muitos empates
+    ]
+    for qtd, bolas, num_min, num_max in casos:
+        sorteios = _sorteios(qtd, bolas, num_min, num_max, seed=qtd + bolas)
+        for k in (2, 3, 4):
+            contador = ContadorSubconjuntos(sorteios, k, num_min, num_max)
+            esperado = _counter(sorteios, k)
+            for top in (1, 10, 50, len(esperado) + 5):
+                assert contador.mais_frequentes(top) == esperado.most_common(top), (bolas, num_max, k, top)
+            assert list(contador.como_dict().items()) == list(esperado.items()), (bolas, num_max, k)
+
+
+def test_casos_de_borda():
+    assert ContadorSubconjuntos(np.zeros((0, 6)), 2, 1, 60).mais_frequentes(10) == []
+    assert ContadorSubconjuntos(_sorteios(5, 3, 1, 60, seed=1), 4, 1, 60).como_dict() == {}
+    sorteios = _sorteios(20, 6, 1, 60, seed=2)
+    assert ContadorSubconjuntos(sorteios, 2, 1, 60).mais_frequentes(0) == []
+    # Uma linha só: todos empatados, na ordem de itertools
+    linha = np.array([[9, 3, 7, 1]])
+    assert ContadorSubconjuntos(linha, 2, 1, 9).mais_frequentes(10) == _counter(linha, 2).most_common(10)
+
+
+if __name__ == "__main__":
+    print("🔍 Conferindo duplas/ternas/quadras contra Counter...")
+    test_igual_a_counter_most_common()
+    test_casos_de_borda()
+    print("✅ Subconjuntos ok")